@@ -14,28 +14,44 @@ from __future__ import annotations
 
 import asyncio
 import json
-import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import httpx
 import toml
 
+from backend.http_pool import get_http_client
 from config.manager import ConfigManager
 from i18n.manager import _
 from log.manager import get_logger
 
+from . import profiling, systemd
 from .models import AgentInitStatus, DeploymentState
+from .readiness import BackoffPolicy, wait_until_ready
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
 
+    from .checkpoint import StepCheckpoint
+
 logger = get_logger(__name__)
 
 # HTTP 状态码常量
 HTTP_OK = 200
 
+# MCP 服务注册与智能体创建的默认并发数
+DEFAULT_MAX_CONCURRENCY = 4
+
+# 等待 MCP 服务完成启动的超时时间（秒）
+MCP_SERVICE_START_TIMEOUT = 30
+
+# 断点记录中保存已注册 MCP 服务映射的键
+MCP_SERVICES_OUTPUT = "mcp_services"
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
 
 class ConfigError(Exception):
     """配置错误异常"""
@@ -154,42 +170,38 @@ class ApiClient:
         }
 
         logger.info("注册 MCP 服务: %s", config.name)
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
+        try:
+            response = await self._request("POST", url, json=payload)
 
-                result = response.json()
-                if result.get("code") != HTTP_OK:
-                    msg = f"注册 MCP 服务失败: {result.get('message', 'Unknown error')}"
-                    logger.error(msg)
-                    raise ApiError(msg)
+            result = response.json()
+            if result.get("code") != HTTP_OK:
+                msg = f"注册 MCP 服务失败: {result.get('message', 'Unknown error')}"
+                logger.error(msg)
+                raise ApiError(msg)
 
-                service_id = result["result"]["serviceId"]
-                logger.info("MCP 服务注册成功: %s -> %s", config.name, service_id)
+            service_id = result["result"]["serviceId"]
+            logger.info("MCP 服务注册成功: %s -> %s", config.name, service_id)
 
-            except httpx.RequestError as e:
-                msg = f"注册 MCP 服务网络错误: {e}"
-                logger.exception(msg)
-                raise ApiError(msg) from e
+        except httpx.RequestError as e:
+            msg = f"注册 MCP 服务网络错误: {e}"
+            logger.exception(msg)
+            raise ApiError(msg) from e
 
-            else:
-                return service_id
+        else:
+            return service_id
 
     async def install_mcp_service(self, service_id: str) -> None:
         """安装 MCP 服务"""
         url = f"{self.base_url}/api/mcp/{service_id}/install?install=true"
 
         logger.info("安装 MCP 服务: %s", service_id)
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url)
-                response.raise_for_status()
-                logger.info("MCP 服务安装请求已发送: %s", service_id)
-            except httpx.RequestError as e:
-                msg = f"安装 MCP 服务网络错误: {e}"
-                logger.exception(msg)
-                raise ApiError(msg) from e
+        try:
+            await self._request("POST", url)
+            logger.info("MCP 服务安装请求已发送: %s", service_id)
+        except httpx.RequestError as e:
+            msg = f"安装 MCP 服务网络错误: {e}"
+            logger.exception(msg)
+            raise ApiError(msg) from e
 
     async def check_mcp_service_status(self, service_id: str) -> str | None:
         """
@@ -205,30 +217,28 @@ class ApiClient:
         """
         url = f"{self.base_url}/api/mcp/{service_id}"
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.get(url)
-                response.raise_for_status()
+        try:
+            response = await self._request("GET", url)
 
-                result = response.json()
-                # 检查 API 调用是否成功
-                if result.get("code") != HTTP_OK:
-                    logger.warning("获取 MCP 服务状态失败: %s", result.get("message", "Unknown error"))
-                    return None
+            result = response.json()
+            # 检查 API 调用是否成功
+            if result.get("code") != HTTP_OK:
+                logger.warning("获取 MCP 服务状态失败: %s", result.get("message", "Unknown error"))
+                return None
 
-                # 获取服务状态
-                service_result = result.get("result", {})
-                status = service_result.get("status")
+            # 获取服务状态
+            service_result = result.get("result", {})
+            status = service_result.get("status")
 
-                if status in ("ready", "failed", "cancelled", "init", "installing"):
-                    return status
+            if status in ("ready", "failed", "cancelled", "init", "installing"):
+                return status
 
-                logger.warning("未知的 MCP 服务状态: %s", status)
+            logger.warning("未知的 MCP 服务状态: %s", status)
 
-            except httpx.RequestError as e:
-                logger.debug("检查 MCP 服务状态网络错误: %s", e)
+        except httpx.RequestError as e:
+            logger.debug("检查 MCP 服务状态网络错误: %s", e)
 
-            return None
+        return None
 
     async def wait_for_installation(
         self,
@@ -241,40 +251,53 @@ class ApiClient:
 
         只要接口能打通、后端返回的状态没有明确成功或失败或取消，就会一直等下去。
         只有在明确失败或取消时才返回 False。
+        开始时快速轮询，之后按指数退避逐步放宽到 check_interval 秒。
         """
         logger.info("等待 MCP 服务安装完成: %s", service_id)
 
-        attempt = 0
-        while True:
-            status = await self.check_mcp_service_status(service_id)
-
-            if status == "ready":
-                logger.info("MCP 服务安装完成: %s", service_id)
-                return True
+        status: str | None = None
+        timeout_warned = False
 
-            if status in ("failed", "cancelled"):
-                logger.error("MCP 服务安装失败或被取消: %s (状态: %s)", service_id, status)
-                return False
+        async def is_settled() -> bool:
+            nonlocal status
+            status = await self.check_mcp_service_status(service_id)
+            return status in ("ready", "failed", "cancelled")
 
+        def on_attempt(attempt: int, elapsed: float) -> None:
+            nonlocal timeout_warned
+            if attempt == 1:
+                return
             if status in ("init", "installing"):
                 logger.debug(
                     "MCP 服务 %s %s中... (第 %d 次检查)",
                     service_id,
                     "初始化" if status == "init" else "安装",
-                    attempt + 1,
+                    attempt - 1,
                 )
             elif status is None:
-                logger.debug("MCP 服务 %s 状态检查失败，继续等待... (第 %d 次检查)", service_id, attempt + 1)
+                logger.debug("MCP 服务 %s 状态检查失败，继续等待... (第 %d 次检查)", service_id, attempt - 1)
             else:
-                logger.debug("MCP 服务 %s 状态未知: %s，继续等待... (第 %d 次检查)", service_id, status, attempt + 1)
+                logger.debug("MCP 服务 %s 状态未知: %s，继续等待... (第 %d 次检查)", service_id, status, attempt - 1)
 
-            # 只有在超过最大等待时间时才超时返回，但仅在没有明确失败的情况下
-            attempt += 1
-            if attempt * check_interval >= max_wait_time:
-                # 这里不返回 False，而是继续等待，因为要求只要接口能打通就一直等
+            # 超过最大等待时间只告警一次，不返回 False，因为要求只要接口能打通就一直等
+            if not timeout_warned and elapsed >= max_wait_time:
+                timeout_warned = True
                 logger.warning("MCP 服务安装等待超时: %s (已等待 %d 秒，但将继续尝试)", service_id, max_wait_time)
 
-            await asyncio.sleep(check_interval)
+        result = await wait_until_ready(
+            f"MCP {service_id}",
+            is_settled,
+            timeout=None,
+            policy=BackoffPolicy(initial=0.25, max_interval=float(check_interval)),
+            on_attempt=on_attempt,
+        )
+
+        if status == "ready":
+            logger.info("MCP 服务安装完成: %s (等待 %.1f 秒)", service_id, result.elapsed)
+            return True
+
+        logger.error("MCP 服务安装失败或被取消: %s (状态: %s)", service_id, status)
+        return False
 
     async def activate_mcp_service(self, service_id: str) -> None:
         """激活 MCP 服务"""
@@ -282,23 +305,21 @@ class ApiClient:
         payload = {"active": True}
 
         logger.info("激活 MCP 服务: %s", service_id)
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
+        try:
+            response = await self._request("POST", url, json=payload)
 
-                result = response.json()
-                if result.get("code") != HTTP_OK:
-                    msg = f"激活 MCP 服务失败: {result.get('message', 'Unknown error')}"
-                    logger.error(msg)
-                    raise ApiError(msg)
+            result = response.json()
+            if result.get("code") != HTTP_OK:
+                msg = f"激活 MCP 服务失败: {result.get('message', 'Unknown error')}"
+                logger.error(msg)
+                raise ApiError(msg)
 
-                logger.info("MCP 服务激活成功: %s", service_id)
+            logger.info("MCP 服务激活成功: %s", service_id)
 
-            except httpx.RequestError as e:
-                msg = f"激活 MCP 服务网络错误: {e}"
-                logger.exception(msg)
-                raise ApiError(msg) from e
+        except httpx.RequestError as e:
+            msg = f"激活 MCP 服务网络错误: {e}"
+            logger.exception(msg)
+            raise ApiError(msg) from e
 
     async def create_agent(
         self,
@@ -319,59 +340,117 @@ class ApiClient:
         }
 
         logger.info("创建智能体: %s (包含 %d 个 MCP 服务)", name, len(mcp_service_ids))
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
+        try:
+            response = await self._request("POST", url, json=payload)
 
-                result = response.json()
-                if result.get("code") != HTTP_OK:
-                    msg = f"创建智能体失败: {result.get('message', 'Unknown error')}"
-                    logger.error(msg)
-                    raise ApiError(msg)
+            result = response.json()
+            if result.get("code") != HTTP_OK:
+                msg = f"创建智能体失败: {result.get('message', 'Unknown error')}"
+                logger.error(msg)
+                raise ApiError(msg)
 
-                app_id = result["result"]["appId"]
-                logger.info("智能体创建成功: %s -> %s", name, app_id)
+            app_id = result["result"]["appId"]
+            logger.info("智能体创建成功: %s -> %s", name, app_id)
 
-            except httpx.RequestError as e:
-                msg = f"创建智能体网络错误: {e}"
-                logger.exception(msg)
-                raise ApiError(msg) from e
+        except httpx.RequestError as e:
+            msg = f"创建智能体网络错误: {e}"
+            logger.exception(msg)
+            raise ApiError(msg) from e
 
-            else:
-                return app_id
+        else:
+            return app_id
 
     async def publish_agent(self, app_id: str) -> None:
         """发布智能体"""
         url = f"{self.base_url}/api/app/{app_id}"
 
         logger.info("发布智能体: %s", app_id)
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url)
-                response.raise_for_status()
-
-                result = response.json()
-                if result.get("code") != HTTP_OK:
-                    msg = f"发布智能体失败: {result.get('message', 'Unknown error')}"
-                    logger.error(msg)
-                    raise ApiError(msg)
-
-                logger.info("智能体发布成功: %s", app_id)
-
-            except httpx.RequestError as e:
-                msg = f"发布智能体网络错误: {e}"
-                logger.exception(msg)
-                raise ApiError(msg) from e
+        try:
+            response = await self._request("POST", url)
+
+            result = response.json()
+            if result.get("code") != HTTP_OK:
+                msg = f"发布智能体失败: {result.get('message', 'Unknown error')}"
+                logger.error(msg)
+                raise ApiError(msg)
+
+            logger.info("智能体发布成功: %s", app_id)
+
+        except httpx.RequestError as e:
+            msg = f"发布智能体网络错误: {e}"
+            logger.exception(msg)
+            raise ApiError(msg) from e
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取共享的长连接 HTTP 客户端（超时与 self.timeout 一致）"""
+        return get_http_client(self.base_url, profile="default")
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """发送请求并记录耗时，非 2xx 响应抛出 httpx.HTTPStatusError"""
+        with profiling.measure("http", f"{method} {httpx.URL(url).path}"):
+            response = await self._get_client().request(method, url, **kwargs)
+            response.raise_for_status()
+        return response
+
+
+class _OrderedProgress:
+    """按任务顺序转发并发任务的进度消息"""
+
+    def __init__(self, count: int, report: Callable[[str], None]) -> None:
+        """初始化各任务的进度缓冲区"""
+        self._report = report
+        self._buffers = [DeploymentState() for _ in range(count)]
+        self._forwarded = [0] * count
+        self._done = [False] * count
+        self._head = 0
+
+    def buffer(self, index: int) -> DeploymentState:
+        """获取任务专用的进度缓冲区"""
+        return self._buffers[index]
+
+    def finish(self, index: int) -> None:
+        """标记任务完成并转发可输出的进度"""
+        self._done[index] = True
+        self.flush()
+
+    def flush(self) -> None:
+        """转发排在最前面的任务的新消息，前面的任务完成后继续转发后续任务"""
+        while self._head < len(self._buffers):
+            buffer = self._buffers[self._head]
+            messages, _dropped = buffer.logs_since(self._forwarded[self._head])
+            for message in messages:
+                self._report(message)
+            self._forwarded[self._head] = buffer.log_count
+            if not self._done[self._head]:
+                break
+            self._head += 1
 
 
 class AgentManager:
     """智能体管理器"""
 
-    def __init__(self, server_ip: str = "127.0.0.1", server_port: int = 8002) -> None:
-        """初始化智能体管理器"""
+    def __init__(
+        self,
+        server_ip: str = "127.0.0.1",
+        server_port: int = 8002,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        checkpoint: StepCheckpoint | None = None,
+    ) -> None:
+        """
+        初始化智能体管理器
+
+        Args:
+            server_ip: 后端服务地址
+            server_port: 后端服务端口
+            max_concurrency: 同时注册/安装的 MCP 服务及同时创建的智能体数量上限
+            checkpoint: 部署断点记录，用于在重试时复用上次已注册的 MCP 服务
+
+        """
         self.api_client = ApiClient(server_ip, server_port)
         self.config_manager = ConfigManager()
+        self.max_concurrency = max(1, max_concurrency)
+        self.checkpoint = checkpoint
 
         resource_paths = [
             Path("/usr/lib/euler-copilot-framework/mcp_center"),  # 生产环境
@@ -436,10 +515,14 @@ class AgentManager:
         if not await self._verify_mcp_services(state, progress_callback):
             return AgentInitStatus.FAILED
 
-        # 4. 加载 MCP 配置并注册服务
-        mcp_service_mapping = await self._register_all_mcp_services(state, progress_callback)
+        # 4. 加载 MCP 配置并注册服务，重试时复用上次已注册的服务
+        mcp_service_mapping = self._restore_mcp_services(state, progress_callback)
         if not mcp_service_mapping:
-            return AgentInitStatus.FAILED
+            mcp_service_mapping = await self._register_all_mcp_services(state, progress_callback)
+            if not mcp_service_mapping:
+                return AgentInitStatus.FAILED
+            if self.checkpoint is not None:
+                self.checkpoint.save_output(MCP_SERVICES_OUTPUT, mcp_service_mapping)
 
         # 5. 读取应用配置并创建智能体
         default_app_id = await self._create_agents_from_config(
@@ -461,6 +544,25 @@ class AgentManager:
         self._report_progress(state, _("[yellow]未能创建任何智能体[/yellow]"), progress_callback)
         return AgentInitStatus.SUCCESS
 
+    def _restore_mcp_services(
+        self,
+        state: DeploymentState,
+        callback: Callable[[DeploymentState], None] | None,
+    ) -> dict[str, str]:
+        """从断点记录中恢复上次注册的 MCP 服务映射"""
+        if self.checkpoint is None:
+            return {}
+        mapping = self.checkpoint.get_output(MCP_SERVICES_OUTPUT)
+        if not isinstance(mapping, dict) or not mapping:
+            return {}
+        self._report_progress(
+            state,
+            _("[green]复用上次部署注册的 {count} 个 MCP 服务[/green]").format(count=len(mapping)),
+            callback,
+        )
+        logger.info("从断点记录恢复 MCP 服务映射: %s", mapping)
+        return mapping
+
     def _report_progress(
         self,
         state: DeploymentState,
@@ -472,6 +574,45 @@ class AgentManager:
         if callback:
             callback(state)
 
+    async def _run_ordered(
+        self,
+        items: list[_T],
+        worker: Callable[[_T, DeploymentState, Callable[[DeploymentState], None]], Awaitable[_R]],
+        state: DeploymentState,
+        callback: Callable[[DeploymentState], None] | None,
+    ) -> list[_R]:
+        """
+        以有限并发执行任务，并按任务顺序转发进度
+
+        每个任务向独立的 DeploymentState 写入进度，排在最前面的未完成任务的消息实时转发，
+        其余任务的消息缓存到前面的任务全部完成后再按顺序输出，日志顺序与串行执行时一致。
+
+        Args:
+            items: 任务参数列表
+            worker: 任务函数，接收任务参数、任务专用状态对象和进度回调
+            state: 主部署流程的状态对象
+            callback: 主进度回调函数
+
+        Returns:
+            list[_R]: 与 items 顺序一致的任务结果
+
+        """
+        progress = _OrderedProgress(
+            len(items),
+            lambda message: self._report_progress(state, message, callback),
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(index: int, item: _T) -> _R:
+            task_state = progress.buffer(index)
+            try:
+                async with semaphore:
+                    return await worker(item, task_state, lambda _state: progress.flush())
+            finally:
+                progress.finish(index)
+
+        return list(await asyncio.gather(*(run(index, item) for index, item in enumerate(items))))
+
     def _get_service_files(
         self,
         state: DeploymentState,
@@ -608,7 +749,7 @@ class AgentManager:
         try:
             # 复制服务文件到 systemd 目录
             cmd = f"sudo cp {service_file} {target_path}"
-            process = await asyncio.create_subprocess_shell(
+            process = await profiling.create_subprocess_shell(
                 cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
@@ -653,7 +794,7 @@ class AgentManager:
 
         try:
             cmd = "sudo systemctl daemon-reload"
-            process = await asyncio.create_subprocess_shell(
+            process = await profiling.create_subprocess_shell(
                 cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
@@ -721,7 +862,7 @@ class AgentManager:
             self._report_progress(state, _("  [blue]执行命令: {cmd}[/blue]").format(cmd=cmd), callback)
             logger.info("执行 MCP 启动脚本: %s", cmd)
 
-            process = await asyncio.create_subprocess_shell(
+            process = await profiling.create_subprocess_shell(
                 cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.STDOUT,
@@ -763,41 +904,19 @@ class AgentManager:
         if not self.service_dir or not self.service_dir.exists():
             return True
 
-        service_files = list(self.service_dir.glob("*.service"))
-        if not service_files:
+        service_names = [service_file.stem for service_file in self.service_dir.glob("*.service")]
+        if not service_names:
             return True
 
-        # 静默清理服务
-        for service_file in service_files:
-            service_name = service_file.stem  # 去掉 .service 后缀
-            await self._stop_service(service_name)
-
-        return True
-
-    async def _stop_service(self, service_name: str) -> None:
-        """静默停止服务"""
+        # 一次查询所有服务状态，静默停止正在运行的服务
         try:
-            # 检查服务状态
-            status_cmd = f"systemctl is-active {service_name}"
-            status_process = await asyncio.create_subprocess_shell(
-                status_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, _ = await status_process.communicate()
-            status = stdout.decode("utf-8").strip() if stdout else ""
-
-            # 如果服务正在运行，静默停止它
-            if status == "active":
-                stop_cmd = f"sudo systemctl stop {service_name}"
-                await asyncio.create_subprocess_shell(
-                    stop_cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-        except (OSError, subprocess.SubprocessError):
+            statuses = await systemd.query_units(service_names)
+            await systemd.stop_units([name for name, status in statuses.items() if status.active_state == "active"])
+        except (OSError, systemd.SystemdError) as e:
             # 静默忽略任何错误
-            logger.debug("静默停止服务时发生异常: %s", service_name)
+            logger.debug("静默停止服务时发生异常: %s", e)
+
+        return True
 
     async def _verify_mcp_services(
         self,
@@ -812,13 +931,21 @@ class AgentManager:
         if service_files is None:
             return True
 
-        # 处理所有服务文件
-        _overall_success, _active_services, failed_services = await self._process_service_files(
-            service_files,
-            state,
-            callback,
-            self._verify_single_service,
-        )
+        service_names = [service_file.stem for service_file in service_files]
+        for service_name in service_names:
+            self._report_progress(
+                state,
+                _("  [magenta]检查服务状态: {name}[/magenta]").format(name=service_name),
+                callback,
+            )
+
+        statuses = await self._wait_for_services_settled(service_names, state, callback)
+
+        failed_services = [
+            service_name
+            for service_name in service_names
+            if not self._report_service_status(service_name, statuses.get(service_name), state, callback)
+        ]
 
         if failed_services:
             self._report_progress(
@@ -832,114 +959,114 @@ class AgentManager:
         self._report_progress(state, _("[green]MCP Server 服务验证完成[/green]"), callback)
         return True
 
-    async def _verify_single_service(
+    async def _wait_for_services_settled(
         self,
-        service_file: Path,
+        service_names: list[str],
         state: DeploymentState,
         callback: Callable[[DeploymentState], None] | None,
-        retry_count: int = 0,
-    ) -> tuple[bool, str]:
-        """验证单个服务状态"""
-        await asyncio.sleep(0.1)
+    ) -> dict[str, systemd.UnitStatus]:
+        """
+        一起轮询所有服务，直到每个服务都不再处于启动中或超时
+
+        Returns:
+            dict[str, UnitStatus]: 各服务最后一次查询到的状态，查询失败而无法确定状态的服务不包含在内
+
+        """
+        statuses: dict[str, systemd.UnitStatus] = {}
+        pending = list(service_names)
+        query_failed = False
 
-        service_name = service_file.stem  # 去掉 .service 后缀
+        async def all_settled() -> bool:
+            nonlocal pending, query_failed
+            try:
+                current = await systemd.query_units(pending)
+            except (OSError, systemd.SystemdError):
+                logger.exception("检查服务状态失败: %s", pending)
+                query_failed = True
+                return True
+
+            for service_name, status in current.items():
+                if status.is_pending and service_name not in statuses:
+                    self._report_progress(
+                        state,
+                        _("    [yellow]{service_name} 正在启动中，等待启动完成...[/yellow]").format(
+                            service_name=service_name,
+                        ),
+                        callback,
+                    )
+                    logger.info("服务正在启动中，等待启动完成: %s", service_name)
+            statuses.update(current)
+            pending = [service_name for service_name, status in current.items() if status.is_pending]
+            return not pending
+
+        await wait_until_ready(
+            "MCP systemd units",
+            all_settled,
+            timeout=MCP_SERVICE_START_TIMEOUT,
+            policy=BackoffPolicy(initial=0.2, max_interval=2.0),
+        )
+        if query_failed:
+            for service_name in pending:
+                statuses.pop(service_name, None)
+        return statuses
 
-        # 限制递归次数，最多重试6次（30秒）
-        max_retries = 6
-        if retry_count > max_retries:
+    def _report_service_status(
+        self,
+        service_name: str,
+        status: systemd.UnitStatus | None,
+        state: DeploymentState,
+        callback: Callable[[DeploymentState], None] | None,
+    ) -> bool:
+        """报告单个服务的最终状态，返回服务是否正常运行"""
+        if status is None:
             self._report_progress(
                 state,
-                _("    [red]{name} 启动超时 (30秒)[/red]").format(name=service_name),
+                _("    [red]检查 {name} 状态失败[/red]").format(name=service_name),
                 callback,
             )
-            logger.error("服务启动超时: %s", service_name)
-            return False, service_name
+            return False
 
-        if retry_count == 0:
+        if status.is_running:
             self._report_progress(
                 state,
-                _("  [magenta]检查服务状态: {name}[/magenta]").format(name=service_name),
+                _("    [green]{service_name} 状态正常 (active running)[/green]").format(service_name=service_name),
                 callback,
             )
-        else:
+            logger.info("服务状态正常: %s", service_name)
+            return True
+
+        if status.is_pending:
             self._report_progress(
                 state,
-                _("    [dim]{name} 重新检查状态... (第 {count} 次)[/dim]").format(
+                _("    [red]{name} 启动超时 ({seconds}秒)[/red]").format(
                     name=service_name,
-                    count=retry_count,
+                    seconds=MCP_SERVICE_START_TIMEOUT,
                 ),
                 callback,
             )
+            logger.error("服务启动超时: %s", service_name)
+            return False
 
-        try:
-            # 使用 systemctl status 获取详细状态信息
-            cmd = f"systemctl status {service_name}"
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, _stderr = await process.communicate()
-            output = stdout.decode("utf-8") if stdout else ""
-
-        except Exception:
+        if status.active_state == "failed" or status.sub_state in systemd.FAILING_SUB_STATES:
             self._report_progress(
                 state,
-                _("    [red]检查 {name} 状态失败[/red]").format(name=service_name),
+                _("    [red]{service_name} 服务启动失败[/red]").format(service_name=service_name),
                 callback,
             )
-            logger.exception("检查服务状态失败: %s", service_name)
-            return False, service_name
-        else:
-            # systemctl status 返回码: 0=active, 1=dead, 2=unknown, 3=not-found, 4=permission-denied
-            if process.returncode == 0 and "active (running)" in output.lower():
-                # 服务正常运行
-                self._report_progress(
-                    state,
-                    _("    [green]{service_name} 状态正常 (active running)[/green]").format(service_name=service_name),
-                    callback,
-                )
-                logger.info("服务状态正常: %s", service_name)
-                return True, service_name
-
-            # 分析输出内容，检查是否有失败信息
-            if "failed" in output.lower() or "code=exited" in output.lower():
-                self._report_progress(
-                    state,
-                    _("    [red]{service_name} 服务启动失败[/red]").format(service_name=service_name),
-                    callback,
-                )
-                logger.error("服务启动失败: %s, 详细信息: %s", service_name, output.strip())
-                return False, service_name
-
-            # 检查是否真的在启动中（activating 状态）
-            if "activating" in output.lower() and "start" in output.lower():
-                if retry_count == 0:
-                    self._report_progress(
-                        state,
-                        _("    [yellow]{service_name} 正在启动中，等待启动完成...[/yellow]").format(
-                            service_name=service_name,
-                        ),
-                        callback,
-                    )
-                    logger.info("服务正在启动中，等待启动完成: %s", service_name)
-
-                # 等待3秒后递归调用自己
-                await asyncio.sleep(3)
-                return await self._verify_single_service(service_file, state, callback, retry_count + 1)
+            logger.error("服务启动失败: %s, 状态: %s, 结果: %s", service_name, status.describe(), status.result)
+            return False
 
-            # 其他状态都认为是异常
-            self._report_progress(
-                state,
-                _("    [red]{service_name} 状态异常 (返回码: {returncode})[/red]").format(
-                    service_name=service_name,
-                    returncode=process.returncode,
-                ),
-                callback,
-            )
-            logger.warning("服务状态异常: %s, 返回码: %d, 输出: %s", service_name, process.returncode, output.strip())
-            return False, service_name
+        # 其他状态都认为是异常
+        self._report_progress(
+            state,
+            _("    [red]{service_name} 状态异常: {status}[/red]").format(
+                service_name=service_name,
+                status=status.describe(),
+            ),
+            callback,
+        )
+        logger.warning("服务状态异常: %s, 加载状态: %s, 状态: %s", service_name, status.load_state, status.describe())
+        return False
 
     async def _register_all_mcp_services(
         self,
@@ -960,29 +1087,40 @@ class AgentManager:
         if not configs:
             return {}
 
-        mcp_service_mapping = {}
-
-        for config_path, config in configs:
-            service_id = await self._process_mcp_service(config, state, callback)
+        async def register(
+            item: tuple[Path, McpConfig],
+            task_state: DeploymentState,
+            task_callback: Callable[[DeploymentState], None],
+        ) -> str | None:
+            config_path, config = item
+            service_id = await self._process_mcp_service(config, task_state, task_callback)
             if service_id:
-                # 使用配置目录名作为 MCP 路径名
-                mcp_path_name = config_path.parent.name
-                mcp_service_mapping[mcp_path_name] = service_id
                 self._report_progress(
-                    state,
+                    task_state,
                     _("  [green]{name} 注册成功: {mcp_path} -> {service_id}[/green]").format(
                         name=config.name,
-                        mcp_path=mcp_path_name,
+                        mcp_path=config_path.parent.name,
                         service_id=service_id,
                     ),
-                    callback,
+                    task_callback,
                 )
             else:
                 self._report_progress(
-                    state,
+                    task_state,
                     _("  [red]MCP 服务 {name} 注册失败[/red]").format(name=config.name),
-                    callback,
+                    task_callback,
                 )
+            return service_id
+
+        # 并发注册、安装并等待各 MCP 服务，进度按配置顺序输出
+        service_ids = await self._run_ordered(configs, register, state, callback)
+
+        # 使用配置目录名作为 MCP 路径名
+        mcp_service_mapping = {
+            config_path.parent.name: service_id
+            for (config_path, _config), service_id in zip(configs, service_ids, strict=True)
+            if service_id
+        }
 
         self._report_progress(
             state,
@@ -1005,29 +1143,28 @@ class AgentManager:
         if not app_configs:
             return None
 
-        created_agents = []
-        default_app_id = None
+        async def create(
+            item: tuple[int, AppConfig],
+            task_state: DeploymentState,
+            task_callback: Callable[[DeploymentState], None],
+        ) -> str | None:
+            index, app_config = item
+            app_id = await self._create_single_agent(app_config, mcp_service_mapping, task_state, task_callback)
 
-        for i, app_config in enumerate(app_configs):
-            app_id = await self._create_single_agent(
-                app_config,
-                mcp_service_mapping,
-                state,
-                callback,
-            )
-
-            if app_id:
-                created_agents.append(app_id)
+            # 第一个智能体设置为默认智能体
+            if app_id and index == 0:
+                self._report_progress(
+                    task_state,
+                    _("  [dim]设置默认智能体: {name}[/dim]").format(name=app_config.name),
+                    task_callback,
+                )
+                self.config_manager.set_default_app(app_id)
+            return app_id
 
-                # 第一个智能体设置为默认智能体
-                if i == 0:
-                    default_app_id = app_id
-                    self._report_progress(
-                        state,
-                        _("  [dim]设置默认智能体: {name}[/dim]").format(name=app_config.name),
-                        callback,
-                    )
-                    self.config_manager.set_default_app(app_id)
+        # 所有 MCP 服务已就绪，智能体之间互不依赖，可并发创建
+        app_ids = await self._run_ordered(list(enumerate(app_configs)), create, state, callback)
+        created_agents = [app_id for app_id in app_ids if app_id]
+        default_app_id = app_ids[0]
 
         if created_agents:
             self._report_progress(
@@ -1361,21 +1498,25 @@ class AgentManager:
         """尝试简单的 SSE 检查（原来的方式）"""
         try:
             # 使用流式请求，只读取响应头，避免 SSE 连接一直保持开放
-            async with (
-                httpx.AsyncClient(timeout=self.api_client.timeout) as client,
-                client.stream("GET", url, headers={"Accept": "text/event-stream"}) as response,
-            ):
-                if response.status_code == HTTP_OK:
-                    logger.debug("SSE Endpoint 简单检查成功: %s (尝试 %d 次)", url, attempt)
-                    return True
-
-                logger.debug(
-                    "SSE Endpoint 简单检查响应码非 200: %s, 状态码: %d, 尝试: %d/%d",
+            client = get_http_client(url)
+            with profiling.measure("http", f"GET {url}"):
+                async with client.stream(
+                    "GET",
                     url,
-                    response.status_code,
-                    attempt,
-                    max_attempts,
-                )
+                    headers={"Accept": "text/event-stream"},
+                    timeout=self.api_client.timeout,
+                ) as response:
+                    if response.status_code == HTTP_OK:
+                        logger.debug("SSE Endpoint 简单检查成功: %s (尝试 %d 次)", url, attempt)
+                        return True
+
+                    logger.debug(
+                        "SSE Endpoint 简单检查响应码非 200: %s, 状态码: %d, 尝试: %d/%d",
+                        url,
+                        response.status_code,
+                        attempt,
+                        max_attempts,
+                    )
 
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             logger.debug("SSE Endpoint 简单检查连接失败: %s, 错误: %s, 尝试: %d/%d", url, e, attempt, max_attempts)
@@ -1412,48 +1553,49 @@ class AgentManager:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self.api_client.timeout) as client:
-                response = await client.post(url, json=mcp_payload, headers=headers)
+            client = get_http_client(url)
+            with profiling.measure("http", f"POST {url}"):
+                response = await client.post(url, json=mcp_payload, headers=headers, timeout=self.api_client.timeout)
 
-                if response.status_code == HTTP_OK:
-                    # 尝试解析 SSE 响应，确保是有效的 MCP JSON-RPC 响应
-                    try:
-                        response_text = response.text
-
-                        # 检查是否是 SSE 格式的响应
-                        if "event: message" in response_text and "data: " in response_text:
-                            logger.debug("SSE Endpoint MCP 协议检查成功: %s (尝试 %d 次)", url, attempt)
-                            return True
-
-                        # 限制日志输出长度，避免过长的响应内容
-                        max_log_length = 100
-                        truncated_response = (
-                            response_text[:max_log_length] + "..."
-                            if len(response_text) > max_log_length
-                            else response_text
-                        )
-                        logger.debug(
-                            "SSE Endpoint MCP 响应格式异常: %s, 响应: %s, 尝试: %d/%d",
-                            url,
-                            truncated_response,
-                            attempt,
-                            max_attempts,
-                        )
-                    except json.JSONDecodeError:
-                        logger.debug(
-                            "SSE Endpoint MCP 响应非 JSON 格式: %s, 尝试: %d/%d",
-                            url,
-                            attempt,
-                            max_attempts,
-                        )
-                else:
+            if response.status_code == HTTP_OK:
+                # 尝试解析 SSE 响应，确保是有效的 MCP JSON-RPC 响应
+                try:
+                    response_text = response.text
+
+                    # 检查是否是 SSE 格式的响应
+                    if "event: message" in response_text and "data: " in response_text:
+                        logger.debug("SSE Endpoint MCP 协议检查成功: %s (尝试 %d 次)", url, attempt)
+                        return True
+
+                    # 限制日志输出长度，避免过长的响应内容
+                    max_log_length = 100
+                    truncated_response = (
+                        response_text[:max_log_length] + "..."
+                        if len(response_text) > max_log_length
+                        else response_text
+                    )
                     logger.debug(
-                        "SSE Endpoint MCP 响应码非 200: %s, 状态码: %d, 尝试: %d/%d",
+                        "SSE Endpoint MCP 响应格式异常: %s, 响应: %s, 尝试: %d/%d",
+                        url,
+                        truncated_response,
+                        attempt,
+                        max_attempts,
+                    )
+                except json.JSONDecodeError:
+                    logger.debug(
+                        "SSE Endpoint MCP 响应非 JSON 格式: %s, 尝试: %d/%d",
                         url,
-                        response.status_code,
                         attempt,
                         max_attempts,
                     )
+            else:
+                logger.debug(
+                    "SSE Endpoint MCP 响应码非 200: %s, 状态码: %d, 尝试: %d/%d",
+                    url,
+                    response.status_code,
+                    attempt,
+                    max_attempts,
+                )
 
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             logger.debug("SSE Endpoint MCP 连接失败: %s, 错误: %s, 尝试: %d/%d", url, e, attempt, max_attempts)
@@ -0,0 +1,149 @@
+"""
+ANSI 转义序列转换
+
+将安装脚本输出中的 ANSI 转义序列一次扫描转换为 Rich 标记。
+SGR（颜色与字体样式）序列按当前样式状态转换，任意时刻最多只有一个未闭合的标记，行尾自动闭合，
+因此输出的标记始终平衡；无法识别的 SGR 参数被忽略，其他控制序列（如清除行、移动光标）直接丢弃。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+
+# 匹配 CSI 序列（ESC [ 参数 结束字节）以及其他双字节转义序列
+_ANSI_TOKEN = re.compile(r"\x1b\[([0-?]*)[ -/]*([@-~])|\x1b[@-_]?")
+
+_BASIC_COLORS = ("black", "red", "green", "yellow", "blue", "magenta", "cyan", "white")
+
+# SGR 参数 -> (样式字段, 颜色)，颜色为 None 表示恢复默认颜色
+_COLOR_CODES: dict[int, tuple[str, str | None]] = {
+    **{30 + i: ("foreground", color) for i, color in enumerate(_BASIC_COLORS)},
+    **{90 + i: ("foreground", f"bright_{color}") for i, color in enumerate(_BASIC_COLORS)},
+    **{40 + i: ("background", color) for i, color in enumerate(_BASIC_COLORS)},
+    **{100 + i: ("background", f"bright_{color}") for i, color in enumerate(_BASIC_COLORS)},
+    39: ("foreground", None),
+    49: ("background", None),
+}
+
+# 扩展颜色参数（256 色或真彩色）-> 样式字段，下划线颜色 Rich 不支持，只解析不应用
+_EXTENDED_COLOR_CODES: dict[int, str | None] = {38: "foreground", 48: "background", 58: None}
+_COLOR_MODE_256 = 5
+_COLOR_MODE_RGB = 2
+_MAX_COLOR_VALUE = 255
+
+# 开启与关闭字体样式的 SGR 参数
+_ATTRIBUTE_ON = {1: "bold", 2: "dim", 3: "italic", 4: "underline", 7: "reverse", 9: "strike"}
+_ATTRIBUTE_OFF = {22: ("bold", "dim"), 23: ("italic",), 24: ("underline",), 27: ("reverse",), 29: ("strike",)}
+
+
+@dataclass(frozen=True)
+class _SgrState:
+    """当前生效的 SGR 样式"""
+
+    foreground: str | None = None
+    background: str | None = None
+    attributes: frozenset[str] = frozenset()
+
+    def markup(self) -> str:
+        """转换为 Rich 样式描述，无样式时为空字符串"""
+        parts = sorted(self.attributes)
+        if self.foreground:
+            parts.append(self.foreground)
+        if self.background:
+            parts.append(f"on {self.background}")
+        return " ".join(parts)
+
+
+def ansi_to_rich(text: str) -> str:
+    """
+    将包含 ANSI 转义序列的文本转换为 Rich 标记
+
+    文本中原有的 Rich 标记保持不变。
+
+    Args:
+        text: 包含 ANSI 转义序列的文本
+
+    Returns:
+        转换后的 Rich 标记文本
+
+    """
+    if "\x1b" not in text:
+        return text
+
+    parts: list[str] = []
+    state = _SgrState()
+    open_markup = ""
+    last = 0
+    for match in _ANSI_TOKEN.finditer(text):
+        parts.append(text[last : match.start()])
+        last = match.end()
+        if match.group(2) != "m":
+            # 非 SGR 序列不影响显示样式
+            continue
+        state = _apply_sgr(state, match.group(1))
+        markup = state.markup()
+        if markup == open_markup:
+            continue
+        if open_markup:
+            parts.append("[/]")
+        if markup:
+            parts.append(f"[{markup}]")
+        open_markup = markup
+    parts.append(text[last:])
+    if open_markup:
+        parts.append("[/]")
+    return "".join(parts)
+
+
+def strip_ansi(text: str) -> str:
+    """移除文本中的所有 ANSI 转义序列"""
+    if "\x1b" not in text:
+        return text
+    return _ANSI_TOKEN.sub("", text)
+
+
+def _apply_sgr(state: _SgrState, params: str) -> _SgrState:
+    """按 SGR 参数更新样式，无法识别的参数被忽略"""
+    codes = [_parse_code(code) for code in params.split(";")] if params else [0]
+    index = 0
+    while index < len(codes):
+        code = codes[index]
+        index += 1
+        if code == 0:
+            state = _SgrState()
+        elif code in _ATTRIBUTE_ON:
+            state = replace(state, attributes=state.attributes | {_ATTRIBUTE_ON[code]})
+        elif code in _ATTRIBUTE_OFF:
+            state = replace(state, attributes=state.attributes - set(_ATTRIBUTE_OFF[code]))
+        elif code in _COLOR_CODES:
+            target, color = _COLOR_CODES[code]
+            state = replace(state, **{target: color})
+        elif code in _EXTENDED_COLOR_CODES:
+            color, index = _parse_extended_color(codes, index)
+            target = _EXTENDED_COLOR_CODES[code]
+            if color is not None and target is not None:
+                state = replace(state, **{target: color})
+    return state
+
+
+def _parse_extended_color(codes: list[int | None], index: int) -> tuple[str | None, int]:
+    """解析 256 色或真彩色参数，返回颜色和下一个参数的位置"""
+    mode = codes[index] if index < len(codes) else None
+    if mode == _COLOR_MODE_256 and index + 1 < len(codes):
+        value = codes[index + 1]
+        return (f"color({value})" if value is not None and value <= _MAX_COLOR_VALUE else None), index + 2
+    if mode == _COLOR_MODE_RGB and index + 3 < len(codes):
+        rgb = codes[index + 1 : index + 4]
+        if all(value is not None and value <= _MAX_COLOR_VALUE for value in rgb):
+            return "rgb({},{},{})".format(*rgb), index + 4
+        return None, index + 4
+    # 格式无法识别时忽略剩余参数
+    return None, len(codes)
+
+
+def _parse_code(code: str) -> int | None:
+    """解析单个 SGR 参数，空参数视为 0，带子参数等无法识别的格式返回 None"""
+    if not code:
+        return 0
+    return int(code) if code.isdigit() else None
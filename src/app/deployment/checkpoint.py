@@ -0,0 +1,168 @@
+"""
+部署断点记录
+
+持久化记录每个已完成部署步骤的输入指纹（相关部署配置字段的哈希）与步骤产出（如已注册的 MCP 服务 ID）。
+部署失败后重试时，指纹未变化的已完成步骤直接跳过，从失败的步骤继续执行；部署成功后清除断点记录。
+
+断点记录只描述记录时的主机状态：记录第一次部署尝试的开始时间与系统启动 ID，
+超过有效期或主机重启后读取时丢弃，避免按过时的记录跳过步骤。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from log.manager import get_logger
+
+DEPLOYMENT_CHECKPOINT_PATH = Path.home() / ".cache" / "openEuler Intelligence" / "deployment-checkpoint.json"
+CHECKPOINT_VERSION = 2
+# 断点记录的有效期（秒），从第一次部署尝试开始计算
+DEPLOYMENT_CHECKPOINT_TTL = 2 * 3600
+BOOT_ID_PATH = Path("/proc/sys/kernel/random/boot_id")
+
+logger = get_logger(__name__)
+
+
+class DeploymentCheckpoint:
+    """
+    部署断点记录
+
+    每个步骤对应一条记录，包含输入指纹、是否已完成以及步骤产出。
+    未完成的步骤也可以保存部分产出，在指纹不变的情况下供重试时复用。
+    """
+
+    def __init__(self, path: Path = DEPLOYMENT_CHECKPOINT_PATH, ttl: float = DEPLOYMENT_CHECKPOINT_TTL) -> None:
+        """初始化断点记录，已过期或主机重启前的记录被丢弃"""
+        self.path = path
+        self.ttl = ttl
+        self._boot_id = _read_boot_id()
+        self._started = time.time()
+        self._steps = self._load()
+
+    @staticmethod
+    def fingerprint(values: dict[str, Any]) -> str:
+        """根据步骤依赖的配置字段计算输入指纹"""
+        raw = json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def is_completed(self, step: str, fingerprint: str) -> bool:
+        """步骤是否已在相同输入下完成"""
+        entry = self._steps.get(step)
+        return entry is not None and entry.get("completed", False) and entry.get("fingerprint") == fingerprint
+
+    def begin(self, step: str, fingerprint: str, *, keep_outputs: bool = True) -> None:
+        """
+        开始执行步骤
+
+        指纹不变且允许保留时沿用上次保存的部分产出，否则清空该步骤的记录。
+        """
+        entry = self._steps.get(step)
+        outputs = entry.get("outputs", {}) if entry and keep_outputs and entry.get("fingerprint") == fingerprint else {}
+        self._steps[step] = {"fingerprint": fingerprint, "completed": False, "outputs": outputs}
+        self._save()
+
+    def complete(self, step: str) -> None:
+        """标记步骤已完成"""
+        entry = self._steps.get(step)
+        if entry is None:
+            return
+        entry["completed"] = True
+        entry["completed_at"] = time.time()
+        self._save()
+
+    def get_output(self, step: str, key: str) -> Any:
+        """获取步骤保存的产出，不存在时返回 None"""
+        entry = self._steps.get(step)
+        return entry.get("outputs", {}).get(key) if entry else None
+
+    def save_output(self, step: str, key: str, value: Any) -> None:
+        """保存步骤产出，值需可序列化为 JSON"""
+        entry = self._steps.setdefault(step, {"fingerprint": "", "completed": False, "outputs": {}})
+        entry.setdefault("outputs", {})[key] = value
+        self._save()
+
+    def step(self, step: str) -> StepCheckpoint:
+        """获取绑定到指定步骤的断点记录视图"""
+        return StepCheckpoint(self, step)
+
+    def clear(self) -> None:
+        """清除所有断点记录"""
+        self._steps = {}
+        self._started = time.time()
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("删除部署断点记录失败: %s", e)
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """读取断点记录文件"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug("读取部署断点记录失败: %s", e)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION or not self._is_current(data):
+            return {}
+        steps = data.get("steps")
+        if not isinstance(steps, dict):
+            return {}
+        self._started = data["started"]
+        return steps
+
+    def _is_current(self, data: dict[str, Any]) -> bool:
+        """断点记录是否仍描述当前主机状态：未超过有效期且主机未重启"""
+        started = data.get("started")
+        if not isinstance(started, (int, float)) or not 0 <= time.time() - started <= self.ttl:
+            logger.info("部署断点记录已过期，重新执行所有步骤")
+            return False
+        if data.get("boot_id") != self._boot_id:
+            logger.info("主机已重启，部署断点记录不再有效，重新执行所有步骤")
+            return False
+        return True
+
+    def _save(self) -> None:
+        """写入断点记录文件"""
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "started": self._started,
+            "boot_id": self._boot_id,
+            "steps": self._steps,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning("写入部署断点记录失败: %s", e)
+
+
+def _read_boot_id() -> str:
+    """读取本次系统启动的 ID，无法读取时返回空字符串"""
+    try:
+        return BOOT_ID_PATH.read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+
+
+class StepCheckpoint:
+    """绑定到单个部署步骤的断点记录，供步骤内部保存和复用产出"""
+
+    def __init__(self, checkpoint: DeploymentCheckpoint, step: str) -> None:
+        """初始化步骤断点记录"""
+        self.checkpoint = checkpoint
+        self.name = step
+
+    def get_output(self, key: str) -> Any:
+        """获取步骤保存的产出"""
+        return self.checkpoint.get_output(self.name, key)
+
+    def save_output(self, key: str, value: Any) -> None:
+        """保存步骤产出"""
+        self.checkpoint.save_output(self.name, key, value)
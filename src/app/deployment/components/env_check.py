@@ -16,13 +16,16 @@ from textual.widgets import (
     Static,
 )
 
-from app.deployment.service import DeploymentService
+from app.deployment.precheck import run_prechecks
+from app.deployment.service import PRECHECK_OS, PRECHECK_SUDO, DeploymentService
 from app.deployment.ui import DeploymentConfigScreen
 from i18n.manager import _
 
 if TYPE_CHECKING:
     from textual.app import ComposeResult
 
+    from app.deployment.precheck import PrecheckResult
+
 
 class EnvironmentCheckScreen(ModalScreen[bool]):
     """
@@ -109,13 +112,10 @@ class EnvironmentCheckScreen(ModalScreen[bool]):
         await self._perform_environment_check()
 
     async def _perform_environment_check(self) -> None:
-        """执行环境检查"""
+        """同时执行所有环境检查，每项检查完成后立即更新界面"""
         try:
-            # 检查操作系统
-            await self._check_operating_system()
-
-            # 检查 sudo 权限
-            await self._check_sudo_privileges()
+            checks = self.service.environment_prechecks((PRECHECK_OS, PRECHECK_SUDO))
+            await run_prechecks(checks, self._show_check_result)
 
             # 更新界面状态
             self._update_ui_state()
@@ -123,51 +123,54 @@ class EnvironmentCheckScreen(ModalScreen[bool]):
         except (OSError, RuntimeError) as e:
             self.notify(_("环境检查过程中发生异常: {error}").format(error=e), severity="error")
 
-    async def _check_operating_system(self) -> None:
-        """检查操作系统类型"""
-        try:
-            is_openeuler = self.service.detect_openeuler()
-            self.check_results["os"] = is_openeuler
-
-            os_status = self.query_one("#os_status", Static)
-            os_desc = self.query_one("#os_desc", Static)
-
-            if is_openeuler:
-                os_status.update("[green]✓[/green]")
-                os_desc.update(_("操作系统: openEuler (支持)"))
-            else:
-                os_status.update("[red]✗[/red]")
-                os_desc.update(_("操作系统: 非 openEuler (不支持)"))
-                self.error_messages.append(_("仅支持 openEuler 操作系统"))
-
-        except (OSError, RuntimeError) as e:
-            self.check_results["os"] = False
-            self.query_one("#os_status", Static).update("[red]✗[/red]")
-            self.query_one("#os_desc", Static).update(_("操作系统检查失败: {error}").format(error=e))
-            self.error_messages.append(_("操作系统检查异常: {error}").format(error=e))
-
-    async def _check_sudo_privileges(self) -> None:
-        """检查管理员权限"""
-        try:
-            has_sudo = await self.service.check_sudo_privileges()
-            self.check_results["sudo"] = has_sudo
-
-            sudo_status = self.query_one("#sudo_status", Static)
-            sudo_desc = self.query_one("#sudo_desc", Static)
-
-            if has_sudo:
-                sudo_status.update("[green]✓[/green]")
-                sudo_desc.update(_("管理员权限: 可用"))
-            else:
-                sudo_status.update("[red]✗[/red]")
-                sudo_desc.update(_("管理员权限: 不可用 (需要 sudo)"))
-                self.error_messages.append(_("需要管理员权限，请确保可以使用 sudo"))
-
-        except (OSError, RuntimeError) as e:
-            self.check_results["sudo"] = False
-            self.query_one("#sudo_status", Static).update("[red]✗[/red]")
-            self.query_one("#sudo_desc", Static).update(_("权限检查失败: {error}").format(error=e))
-            self.error_messages.append(_("权限检查异常: {error}").format(error=e))
+    def _show_check_result(self, result: PrecheckResult) -> None:
+        """显示单项检查的结果"""
+        self.check_results[result.name] = result.passed
+        if result.name == PRECHECK_OS:
+            self._show_operating_system_result(result)
+        elif result.name == PRECHECK_SUDO:
+            self._show_sudo_privileges_result(result)
+
+    def _show_operating_system_result(self, result: PrecheckResult) -> None:
+        """显示操作系统类型检查结果"""
+        os_status = self.query_one("#os_status", Static)
+        os_desc = self.query_one("#os_desc", Static)
+
+        if result.passed:
+            os_status.update("[green]✓[/green]")
+            os_desc.update(_("操作系统: openEuler (支持)"))
+        elif result.timed_out or result.error:
+            error = result.error or self._timeout_error(result)
+            os_status.update("[red]✗[/red]")
+            os_desc.update(_("操作系统检查失败: {error}").format(error=error))
+            self.error_messages.append(_("操作系统检查异常: {error}").format(error=error))
+        else:
+            os_status.update("[red]✗[/red]")
+            os_desc.update(_("操作系统: 非 openEuler (不支持)"))
+            self.error_messages.append(_("仅支持 openEuler 操作系统"))
+
+    def _show_sudo_privileges_result(self, result: PrecheckResult) -> None:
+        """显示管理员权限检查结果"""
+        sudo_status = self.query_one("#sudo_status", Static)
+        sudo_desc = self.query_one("#sudo_desc", Static)
+
+        if result.passed:
+            sudo_status.update("[green]✓[/green]")
+            sudo_desc.update(_("管理员权限: 可用"))
+        elif result.timed_out or result.error:
+            error = result.error or self._timeout_error(result)
+            sudo_status.update("[red]✗[/red]")
+            sudo_desc.update(_("权限检查失败: {error}").format(error=error))
+            self.error_messages.append(_("权限检查异常: {error}").format(error=error))
+        else:
+            sudo_status.update("[red]✗[/red]")
+            sudo_desc.update(_("管理员权限: 不可用 (需要 sudo)"))
+            self.error_messages.append(_("需要管理员权限，请确保可以使用 sudo"))
+
+    @staticmethod
+    def _timeout_error(result: PrecheckResult) -> str:
+        """检查超时的错误描述"""
+        return _("超过 {seconds:.0f} 秒未完成").format(seconds=result.elapsed)
 
     def _update_ui_state(self) -> None:
         """更新界面状态"""
@@ -6,16 +6,30 @@
 
 from __future__ import annotations
 
-import re
+import contextlib
+import itertools
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import TYPE_CHECKING, TextIO
 
 from i18n.manager import _
+from log.manager import get_logger
 from tool.validators import APIValidator
 
+from .ansi import ansi_to_rich, strip_ansi
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+logger = get_logger(__name__)
+
 # 常量定义
 MAX_TEMPERATURE = 10.0
 MIN_TEMPERATURE = 0.0
+# 部署日志环形缓冲区容量（行）
+LOG_BUFFER_SIZE = 2000
 
 
 class AgentInitStatus(Enum):
@@ -224,133 +238,92 @@ class DeploymentState:
     is_completed: bool = False
     is_failed: bool = False
     error_message: str = ""
-    output_log: list[str] = field(default_factory=list)
+    output_log: deque[str] = field(default_factory=lambda: deque(maxlen=LOG_BUFFER_SIZE))
+    """最近的日志（Rich 标记），超出容量的旧日志被淘汰，完整日志见 log_file"""
+    log_count: int = 0
+    """累计添加的日志条数，用作增量读取日志的游标"""
+    log_file: Path | None = None
+    """完整日志的落盘文件"""
+    wait_times: dict[str, float] = field(default_factory=dict)  # 各就绪等待阶段的耗时（秒）
+    _log_stream: TextIO | None = field(default=None, init=False, repr=False, compare=False)
 
     def add_log(self, message: str) -> None:
         """
         添加日志消息
 
-        避免输出重复内容，只有当新消息与最后一条消息不同时才添加
+        避免输出重复内容，只有当新消息与最后一条消息不同时才添加。
+        ANSI 颜色码转换为 Rich 标记后存入环形缓冲区；已打开日志文件时同时写入去除颜色码的原始文本。
 
         Args:
             message: 日志消息
 
         """
-        # 转换 ANSI 颜色标记为 Textual 富文本标记
-        rich_message = self._convert_shell_colors_to_rich(message)
-
-        # 如果日志为空，或者新消息与最后一条消息不同，则添加
-        if not self.output_log or self.output_log[-1] != rich_message:
-            self.output_log.append(rich_message)
-
-    def _convert_shell_colors_to_rich(self, text: str) -> str:
-        r"""
-        将 Shell ANSI 颜色码转换为 Textual Rich 标记
+        self.add_logs((message,))
 
-        基于脚本中实际使用的颜色标记进行转换:
-        - COLOR_INFO='\033[34m'    # 蓝色信息 -> [blue]
-        - COLOR_SUCCESS='\033[32m' # 绿色成功 -> [green]
-        - COLOR_ERROR='\033[31m'   # 红色错误 -> [red]
-        - COLOR_WARNING='\033[33m' # 黄色警告 -> [yellow]
-        - COLOR_RESET='\033[0m'    # 重置颜色 -> [/]
+    def add_logs(self, messages: Iterable[str]) -> None:
+        """
+        批量添加日志消息
 
-        处理跨行颜色标记，确保 Rich 标记的完整性，避免 MarkupError。
+        与逐条调用 add_log 的结果相同，但整批日志只写入一次日志文件。
 
         Args:
-            text: 包含 ANSI 颜色码的文本
-
-        Returns:
-            转换后的 Rich 标记文本
+            messages: 日志消息
 
         """
-        # ANSI 颜色码到 Rich 标记的映射
-        color_map = {
-            r"\033\[34m": "[blue]",  # 蓝色信息
-            r"\033\[32m": "[green]",  # 绿色成功
-            r"\033\[31m": "[red]",  # 红色错误
-            r"\033\[33m": "[yellow]",  # 黄色警告
-            r"\033\[0;32m": "[green]",  # 绿色 (GREEN 变量)
-            r"\033\[0;33m": "[yellow]",  # 黄色 (YELLOW 变量)
-            r"\033\[0;34m": "[blue]",  # 蓝色 (BLUE 变量)
-            r"\033\[0m": "[/]",  # 重置颜色
-        }
-
-        # 应用颜色转换
-        result = text
-        for ansi_code, rich_markup in color_map.items():
-            result = re.sub(ansi_code, rich_markup, result)
-
-        # 检查是否存在未配对的Rich标记，避免MarkupError
-        return self._ensure_balanced_rich_tags(result)
-
-    def _ensure_balanced_rich_tags(self, text: str) -> str:
-        """
-        确保 Rich 标记的平衡性，避免跨行导致的 MarkupError
+        spilled: list[str] = []
+        for message in messages:
+            rich_message = ansi_to_rich(message)
 
-        处理以下情况：
-        1. 只有开始标记没有结束标记：自动添加结束标记
-        2. 只有结束标记没有开始标记：移除孤立的结束标记
-        3. 嵌套不当的标记：进行修复
+            # 如果日志为空，或者新消息与最后一条消息不同，则添加
+            if self.output_log and self.output_log[-1] == rich_message:
+                continue
+            self.output_log.append(rich_message)
+            self.log_count += 1
+            if self._log_stream is not None:
+                spilled.append(strip_ansi(message) + "\n")
+
+        if spilled and self._log_stream is not None:
+            try:
+                self._log_stream.write("".join(spilled))
+            except OSError:
+                logger.exception("写入部署日志文件失败，停止落盘")
+                self.close_log_file()
+
+    def logs_since(self, cursor: int) -> tuple[list[str], int]:
+        """
+        获取游标之后新增的日志
 
         Args:
-            text: 包含 Rich 标记的文本
+            cursor: 上次读取后的 log_count
 
         Returns:
-            平衡的 Rich 标记文本
+            tuple[list[str], int]: (新增且仍在缓冲区中的日志, 已被淘汰而无法返回的条数)
 
         """
-        close_pattern = r"\[/\]"
-        color_pattern = r"\[(blue|green|red|yellow)\]"
-
-        # 找到所有开始标记和结束标记，包含结束位置
-        open_matches = [
-            {"pos": match.start(), "end": match.end(), "type": "open", "tag": match.group(1)}
-            for match in re.finditer(color_pattern, text)
-        ]
-
-        close_matches = [
-            {"pos": match.start(), "end": match.end(), "type": "close", "tag": "close"}
-            for match in re.finditer(close_pattern, text)
-        ]
-
-        # 合并并按位置排序
-        all_matches = open_matches + close_matches
-        all_matches.sort(key=lambda x: x["pos"])
-
-        # 使用栈来跟踪标记平衡
-        open_stack = []
-        balanced_text = ""
-        last_pos = 0
-
-        for match in all_matches:
-            # 添加匹配前的文本
-            balanced_text += text[last_pos : match["pos"]]
-
-            if match["type"] == "open":
-                # 开始标记：入栈并添加到结果
-                open_stack.append(match["tag"])
-                balanced_text += f"[{match['tag']}]"
-            elif match["type"] == "close":
-                if open_stack:
-                    # 有匹配的开始标记：出栈并添加结束标记
-                    open_stack.pop()
-                    balanced_text += "[/]"
-                # 如果没有匹配的开始标记，忽略这个结束标记（不添加到结果中）
-
-            last_pos = match["end"]
-
-        # 添加剩余的文本
-        balanced_text += text[last_pos:]
-
-        # 为未闭合的开始标记添加结束标记
-        while open_stack:
-            balanced_text += "[/]"
-            open_stack.pop()
-
-        return balanced_text
+        first = self.log_count - len(self.output_log)
+        start = max(cursor, first)
+        return list(itertools.islice(self.output_log, start - first, None)), start - cursor
+
+    def open_log_file(self, path: Path) -> None:
+        """打开完整日志的落盘文件，此后添加的日志都会写入该文件"""
+        self.close_log_file()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._log_stream = path.open("a", encoding="utf-8", buffering=1)
+        except OSError:
+            logger.exception("无法打开部署日志文件: %s", path)
+            return
+        self.log_file = path
+
+    def close_log_file(self) -> None:
+        """关闭完整日志的落盘文件"""
+        if self._log_stream is not None:
+            with contextlib.suppress(OSError):
+                self._log_stream.close()
+            self._log_stream = None
 
     def clear_log(self) -> None:
-        """清空日志"""
+        """清空日志缓冲区"""
         self.output_log.clear()
 
     def reset(self) -> None:
@@ -361,4 +334,6 @@ class DeploymentState:
         self.is_completed = False
         self.is_failed = False
         self.error_message = ""
+        self.wait_times.clear()
         self.clear_log()
+        self.log_count = 0
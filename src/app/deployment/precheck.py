@@ -0,0 +1,93 @@
+"""
+部署前环境检查
+
+相互独立的环境检查（操作系统、管理员权限、部署资源等）同时启动，每项检查有各自的超时时间，
+检查结果按完成顺序立即回调，总耗时取决于最慢的一项检查而不是所有检查耗时之和。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+logger = get_logger(__name__)
+
+# 单项检查的默认超时时间（秒）
+PRECHECK_TIMEOUT = 10.0
+
+
+@dataclass(frozen=True)
+class Precheck:
+    """单项环境检查"""
+
+    name: str
+    label: str
+    """展示用名称"""
+    run: Callable[[], Awaitable[bool]]
+    """检查函数，返回 True 表示检查通过"""
+    timeout: float = PRECHECK_TIMEOUT
+
+
+@dataclass(frozen=True)
+class PrecheckResult:
+    """单项环境检查的结果"""
+
+    name: str
+    label: str
+    passed: bool
+    elapsed: float
+    """检查耗时（秒）"""
+    timed_out: bool = False
+    error: str = ""
+    """检查过程中发生的异常"""
+
+
+async def run_prechecks(
+    checks: Sequence[Precheck],
+    on_result: Callable[[PrecheckResult], None] | None = None,
+) -> dict[str, PrecheckResult]:
+    """
+    并发执行所有检查
+
+    Args:
+        checks: 要执行的检查
+        on_result: 每项检查完成时立即调用
+
+    Returns:
+        dict[str, PrecheckResult]: 检查名称到结果的映射，顺序与 checks 一致
+
+    """
+
+    async def run(check: Precheck) -> PrecheckResult:
+        result = await _run_check(check)
+        if on_result:
+            on_result(result)
+        return result
+
+    results = await asyncio.gather(*(run(check) for check in checks))
+    return {result.name: result for result in results}
+
+
+async def _run_check(check: Precheck) -> PrecheckResult:
+    """在超时时间内执行单项检查，超时或异常均视为未通过"""
+    started = time.monotonic()
+    try:
+        async with asyncio.timeout(check.timeout):
+            passed = await check.run()
+    except TimeoutError:
+        logger.warning("环境检查超时: %s (%.1f 秒)", check.name, check.timeout)
+        return PrecheckResult(check.name, check.label, passed=False, elapsed=check.timeout, timed_out=True)
+    except Exception as e:
+        logger.exception("环境检查发生异常: %s", check.name)
+        return PrecheckResult(check.name, check.label, passed=False, elapsed=time.monotonic() - started, error=str(e))
+
+    elapsed = time.monotonic() - started
+    logger.info("环境检查完成: %s, 结果: %s, 耗时 %.2f 秒", check.name, passed, elapsed)
+    return PrecheckResult(check.name, check.label, passed=passed, elapsed=elapsed)
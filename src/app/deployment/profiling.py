@@ -0,0 +1,255 @@
+"""
+部署耗时分析
+
+记录部署过程中每个步骤、子进程（部署脚本、systemctl、sudo tee 等）和 HTTP 请求的耗时，
+汇总为结构化的耗时报告，在部署结束时展示并保存为 JSON，便于比较不同版本和主机上的部署耗时。
+
+当前部署的耗时记录器通过上下文变量传递，调度器为每个步骤设置当前步骤名称，
+步骤内部启动的子进程与发出的请求会自动归属到所在步骤。没有激活的记录器时所有记录操作均为空操作。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from __version__ import __version__
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DEPLOYMENT_PROFILE_DIR = Path.home() / ".cache" / "openEuler Intelligence" / "deployment-profiles"
+PROFILE_FORMAT_VERSION = 1
+# 记录命令时保留的最大长度
+MAX_NAME_LENGTH = 120
+
+logger = get_logger(__name__)
+
+_current_profile: contextvars.ContextVar[DeploymentProfile | None] = contextvars.ContextVar(
+    "deployment_profile",
+    default=None,
+)
+_current_step: contextvars.ContextVar[str | None] = contextvars.ContextVar("deployment_step", default=None)
+
+
+@dataclass
+class TimingRecord:
+    """单条耗时记录"""
+
+    category: str
+    """记录类型: step / subprocess / http"""
+    name: str
+    step: str | None
+    """所属部署步骤"""
+    offset: float
+    """相对部署开始的时间（秒）"""
+    duration: float
+    success: bool = True
+    skipped: bool = False
+    label: str = ""
+    """展示用名称，步骤记录为步骤标题"""
+
+
+@dataclass
+class StepSummary:
+    """单个步骤的耗时汇总"""
+
+    name: str
+    label: str
+    duration: float
+    success: bool
+    skipped: bool
+    subprocess_count: int = 0
+    subprocess_time: float = 0.0
+    http_count: int = 0
+    http_time: float = 0.0
+
+
+class DeploymentProfile:
+    """一次部署的耗时记录"""
+
+    def __init__(self, deployment_mode: str = "") -> None:
+        """初始化耗时记录"""
+        self.deployment_mode = deployment_mode
+        self.started_at = datetime.now(UTC)
+        self.records: list[TimingRecord] = []
+        self.total_duration = 0.0
+        self.success = False
+        self.saved_path: Path | None = None
+        self._start = time.monotonic()
+        self._watchers: set[asyncio.Task[None]] = set()
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[DeploymentProfile]:
+        """在当前上下文中激活耗时记录，其中创建的任务均会继承"""
+        token = _current_profile.set(self)
+        try:
+            yield self
+        finally:
+            _current_profile.reset(token)
+
+    def record(  # noqa: PLR0913
+        self,
+        category: str,
+        name: str,
+        started: float,
+        *,
+        success: bool = True,
+        skipped: bool = False,
+        label: str = "",
+        step: str | None = None,
+    ) -> TimingRecord:
+        """记录一段从 started（time.monotonic()）开始到现在的耗时"""
+        record = TimingRecord(
+            category=category,
+            name=name[:MAX_NAME_LENGTH],
+            step=step if step is not None else _current_step.get(),
+            offset=round(started - self._start, 3),
+            duration=round(time.monotonic() - started, 3),
+            success=success,
+            skipped=skipped,
+            label=label,
+        )
+        self.records.append(record)
+        return record
+
+    async def finish(self, *, success: bool) -> None:
+        """结束记录，丢弃仍未退出的子进程的记录"""
+        self.total_duration = round(time.monotonic() - self._start, 3)
+        self.success = success
+        for task in self._watchers:
+            task.cancel()
+        await asyncio.gather(*self._watchers, return_exceptions=True)
+        self._watchers.clear()
+
+    def summary(self) -> list[StepSummary]:
+        """按步骤汇总耗时，步骤按开始时间排序"""
+        steps = {
+            record.name: StepSummary(
+                name=record.name,
+                label=record.label or record.name,
+                duration=record.duration,
+                success=record.success,
+                skipped=record.skipped,
+            )
+            for record in sorted(self.records, key=lambda item: item.offset)
+            if record.category == "step"
+        }
+        for record in self.records:
+            summary = steps.get(record.step or "")
+            if summary is None:
+                continue
+            if record.category == "subprocess":
+                summary.subprocess_count += 1
+                summary.subprocess_time += record.duration
+            elif record.category == "http":
+                summary.http_count += 1
+                summary.http_time += record.duration
+        return list(steps.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为可序列化的字典"""
+        return {
+            "format_version": PROFILE_FORMAT_VERSION,
+            "app_version": __version__,
+            "host": {
+                "hostname": platform.node(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+            },
+            "deployment_mode": self.deployment_mode,
+            "started_at": self.started_at.isoformat(),
+            "total_duration": self.total_duration,
+            "success": self.success,
+            "steps": [asdict(summary) for summary in self.summary()],
+            "records": [asdict(record) for record in self.records],
+        }
+
+    def save(self, directory: Path = DEPLOYMENT_PROFILE_DIR) -> Path | None:
+        """保存为 JSON 文件，返回文件路径，失败时返回 None"""
+        path = directory / f"deployment-{self.started_at.strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        except OSError as e:
+            logger.warning("保存部署耗时报告失败: %s", e)
+            return None
+        self.saved_path = path
+        logger.info("部署耗时报告已保存: %s", path)
+        return path
+
+    def watch_process(self, name: str, started: float, process: asyncio.subprocess.Process) -> None:
+        """在子进程退出时记录其耗时"""
+        step = _current_step.get()
+
+        async def wait() -> None:
+            return_code = await process.wait()
+            self.record("subprocess", name, started, success=return_code == 0, step=step)
+
+        task = asyncio.create_task(wait())
+        self._watchers.add(task)
+        task.add_done_callback(self._watchers.discard)
+
+
+def current_profile() -> DeploymentProfile | None:
+    """获取当前上下文中激活的耗时记录"""
+    return _current_profile.get()
+
+
+@contextlib.contextmanager
+def step_scope(step: str) -> Iterator[None]:
+    """将代码块内记录的子进程与请求归属到指定步骤"""
+    token = _current_step.set(step)
+    try:
+        yield
+    finally:
+        _current_step.reset(token)
+
+
+@contextlib.contextmanager
+def measure(category: str, name: str) -> Iterator[None]:
+    """记录代码块的耗时，代码块抛出异常时记为失败"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    started = time.monotonic()
+    success = False
+    try:
+        yield
+        success = True
+    finally:
+        profile.record(category, name, started, success=success)
+
+
+async def create_subprocess_exec(*cmd: str | Path, **kwargs: Any) -> asyncio.subprocess.Process:
+    """启动子进程（同 asyncio.create_subprocess_exec），并记录其从启动到退出的耗时"""
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_exec(*cmd, **kwargs)
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.watch_process(" ".join(str(part) for part in cmd), started, process)
+    return process
+
+
+async def create_subprocess_shell(cmd: str, **kwargs: Any) -> asyncio.subprocess.Process:
+    """启动 shell 子进程（同 asyncio.create_subprocess_shell），并记录其从启动到退出的耗时"""
+    started = time.monotonic()
+    process = await asyncio.create_subprocess_shell(cmd, **kwargs)
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.watch_process(cmd, started, process)
+    return process
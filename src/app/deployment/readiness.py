@@ -0,0 +1,215 @@
+"""
+就绪等待工具
+
+提供部署流程中通用的“等待服务就绪”原语：初始阶段快速轮询，之后按指数退避并叠加随机抖动，
+在截止时间到达时放弃。可选的事件源（如跟随 journalctl 日志、探测端口连通性）在服务状态可能
+发生变化时立即唤醒下一次检查，从而在服务就绪后尽快返回。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator, Sequence
+
+    EventSource = Callable[[asyncio.Event], Awaitable[None]]
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """轮询间隔策略"""
+
+    initial: float = 0.2
+    """首次检查失败后的等待时间（秒）"""
+    factor: float = 2.0
+    """每次失败后等待时间的增长倍数"""
+    max_interval: float = 5.0
+    """单次等待时间上限（秒）"""
+    jitter: float = 0.2
+    """随机抖动比例，避免多个等待者同时发起检查"""
+    min_interval: float = 0.05
+    """被事件源唤醒后两次检查之间的最小间隔（秒），防止日志刷屏导致频繁检查"""
+
+    def intervals(self) -> Iterator[float]:
+        """生成逐次的等待时间"""
+        interval = self.initial
+        while True:
+            spread = interval * self.jitter
+            yield max(0.0, interval + random.uniform(-spread, spread))  # noqa: S311
+            interval = min(self.max_interval, interval * self.factor)
+
+
+@dataclass
+class WaitResult:
+    """就绪等待结果"""
+
+    name: str
+    ready: bool
+    elapsed: float
+    """等待耗时（秒）"""
+    attempts: int
+    """执行检查的次数"""
+    woken_by_event: int = 0
+    """由事件源提前唤醒的次数"""
+
+
+async def wait_until_ready(  # noqa: PLR0913
+    name: str,
+    check: Callable[[], Awaitable[bool]],
+    *,
+    timeout: float | None,  # noqa: ASYNC109
+    policy: BackoffPolicy | None = None,
+    event_sources: Sequence[EventSource] = (),
+    on_attempt: Callable[[int, float], None] | None = None,
+) -> WaitResult:
+    """
+    等待检查函数返回 True
+
+    Args:
+        name: 等待阶段名称，用于日志与结果
+        check: 就绪检查函数，返回 True 表示已就绪
+        timeout: 截止时间（秒），None 表示一直等待
+        policy: 轮询间隔策略
+        event_sources: 事件源列表，事件源在状态可能变化时设置传入的 asyncio.Event 以立即触发检查
+        on_attempt: 每次检查前调用，参数为检查序号和已等待时间
+
+    Returns:
+        WaitResult: 等待结果及各项耗时统计
+
+    """
+    policy = policy or BackoffPolicy()
+    wake = asyncio.Event()
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+    intervals = policy.intervals()
+    attempts = 0
+    woken_by_event = 0
+
+    source_tasks = [asyncio.create_task(_run_event_source(source, wake)) for source in event_sources]
+    try:
+        while True:
+            attempts += 1
+            if on_attempt:
+                on_attempt(attempts, time.monotonic() - start)
+            # 在检查前清除事件，检查期间发生的事件会触发紧接着的下一次检查
+            wake.clear()
+            if await check():
+                return _finish(name, ready=True, start=start, attempts=attempts, woken_by_event=woken_by_event)
+
+            sleep_for = next(intervals)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return _finish(name, ready=False, start=start, attempts=attempts, woken_by_event=woken_by_event)
+                sleep_for = min(sleep_for, remaining)
+
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=sleep_for)
+            except TimeoutError:
+                continue
+            woken_by_event += 1
+            await asyncio.sleep(policy.min_interval)
+    finally:
+        for task in source_tasks:
+            task.cancel()
+        await asyncio.gather(*source_tasks, return_exceptions=True)
+
+
+def journal_event_source(unit: str) -> EventSource:
+    """
+    跟随 systemd 单元日志的事件源
+
+    journalctl 每输出一行新日志就唤醒一次检查；journalctl 不可用时该事件源静默退出。
+    """
+
+    async def follow(wake: asyncio.Event) -> None:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "journalctl",
+                "--follow",
+                "--lines=0",
+                "--output=cat",
+                "--unit",
+                unit,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logger.debug("无法跟随 %s 的日志: %s", unit, e)
+            return
+
+        try:
+            if process.stdout is None:
+                return
+            while await process.stdout.readline():
+                wake.set()
+        finally:
+            if process.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    process.terminate()
+                await process.wait()
+
+    return follow
+
+
+def tcp_connect_event_source(host: str, port: int, *, interval: float = 0.1) -> EventSource:
+    """
+    探测端口连通性的事件源
+
+    以较短的间隔尝试建立 TCP 连接，端口开始监听时立即唤醒检查，随后退出。
+    """
+
+    async def probe(wake: asyncio.Event) -> None:
+        while True:
+            try:
+                _reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                await asyncio.sleep(interval)
+                continue
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+            wake.set()
+            return
+
+    return probe
+
+
+async def _run_event_source(source: EventSource, wake: asyncio.Event) -> None:
+    """运行事件源，事件源自身的异常不影响轮询"""
+    try:
+        await source(wake)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("就绪事件源运行失败")
+
+
+def _finish(name: str, *, ready: bool, start: float, attempts: int, woken_by_event: int) -> WaitResult:
+    """构造等待结果并记录日志"""
+    result = WaitResult(
+        name=name,
+        ready=ready,
+        elapsed=time.monotonic() - start,
+        attempts=attempts,
+        woken_by_event=woken_by_event,
+    )
+    logger.info(
+        "就绪等待 [%s] %s - 耗时 %.2f 秒, 检查 %d 次, 事件唤醒 %d 次",
+        name,
+        "完成" if ready else "超时",
+        result.elapsed,
+        attempts,
+        woken_by_event,
+    )
+    return result
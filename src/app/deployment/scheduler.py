@@ -0,0 +1,280 @@
+"""
+部署步骤调度器
+
+将部署流程建模为声明了依赖关系的步骤有向无环图 (DAG)，依赖均已完成的步骤并发执行。
+调度器统一维护部署状态中的步骤进度：已完成步骤数只增不减，步骤名称显示当前正在执行的所有步骤，
+保证部署进度界面在步骤并发时仍然连贯。
+
+声明了输入指纹的步骤在提供断点记录时可以断点续跑：指纹未变且依赖均未重新执行的已完成步骤直接跳过。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from i18n.manager import _
+from log.manager import get_logger
+
+from . import profiling
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Collection, Sequence
+
+    from .checkpoint import DeploymentCheckpoint
+    from .models import DeploymentState
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class DeploymentStep:
+    """部署步骤"""
+
+    name: str
+    """步骤标识，用于声明依赖"""
+    title: str
+    """在进度界面显示的步骤名称"""
+    run: Callable[[], Awaitable[bool]]
+    """步骤执行函数，返回 False 表示步骤失败"""
+    depends_on: tuple[str, ...] = ()
+    """必须先完成的步骤标识"""
+    fingerprint: str | None = None
+    """步骤输入指纹，None 表示该步骤不记录断点、每次都执行"""
+
+
+@dataclass
+class StepResult:
+    """步骤执行结果"""
+
+    name: str
+    success: bool
+    started_at: float
+    finished_at: float
+    skipped: bool = False
+    """是否因断点记录而跳过"""
+
+    @property
+    def duration(self) -> float:
+        """步骤耗时（秒）"""
+        return self.finished_at - self.started_at
+
+
+class StepScheduler:
+    """按依赖关系并发执行部署步骤"""
+
+    def __init__(
+        self,
+        steps: Sequence[DeploymentStep],
+        *,
+        max_concurrency: int | None = None,
+        checkpoint: DeploymentCheckpoint | None = None,
+    ) -> None:
+        """
+        初始化调度器
+
+        Args:
+            steps: 部署步骤列表，可同时启动的步骤按列表顺序启动
+            max_concurrency: 同时执行的步骤数量上限，None 表示不限制，1 表示按列表顺序串行执行
+            checkpoint: 断点记录，None 表示不跳过任何步骤
+
+        Raises:
+            ValueError: 步骤标识重复、依赖未声明的步骤或存在循环依赖
+
+        """
+        self.steps = list(steps)
+        self.max_concurrency = max_concurrency
+        self.checkpoint = checkpoint
+        self.results: dict[str, StepResult] = {}
+        self.elapsed = 0.0
+        self._state: DeploymentState | None = None
+        self._progress_callback: Callable[[DeploymentState], None] | None = None
+        self._validate()
+
+    @property
+    def serial_time(self) -> float:
+        """各步骤耗时之和，即串行执行所需的时间"""
+        return sum(result.duration for result in self.results.values())
+
+    async def run(
+        self,
+        state: DeploymentState | None = None,
+        progress_callback: Callable[[DeploymentState], None] | None = None,
+    ) -> bool:
+        """
+        执行所有步骤
+
+        某个步骤失败后不再启动新的步骤，等待正在执行的步骤结束后返回。
+
+        Args:
+            state: 部署状态，调度器据此更新步骤进度
+            progress_callback: 进度回调函数
+
+        Returns:
+            bool: 所有步骤是否均执行成功
+
+        """
+        self.results.clear()
+        self._state = state
+        self._progress_callback = progress_callback
+        if state is not None:
+            state.total_steps = len(self.steps)
+
+        pending = list(self.steps)
+        completed: set[str] = set()
+        # 本次重新执行且会使下游断点失效的步骤
+        refreshed: set[str] = set()
+        running: dict[asyncio.Task[bool], DeploymentStep] = {}
+        failed = False
+        start = time.monotonic()
+
+        try:
+            while True:
+                if not failed:
+                    for step in self._start_ready_steps(pending, completed, refreshed, len(running)):
+                        running[asyncio.create_task(self._run_step(step))] = step
+                if not running:
+                    break
+
+                self._report(state, progress_callback, running.values(), len(completed))
+                finished, _pending = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    step = running.pop(task)
+                    if task.result():
+                        completed.add(step.name)
+                        if self.checkpoint is not None and step.fingerprint is not None:
+                            self.checkpoint.complete(step.name)
+                    else:
+                        failed = True
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        self.elapsed = time.monotonic() - start
+        self._report(state, progress_callback, (), len(completed))
+        logger.info(
+            "部署步骤执行%s - 实际耗时 %.2f 秒, 各步骤累计耗时 %.2f 秒",
+            "失败" if failed else "完成",
+            self.elapsed,
+            self.serial_time,
+        )
+        return not failed and not pending
+
+    def _start_ready_steps(
+        self,
+        pending: list[DeploymentStep],
+        completed: set[str],
+        refreshed: set[str],
+        running: int,
+    ) -> list[DeploymentStep]:
+        """
+        取出可以开始的步骤
+
+        断点记录匹配且依赖均未重新执行的步骤直接视为完成，并继续检查因此满足依赖的后续步骤；
+        返回需要实际执行的步骤。
+        """
+        to_run: list[DeploymentStep] = []
+        while True:
+            restored = False
+            for step in self._ready_steps(pending, completed, running + len(to_run)):
+                pending.remove(step)
+                deps_refreshed = any(dep in refreshed for dep in step.depends_on)
+                if not deps_refreshed and self._restore(step):
+                    completed.add(step.name)
+                    restored = True
+                    continue
+                if step.fingerprint is not None or deps_refreshed:
+                    refreshed.add(step.name)
+                if self.checkpoint is not None and step.fingerprint is not None:
+                    # 上游重新执行过时，上次保存的部分产出也不再可信
+                    self.checkpoint.begin(step.name, step.fingerprint, keep_outputs=not deps_refreshed)
+                to_run.append(step)
+            if not restored:
+                return to_run
+
+    def _restore(self, step: DeploymentStep) -> bool:
+        """步骤已在相同输入下完成时跳过该步骤"""
+        if self.checkpoint is None or step.fingerprint is None:
+            return False
+        if not self.checkpoint.is_completed(step.name, step.fingerprint):
+            return False
+        now = time.monotonic()
+        self.results[step.name] = StepResult(step.name, success=True, started_at=now, finished_at=now, skipped=True)
+        profile = profiling.current_profile()
+        if profile is not None:
+            profile.record("step", step.name, now, skipped=True, label=step.title)
+        logger.info("部署步骤 %s 已在上次部署中完成，跳过", step.name)
+        if self._state is not None:
+            self._state.add_log(_("✓ {title}已在上次部署中完成，跳过").format(title=step.title))
+            if self._progress_callback:
+                self._progress_callback(self._state)
+        return True
+
+    def _ready_steps(self, pending: list[DeploymentStep], completed: set[str], running: int) -> list[DeploymentStep]:
+        """按列表顺序返回依赖已满足且不超过并发上限的步骤"""
+        ready = [step for step in pending if all(dep in completed for dep in step.depends_on)]
+        if self.max_concurrency is not None:
+            ready = ready[: max(0, self.max_concurrency - running)]
+        return ready
+
+    async def _run_step(self, step: DeploymentStep) -> bool:
+        """执行单个步骤并记录耗时，步骤抛出的异常视为失败"""
+        started_at = time.monotonic()
+        try:
+            with profiling.step_scope(step.name):
+                success = await step.run()
+        except Exception:
+            logger.exception("部署步骤 %s 执行异常", step.name)
+            success = False
+        finished_at = time.monotonic()
+        self.results[step.name] = StepResult(step.name, success, started_at, finished_at)
+        profile = profiling.current_profile()
+        if profile is not None:
+            profile.record("step", step.name, started_at, success=success, label=step.title)
+        logger.info("部署步骤 %s %s - 耗时 %.2f 秒", step.name, "成功" if success else "失败", finished_at - started_at)
+        return success
+
+    def _report(
+        self,
+        state: DeploymentState | None,
+        progress_callback: Callable[[DeploymentState], None] | None,
+        running: Collection[DeploymentStep],
+        completed: int,
+    ) -> None:
+        """更新步骤进度：当前步骤序号为已完成步骤数加一，名称为所有正在执行的步骤"""
+        if state is None:
+            return
+        titles = [step.title for step in self.steps if step in running]
+        state.current_step = min(completed + 1, len(self.steps))
+        if titles:
+            state.current_step_name = " / ".join(titles)
+        if progress_callback:
+            progress_callback(state)
+
+    def _validate(self) -> None:
+        """检查步骤标识唯一、依赖存在且无循环依赖"""
+        names = [step.name for step in self.steps]
+        if len(set(names)) != len(names):
+            msg = "部署步骤标识重复"
+            raise ValueError(msg)
+
+        known = set(names)
+        for step in self.steps:
+            missing = [dep for dep in step.depends_on if dep not in known]
+            if missing:
+                msg = f"部署步骤 {step.name} 依赖未知步骤: {', '.join(missing)}"
+                raise ValueError(msg)
+
+        # 按拓扑顺序逐步消去依赖已满足的步骤，无法消去的步骤构成循环
+        resolved: set[str] = set()
+        remaining = list(self.steps)
+        while remaining:
+            ready = [step for step in remaining if set(step.depends_on) <= resolved]
+            if not ready:
+                msg = f"部署步骤存在循环依赖: {', '.join(step.name for step in remaining)}"
+                raise ValueError(msg)
+            resolved.update(step.name for step in ready)
+            remaining = [step for step in remaining if step.name not in resolved]
@@ -8,29 +8,49 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import dataclasses
+import functools
 import platform
 import re
 import sys
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import httpx
 import toml
 
+from backend.http_pool import close_http_clients, get_http_client
 from config.manager import ConfigManager
 from i18n.manager import _
 from log.manager import get_logger
 
+from . import profiling, systemd
 from .agent import AgentManager
+from .checkpoint import DeploymentCheckpoint
 from .models import AgentInitStatus, DeploymentConfig, DeploymentState
+from .precheck import Precheck, PrecheckResult, run_prechecks
+from .readiness import BackoffPolicy, journal_event_source, tcp_connect_event_source, wait_until_ready
+from .scheduler import DeploymentStep, StepScheduler
+from .streaming import ThrottledProgress, read_line_batches
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Callable
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Collection
 
 logger = get_logger(__name__)
 
 
 LOCAL_DEPLOYMENT_HOST = "127.0.0.1"
+# 完整部署日志的保存目录
+DEPLOYMENT_LOG_DIR = Path.home() / ".cache" / "openEuler Intelligence" / "logs"
+# 环境检查名称
+PRECHECK_OS = "os"
+PRECHECK_SUDO = "sudo"
+PRECHECK_INSTALLER = "installer"
+# sudo -n 在配置了外部认证的系统上可能长时间无响应
+SUDO_CHECK_TIMEOUT = 5.0
+# 部署脚本没有输出时刷新界面的间隔（秒）
+HEARTBEAT_INTERVAL = 1.0
 
 
 class DeploymentResourceManager:
@@ -169,6 +189,8 @@ class DeploymentService:
         self.state = DeploymentState()
         self._process: asyncio.subprocess.Process | None = None
         self.resource_manager = DeploymentResourceManager()
+        self.checkpoint = DeploymentCheckpoint()
+        self.profile: profiling.DeploymentProfile | None = None
 
     # 公共方法
 
@@ -183,7 +205,6 @@ class DeploymentService:
             tuple[bool, list[str]]: (是否成功, 错误信息列表)
 
         """
-        errors = []
         temp_state = DeploymentState()
 
         # 更新状态
@@ -192,11 +213,6 @@ class DeploymentService:
             temp_state.add_log(_("正在检查部署环境依赖..."))
             progress_callback(temp_state)
 
-        # 检查操作系统
-        if not self.detect_openeuler():
-            errors.append(_("仅支持 openEuler 操作系统"))
-            return False, errors
-
         # 检查 Python 版本兼容性
         python_version = sys.version_info
         current_version = f"{python_version.major}.{python_version.minor}"
@@ -207,21 +223,32 @@ class DeploymentService:
             temp_state.add_log(warning_msg)
             progress_callback(temp_state)
 
-        # 检查并安装 openeuler-intelligence-installer
-        if not self.resource_manager.check_installer_available():
+        # 同时检查操作系统、管理员权限和部署资源，每项检查完成后立即显示结果
+        def on_result(result: PrecheckResult) -> None:
+            if progress_callback:
+                temp_state.add_log(self._describe_precheck_result(result))
+                progress_callback(temp_state)
+
+        results = await run_prechecks(self.environment_prechecks(), on_result)
+
+        # 操作系统和管理员权限是部署的前提条件，同时报告所有未通过的检查
+        required = {
+            PRECHECK_OS: _("仅支持 openEuler 操作系统"),
+            PRECHECK_SUDO: _("需要管理员权限，请确保可以使用 sudo"),
+        }
+        errors = [message for name, message in required.items() if not results[name].passed]
+        if errors:
+            return False, errors
+
+        # 缺少部署资源时安装 openeuler-intelligence-installer
+        if not results[PRECHECK_INSTALLER].passed:
             if progress_callback:
                 temp_state.add_log(_("缺少 openeuler-intelligence-installer 包，正在尝试安装..."))
                 progress_callback(temp_state)
 
             success, install_errors = await self._install_intelligence_installer(progress_callback)
             if not success:
-                errors.extend(install_errors)
-                return False, errors
-
-        # 检查 sudo 权限
-        if not await self.check_sudo_privileges():
-            errors.append(_("需要管理员权限，请确保可以使用 sudo"))
-            return False, errors
+                return False, install_errors
 
         if progress_callback:
             temp_state.add_log(_("✓ 部署环境依赖检查完成"))
@@ -229,6 +256,38 @@ class DeploymentService:
 
         return True, []
 
+    def environment_prechecks(self, names: Collection[str] | None = None) -> list[Precheck]:
+        """
+        获取部署前相互独立的环境检查
+
+        Args:
+            names: 只返回指定名称的检查，None 表示全部
+
+        Returns:
+            list[Precheck]: 可由 run_prechecks 并发执行的检查
+
+        """
+        checks = [
+            # 读取系统文件的检查放到线程中执行，不阻塞事件循环
+            Precheck(PRECHECK_OS, _("操作系统"), functools.partial(asyncio.to_thread, self.detect_openeuler)),
+            Precheck(PRECHECK_SUDO, _("管理员权限"), self.check_sudo_privileges, timeout=SUDO_CHECK_TIMEOUT),
+            Precheck(
+                PRECHECK_INSTALLER,
+                _("部署资源"),
+                functools.partial(asyncio.to_thread, self.resource_manager.check_installer_available),
+            ),
+        ]
+        return [check for check in checks if names is None or check.name in names]
+
+    @staticmethod
+    def _describe_precheck_result(result: PrecheckResult) -> str:
+        """环境检查结果的日志描述"""
+        if result.passed:
+            return _("✓ {name}检查通过 ({seconds:.1f} 秒)").format(name=result.label, seconds=result.elapsed)
+        if result.timed_out:
+            return _("✗ {name}检查超时 ({seconds:.0f} 秒)").format(name=result.label, seconds=result.elapsed)
+        return _("✗ {name}检查未通过").format(name=result.label)
+
     def detect_openeuler(self) -> bool:
         """检测是否为 openEuler 系统"""
         try:
@@ -285,14 +344,20 @@ class DeploymentService:
     async def check_sudo_privileges(self) -> bool:
         """检查 sudo 权限"""
         try:
-            process = await asyncio.create_subprocess_exec(
+            process = await profiling.create_subprocess_exec(
                 "sudo",
                 "-n",
                 "true",
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
             )
-            return_code = await process.wait()
+            try:
+                return_code = await process.wait()
+            except asyncio.CancelledError:
+                # 检查超时被取消时结束 sudo 进程
+                with contextlib.suppress(ProcessLookupError):
+                    process.kill()
+                raise
         except OSError:
             return False
         else:
@@ -314,6 +379,26 @@ class DeploymentService:
             bool: 部署是否成功
 
         """
+        # 记录本次部署各步骤、子进程与 HTTP 请求的耗时
+        self.profile = profiling.DeploymentProfile(config.deployment_mode)
+        success = False
+        try:
+            with self.profile.activate():
+                success = await self._deploy(config, progress_callback)
+        finally:
+            await self.profile.finish(success=success)
+            self.profile.save()
+            self.state.close_log_file()
+            # 部署结束后释放共享的 HTTP 长连接
+            await close_http_clients()
+        return success
+
+    async def _deploy(
+        self,
+        config: DeploymentConfig,
+        progress_callback: Callable[[DeploymentState], None] | None,
+    ) -> bool:
+        """执行部署的具体流程"""
         # 在部署开始时更新当前用户的配置，确保使用正确的后端 URL
         self._update_backend_url_config(config)
 
@@ -323,15 +408,19 @@ class DeploymentService:
             # 重置状态
             self.state.reset()
             self.state.is_running = True
-            # 根据部署模式设置总步数：轻量模式5步，全量模式4步
-            self.state.total_steps = 5 if config.deployment_mode == "light" else 4
-
+            # 界面只保留最近的日志，完整日志写入文件
+            self.state.open_log_file(
+                DEPLOYMENT_LOG_DIR / f"deployment-{datetime.now(UTC).astimezone():%Y%m%d-%H%M%S}.log",
+            )
             # 执行部署步骤
             success = await self._execute_deployment_steps(config, progress_callback)
 
             if not success:
                 return False
 
+            # 部署成功后不再需要断点续跑
+            self.checkpoint.clear()
+
         except Exception:
             logger.exception("部署过程中发生错误")
             self.state.is_running = False
@@ -420,26 +509,94 @@ class DeploymentService:
         config: DeploymentConfig,
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
-        """执行所有部署步骤"""
-        # 检查并停止旧的 oi-runtime 服务
-        if not await self._check_and_stop_old_service(progress_callback):
-            return False
+        """
+        按依赖关系执行所有部署步骤，相互独立的步骤并发执行
 
-        steps = [
-            self._setup_deploy_mode,
-            self._check_environment,
-            self._run_env_check_script,
-            self._run_install_dependency_script,
-            self._generate_config_files,
-            self._run_init_config_script,
-            self._run_agent_init,
-        ]
+        上次部署失败时，输入未变化的已完成步骤根据断点记录跳过。
+        """
+        scheduler = StepScheduler(self._build_deployment_steps(config, progress_callback), checkpoint=self.checkpoint)
+        return await scheduler.run(self.state, progress_callback)
 
-        for step in steps:
-            if not await step(config, progress_callback):
-                return False
+    def _build_deployment_steps(
+        self,
+        config: DeploymentConfig,
+        progress_callback: Callable[[DeploymentState], None] | None,
+    ) -> list[DeploymentStep]:
+        """
+        构建部署步骤依赖图
 
-        return True
+        - 停止旧服务只需早于依赖安装与服务初始化，与环境检查、配置渲染并发执行
+        - 配置文件只依赖安装器资源，与环境检查脚本、依赖安装脚本并发渲染
+        - 安装脚本依次执行，避免多个 sudo 脚本同时修改系统
+
+        除停止旧服务与系统环境检查外的步骤都声明输入指纹，用于断点续跑；这两个步骤检查的是主机的当前状态，
+        每次都要执行。指纹只包含步骤实际使用的配置字段，上游步骤重新执行时下游步骤也会重新执行。
+        """
+
+        def bind(step: Callable[..., Awaitable[bool]]) -> Callable[[], Awaitable[bool]]:
+            return functools.partial(step, config, progress_callback)
+
+        fingerprint = DeploymentCheckpoint.fingerprint
+        install_inputs = {
+            "deployment_mode": config.deployment_mode,
+            "enable_web": config.enable_web,
+            "enable_rag": config.enable_rag,
+        }
+        config_inputs = {
+            "llm": dataclasses.asdict(config.llm),
+            "embedding": dataclasses.asdict(config.embedding),
+            "detected_backend_type": config.detected_backend_type,
+        }
+
+        return [
+            DeploymentStep(
+                "stop_old_service",
+                _("停止旧服务"),
+                functools.partial(self._check_and_stop_old_service, progress_callback),
+            ),
+            DeploymentStep(
+                "setup_deploy_mode",
+                _("初始化部署配置"),
+                bind(self._setup_deploy_mode),
+                fingerprint=fingerprint(install_inputs),
+            ),
+            DeploymentStep("check_environment", _("检查系统环境"), bind(self._check_environment)),
+            DeploymentStep(
+                "env_check_script",
+                _("检查系统环境"),
+                bind(self._run_env_check_script),
+                depends_on=("setup_deploy_mode", "check_environment"),
+                fingerprint=fingerprint(install_inputs),
+            ),
+            DeploymentStep(
+                "generate_config_files",
+                _("更新配置文件"),
+                bind(self._generate_config_files),
+                depends_on=("check_environment",),
+                fingerprint=fingerprint(config_inputs),
+            ),
+            DeploymentStep(
+                "install_dependency_script",
+                _("安装依赖组件"),
+                bind(self._run_install_dependency_script),
+                depends_on=("env_check_script", "stop_old_service"),
+                fingerprint=fingerprint(install_inputs),
+            ),
+            DeploymentStep(
+                "init_config_script",
+                _("初始化配置和服务"),
+                bind(self._run_init_config_script),
+                depends_on=("install_dependency_script", "generate_config_files"),
+                fingerprint=fingerprint({}),
+            ),
+            DeploymentStep(
+                "agent_init",
+                _("初始化 Agent 服务"),
+                bind(self._run_agent_init),
+                depends_on=("init_config_script",),
+                fingerprint=fingerprint({}),
+            ),
+        ]
 
     async def _execute_install_command(
         self,
@@ -448,20 +605,21 @@ class DeploymentService:
         temp_state: DeploymentState,
     ) -> tuple[bool, list[str]]:
         """执行安装命令"""
-        process = await asyncio.create_subprocess_exec(
+        process = await profiling.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.STDOUT,
         )
 
-        # 读取安装输出
+        # 读取安装输出，界面按固定间隔合并刷新
         output_lines = []
-        if process.stdout:
-            async for line in self._read_process_output_lines(process):
-                output_lines.append(line)
-                if progress_callback:
-                    temp_state.add_log(f"安装: {line}")
-                    progress_callback(temp_state)
+        progress = ThrottledProgress(progress_callback)
+        async for lines in self._read_process_output_batches(process):
+            output_lines.extend(lines)
+            if progress_callback:
+                temp_state.add_logs(f"安装: {line}" for line in lines)
+                progress(temp_state)
+        progress.flush()
 
         # 等待进程结束
         return_code = await process.wait()
@@ -473,8 +631,6 @@ class DeploymentService:
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """检查系统环境和资源"""
-        self.state.current_step = 1
-        self.state.current_step_name = _("检查系统环境")
         self.state.add_log(_("正在检查系统环境..."))
 
         if progress_callback:
@@ -513,8 +669,6 @@ class DeploymentService:
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """设置部署模式"""
-        self.state.current_step = 0
-        self.state.current_step_name = _("初始化部署配置")
         self.state.add_log(_("正在设置部署模式..."))
 
         if progress_callback:
@@ -531,7 +685,7 @@ class DeploymentService:
                 str(self.resource_manager.INSTALL_MODE_FILE),
             ]
 
-            process = await asyncio.create_subprocess_exec(
+            process = await profiling.create_subprocess_exec(
                 *cmd,
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
@@ -563,8 +717,6 @@ class DeploymentService:
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """运行环境检查脚本"""
-        self.state.current_step = 1
-        self.state.current_step_name = _("检查系统环境")
         self.state.add_log(_("正在执行系统环境检查..."))
 
         if progress_callback:
@@ -584,8 +736,6 @@ class DeploymentService:
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """运行依赖安装脚本"""
-        self.state.current_step = 2
-        self.state.current_step_name = _("安装依赖组件")
         self.state.add_log(_("正在安装 Witty Assistant 依赖组件..."))
 
         if progress_callback:
@@ -607,8 +757,6 @@ class DeploymentService:
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """运行配置初始化脚本"""
-        self.state.current_step = 4
-        self.state.current_step_name = _("初始化配置和服务")
         self.state.add_log(_("正在初始化配置和启动服务..."))
 
         if progress_callback:
@@ -640,30 +788,31 @@ class DeploymentService:
 
             cmd = ["sudo", "bash", script_file]
 
-            self._process = await asyncio.create_subprocess_exec(
+            self._process = await profiling.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.STDOUT,
                 cwd=script_dir,
             )
 
-            # 创建心跳任务，定期更新界面
-            heartbeat_task = asyncio.create_task(self._heartbeat_progress(progress_callback))
+            # 限制界面刷新频率，并创建心跳任务在脚本没有输出时定期更新界面
+            progress = ThrottledProgress(progress_callback)
+            heartbeat_task = asyncio.create_task(self._heartbeat_progress(progress))
 
             try:
-                # 读取输出
-                async for line in self._read_process_output_lines(self._process):
-                    self.state.add_log(line)
-                    if progress_callback:
-                        progress_callback(self.state)
+                # 按批读取输出
+                async for lines in self._read_process_output_batches(self._process):
+                    self.state.add_logs(lines)
+                    progress(self.state)
 
                 # 等待进程结束
                 return_code = await self._process.wait()
             finally:
-                # 取消心跳任务
+                # 取消心跳任务，并刷新尚未显示的日志
                 heartbeat_task.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
                     await heartbeat_task
+                progress.flush()
 
             self._process = None
 
@@ -680,16 +829,13 @@ class DeploymentService:
             self.state.add_log(_("✗ {name}执行失败，返回码: {code}").format(name=script_name, code=return_code))
             return False
 
-    async def _heartbeat_progress(self, progress_callback: Callable[[DeploymentState], None] | None) -> None:
-        """心跳进度更新，确保界面不会卡死"""
-        if not progress_callback:
-            return
-
+    async def _heartbeat_progress(self, progress: ThrottledProgress) -> None:
+        """心跳进度更新，确保界面不会卡死；最近一秒内已有更新时跳过"""
         with contextlib.suppress(asyncio.CancelledError):
             while True:
-                await asyncio.sleep(1.0)  # 每秒更新一次
-                if progress_callback:
-                    progress_callback(self.state)
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+                if progress.idle_for >= HEARTBEAT_INTERVAL:
+                    progress(self.state)
 
     async def _generate_config_files(
         self,
@@ -697,8 +843,6 @@ class DeploymentService:
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """生成配置文件"""
-        self.state.current_step = 3
-        self.state.current_step_name = _("更新配置文件")
         self.state.add_log(_("正在更新配置文件..."))
 
         if progress_callback:
@@ -738,7 +882,7 @@ class DeploymentService:
             str(self.resource_manager.ENV_TEMPLATE),
             f"{self.resource_manager.ENV_TEMPLATE}.backup",
         ]
-        backup_process = await asyncio.create_subprocess_exec(
+        backup_process = await profiling.create_subprocess_exec(
             *backup_cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
@@ -752,7 +896,7 @@ class DeploymentService:
 
         # 写入更新后的内容
         write_cmd = ["sudo", "tee", str(self.resource_manager.ENV_TEMPLATE)]
-        process = await asyncio.create_subprocess_exec(
+        process = await profiling.create_subprocess_exec(
             *write_cmd,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
@@ -783,7 +927,7 @@ class DeploymentService:
             str(self.resource_manager.CONFIG_TEMPLATE),
             f"{self.resource_manager.CONFIG_TEMPLATE}.backup",
         ]
-        backup_process = await asyncio.create_subprocess_exec(
+        backup_process = await profiling.create_subprocess_exec(
             *backup_cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
@@ -797,7 +941,7 @@ class DeploymentService:
 
         # 写入更新后的内容
         write_cmd = ["sudo", "tee", str(self.resource_manager.CONFIG_TEMPLATE)]
-        process = await asyncio.create_subprocess_exec(
+        process = await profiling.create_subprocess_exec(
             *write_cmd,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
@@ -810,27 +954,19 @@ class DeploymentService:
             msg = _("写入 config.toml 文件失败: {error}").format(error=error_msg)
             raise RuntimeError(msg)
 
-    async def _read_process_output_lines(self, process: asyncio.subprocess.Process) -> AsyncGenerator[str, None]:
-        """读取进程输出行"""
+    async def _read_process_output_batches(
+        self,
+        process: asyncio.subprocess.Process,
+    ) -> AsyncGenerator[list[str], None]:
+        """按块读取进程输出，每次产出一批输出行"""
         if not process.stdout:
             return
 
-        while not process.stdout.at_eof():
-            try:
-                line = await process.stdout.readline()
-                if not line:
-                    break
-
-                decoded_line = line.decode("utf-8", errors="ignore").strip()
-                if decoded_line:
-                    yield decoded_line
-
-                # 每次读取后让出控制权
-                await asyncio.sleep(0)
-
-            except OSError as e:
-                logger.warning("读取进程输出时发生错误: %s", e)
-                break
+        try:
+            async for lines in read_line_batches(process.stdout):
+                yield lines
+        except OSError as e:
+            logger.warning("读取进程输出时发生错误: %s", e)
 
     async def _check_framework_service_health(
         self,
@@ -850,48 +986,44 @@ class DeploymentService:
         self,
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
-        """检查 systemctl oi-runtime 服务状态，每2秒检查一次，5次后超时"""
-        max_attempts = 5
-        check_interval = 2.0  # 2秒
-
-        for attempt in range(1, max_attempts + 1):
-            self.state.add_log(
-                _("检查 oi-runtime 服务状态 ({current}/{total})...").format(
-                    current=attempt,
-                    total=max_attempts,
-                ),
-            )
-
-            if progress_callback:
-                progress_callback(self.state)
+        """检查 systemctl oi-runtime 服务状态，快速轮询并跟随服务日志，10 秒后超时"""
+        last_status = ""
 
+        async def is_active() -> bool:
+            nonlocal last_status
             try:
-                # 使用 systemctl is-active 检查服务状态
-                process = await asyncio.create_subprocess_exec(
-                    "systemctl",
-                    "is-active",
-                    "oi-runtime",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-
-                stdout, _stderr = await process.communicate()
-                status = stdout.decode("utf-8").strip()
-
-                if process.returncode == 0 and status == "active":
-                    self.state.add_log(_("✓ Framework 服务状态正常"))
+                unit = (await systemd.query_units(["oi-runtime"]))["oi-runtime"]
+            except (OSError, TimeoutError, systemd.SystemdError) as e:
+                status = str(e)
+                if status != last_status:
+                    self.state.add_log(_("检查服务状态时发生错误: {error}").format(error=e))
+            else:
+                if unit.active_state == "active":
                     return True
+                status = unit.describe()
+                # 仅在状态变化时记录，避免快速轮询刷屏
+                if status != last_status:
+                    self.state.add_log(_("Framework 服务状态: {status}").format(status=status))
+            last_status = status
+            if progress_callback:
+                progress_callback(self.state)
+            return False
 
-                self.state.add_log(_("Framework 服务状态: {status}").format(status=status))
+        self.state.add_log(_("检查 oi-runtime 服务状态..."))
+        if progress_callback:
+            progress_callback(self.state)
 
-                if attempt < max_attempts:
-                    self.state.add_log(_("等待 {seconds} 秒后重试...").format(seconds=check_interval))
-                    await asyncio.sleep(check_interval)
+        result = await wait_until_ready(
+            "oi-runtime systemd",
+            is_active,
+            timeout=10.0,
+            event_sources=[journal_event_source("oi-runtime")],
+        )
+        self.state.wait_times[result.name] = result.elapsed
 
-            except (OSError, TimeoutError) as e:
-                self.state.add_log(_("检查服务状态时发生错误: {error}").format(error=e))
-                if attempt < max_attempts:
-                    await asyncio.sleep(check_interval)
+        if result.ready:
+            self.state.add_log(_("✓ Framework 服务状态正常 (等待 {seconds:.1f} 秒)").format(seconds=result.elapsed))
+            return True
 
         self.state.add_log(_("✗ Framework 服务状态检查超时失败"))
         return False
@@ -902,48 +1034,63 @@ class DeploymentService:
         server_port: int,
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
-        """检查 oi-runtime API 健康状态，每10秒检查一次，5分钟后超时"""
-        max_attempts = 30
-        check_interval = 10.0  # 10秒
+        """检查 oi-runtime API 健康状态，端口开始监听时立即检查，5分钟后超时"""
         api_url = f"http://{server_host}:{server_port}/api/user"
-        http_ok = 200  # HTTP OK 状态码
 
-        self.state.add_log(_("等待 Witty Assistant 服务就绪"))
-
-        async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-            for attempt in range(1, max_attempts + 1):
-                logger.debug("第 %d 次检查 Witty Assistant 服务状态...", attempt)
-                if progress_callback:
-                    progress_callback(self.state)
+        async def is_healthy() -> bool:
+            healthy = await self._probe_framework_api(api_url)
+            if not healthy and progress_callback:
+                progress_callback(self.state)
+            return healthy
 
-                try:
-                    response = await client.get(api_url)
+        def on_attempt(attempt: int, _elapsed: float) -> None:
+            logger.debug("第 %d 次检查 Witty Assistant 服务状态...", attempt)
 
-                    if response.status_code == http_ok:
-                        self.state.add_log(_("✓ Witty Assistant 服务已就绪"))
-                        return True
+        self.state.add_log(_("等待 Witty Assistant 服务就绪"))
+        if progress_callback:
+            progress_callback(self.state)
 
-                except httpx.ConnectError:
-                    pass
-                except httpx.TimeoutException:
-                    self.state.add_log(_("连接 {url} 超时").format(url=api_url))
-                except (httpx.RequestError, OSError) as e:
-                    self.state.add_log(_("API 连通性检查时发生错误: {error}").format(error=e))
+        result = await wait_until_ready(
+            "Witty Assistant API",
+            is_healthy,
+            timeout=300.0,
+            policy=BackoffPolicy(initial=0.5, max_interval=10.0),
+            event_sources=[tcp_connect_event_source(server_host, server_port)],
+            on_attempt=on_attempt,
+        )
+        self.state.wait_times[result.name] = result.elapsed
 
-                if attempt < max_attempts:
-                    await asyncio.sleep(check_interval)
+        if result.ready:
+            self.state.add_log(_("✓ Witty Assistant 服务已就绪 (等待 {seconds:.1f} 秒)").format(seconds=result.elapsed))
+            return True
 
         self.state.add_log(_("✗ Witty Assistant API 服务检查超时失败"))
         return False
 
+    async def _probe_framework_api(self, api_url: str) -> bool:
+        """请求一次 API 接口，返回是否已就绪"""
+        http_ok = 200  # HTTP OK 状态码
+        client = get_http_client(api_url, profile="health")
+        try:
+            with profiling.measure("http", f"GET {api_url}"):
+                response = await client.get(api_url)
+        except httpx.ConnectError:
+            return False
+        except httpx.TimeoutException:
+            self.state.add_log(_("连接 {url} 超时").format(url=api_url))
+            return False
+        except (httpx.RequestError, OSError) as e:
+            self.state.add_log(_("API 连通性检查时发生错误: {error}").format(error=e))
+            return False
+        else:
+            return response.status_code == http_ok
+
     async def _run_agent_init(
         self,
         config: DeploymentConfig,
         progress_callback: Callable[[DeploymentState], None] | None,
     ) -> bool:
         """运行 Agent 初始化脚本"""
-        self.state.current_step = 5
-        self.state.current_step_name = _("初始化 Agent 服务")
         self.state.add_log(_("正在检查 Witty Assistant 后端服务状态..."))
 
         if progress_callback:
@@ -964,7 +1111,7 @@ class DeploymentService:
             progress_callback(self.state)
 
         # 初始化 Agent 和 MCP 服务
-        agent_manager = AgentManager()
+        agent_manager = AgentManager(checkpoint=self.checkpoint.step("agent_init"))
         init_status = await agent_manager.initialize_agents(self.state, progress_callback)
 
         if init_status == AgentInitStatus.SUCCESS:
@@ -1072,7 +1219,7 @@ class DeploymentService:
         for service_name in services_to_check:
             try:
                 # 检查服务状态
-                process = await asyncio.create_subprocess_exec(
+                process = await profiling.create_subprocess_exec(
                     "systemctl",
                     "is-active",
                     service_name,
@@ -1090,7 +1237,7 @@ class DeploymentService:
                         progress_callback(self.state)
 
                     # 停止服务
-                    stop_process = await asyncio.create_subprocess_exec(
+                    stop_process = await profiling.create_subprocess_exec(
                         "sudo",
                         "systemctl",
                         "stop",
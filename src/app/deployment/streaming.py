@@ -0,0 +1,118 @@
+"""
+部署脚本输出的批量读取
+
+部署脚本（尤其是安装依赖阶段）会在短时间内输出成千上万行日志。
+这里按块读取子进程输出并整批切分为行，进度回调经过限频合并，
+无论脚本输出多快，界面每个刷新间隔最多更新一次，且最后一次更新不会丢失。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Callable
+
+    from .models import DeploymentState
+
+# 单次读取子进程输出的最大字节数
+OUTPUT_CHUNK_SIZE = 16 * 1024
+# 没有换行符的输出超过该长度时强制作为一行处理
+MAX_LINE_LENGTH = 64 * 1024
+# 两次进度回调之间的最小间隔（秒）
+PROGRESS_INTERVAL = 0.1
+
+
+async def read_line_batches(
+    stream: asyncio.StreamReader,
+    chunk_size: int = OUTPUT_CHUNK_SIZE,
+) -> AsyncGenerator[list[str], None]:
+    """
+    按块读取输出流，每次产出一批去除首尾空白后的非空行
+
+    Args:
+        stream: 子进程的输出流
+        chunk_size: 单次读取的最大字节数
+
+    Yields:
+        list[str]: 本次读取到的完整行，流结束时包含最后不以换行结尾的内容
+
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    while True:
+        chunk = await stream.read(chunk_size)
+        text = pending + decoder.decode(chunk, final=not chunk)
+        parts = text.split("\n")
+        pending = "" if not chunk else parts.pop()
+        if len(pending) > MAX_LINE_LENGTH:
+            parts.append(pending)
+            pending = ""
+
+        lines = [stripped for part in parts if (stripped := part.strip())]
+        if lines:
+            yield lines
+        if not chunk:
+            return
+
+        # 缓冲区中有大量数据时 read 不会挂起，每读取一块让出一次控制权
+        await asyncio.sleep(0)
+
+
+class ThrottledProgress:
+    """
+    限频的进度回调
+
+    可直接作为进度回调使用。距上次回调不足一个间隔时不立即回调，而是在间隔结束时
+    用最新的状态回调一次，因此间隔内的多次更新会合并为一次，且不会丢失最后一次更新。
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[DeploymentState], None] | None,
+        interval: float = PROGRESS_INTERVAL,
+    ) -> None:
+        """初始化限频回调"""
+        self._callback = callback
+        self._interval = interval
+        self._state: DeploymentState | None = None
+        self._last = float("-inf")
+        self._timer: asyncio.TimerHandle | None = None
+        self.calls = 0
+        """实际执行回调的次数"""
+
+    def __call__(self, state: DeploymentState) -> None:
+        """提交一次进度更新"""
+        if self._callback is None:
+            return
+
+        self._state = state
+        if self._timer is not None:
+            # 已安排的回调会使用最新的状态
+            return
+        delay = self._last + self._interval - time.monotonic()
+        if delay <= 0:
+            self._emit()
+        else:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._emit)
+
+    @property
+    def idle_for(self) -> float:
+        """距上次回调经过的时间（秒）"""
+        return time.monotonic() - self._last
+
+    def flush(self) -> None:
+        """立即执行尚未执行的更新"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._emit()
+
+    def _emit(self) -> None:
+        self._timer = None
+        self._last = time.monotonic()
+        if self._callback is not None and self._state is not None:
+            self.calls += 1
+            self._callback(self._state)
@@ -0,0 +1,147 @@
+"""
+systemd 服务状态批量查询
+
+通过一次 `systemctl show` 调用获取多个服务单元的状态，避免逐个服务启动 systemctl 进程。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from . import profiling
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# 查询的单元属性 -> UnitStatus 字段
+UNIT_PROPERTIES = {
+    "LoadState": "load_state",
+    "ActiveState": "active_state",
+    "SubState": "sub_state",
+    "Result": "result",
+}
+# 单元正在切换状态，需要继续等待
+TRANSITIONAL_STATES = frozenset({"activating", "deactivating", "reloading"})
+# 处于切换状态但实际已经失败的子状态（进程退出后等待自动重启）
+FAILING_SUB_STATES = frozenset({"auto-restart", "failed"})
+
+
+class SystemdError(Exception):
+    """systemctl 调用失败异常"""
+
+
+@dataclass(frozen=True)
+class UnitStatus:
+    """单个服务单元的状态"""
+
+    name: str
+    load_state: str = ""
+    """loaded / not-found 等"""
+    active_state: str = ""
+    """active / activating / inactive / failed 等"""
+    sub_state: str = ""
+    """running / start / exited / dead / auto-restart 等"""
+    result: str = ""
+    """上次运行结果，success / exit-code 等"""
+
+    @property
+    def is_running(self) -> bool:
+        """服务是否正常运行"""
+        return self.active_state == "active" and self.sub_state == "running"
+
+    @property
+    def is_pending(self) -> bool:
+        """服务是否仍在启动或停止过程中"""
+        return self.active_state in TRANSITIONAL_STATES and self.sub_state not in FAILING_SUB_STATES
+
+    def describe(self) -> str:
+        """状态描述，如 active (running)"""
+        return f"{self.active_state} ({self.sub_state})"
+
+
+async def query_units(units: Sequence[str]) -> dict[str, UnitStatus]:
+    """
+    一次查询多个服务单元的状态
+
+    Args:
+        units: 服务单元名称
+
+    Returns:
+        dict[str, UnitStatus]: 服务单元名称到状态的映射，顺序与 units 一致
+
+    Raises:
+        SystemdError: systemctl 执行失败或输出无法解析
+
+    """
+    if not units:
+        return {}
+
+    process = await profiling.create_subprocess_exec(
+        "systemctl",
+        "show",
+        "--no-pager",
+        f"--property={','.join(UNIT_PROPERTIES)}",
+        "--",
+        *units,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        error = stderr.decode("utf-8", errors="ignore").strip()
+        msg = f"systemctl show 执行失败 (返回码: {process.returncode}): {error}"
+        raise SystemdError(msg)
+
+    # systemctl show 按参数顺序输出每个单元的属性，单元之间以空行分隔
+    blocks = _parse_show_output(stdout.decode("utf-8", errors="ignore"))
+    if len(blocks) != len(units):
+        msg = f"systemctl show 返回了 {len(blocks)} 个单元的状态，预期 {len(units)} 个"
+        raise SystemdError(msg)
+    return {unit: UnitStatus(unit, **fields) for unit, fields in zip(units, blocks, strict=True)}
+
+
+async def stop_units(units: Sequence[str]) -> None:
+    """
+    一次停止多个服务单元
+
+    Raises:
+        SystemdError: systemctl 执行失败
+
+    """
+    if not units:
+        return
+
+    process = await profiling.create_subprocess_exec(
+        "sudo",
+        "systemctl",
+        "stop",
+        "--",
+        *units,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        error = stderr.decode("utf-8", errors="ignore").strip()
+        msg = f"systemctl stop 执行失败 (返回码: {process.returncode}): {error}"
+        raise SystemdError(msg)
+
+
+def _parse_show_output(output: str) -> list[dict[str, str]]:
+    """解析 systemctl show 的输出，每个单元一个属性字典"""
+    blocks: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    for line in output.splitlines():
+        if not line.strip():
+            if current:
+                blocks.append(current)
+                current = {}
+            continue
+        key, _sep, value = line.partition("=")
+        if key in UNIT_PROPERTIES:
+            current[UNIT_PROPERTIES[key]] = value.strip()
+    if current:
+        blocks.append(current)
+    return blocks
@@ -12,6 +12,8 @@ from enum import Enum
 from typing import TYPE_CHECKING
 
 from rich.errors import MarkupError
+from rich.markup import escape
+from rich.table import Table
 from textual import on
 from textual.containers import Container, Horizontal, Vertical
 from textual.screen import ModalScreen
@@ -691,7 +693,9 @@ class DeploymentProgressScreen(ModalScreen[bool]):
         self.deployment_cancelled = False
         self.deployment_errors: list[str] = []
         self.deployment_progress_value = 0
-        self.latest_log: str = ""
+        # 已写入界面的日志来源和读取游标
+        self._log_state: DeploymentState | None = None
+        self._log_cursor = 0
 
     def compose(self) -> ComposeResult:
         """组合界面组件"""
@@ -773,7 +777,8 @@ class DeploymentProgressScreen(ModalScreen[bool]):
         self.deployment_cancelled = False
         self.deployment_errors.clear()
         self.deployment_progress_value = 0  # 重置进度记录
-        self.latest_log = ""
+        self._log_state = None
+        self._log_cursor = 0
 
         # 重置进度
         self.query_one("#step_label", Static).update("")
@@ -851,6 +856,7 @@ class DeploymentProgressScreen(ModalScreen[bool]):
             # 步骤2：执行部署
             self.query_one("#step_label", Static).update(_("正在执行部署..."))
             success = await self.service.deploy(self.config, self._on_progress_update)
+            self._show_timing_report()
 
             # 更新界面状态
             if success:
@@ -878,6 +884,37 @@ class DeploymentProgressScreen(ModalScreen[bool]):
             self.deployment_errors.append(error_msg)
             self._update_buttons_after_failure()
 
+    def _show_timing_report(self) -> None:
+        """在部署日志末尾展示各步骤的耗时汇总"""
+        profile = self.service.profile
+        if profile is None or not profile.records:
+            return
+
+        table = Table(title=_("部署耗时报告"), expand=False)
+        table.add_column(_("步骤"))
+        table.add_column(_("耗时"), justify="right")
+        table.add_column(_("子进程"), justify="right")
+        table.add_column(_("HTTP 请求"), justify="right")
+        table.add_column(_("状态"), justify="center")
+        for step in profile.summary():
+            status = "[green]✓[/green]" if step.success else "[red]✗[/red]"
+            if step.skipped:
+                status = _("跳过")
+            table.add_row(
+                step.label,
+                f"{step.duration:.1f}s",
+                f"{step.subprocess_count} / {step.subprocess_time:.1f}s",
+                f"{step.http_count} / {step.http_time:.1f}s",
+                status,
+            )
+        table.add_section()
+        table.add_row(_("总计"), f"{profile.total_duration:.1f}s", "", "", "")
+
+        log_widget = self.query_one("#deployment_log", RichLog)
+        log_widget.write(table)
+        if profile.saved_path is not None:
+            log_widget.write(_("耗时报告已保存到: {path}").format(path=profile.saved_path))
+
     def _on_progress_update(self, state: DeploymentState) -> None:
         """处理进度更新"""
         # 更新进度条
@@ -897,21 +934,48 @@ class DeploymentProgressScreen(ModalScreen[bool]):
         )
         self.query_one("#step_label", Static).update(step_text)
 
-        # 添加最新的日志条目
+        # 批量写入上次更新以来新增的日志
+        self._write_new_logs(state)
+
+    def _write_new_logs(self, state: DeploymentState) -> None:
+        """将新增日志一次性写入日志控件，已被缓冲区淘汰的日志以提示代替"""
+        if state is not self._log_state or self._log_cursor > state.log_count:
+            # 切换到新的状态对象，或状态已被重置
+            self._log_state = state
+            self._log_cursor = 0
+        lines, dropped = state.logs_since(self._log_cursor)
+        self._log_cursor = state.log_count
+
         log_widget = self.query_one("#deployment_log", RichLog)
-        if state.output_log and self.latest_log != state.output_log[-1]:
-            # 只显示最新的日志条目
-            self.latest_log = state.output_log[-1]
-            try:
-                if self.latest_log.startswith("✓"):
-                    log_widget.write(f"[green]{self.latest_log}[/green]")
-                elif self.latest_log.startswith("✗"):
-                    log_widget.write(f"[red]{self.latest_log}[/red]")
-                else:
-                    log_widget.write(self.latest_log)
-            except MarkupError:
-                # 忽略日志消息格式错误
-                pass
+        if dropped:
+            log_widget.write(
+                _("[dim]... 省略 {count} 行日志，完整日志见 {path}[/dim]").format(
+                    count=dropped,
+                    path=escape(str(state.log_file or "")),
+                ),
+            )
+        if not lines:
+            return
+
+        rendered = [self._colorize_log(line) for line in lines]
+        try:
+            log_widget.write("\n".join(rendered))
+        except MarkupError:
+            # 逐行写入，格式错误的行按原文显示
+            for line in rendered:
+                try:
+                    log_widget.write(line)
+                except MarkupError:
+                    log_widget.write(escape(line))
+
+    @staticmethod
+    def _colorize_log(line: str) -> str:
+        """按成功/失败前缀为日志着色"""
+        if line.startswith("✓"):
+            return f"[green]{line}[/green]"
+        if line.startswith("✗"):
+            return f"[red]{line}[/red]"
+        return line
 
 
 class ErrorMessageScreen(ModalScreen[None]):
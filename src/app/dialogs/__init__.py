@@ -2,5 +2,7 @@
 
 from .agent import AgentSelectionDialog, BackendRequiredDialog
 from .common import ExitDialog
+from .history import HistorySearchDialog
+from .search import SearchDialog
 
-__all__ = ["AgentSelectionDialog", "BackendRequiredDialog", "ExitDialog"]
+__all__ = ["AgentSelectionDialog", "BackendRequiredDialog", "ExitDialog", "HistorySearchDialog", "SearchDialog"]
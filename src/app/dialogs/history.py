@@ -0,0 +1,110 @@
+"""输入历史反向搜索对话框"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, ClassVar
+
+from rich.markup import escape
+from textual import on
+from textual.binding import Binding, BindingType
+from textual.containers import Container
+from textual.screen import ModalScreen
+from textual.widgets import Input, Label, Static
+
+from i18n.manager import _
+
+if TYPE_CHECKING:
+    from textual.app import ComposeResult
+
+    from app.input_history import InputHistory
+
+# 对话框中显示的最大结果数
+VISIBLE_RESULTS = 12
+
+
+class HistorySearchDialog(ModalScreen[str | None]):
+    """输入历史反向搜索对话框，回车将选中的历史条目填入输入框"""
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "close", show=False),
+        Binding("up", "move(-1)", show=False),
+        Binding("down,ctrl+r", "move(1)", show=False),
+    ]
+
+    def __init__(self, history: InputHistory, query: str = "") -> None:
+        """
+        初始化对话框
+
+        Args:
+            history: 输入历史
+            query: 初始查询内容
+
+        """
+        super().__init__()
+        self.history = history
+        self.initial_query = query
+        self.results: list[str] = []
+        self.selected_index = 0
+
+    def compose(self) -> ComposeResult:
+        """构建对话框"""
+        yield Container(
+            Container(
+                Label(_("History"), id="history-dialog-title"),
+                Input(self.initial_query, placeholder=_("Search input history..."), id="history-input"),
+                Static("", markup=True, id="history-results"),
+                Label(_("↑/↓ or Ctrl+R select, Enter use, ESC close"), id="history-dialog-help"),
+                id="history-dialog",
+            ),
+            id="history-dialog-screen",
+        )
+
+    def on_mount(self) -> None:
+        """挂载时聚焦输入框并显示最近的历史"""
+        self.query_one("#history-input", Input).focus()
+        self._run_search()
+
+    @on(Input.Changed, "#history-input")
+    def handle_query_changed(self) -> None:
+        """输入变化时重新搜索"""
+        self._run_search()
+
+    @on(Input.Submitted, "#history-input")
+    def handle_query_submitted(self, event: Input.Submitted) -> None:
+        """回车使用选中的历史条目"""
+        event.stop()
+        if self.results:
+            self.dismiss(self.results[self.selected_index])
+        else:
+            self.dismiss(None)
+
+    def action_close(self) -> None:
+        """关闭对话框"""
+        self.dismiss(None)
+
+    def action_move(self, delta: int) -> None:
+        """移动选中的结果，向下为更早的历史"""
+        if self.results:
+            self.selected_index = max(0, min(len(self.results) - 1, self.selected_index + delta))
+            self._update_display()
+
+    def _run_search(self) -> None:
+        """执行搜索并更新结果"""
+        query = self.query_one("#history-input", Input).value
+        self.results = self.history.index.search(query)
+        self.selected_index = 0
+        self._update_display()
+
+    def _update_display(self) -> None:
+        """更新结果列表"""
+        lines = []
+        if not self.history.loaded:
+            lines.append(f"[bright_black]{escape(_('Loading input history...'))}[/bright_black]")
+        start = max(0, self.selected_index - VISIBLE_RESULTS + 1)
+        for offset, text in enumerate(self.results[start : start + VISIBLE_RESULTS]):
+            label = escape(" ".join(text.split()))
+            if start + offset == self.selected_index:
+                lines.append(f"[white on blue]► {label}[/white on blue]")
+            else:
+                lines.append(f"[bright_white]  {label}[/bright_white]")
+        self.query_one("#history-results", Static).update("\n".join(lines))
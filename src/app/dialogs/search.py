@@ -0,0 +1,199 @@
+"""输出内容搜索对话框"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, ClassVar
+
+from rich.markup import escape
+from textual import on
+from textual.binding import Binding, BindingType
+from textual.containers import Container
+from textual.screen import ModalScreen
+from textual.widgets import Input, Label, Static
+
+from app.search_index import SessionMatch, make_snippet, query_terms
+from i18n.manager import _
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from textual.app import ComposeResult
+    from textual.widget import Widget
+
+    from app.search_index import SearchIndex, SessionSearchIndex
+
+# 对话框中显示的最大结果数
+VISIBLE_RESULTS = 12
+
+
+class SearchDialog(ModalScreen):
+    """输出内容搜索对话框，输入时实时显示结果，回车跳转到匹配的输出"""
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "close", show=False),
+        Binding("up", "move(-1)", show=False),
+        Binding("down", "move(1)", show=False),
+        Binding("tab", "toggle_scope", show=False),
+    ]
+
+    def __init__(
+        self,
+        index: SearchIndex[Widget],
+        session_index: SessionSearchIndex,
+        *,
+        current_session: str,
+        on_jump: Callable[[Widget], None],
+    ) -> None:
+        """
+        初始化搜索对话框
+
+        Args:
+            index: 当前会话输出的索引
+            session_index: 已保存会话的磁盘索引
+            current_session: 当前会话ID，不在已保存会话中重复检索
+            on_jump: 选择当前会话的结果后调用，跳转到对应的输出组件
+
+        """
+        super().__init__()
+        self.index = index
+        self.session_index = session_index
+        self.current_session = current_session
+        self.on_jump = on_jump
+        self.logger = get_logger(__name__)
+        self.all_sessions = False
+        self.results: list[Widget] | list[SessionMatch] = []
+        self.selected_index = 0
+        self.status = ""
+        self._sessions_ready = False
+        self._refresh_task: asyncio.Task | None = None
+        # 已保存会话的检索需要读取磁盘，在线程中执行，输入变化时取消尚未完成的检索
+        self._search_task: asyncio.Task | None = None
+
+    def compose(self) -> ComposeResult:
+        """构建搜索对话框"""
+        yield Container(
+            Container(
+                Label(_("Search"), id="search-dialog-title"),
+                Input(placeholder=_("Type to search..."), id="search-input"),
+                Static("", markup=True, id="search-results"),
+                Label(
+                    _("↑/↓ select, Enter jump, Tab switch between this session and saved sessions, ESC close"),
+                    id="search-dialog-help",
+                ),
+                id="search-dialog",
+            ),
+            id="search-dialog-screen",
+        )
+
+    def on_mount(self) -> None:
+        """挂载时聚焦输入框"""
+        self.query_one("#search-input", Input).focus()
+        self._update_display()
+
+    @on(Input.Changed, "#search-input")
+    def handle_query_changed(self) -> None:
+        """输入变化时重新搜索"""
+        self._run_search()
+
+    @on(Input.Submitted, "#search-input")
+    def handle_query_submitted(self) -> None:
+        """回车打开选中的结果"""
+        if not self.results:
+            return
+        result = self.results[self.selected_index]
+        self.app.pop_screen()
+        if isinstance(result, SessionMatch):
+            self.app.notify(
+                _("Run witty --resume {session_id} to open this session").format(session_id=result.session_id),
+            )
+        else:
+            self.on_jump(result)
+
+    def action_close(self) -> None:
+        """关闭对话框"""
+        self.app.pop_screen()
+
+    def action_move(self, delta: int) -> None:
+        """移动选中的结果"""
+        if self.results:
+            self.selected_index = max(0, min(len(self.results) - 1, self.selected_index + delta))
+            self._update_display()
+
+    def action_toggle_scope(self) -> None:
+        """在当前会话与已保存会话之间切换搜索范围"""
+        self.all_sessions = not self.all_sessions
+        if self.all_sessions and not self._sessions_ready:
+            if self._refresh_task is None:
+                self.status = _("Indexing saved sessions...")
+                self._refresh_task = asyncio.create_task(self._refresh_sessions())
+            self.results = []
+            self._update_display()
+            return
+        self._run_search()
+
+    async def _refresh_sessions(self) -> None:
+        """在线程中同步已保存会话的磁盘索引，完成后重新搜索"""
+        try:
+            await asyncio.to_thread(self.session_index.refresh, self.current_session)
+        except Exception:
+            self.logger.exception("建立会话检索索引失败")
+        self._sessions_ready = True
+        if self.is_attached:
+            self._run_search()
+
+    def _run_search(self) -> None:
+        """执行搜索并更新结果"""
+        if self._search_task is not None:
+            self._search_task.cancel()
+            self._search_task = None
+        if self.all_sessions and not self._sessions_ready:
+            return
+        query = self.query_one("#search-input", Input).value
+        if self.all_sessions:
+            self._search_task = asyncio.create_task(self._search_sessions(query))
+            return
+        started = time.perf_counter()
+        self._show_results(query, self.index.search(query), started)
+
+    async def _search_sessions(self, query: str) -> None:
+        """在线程中检索已保存的会话，完成时输入未变化才显示结果"""
+        started = time.perf_counter()
+        try:
+            results = await asyncio.to_thread(self.session_index.search, query)
+        except Exception:
+            self.logger.exception("检索已保存的会话失败")
+            results = []
+        if self.is_attached and self.all_sessions:
+            self._show_results(query, results, started)
+
+    def _show_results(self, query: str, results: list[Widget] | list[SessionMatch], started: float) -> None:
+        """显示搜索结果与耗时"""
+        self.results = results
+        elapsed = (time.perf_counter() - started) * 1000
+        self.selected_index = 0
+        self.status = (
+            _("{count} results in {elapsed:.1f} ms").format(count=len(self.results), elapsed=elapsed)
+            if query.strip()
+            else ""
+        )
+        self._update_display()
+
+    def _update_display(self) -> None:
+        """更新结果列表"""
+        scope = _("Saved sessions") if self.all_sessions else _("This session")
+        lines = [f"[bright_black]{escape(scope)}  {escape(self.status)}[/bright_black]"]
+        terms = query_terms(self.query_one("#search-input", Input).value)
+        start = max(0, self.selected_index - VISIBLE_RESULTS + 1)
+        for offset, result in enumerate(self.results[start : start + VISIBLE_RESULTS]):
+            if isinstance(result, SessionMatch):
+                label = f"{result.session_id}  {make_snippet(result.text, terms)}"
+            else:
+                label = make_snippet(self.index.get_text(result), terms)
+            if start + offset == self.selected_index:
+                lines.append(f"[white on blue]► {escape(label)}[/white on blue]")
+            else:
+                lines.append(f"[bright_white]  {escape(label)}[/bright_white]")
+        self.query_one("#search-results", Static).update("\n".join(lines))
@@ -0,0 +1,290 @@
+"""
+命令输入历史
+
+历史记录保存在只追加的文件中，每行一个 JSON 字符串。多个 witty 实例同时运行时，
+每次追加都在文件锁内以单次写入完成，互不覆盖；文件中重复条目过多时在启动加载时压缩重写，
+重写同样持有文件锁，双方在获得锁后都检查文件是否已被替换。历史文件只允许当前用户访问。
+
+内存中的 HistoryIndex 对条目去重（重复输入的命令移动到最新位置），并维护：
+- 按加入顺序排列的条目表，条目在表中的位置即其序号，用于上下方向键浏览；
+- 有序条目表，按前缀浏览时用二分查找得到匹配条目的数量：匹配条目较少时直接比较它们的序号，
+  较多时沿条目表逐条查找，很快就会遇到下一个匹配条目，不需要对匹配条目排序；
+- 与输出搜索相同的倒排索引（app.search_index），用于 Ctrl+R 反向搜索。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from app.search_index import SEARCH_RESULT_LIMIT, SearchIndex
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+HISTORY_FILE = Path.home() / ".cache" / "openEuler Intelligence" / "history"
+# 保留的最大历史条目数
+HISTORY_MAX_ENTRIES = 100_000
+# 文件行数超过去重后条目数的倍数时压缩重写
+HISTORY_COMPACT_RATIO = 2
+HISTORY_COMPACT_MIN_LINES = 1000
+# 按前缀浏览时，匹配条目不超过该数量则直接比较序号，否则沿条目表查找
+HISTORY_PREFIX_SCAN = 1024
+# 历史文件及其目录的权限
+HISTORY_DIR_MODE = 0o700
+HISTORY_FILE_MODE = 0o600
+
+logger = get_logger(__name__)
+
+
+class HistoryIndex:
+    """去重的历史条目索引"""
+
+    def __init__(self, max_entries: int = HISTORY_MAX_ENTRIES) -> None:
+        """初始化空索引"""
+        self.max_entries = max_entries
+        # 按加入顺序排列的条目，被移动或淘汰的位置为 None
+        self._items: list[str | None] = []
+        self._positions: dict[str, int] = {}
+        self._sorted: list[str] = []
+        self._search: SearchIndex[str] = SearchIndex()
+        self._first = 0
+
+    @classmethod
+    def from_entries(cls, texts: list[str], max_entries: int = HISTORY_MAX_ENTRIES) -> HistoryIndex:
+        """由从旧到新排列的条目一次建立索引，有序条目表只排序一次"""
+        entries: list[str | None] = list(dict.fromkeys(reversed(texts)))[:max_entries]
+        entries.reverse()
+        index = cls(max_entries)
+        index._items = entries
+        index._positions = {text: position for position, text in enumerate(entries) if text is not None}
+        index._sorted = sorted(index._positions)
+        for text in index._positions:
+            index._search.set(text, text)
+        return index
+
+    def __len__(self) -> int:
+        """条目数量"""
+        return len(self._positions)
+
+    def __contains__(self, text: object) -> bool:
+        """条目是否存在"""
+        return text in self._positions
+
+    @property
+    def end(self) -> int:
+        """浏览的起点：最新条目之后的位置"""
+        return len(self._items)
+
+    def entries(self) -> list[str]:
+        """按从旧到新的顺序返回所有条目"""
+        return [text for text in self._items[self._first :] if text is not None]
+
+    def add(self, text: str) -> None:
+        """加入条目，已存在的条目移动到最新位置"""
+        position = self._positions.get(text)
+        if position is not None:
+            if position == len(self._items) - 1:
+                return
+            self._items[position] = None
+            self._search.remove(text)
+        else:
+            bisect.insort(self._sorted, text)
+        self._positions[text] = len(self._items)
+        self._items.append(text)
+        self._search.set(text, text)
+
+        while len(self._positions) > self.max_entries:
+            self._drop_oldest()
+        if len(self._items) - self._first > 2 * len(self._positions):
+            self._compact()
+
+    def previous(self, prefix: str, before: int) -> tuple[int, str] | None:
+        """查找 before 之前最近的以 prefix 开头的条目"""
+        start, end = self._prefix_range(prefix)
+        if end - start <= HISTORY_PREFIX_SCAN:
+            positions = (self._positions[self._sorted[i]] for i in range(start, end))
+            position = max((position for position in positions if position < before), default=None)
+            return None if position is None else (position, self._items[position] or "")
+        for position in range(min(before, len(self._items)) - 1, self._first - 1, -1):
+            text = self._items[position]
+            if text is not None and text.startswith(prefix):
+                return position, text
+        return None
+
+    def next(self, prefix: str, after: int) -> tuple[int, str] | None:
+        """查找 after 之后最近的以 prefix 开头的条目"""
+        start, end = self._prefix_range(prefix)
+        if end - start <= HISTORY_PREFIX_SCAN:
+            positions = (self._positions[self._sorted[i]] for i in range(start, end))
+            position = min((position for position in positions if position > after), default=None)
+            return None if position is None else (position, self._items[position] or "")
+        for position in range(max(after + 1, self._first), len(self._items)):
+            text = self._items[position]
+            if text is not None and text.startswith(prefix):
+                return position, text
+        return None
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[str]:
+        """查询包含所有查询词的条目，从新到旧排列；查询为空时返回最近的条目"""
+        if not query.strip():
+            recent: list[str] = []
+            for text in reversed(self._items):
+                if len(recent) >= limit:
+                    break
+                if text is not None:
+                    recent.append(text)
+            return recent
+        return self._search.search(query, limit)
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        """以 prefix 开头的条目在有序条目表中的范围"""
+        if not prefix:
+            return 0, len(self._sorted)
+        start = bisect.bisect_left(self._sorted, prefix)
+        return start, bisect.bisect_left(self._sorted, prefix + "\U0010ffff", start)
+
+    def _drop_oldest(self) -> None:
+        """淘汰最旧的条目"""
+        while self._items[self._first] is None:
+            self._first += 1
+        text = self._items[self._first]
+        if text is None:
+            return
+        self._items[self._first] = None
+        self._first += 1
+        del self._positions[text]
+        del self._sorted[bisect.bisect_left(self._sorted, text)]
+        self._search.remove(text)
+
+    def _compact(self) -> None:
+        """移除条目表中的空位"""
+        self._items = list(self.entries())
+        self._positions = {text: position for position, text in enumerate(self._items)}
+        self._first = 0
+
+
+class InputHistory:
+    """持久化的命令输入历史"""
+
+    def __init__(self, path: Path = HISTORY_FILE, max_entries: int = HISTORY_MAX_ENTRIES) -> None:
+        """初始化历史记录，文件内容由 load 在后台加载"""
+        self.path = path
+        self.max_entries = max_entries
+        self.index = HistoryIndex(max_entries)
+        self.loaded = False
+        # 每次条目变化时递增，浏览中的位置随之失效
+        self.version = 0
+        # 加载完成前输入的条目，加载后合并到新索引的末尾
+        self._pending: list[str] = []
+        self._disabled = False
+
+    async def load(self) -> None:
+        """在线程中读取历史文件并建立索引，完成后替换当前索引"""
+        try:
+            index = await asyncio.to_thread(self._read)
+        except asyncio.CancelledError:
+            # 加载被取消时继续使用当前索引（已包含启动后的输入），不再等待合并
+            self._pending.clear()
+            self.loaded = True
+            raise
+        except Exception:
+            logger.exception("加载输入历史失败")
+            index = HistoryIndex(self.max_entries)
+        for text in self._pending:
+            index.add(text)
+        self._pending.clear()
+        self.index = index
+        self.loaded = True
+        self.version += 1
+        logger.debug("输入历史加载完成，共 %d 条", len(index))
+
+    def add(self, text: str) -> None:
+        """记录一条输入并追加到历史文件"""
+        text = text.strip()
+        if not text:
+            return
+        self.index.add(text)
+        if not self.loaded:
+            self._pending.append(text)
+        self.version += 1
+        self._append(text)
+
+    def _read(self) -> HistoryIndex:
+        """读取历史文件，重复条目过多时压缩重写"""
+        texts, lines = self._read_texts()
+        index = HistoryIndex.from_entries(texts, self.max_entries)
+        if lines > max(HISTORY_COMPACT_RATIO * len(index), HISTORY_COMPACT_MIN_LINES):
+            self._compact()
+        return index
+
+    def _read_texts(self) -> tuple[list[str], int]:
+        """读取历史文件中的条目与总行数，损坏的行（例如写入中断）被忽略"""
+        try:
+            with self.path.open("rb") as file:
+                lines = file.read().splitlines()
+        except FileNotFoundError:
+            return [], 0
+        texts = []
+        for line in lines:
+            try:
+                text = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(text, str) and text:
+                texts.append(text)
+        return texts, len(lines)
+
+    def _append(self, text: str) -> None:
+        """在文件锁内以单次写入追加一行"""
+        if self._disabled:
+            return
+        data = (json.dumps(text, ensure_ascii=False) + "\n").encode()
+        try:
+            with self._locked() as file:
+                # 其他实例写入中断留下的不完整行单独成行，不影响本条记录
+                size = os.fstat(file.fileno()).st_size
+                if size and os.pread(file.fileno(), 1, size - 1) != b"\n":
+                    data = b"\n" + data
+                file.write(data)
+        except OSError as e:
+            logger.warning("写入输入历史失败，本次运行不再记录: %s", e)
+            self._disabled = True
+
+    def _compact(self) -> None:
+        """在文件锁内去重重写历史文件"""
+        temp_path = self.path.with_suffix(".tmp")
+        try:
+            with self._locked():
+                # 持有锁后重新读取，包含其他实例在此之前追加的条目
+                texts, lines = self._read_texts()
+                entries = list(dict.fromkeys(reversed(texts)))[: self.max_entries]
+                temp_path.unlink(missing_ok=True)
+                fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, HISTORY_FILE_MODE)
+                with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                    temp.writelines(json.dumps(text, ensure_ascii=False) + "\n" for text in reversed(entries))
+                temp_path.replace(self.path)
+            logger.info("已压缩输入历史：%d 行 -> %d 条", lines, len(entries))
+        except OSError as e:
+            logger.warning("压缩输入历史失败: %s", e)
+
+    @contextmanager
+    def _locked(self) -> Iterator[IO[bytes]]:
+        """以追加方式打开历史文件并持有文件锁"""
+        self.path.parent.mkdir(mode=HISTORY_DIR_MODE, parents=True, exist_ok=True)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, HISTORY_FILE_MODE)
+            with os.fdopen(fd, "a+b") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                # 等待锁期间文件可能已被其他实例压缩替换，此时重新打开
+                if os.fstat(file.fileno()).st_ino != self.path.stat().st_ino:
+                    continue
+                yield file
+                return
@@ -0,0 +1,397 @@
+"""
+输出内容全文检索
+
+SearchIndex 是增量维护的倒排索引：英文与数字按单词建立索引，查询词按前缀匹配；
+中文等没有词边界的文字按单字与相邻两字建立索引，查询时取所有二元组（单字查询取单字）倒排表的交集。
+候选结果再用原文做子串校验，避免二元组交集带来的误匹配。条目内容变化时只更新增减的词项，
+流式输出不断变长的条目无需整体重建。
+
+结果只需要最新的若干条：候选较少时按加入顺序排序，较多时从最新的条目向前查找候选，
+找够结果即停止；前缀过短、匹配单词过多的查询词不合并倒排表，而是逐条检查条目的词项。
+
+SessionSearchIndex 为已保存的会话（见 app.transcript）维护磁盘索引，只保存每个输出块的
+词项，加载时重建倒排表；会话记录文件大小未变化时直接复用，变化时只重建该会话。
+匹配块的原文在检索时按需从会话记录中读取，检索由调用方放到线程中执行。
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+from app.transcript import (
+    PRIVATE_DIR_MODE,
+    PRIVATE_FILE_MODE,
+    TRANSCRIPT_DIR,
+    TranscriptBlock,
+    TranscriptReader,
+    list_sessions,
+)
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Iterator
+    from pathlib import Path
+
+K = TypeVar("K", bound="Hashable")
+
+SEARCH_INDEX_VERSION = 2
+SEARCH_INDEX_FILE = "search-index.json"
+# 单次查询返回的最大结果数
+SEARCH_RESULT_LIMIT = 50
+# 检索已保存会话时最多读取原文校验的候选块数
+SESSION_SEARCH_CANDIDATES = 500
+# 英文查询词匹配的单词超过该数量时不合并倒排表，改为逐条检查条目的词项
+PREFIX_UNION_LIMIT = 256
+# 结果摘要的长度（字符）
+SNIPPET_WIDTH = 60
+
+_WORD = re.compile(r"[0-9a-z_]+")
+_CJK = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+logger = get_logger(__name__)
+
+
+def tokenize(text: str) -> set[str]:
+    """提取文本的索引词项：英文单词、汉字与中文二元组"""
+    lowered = text.lower()
+    tokens = set(_WORD.findall(lowered))
+    for run in _CJK.findall(lowered):
+        tokens.update(run)
+        tokens.update(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_terms(query: str) -> list[str]:
+    """拆分查询词：英文单词与连续的中文片段，按出现顺序去重"""
+    lowered = query.lower()
+    return list(dict.fromkeys(match.group() for match in re.finditer(f"{_WORD.pattern}|{_CJK.pattern}", lowered)))
+
+
+def matches(text: str, terms: list[str]) -> bool:
+    """校验文本是否包含所有查询词"""
+    lowered = text.lower()
+    return all(term in lowered for term in terms)
+
+
+def make_snippet(text: str, terms: list[str], width: int = SNIPPET_WIDTH) -> str:
+    """截取第一个查询词附近的单行摘要"""
+    flat = " ".join(text.split())
+    position = flat.lower().find(terms[0]) if terms else 0
+    start = max(0, position - width // 3)
+    snippet = flat[start : start + width]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(flat) else ""
+    return f"{prefix}{snippet}{suffix}"
+
+
+class SearchIndex(Generic[K]):
+    """增量维护的倒排索引，结果按条目加入的先后从新到旧排列"""
+
+    def __init__(self, *, store_text: bool = True) -> None:
+        """
+        初始化索引
+
+        Args:
+            store_text: 是否保存条目原文，用于校验候选结果；不保存时由调用方自行校验
+
+        """
+        self.store_text = store_text
+        self._postings: dict[str, set[K]] = {}
+        self._tokens: dict[K, frozenset[str]] = {}
+        self._texts: dict[K, str] = {}
+        self._seq: dict[K, int] = {}
+        self._next_seq = 0
+        # 英文词项的有序词表，用于前缀匹配
+        self._words: list[str] = []
+
+    def __len__(self) -> int:
+        """条目数量"""
+        return len(self._tokens)
+
+    def __contains__(self, key: object) -> bool:
+        """条目是否已建立索引"""
+        return key in self._tokens
+
+    def keys(self) -> list[K]:
+        """按加入顺序返回所有条目"""
+        return sorted(self._tokens, key=self._seq.__getitem__)
+
+    def set(self, key: K, text: str) -> None:
+        """加入或更新条目，内容未变化时直接返回"""
+        if self.store_text:
+            if self._texts.get(key) == text and key in self._tokens:
+                return
+            self._texts[key] = text
+        self.set_tokens(key, tokenize(text))
+
+    def set_tokens(self, key: K, tokens: Iterable[str]) -> None:
+        """直接设置条目的词项，只更新增减的部分"""
+        new = frozenset(tokens)
+        old = self._tokens.get(key, frozenset())
+        if key not in self._seq:
+            self._seq[key] = self._next_seq
+            self._next_seq += 1
+        for token in old - new:
+            self._remove_posting(token, key)
+        for token in new - old:
+            self._add_posting(token, key)
+        self._tokens[key] = new
+
+    def get_tokens(self, key: K) -> frozenset[str]:
+        """获取条目的词项"""
+        return self._tokens.get(key, frozenset())
+
+    def get_text(self, key: K) -> str:
+        """获取条目原文（仅 store_text 时可用）"""
+        return self._texts.get(key, "")
+
+    def remove(self, key: K) -> None:
+        """移除条目"""
+        for token in self._tokens.pop(key, frozenset()):
+            self._remove_posting(token, key)
+        self._texts.pop(key, None)
+        self._seq.pop(key, None)
+
+    def retain(self, keys: Iterable[K]) -> None:
+        """只保留给定的条目"""
+        keep = set(keys)
+        for key in [key for key in self._tokens if key not in keep]:
+            self.remove(key)
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[K]:
+        """
+        查询包含所有查询词的条目，从新到旧排列
+
+        不保存原文时返回最新的 limit 个候选条目，由调用方校验。
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        postings: list[set[K]] = []
+        deferred: list[str] = []
+        for term in terms:
+            term_postings = self._term_postings(term)
+            if term_postings is None:
+                deferred.append(term)
+            elif not term_postings:
+                return []
+            else:
+                postings.append(term_postings)
+
+        results = []
+        for key in self._newest(postings, limit):
+            if deferred and not all(self._has_prefix(key, term) for term in deferred):
+                continue
+            if self.store_text and not matches(self._texts[key], terms):
+                continue
+            results.append(key)
+            if len(results) >= limit:
+                break
+        return results
+
+    def _newest(self, postings: list[set[K]], limit: int) -> Iterator[K]:
+        """从新到旧产生同时出现在所有倒排表中的条目，没有倒排表时产生所有条目"""
+        if not postings:
+            yield from reversed(self._seq)
+            return
+        postings.sort(key=len)
+        smallest, others = postings[0], postings[1:]
+        if len(smallest) ** 2 <= limit * len(self._seq):
+            candidates = smallest.intersection(*others)
+            yield from sorted(candidates, key=self._seq.__getitem__, reverse=True)
+            return
+        # 候选较多时，从最新的条目向前查找很快就能找够结果，比求交集并排序全部候选更省时
+        remaining = len(smallest)
+        for key in reversed(self._seq):
+            if key in smallest:
+                if all(key in other for other in others):
+                    yield key
+                remaining -= 1
+                if not remaining:
+                    return
+
+    def _has_prefix(self, key: K, term: str) -> bool:
+        """条目是否包含以 term 开头的英文单词"""
+        return any(token.startswith(term) for token in self._tokens[key])
+
+    def _term_postings(self, term: str) -> set[K] | None:
+        """获取单个查询词的候选条目（不可修改），匹配单词过多时返回 None"""
+        if _WORD.fullmatch(term):
+            # 英文单词按前缀匹配，输入过程中即可得到结果
+            start = bisect.bisect_left(self._words, term)
+            end = bisect.bisect_left(self._words, term + "\uffff", start)
+            if end - start > PREFIX_UNION_LIMIT:
+                return None
+            if end - start == 1:
+                return self._postings[self._words[start]]
+            return set().union(*(self._postings[self._words[i]] for i in range(start, end)))
+        if len(term) == 1:
+            return self._postings.get(term, set())
+        bigrams = [self._postings.get(term[i : i + 2], set()) for i in range(len(term) - 1)]
+        bigrams.sort(key=len)
+        return bigrams[0].intersection(*bigrams[1:]) if len(bigrams) > 1 else bigrams[0]
+
+    def _add_posting(self, token: str, key: K) -> None:
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = set()
+            if _WORD.fullmatch(token):
+                bisect.insort(self._words, token)
+        postings.add(key)
+
+    def _remove_posting(self, token: str, key: K) -> None:
+        postings = self._postings.get(token)
+        if postings is None:
+            return
+        postings.discard(key)
+        if not postings:
+            del self._postings[token]
+            if _WORD.fullmatch(token):
+                index = bisect.bisect_left(self._words, token)
+                if index < len(self._words) and self._words[index] == token:
+                    del self._words[index]
+
+
+@dataclass
+class SessionMatch:
+    """已保存会话中的匹配结果"""
+
+    session_id: str
+    block: int
+    kind: str
+    text: str
+
+
+class SessionSearchIndex:
+    """已保存会话的磁盘索引"""
+
+    def __init__(self, directory: Path = TRANSCRIPT_DIR) -> None:
+        """初始化索引，索引文件在第一次 refresh 时读取"""
+        self.directory = directory
+        self.path = directory / SEARCH_INDEX_FILE
+        self.index: SearchIndex[tuple[str, int]] = SearchIndex(store_text=False)
+        self._sizes: dict[str, int] = {}
+        self._blocks: dict[str, list[int]] = {}
+        self._loaded = False
+
+    def refresh(self, exclude: str = "") -> None:
+        """
+        与磁盘上的会话记录同步
+
+        Args:
+            exclude: 不参与检索的会话ID（当前会话已在内存索引中）
+
+        """
+        if not self._loaded:
+            self._load()
+        sessions = [session_id for session_id in list_sessions(self.directory) if session_id != exclude]
+        changed = False
+        # 从旧到新加入，新会话中的结果排在前面
+        for session_id in reversed(sessions):
+            try:
+                size = (self.directory / f"{session_id}.jsonl").stat().st_size
+            except OSError:
+                continue
+            if self._sizes.get(session_id) == size:
+                continue
+            self._index_session(session_id)
+            self._sizes[session_id] = size
+            changed = True
+
+        stale = set(self._sizes) - set(sessions)
+        for session_id in stale:
+            self._drop_session(session_id)
+        if changed or stale:
+            self._save()
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[SessionMatch]:
+        """
+        查询已保存的会话，读取候选块的原文进行校验
+
+        只校验最新的 SESSION_SEARCH_CANDIDATES 个候选块。每个会话只读取一次：从最早的候选块读到文件末尾，
+        与建立索引时一样合并之后写入的追加与替换记录。
+        """
+        terms = query_terms(query)
+        candidates = self.index.search(query, SESSION_SEARCH_CANDIDATES)
+        first: dict[str, int] = {}
+        for session_id, number in candidates:
+            first[session_id] = min(number, first.get(session_id, number))
+
+        results: list[SessionMatch] = []
+        loaded: dict[str, dict[int, TranscriptBlock]] = {}
+        for session_id, number in candidates:
+            blocks = loaded.get(session_id)
+            if blocks is None:
+                reader = TranscriptReader(session_id, self.directory)
+                blocks = loaded[session_id] = reader.load_blocks(first[session_id])
+            block = blocks.get(number)
+            if block is None or not matches(block.text, terms):
+                continue
+            results.append(SessionMatch(session_id, number, block.kind, block.text))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _index_session(self, session_id: str) -> None:
+        """重建单个会话的索引"""
+        self._drop_session(session_id)
+        blocks = TranscriptReader(session_id, self.directory).load_blocks()
+        self._blocks[session_id] = sorted(blocks)
+        for number in self._blocks[session_id]:
+            self.index.set_tokens((session_id, number), tokenize(blocks[number].text))
+        logger.debug("已为会话 %s 建立检索索引，共 %d 个输出块", session_id, len(blocks))
+
+    def _drop_session(self, session_id: str) -> None:
+        """移除会话的索引"""
+        self._sizes.pop(session_id, None)
+        for number in self._blocks.pop(session_id, []):
+            self.index.remove((session_id, number))
+
+    def _load(self) -> None:
+        """读取磁盘索引，格式不符或损坏时从头建立"""
+        self._loaded = True
+        try:
+            with self.path.open(encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("读取会话检索索引失败，将重新建立: %s", e)
+            return
+        if not isinstance(data, dict) or data.get("v") != SEARCH_INDEX_VERSION:
+            return
+        for session_id, entry in data.get("sessions", {}).items():
+            self._sizes[session_id] = int(entry.get("size", -1))
+            self._blocks[session_id] = []
+            for number, tokens in entry.get("blocks", []):
+                self._blocks[session_id].append(int(number))
+                self.index.set_tokens((session_id, int(number)), tokens)
+
+    def _save(self) -> None:
+        """写入磁盘索引"""
+        sessions = {
+            session_id: {
+                "size": size,
+                "blocks": [
+                    [number, sorted(self.index.get_tokens((session_id, number)))]
+                    for number in self._blocks.get(session_id, [])
+                ],
+            }
+            for session_id, size in self._sizes.items()
+        }
+        temp_path = self.path.with_suffix(".tmp")
+        try:
+            self.directory.mkdir(mode=PRIVATE_DIR_MODE, parents=True, exist_ok=True)
+            temp_path.unlink(missing_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, PRIVATE_FILE_MODE)
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"v": SEARCH_INDEX_VERSION, "sessions": sessions}, file, ensure_ascii=False)
+            temp_path.replace(self.path)
+        except OSError as e:
+            logger.warning("保存会话检索索引失败: %s", e)
@@ -12,6 +12,7 @@ from textual.screen import ModalScreen
 from textual.widgets import Button, Input, Label, Static
 
 from app.dialogs import ExitDialog
+from backend.client_pool import ClientPoolKey, get_client_pool
 from backend.hermes import HermesChatClient
 from backend.openai import OpenAIClient
 from config import Backend, ConfigManager
@@ -58,6 +59,9 @@ class SettingsScreen(ModalScreen):
 
     def compose(self) -> ComposeResult:
         """构建设置页面"""
+        if self.backend == Backend.REPLAY:
+            yield self._compose_replay_settings()
+            return
         yield Container(
             Container(
                 Label(_("设置"), id="settings-title"),
@@ -141,8 +145,67 @@ class SettingsScreen(ModalScreen):
             id="settings-screen",
         )
 
+    def _compose_replay_settings(self) -> Container:
+        """
+        构建录制回放后端的设置页面
+
+        回放后端没有服务地址与密钥，录制文件与回放速度只能在配置文件中修改，页面只读显示，
+        也不提供后端切换，避免误将回放配置改写为其他后端。
+        """
+        save_btn = Button(_("保存"), id="save-btn", variant="primary", disabled=True)
+        return Container(
+            Container(
+                Label(_("设置"), id="settings-title"),
+                Horizontal(
+                    Label(_("后端:"), classes="settings-label"),
+                    Button(
+                        self.backend.get_display_name(),
+                        id="backend-btn",
+                        classes="settings-button",
+                        disabled=True,
+                    ),
+                    classes="settings-option",
+                ),
+                Horizontal(
+                    Label(_("录制文件:"), classes="settings-label"),
+                    Input(
+                        value=self.config_manager.get_replay_path(),
+                        classes="settings-input",
+                        id="replay-path",
+                        disabled=True,
+                    ),
+                    classes="settings-option",
+                ),
+                Horizontal(
+                    Label(_("回放速度:"), classes="settings-label"),
+                    Input(
+                        value=f"{self.config_manager.get_replay_speed():g}",
+                        classes="settings-input",
+                        id="replay-speed",
+                        disabled=True,
+                    ),
+                    classes="settings-option",
+                ),
+                Static(_("录制回放后端的设置请在配置文件中修改"), id="replay-note"),
+                Static("", id="spacer"),
+                Horizontal(
+                    save_btn,
+                    Button(_("取消"), id="cancel-btn", variant="default"),
+                    id="action-buttons",
+                    classes="settings-option",
+                ),
+                id="settings-container",
+            ),
+            id="settings-screen",
+        )
+
     def on_mount(self) -> None:
         """组件挂载时加载可用模型"""
+        if self.backend == Backend.REPLAY:
+            # 回放后端只读显示，不更新客户端也不验证连接
+            self._ensure_buttons_visible()
+            return
+
         if self.backend == Backend.EULERINTELLI:
             task = asyncio.create_task(self.load_mcp_status())
             # 保存任务引用
@@ -207,8 +270,10 @@ class SettingsScreen(ModalScreen):
 
     @on(Button.Pressed, "#backend-btn")
     def toggle_backend(self) -> None:
-        """切换后端"""
+        """在 OpenAI 与 Hermes 之间切换后端，回放后端只能在配置文件中修改"""
         current = self.backend
+        if current == Backend.REPLAY:
+            return
         new = Backend.EULERINTELLI if current == Backend.OPENAI else Backend.OPENAI
         self.backend = new
 
@@ -319,8 +384,8 @@ class SettingsScreen(ModalScreen):
                 task.cancel()
         self.background_tasks.clear()
 
-        # 检查验证状态
-        if not self.is_validated:
+        # 检查验证状态，回放后端的配置不在设置页面中修改
+        if not self.is_validated or self.backend == Backend.REPLAY:
             return
 
         self.config_manager.set_backend(self.backend)
@@ -497,6 +562,9 @@ class SettingsScreen(ModalScreen):
         if isinstance(self.llm_client, HermesChatClient):
             current_agent_id = getattr(self.llm_client, "current_agent_id", "")
 
+        base_url = base_url_input.value
+        api_key = api_key_input.value
+
         if self.backend == Backend.OPENAI:
             # 获取模型输入值，如果输入框不存在则使用当前选择的模型
             try:
@@ -505,18 +573,27 @@ class SettingsScreen(ModalScreen):
             except NoMatches:
                 model = self.selected_model
 
-            self.llm_client = OpenAIClient(
-                base_url=base_url_input.value,
-                model=model,
-                api_key=api_key_input.value,
+            # 复用验证器已确定的 SSL 策略，避免重复解析
+            self.llm_client = get_client_pool().acquire(
+                ClientPoolKey.create(Backend.OPENAI, base_url, api_key, model),
+                lambda: OpenAIClient(
+                    base_url=base_url,
+                    model=model,
+                    api_key=api_key,
+                    verify_ssl=self.validator.verify_ssl,
+                ),
             )
         else:  # EULERINTELLI
-            self.llm_client = HermesChatClient(
-                base_url=base_url_input.value,
-                auth_token=api_key_input.value,
+            self.llm_client = get_client_pool().acquire(
+                ClientPoolKey.create(Backend.EULERINTELLI, base_url, api_key),
+                lambda: HermesChatClient(
+                    base_url=base_url,
+                    auth_token=api_key,
+                    stream_idle_timeout=self.config_manager.get_stream_idle_timeout(),
+                ),
             )
             # 恢复智能体状态
-            if current_agent_id:
+            if current_agent_id and isinstance(self.llm_client, HermesChatClient):
                 self.llm_client.set_current_agent(current_agent_id)
 
     async def _toggle_mcp_authorization_async(self) -> None:
@@ -0,0 +1,238 @@
+"""
+流式响应读取与渲染流水线
+
+网络读取任务从响应流中读取内容并写入有界队列，渲染方从队列中批量取出内容更新界面，
+界面更新较慢时不再拖慢 HTTP 流的读取，避免服务端缓冲堆积、心跳超时和 MCP 步骤事件停滞。
+
+队列使用高低水位线控制读取：队列深度达到高水位线时暂停读取，渲染方将队列消费到低水位线
+以下后再恢复，避免在满队列附近频繁切换。读取任务的异常在已读取的内容渲染完后抛给渲染方，
+渲染方被取消或提前退出时读取任务随之取消并关闭响应流。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Generic, Self, TypeVar
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, AsyncIterator
+    from types import TracebackType
+
+T = TypeVar("T")
+
+# 队列高水位线，达到后暂停读取
+STREAM_HIGH_WATER = 256
+# 队列低水位线，消费到此深度后恢复读取
+STREAM_LOW_WATER = 64
+# 渲染方单次最多取出的内容数量
+STREAM_MAX_BATCH = 64
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PipelineMetrics:
+    """流水线运行指标"""
+
+    items: int = 0
+    """读取的内容数量"""
+    batches: int = 0
+    """渲染批次数量"""
+    max_depth: int = 0
+    """队列的最大深度"""
+    pauses: int = 0
+    """因达到高水位线暂停读取的次数"""
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+    """内容从读取到被渲染方取出的最大延迟（秒）"""
+
+    @property
+    def mean_lag(self) -> float:
+        """内容从读取到被渲染方取出的平均延迟（秒）"""
+        return self.total_lag / self.items if self.items else 0.0
+
+
+class _EndOfStream:
+    """读取任务结束标记，error 为读取过程中发生的异常"""
+
+    def __init__(self, error: BaseException | None = None) -> None:
+        self.error = error
+
+
+class StreamPipeline(Generic[T]):
+    """
+    流式响应读取与渲染流水线
+
+    用法::
+
+        async with StreamPipeline(source, name="command") as pipeline:
+            async for batch in pipeline.batches():
+                render(batch)
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[T],
+        *,
+        name: str = "stream",
+        high_water: int = STREAM_HIGH_WATER,
+        low_water: int = STREAM_LOW_WATER,
+        max_batch: int = STREAM_MAX_BATCH,
+    ) -> None:
+        """
+        初始化流水线
+
+        Args:
+            source: 响应内容流
+            name: 日志中使用的流水线名称
+            high_water: 队列高水位线
+            low_water: 队列低水位线，必须小于高水位线
+            max_batch: 渲染方单次最多取出的内容数量
+
+        """
+        if not 0 <= low_water < high_water:
+            msg = f"低水位线 {low_water} 必须小于高水位线 {high_water}"
+            raise ValueError(msg)
+        self.name = name
+        self.high_water = high_water
+        self.low_water = low_water
+        self.max_batch = max_batch
+        self.metrics = PipelineMetrics()
+        self._source = source
+        # 结束标记不受高水位线限制，因此容量比高水位线多一个
+        self._queue: asyncio.Queue[tuple[float, T] | _EndOfStream] = asyncio.Queue(maxsize=high_water + 1)
+        self._resume = asyncio.Event()
+        self._resume.set()
+        self._reader: asyncio.Task[None] | None = None
+        self._started = 0.0
+
+    async def __aenter__(self) -> Self:
+        """启动网络读取任务"""
+        self._started = time.monotonic()
+        self._reader = asyncio.create_task(self._read(), name=f"{self.name}-reader")
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """停止读取任务并记录运行指标"""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """取消尚未结束的读取任务，等待其关闭响应流"""
+        reader = self._reader
+        if reader is None:
+            return
+        self._reader = None
+        if not reader.done():
+            reader.cancel()
+        try:
+            await reader
+        except asyncio.CancelledError:
+            # 渲染方自身被取消时继续向上传递
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+        finally:
+            self._log_metrics()
+
+    async def batches(self) -> AsyncGenerator[list[T], None]:
+        """
+        按读取顺序批量取出内容
+
+        每批包含调用时队列中已有的全部内容（最多 max_batch 条），没有内容时等待读取任务。
+
+        Raises:
+            Exception: 读取任务中发生的异常，在之前读取的内容全部取出后抛出
+
+        """
+        while True:
+            batch: list[T] = []
+            entry = await self._queue.get()
+            while True:
+                if isinstance(entry, _EndOfStream):
+                    if batch:
+                        self.metrics.batches += 1
+                        yield batch
+                    if entry.error is not None:
+                        raise entry.error
+                    return
+                batch.append(self._take(entry))
+                if len(batch) >= self.max_batch or self._queue.empty():
+                    break
+                entry = self._queue.get_nowait()
+
+            self.metrics.batches += 1
+            yield batch
+
+    def _take(self, entry: tuple[float, T]) -> T:
+        """记录取出内容的延迟，并在队列消费到低水位线以下时恢复读取"""
+        enqueued, item = entry
+        lag = time.monotonic() - enqueued
+        self.metrics.total_lag += lag
+        self.metrics.max_lag = max(self.metrics.max_lag, lag)
+        if not self._resume.is_set() and self._queue.qsize() <= self.low_water:
+            self._resume.set()
+        return item
+
+    async def _read(self) -> None:
+        """网络读取任务：读取响应流写入队列，结束或出错时写入结束标记"""
+        end = _EndOfStream()
+        try:
+            async for item in self._source:
+                await self._wait_below_high_water()
+                self._queue.put_nowait((time.monotonic(), item))
+                self.metrics.items += 1
+                self.metrics.max_depth = max(self.metrics.max_depth, self._queue.qsize())
+        except asyncio.CancelledError as e:
+            end = _EndOfStream(e)
+            raise
+        except Exception as e:  # noqa: BLE001
+            logger.warning("流水线 %s 读取响应流失败: %s", self.name, e)
+            end = _EndOfStream(e)
+        finally:
+            await _close_source(self._source)
+            self._queue.put_nowait(end)
+
+    async def _wait_below_high_water(self) -> None:
+        """队列达到高水位线时暂停读取，直到渲染方消费到低水位线以下"""
+        if self._queue.qsize() < self.high_water:
+            return
+        self.metrics.pauses += 1
+        self._resume.clear()
+        logger.debug("流水线 %s 队列达到高水位线 %d，暂停读取", self.name, self.high_water)
+        await self._resume.wait()
+
+    def _log_metrics(self) -> None:
+        """记录流水线运行指标"""
+        metrics = self.metrics
+        logger.info(
+            "流水线 %s 结束 - 内容: %d, 批次: %d, 最大队列深度: %d, 暂停读取: %d 次, "
+            "平均延迟: %.3fs, 最大延迟: %.3fs, 耗时: %.3fs",
+            self.name,
+            metrics.items,
+            metrics.batches,
+            metrics.max_depth,
+            metrics.pauses,
+            metrics.mean_lag,
+            metrics.max_lag,
+            time.monotonic() - self._started,
+        )
+
+
+async def _close_source(source: AsyncIterator[object]) -> None:
+    """关闭响应流，释放其持有的网络连接"""
+    aclose = getattr(source, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except Exception:
+        logger.exception("关闭响应流时出错")
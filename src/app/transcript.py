@@ -0,0 +1,377 @@
+"""
+会话记录存储
+
+TUI 中的用户输入、大模型回复、命令输出与 MCP 步骤在流式显示的同时追加写入本地会话记录，
+退出后可以通过 `witty --resume [会话ID]` 恢复：只加载最后若干条记录显示，OpenAI 后端的
+对话历史在 token 预算内从记录末尾向前恢复。
+
+每个会话对应两个文件：
+
+- `<会话ID>.jsonl`：只追加的紧凑 JSON Lines，第一行为会话头，之后每行是一条记录，
+  记录以块编号 b 关联到某个输出块（对应界面上的一个输出组件）:
+    - 新建块: {"b": 3, "k": "reply", "x": "首段内容"}，MCP 步骤额外带有工具名 s
+    - 追加内容: {"b": 3, "x": "后续内容"}
+    - 替换内容: {"b": 5, "r": "完整内容"}（MCP 步骤状态更新）
+- `<会话ID>.idx`：偏移索引，第 n 个 8 字节无符号整数为块 n 首条记录在 jsonl 文件中的偏移，
+  恢复时据此直接定位到末尾若干块，无需从头解析整个会话。
+
+程序异常退出时最后一行可能不完整，读取时跳过无法解析的行与超出文件长度的索引项。
+会话记录可能包含命令输出等敏感内容，目录与文件只允许当前用户访问。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from log.manager import get_logger
+
+TRANSCRIPT_DIR = Path.home() / ".cache" / "openEuler Intelligence" / "sessions"
+TRANSCRIPT_VERSION = 1
+
+# 恢复会话时显示的最后块数
+RESUME_TAIL_BLOCKS = 100
+# 恢复 OpenAI 对话历史的 token 预算（按字符估算）
+RESUME_TOKEN_BUDGET = 8000
+# 向前查找对话历史时每次读取的块数
+HISTORY_WINDOW_BLOCKS = 64
+
+# 输出块类型
+PROMPT = "prompt"
+REPLY = "reply"
+OUTPUT = "output"
+MCP_STEP = "mcp"
+
+# 会话目录与文件的权限
+PRIVATE_DIR_MODE = 0o700
+PRIVATE_FILE_MODE = 0o600
+
+_INDEX_ENTRY = struct.Struct("<Q")
+# 会话ID只能包含字母、数字、下划线与连字符，避免拼接路径时访问会话目录之外的文件
+_SESSION_ID = re.compile(r"[\w-]+")
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TranscriptBlock:
+    """会话记录中的一个输出块"""
+
+    kind: str
+    text: str = ""
+    step: str = ""
+    """MCP 步骤的工具名"""
+
+
+@dataclass
+class TranscriptTail:
+    """会话记录末尾的输出块"""
+
+    session_id: str
+    blocks: list[TranscriptBlock]
+    total_blocks: int
+
+
+def new_session_id() -> str:
+    """生成新的会话ID，按时间排序"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def list_sessions(directory: Path = TRANSCRIPT_DIR) -> list[str]:
+    """按最后修改时间从新到旧列出已保存的会话ID"""
+    if not directory.is_dir():
+        return []
+    paths = sorted(directory.glob("*.jsonl"), key=lambda path: path.stat().st_mtime, reverse=True)
+    return [path.stem for path in paths]
+
+
+def resolve_session(session_id: str = "", directory: Path = TRANSCRIPT_DIR) -> str | None:
+    """
+    解析要恢复的会话
+
+    Args:
+        session_id: 会话ID，为空时使用最近的会话
+        directory: 会话记录目录
+
+    Returns:
+        str | None: 存在的会话ID，找不到或格式不合法时返回 None
+
+    """
+    if not session_id:
+        sessions = list_sessions(directory)
+        return sessions[0] if sessions else None
+    if not _SESSION_ID.fullmatch(session_id):
+        logger.warning("会话ID格式不合法: %s", session_id)
+        return None
+    return session_id if (directory / f"{session_id}.jsonl").is_file() else None
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：ASCII 字符约 4 个一个 token，其他字符（如中文）各算一个"""
+    ascii_count = sum(1 for char in text if char.isascii())
+    return ascii_count // 4 + (len(text) - ascii_count) + 1
+
+
+class TranscriptWriter:
+    """
+    会话记录写入器
+
+    文件在第一次写入时创建，启动后没有任何输入就退出不会留下空会话。
+    写入失败时记录一次日志并停止写入，不影响界面使用。
+    """
+
+    def __init__(self, session_id: str = "", directory: Path = TRANSCRIPT_DIR, *, backend: str = "") -> None:
+        """初始化写入器，session_id 为已有会话时继续追加"""
+        self.session_id = session_id or new_session_id()
+        self.directory = directory
+        self.backend = backend
+        self._data: IO[bytes] | None = None
+        self._index: IO[bytes] | None = None
+        self._next_block = 0
+        self._current_block: int | None = None
+        self._steps: dict[str, int] = {}
+        self._failed = False
+
+    @property
+    def data_path(self) -> Path:
+        """会话记录文件路径"""
+        return self.directory / f"{self.session_id}.jsonl"
+
+    @property
+    def index_path(self) -> Path:
+        """偏移索引文件路径"""
+        return self.directory / f"{self.session_id}.idx"
+
+    def begin(self, kind: str, text: str = "") -> None:
+        """新建一个输出块，之后的 append 追加到该块"""
+        self._current_block = self._begin({"k": kind, "x": text})
+
+    def append(self, text: str) -> None:
+        """向当前输出块追加内容"""
+        if self._current_block is None:
+            self.begin(OUTPUT, text)
+            return
+        if text:
+            self._write({"b": self._current_block, "x": text})
+
+    def step(self, step: str, text: str, *, final: bool) -> None:
+        """
+        记录 MCP 步骤状态
+
+        同一工具未结束的步骤替换其内容，否则新建块；步骤块不影响 append 的目标块。
+        """
+        block = self._steps.get(step)
+        if block is None:
+            block = self._begin({"k": MCP_STEP, "s": step, "x": text})
+        else:
+            self._write({"b": block, "r": text})
+        if final:
+            self._steps.pop(step, None)
+        else:
+            self._steps[step] = block
+
+    def flush(self) -> None:
+        """将缓冲的记录写入磁盘"""
+        for file in (self._data, self._index):
+            if file is not None:
+                file.flush()
+
+    def close(self) -> None:
+        """关闭会话记录文件"""
+        for file in (self._data, self._index):
+            if file is not None:
+                file.close()
+        self._data = self._index = None
+
+    def _begin(self, record: dict[str, Any]) -> int:
+        """写入新块的首条记录及其索引项，返回块编号"""
+        if not self._open():
+            return -1
+        assert self._data is not None
+        assert self._index is not None
+        block = self._next_block
+        self._next_block += 1
+        try:
+            self._index.write(_INDEX_ENTRY.pack(self._data.tell()))
+        except OSError as e:
+            self._fail(e)
+            return block
+        self._write({"b": block, **record})
+        # 新块通常意味着一次交互的开始，及时落盘
+        self.flush()
+        return block
+
+    def _write(self, record: dict[str, Any]) -> None:
+        """追加一条记录"""
+        if not self._open():
+            return
+        assert self._data is not None
+        line = json.dumps({key: value for key, value in record.items() if value != ""}, ensure_ascii=False)
+        try:
+            self._data.write(line.encode("utf-8") + b"\n")
+        except OSError as e:
+            self._fail(e)
+
+    def _open(self) -> bool:
+        """打开会话记录文件，已有会话时从已有块数继续编号"""
+        if self._data is not None:
+            return True
+        if self._failed:
+            return False
+        try:
+            self.directory.mkdir(mode=PRIVATE_DIR_MODE, parents=True, exist_ok=True)
+            exists = self.data_path.is_file()
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+            self._data = os.fdopen(os.open(self.data_path, flags, PRIVATE_FILE_MODE), "ab")
+            self._index = os.fdopen(os.open(self.index_path, flags, PRIVATE_FILE_MODE), "ab")
+            self._data.seek(0, os.SEEK_END)
+            self._index.seek(0, os.SEEK_END)
+            self._next_block = self._index.tell() // _INDEX_ENTRY.size
+            if not exists:
+                header = {"v": TRANSCRIPT_VERSION, "session": self.session_id, "backend": self.backend}
+                header["created"] = round(time.time(), 3)
+                self._data.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError as e:
+            self._fail(e)
+            return False
+        logger.info("会话记录写入: %s", self.data_path)
+        return True
+
+    def _fail(self, error: OSError) -> None:
+        """写入失败后停止记录"""
+        logger.warning("写入会话记录失败，停止记录: %s", error)
+        self._failed = True
+        self.close()
+
+
+class TranscriptReader:
+    """会话记录读取器，通过偏移索引只读取需要的块"""
+
+    def __init__(self, session_id: str, directory: Path = TRANSCRIPT_DIR) -> None:
+        """初始化读取器"""
+        self.session_id = session_id
+        self.data_path = directory / f"{session_id}.jsonl"
+        self.index_path = directory / f"{session_id}.idx"
+
+    def block_count(self) -> int:
+        """会话中的块数"""
+        try:
+            return self.index_path.stat().st_size // _INDEX_ENTRY.size
+        except OSError:
+            return 0
+
+    def load_tail(self, blocks: int = RESUME_TAIL_BLOCKS) -> TranscriptTail:
+        """读取最后 blocks 个输出块，其后的替换记录也会应用到这些块上"""
+        total = self.block_count()
+        first = max(0, total - blocks)
+        offsets = self._read_offsets(first, total)
+        loaded = self._read_blocks(first, offsets[0] if offsets else None)
+        return TranscriptTail(self.session_id, [loaded[number] for number in sorted(loaded)], total)
+
+    def load_blocks(self, first: int = 0) -> dict[int, TranscriptBlock]:
+        """读取编号不小于 first 的所有输出块"""
+        offsets = self._read_offsets(first, first + 1)
+        return self._read_blocks(first, offsets[0] if offsets else None)
+
+    def load_history(self, token_budget: int = RESUME_TOKEN_BUDGET) -> list[dict[str, str]]:
+        """
+        从末尾向前恢复对话历史，直到达到 token 预算
+
+        每个用户输入与其后的大模型回复组成一轮对话，只恢复完整的轮次。
+        """
+        turns: list[tuple[str, str]] = []
+        used = 0
+        # 窗口开头尚未找到对应用户输入的块，与前一个窗口合并后再配对
+        carry: list[TranscriptBlock] = []
+        end = self.block_count()
+        while end > 0:
+            start = max(0, end - HISTORY_WINDOW_BLOCKS)
+            offsets = self._read_offsets(start, start + 1)
+            if not offsets:
+                break
+            # 块的追加与替换记录可能写在之后的块开始之后，需要读到文件末尾
+            window = self._read_blocks(start, offsets[0], end)
+            blocks = [window[number] for number in sorted(window)] + carry
+            first_prompt = next((i for i, block in enumerate(blocks) if block.kind == PROMPT), len(blocks))
+            carry = blocks[:first_prompt]
+            for prompt, reply in reversed(_pair_turns(blocks[first_prompt:])):
+                used += estimate_tokens(prompt) + estimate_tokens(reply)
+                if used > token_budget:
+                    return _to_messages(turns)
+                turns.insert(0, (prompt, reply))
+            end = start
+        return _to_messages(turns)
+
+    def _read_offsets(self, start: int, end: int) -> list[int]:
+        """读取块 [start, end) 的偏移，超出文件长度的索引项被忽略"""
+        if end <= start:
+            return []
+        try:
+            data_size = self.data_path.stat().st_size
+            with self.index_path.open("rb") as file:
+                file.seek(start * _INDEX_ENTRY.size)
+                raw = file.read((end - start) * _INDEX_ENTRY.size)
+        except OSError as e:
+            logger.warning("读取会话索引失败: %s", e)
+            return []
+        usable = len(raw) - len(raw) % _INDEX_ENTRY.size
+        offsets = [offset for (offset,) in _INDEX_ENTRY.iter_unpack(raw[:usable])]
+        return [offset for offset in offsets if offset < data_size]
+
+    def _read_blocks(self, first: int, start: int | None, end: int | None = None) -> dict[int, TranscriptBlock]:
+        """解析从偏移 start 到文件末尾的记录，只保留编号在 [first, end) 内的块"""
+        blocks: dict[int, TranscriptBlock] = {}
+        if start is None:
+            return blocks
+        try:
+            with self.data_path.open("rb") as file:
+                file.seek(start)
+                raw = file.read()
+        except OSError as e:
+            logger.warning("读取会话记录失败: %s", e)
+            return blocks
+
+        for line in raw.splitlines():
+            try:
+                record = json.loads(line)
+                number = int(record["b"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if number < first or (end is not None and number >= end):
+                continue
+            if "k" in record:
+                blocks[number] = TranscriptBlock(record["k"], record.get("x", ""), record.get("s", ""))
+            elif number in blocks:
+                block = blocks[number]
+                block.text = record["r"] if "r" in record else block.text + record.get("x", "")
+        return blocks
+
+
+def _pair_turns(blocks: list[TranscriptBlock]) -> list[tuple[str, str]]:
+    """将用户输入与其后的回复配对，命令输出与 MCP 步骤不计入对话历史"""
+    turns: list[tuple[str, str]] = []
+    prompt: str | None = None
+    reply = ""
+    for block in [*blocks, TranscriptBlock(PROMPT)]:
+        if block.kind == PROMPT:
+            if prompt is not None and reply:
+                turns.append((prompt, reply))
+            prompt, reply = block.text, ""
+        elif block.kind == REPLY and prompt is not None:
+            reply += block.text
+    return turns
+
+
+def _to_messages(turns: list[tuple[str, str]]) -> list[dict[str, str]]:
+    """转换为 OpenAI 对话消息"""
+    messages = []
+    for prompt, reply in turns:
+        messages.append({"role": "user", "content": prompt})
+        messages.append({"role": "assistant", "content": reply})
+    return messages
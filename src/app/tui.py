@@ -3,21 +3,37 @@
 from __future__ import annotations
 
 import asyncio
+from functools import partial
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple, cast
 
 from textual import on
 from textual.app import App, ComposeResult
 from textual.binding import Binding, BindingType
 from textual.containers import Container
+from textual.content import Content
+from textual.css.query import NoMatches
 from textual.message import Message
-from textual.widgets import Footer, Input, Markdown, Static
+from textual.widgets import ContentSwitcher, Footer, Input, Markdown, Static, Tab, Tabs
 
 from __version__ import __version__
-from app.dialogs import AgentSelectionDialog, BackendRequiredDialog, ExitDialog
+from app.dialogs import (
+    AgentSelectionDialog,
+    BackendRequiredDialog,
+    ExitDialog,
+    HistorySearchDialog,
+    SearchDialog,
+)
+from app.input_history import InputHistory
 from app.mcp_widgets import MCPConfirmResult, MCPConfirmWidget, MCPParameterResult, MCPParameterWidget
+from app.search_index import SessionSearchIndex
 from app.settings import SettingsScreen
+from app.stream_pipeline import StreamPipeline
+from app.transcript import OUTPUT, PROMPT, REPLY, TranscriptReader, TranscriptWriter
 from app.tui_header import OIHeader
 from app.tui_mcp_handler import TUIMCPEventHandler
+from app.tui_session import PendingBatch, SessionTab
+from backend.client_pool import ClientPoolKey, get_client_pool
 from backend.factory import BackendFactory
 from backend.hermes import HermesChatClient
 from backend.hermes.mcp_helpers import (
@@ -27,6 +43,9 @@ from backend.hermes.mcp_helpers import (
     is_final_mcp_message,
     is_mcp_message,
 )
+from backend.http_pool import close_http_clients, get_http_pool_stats
+from backend.response_cache import ResponseCache
+from backend.stream_watchdog import StreamIdleError, get_stream_watchdog_stats
 from config import ConfigManager
 from config.model import Backend
 from i18n.manager import _
@@ -35,12 +54,17 @@ from tool.command_processor import process_command
 from tool.validators import APIValidator, validate_oi_connection
 
 if TYPE_CHECKING:
+    from collections.abc import Coroutine
+
     from textual.events import Key as KeyEvent
     from textual.visual import VisualType
     from textual.widget import Widget
 
     from backend.base import LLMClientBase
 
+# 跳转到搜索结果后高亮显示的时长（秒）
+SEARCH_HIGHLIGHT_SECONDS = 2.0
+
 
 class ContentChunkParams(NamedTuple):
     """内容块处理参数"""
@@ -204,11 +228,74 @@ class ProgressOutputLine(MarkdownOutput):
 
 
 class CommandInput(Input):
-    """命令输入组件"""
+    """命令输入组件，支持上下方向键浏览历史与 Ctrl+R 反向搜索"""
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("up", "history_previous", show=False),
+        Binding("down", "history_next", show=False),
+        Binding("ctrl+r", "history_search", description=_("History")),
+    ]
 
-    def __init__(self) -> None:
+    def __init__(self, history: InputHistory) -> None:
         """初始化命令输入组件"""
         super().__init__(placeholder=_("Enter command or question..."), id="command-input")
+        self.history = history
+        # 浏览历史的状态：开始浏览时的输入内容作为前缀，离开历史时恢复
+        self._history_position: int | None = None
+        self._history_draft = ""
+        self._history_value = ""
+        self._history_version = -1
+
+    def action_history_previous(self) -> None:
+        """显示更早的、以浏览前输入内容开头的历史条目"""
+        position = self._history_position
+        if position is None or not self._history_browsing():
+            position = self.history.index.end
+            self._history_draft = self.value
+            self._history_version = self.history.version
+        result = self.history.index.previous(self._history_draft, position)
+        if result is not None:
+            self._history_position, text = result
+            self._show_history(text)
+
+    def action_history_next(self) -> None:
+        """显示更新的历史条目，越过最新条目时恢复浏览前的输入"""
+        if self._history_position is None or not self._history_browsing():
+            return
+        result = self.history.index.next(self._history_draft, self._history_position)
+        if result is None:
+            self._history_position = None
+            self._show_history(self._history_draft)
+            return
+        self._history_position, text = result
+        self._show_history(text)
+
+    def action_history_search(self) -> None:
+        """打开历史反向搜索"""
+        self.app.push_screen(HistorySearchDialog(self.history, self.value), callback=self._apply_history_search)
+
+    def _apply_history_search(self, text: str | None) -> None:
+        """将反向搜索选中的条目填入输入框"""
+        if not self.is_attached:
+            return
+        if text is not None:
+            self._history_position = None
+            self._show_history(text)
+        self.focus()
+
+    def _history_browsing(self) -> bool:
+        """是否仍在浏览历史：输入内容被编辑或历史发生变化后重新开始"""
+        return (
+            self._history_position is not None
+            and self.value == self._history_value
+            and self.history.version == self._history_version
+        )
+
+    def _show_history(self, text: str) -> None:
+        """显示历史条目并将光标移到末尾"""
+        self._history_value = text
+        self.value = text
+        self.cursor_position = len(text)
 
 
 class IntelligentTerminal(App):
@@ -219,8 +306,13 @@ class IntelligentTerminal(App):
     BINDINGS: ClassVar[list[BindingType]] = [
         Binding(key="ctrl+q", action="request_quit", description=_("Quit")),
         Binding(key="ctrl+s", action="settings", description=_("Settings")),
-        Binding(key="ctrl+r", action="reset_conversation", description=_("Reset")),
+        Binding(key="ctrl+l", action="reset_conversation", description=_("Reset")),
         Binding(key="ctrl+t", action="choose_agent", description=_("Agent")),
+        Binding(key="ctrl+f", action="search", description=_("Search"), priority=True),
+        Binding(key="ctrl+n", action="new_tab", description=_("New tab")),
+        Binding(key="ctrl+o", action="next_tab", description=_("Next tab")),
+        Binding(key="ctrl+g", action="close_tab", description=_("Close tab")),
+        Binding(key="ctrl+b", action="bypass_cache", description=_("Reanalyze"), show=False),
         Binding(key="ctrl+c", action="cancel", description=_("Cancel"), priority=True),
         Binding(key="tab", action="toggle_focus", description=_("Focus")),
     ]
@@ -228,47 +320,68 @@ class IntelligentTerminal(App):
     class SwitchToMCPConfirm(Message):
         """切换到 MCP 确认界面的消息"""
 
-        def __init__(self, event) -> None:  # noqa: ANN001
-            """初始化消息"""
+        def __init__(self, event, client: LLMClientBase | None = None) -> None:  # noqa: ANN001
+            """初始化消息，client 为发出事件的客户端，用于确定所属的标签页"""
             super().__init__()
             self.event = event
+            self.client = client
 
     class SwitchToMCPParameter(Message):
         """切换到 MCP 参数输入界面的消息"""
 
-        def __init__(self, event) -> None:  # noqa: ANN001
-            """初始化消息"""
+        def __init__(self, event, client: LLMClientBase | None = None) -> None:  # noqa: ANN001
+            """初始化消息，client 为发出事件的客户端，用于确定所属的标签页"""
             super().__init__()
             self.event = event
+            self.client = client
+
+    def __init__(self, *, resume_session: str = "") -> None:
+        """
+        初始化应用
+
+        Args:
+            resume_session: 要恢复的会话ID，为空时开始新会话
 
-    def __init__(self) -> None:
-        """初始化应用"""
+        """
         super().__init__()
         # 设置应用标题
         self.title = "Witty Assistant"
         self.sub_title = _("Intelligent CLI Assistant {version}").format(version=__version__)
         self.config_manager = ConfigManager()
-        self.processing: bool = False
-        # 添加保存任务的集合到类属性
+        # 应用级的后台任务（配置验证、智能体列表等），会话中的处理任务由各标签页保存
         self.background_tasks: set[asyncio.Task] = set()
-        # 创建并保持单一的 LLM 客户端实例以维持对话历史
-        self._llm_client: LLMClientBase | None = None
+        # 取消操作时发出的中断请求
+        self._interrupt_tasks: set[asyncio.Task] = set()
+        # 输入历史的加载任务，与处理任务分开保存，取消操作不影响加载
+        self._history_tasks: set[asyncio.Task] = set()
         # 当前选择的智能体 - 根据配置的 default_app 初始化
         self.current_agent: tuple[str, str] = self._get_initial_agent()
-        # MCP 状态
-        self._mcp_mode: str = "normal"  # "normal", "confirm", "parameter"
-        self._current_mcp_task_id: str = ""
         # 创建日志实例
         self.logger = get_logger(__name__)
-        # 进度消息跟踪
-        self._current_progress_lines: dict[str, ProgressOutputLine] = {}  # step_id -> ProgressOutputLine
+        # 会话标签页，每个标签页拥有独立的客户端、处理任务、输出区域与会话记录；
+        # 第一个标签页在恢复会话时继续追加到原会话
+        self._resume_session = resume_session
+        self._next_tab_id = 1
+        self._tabs: list[SessionTab] = []
+        self._active_tab = self._create_tab(resume_session)
+        # 已保存会话的检索索引
+        self._session_search_index = SessionSearchIndex()
+        # 命令输入历史，启动后在后台加载
+        self._input_history = InputHistory()
+        # 命令失败分析的本地响应缓存，未在配置中开启时为 None
+        self._response_cache = ResponseCache.from_config(self.config_manager)
 
     def compose(self) -> ComposeResult:
         """构建界面"""
         yield OIHeader()
-        yield FocusableContainer(id="output-container")
+        tabs = Tabs(Tab(Content(self._active_tab.label), id=self._active_tab.tab_widget_id), id="session-tabs")
+        # 只有一个会话时隐藏标签栏
+        tabs.display = False
+        yield tabs
+        with ContentSwitcher(id="output-switcher", initial=self._active_tab.pane_id):
+            yield self._active_tab.container
         with Container(id="input-container", classes="normal-mode"):
-            yield CommandInput()
+            yield CommandInput(self._input_history)
         yield Footer(show_command_palette=False)
 
     def action_settings(self) -> None:
@@ -290,13 +403,20 @@ class IntelligentTerminal(App):
         # 只有在主界面（无其他屏幕）时才响应
         if not self._is_in_main_interface():
             return
-        if self._llm_client is not None and hasattr(self._llm_client, "reset_conversation"):
-            self._llm_client.reset_conversation()
+        tab = self._active_tab
+        if tab.llm_client is not None and hasattr(tab.llm_client, "reset_conversation"):
+            tab.llm_client.reset_conversation()
         # 清除屏幕上的所有内容
-        output_container = self.query_one("#output-container")
-        output_container.remove_children()
+        tab.container.remove_children()
+        tab.pending.clear()
         # 清理进度消息跟踪
-        self._current_progress_lines.clear()
+        tab.progress_lines.clear()
+        # 之后的内容记录到新的会话
+        tab.transcript.close()
+        tab.transcript = TranscriptWriter(backend=self.config_manager.get_backend().value)
+        tab.resumed_history = []
+        tab.title = ""
+        self._refresh_tab_label(tab)
 
     def action_choose_agent(self) -> None:
         """选择智能体的动作"""
@@ -317,6 +437,77 @@ class IntelligentTerminal(App):
         self.background_tasks.add(task)
         task.add_done_callback(self._task_done_callback)
 
+    def action_search(self) -> None:
+        """打开输出内容搜索"""
+        # 只有在主界面（无其他屏幕）时才响应
+        if not self._is_in_main_interface():
+            return
+        self._sync_search_index()
+        self.push_screen(
+            SearchDialog(
+                self._active_tab.search_index,
+                self._session_search_index,
+                current_session=self._active_tab.transcript.session_id,
+                on_jump=self._jump_to_output,
+            ),
+        )
+
+    def action_new_tab(self) -> None:
+        """新建会话标签页"""
+        # 只有在主界面（无其他屏幕）时才响应
+        if not self._is_in_main_interface():
+            return
+        tab = self._create_tab()
+        self.query_one("#output-switcher", ContentSwitcher).mount(tab.container)
+        tabs = self.query_one("#session-tabs", Tabs)
+        tabs.add_tab(Tab(Content(tab.label), id=tab.tab_widget_id))
+        tabs.display = True
+        self._activate_tab(tab)
+
+    def action_next_tab(self) -> None:
+        """切换到下一个会话标签页"""
+        if not self._is_in_main_interface() or len(self._tabs) <= 1:
+            return
+        index = self._tabs.index(self._active_tab)
+        self._activate_tab(self._tabs[(index + 1) % len(self._tabs)])
+
+    def action_close_tab(self) -> None:
+        """关闭当前会话标签页，取消其中正在进行的请求"""
+        if not self._is_in_main_interface():
+            return
+        if len(self._tabs) <= 1:
+            self.notify(_("Cannot close the last session"), severity="warning")
+            return
+        tab = self._active_tab
+        index = self._tabs.index(tab)
+        self._tabs.remove(tab)
+        self._activate_tab(self._tabs[min(index, len(self._tabs) - 1)])
+
+        for task in tab.tasks:
+            if not task.done():
+                task.cancel()
+        tab.transcript.close()
+        tab.container.remove()
+        tabs = self.query_one("#session-tabs", Tabs)
+        tabs.remove_tab(tab.tab_widget_id)
+        tabs.display = len(self._tabs) > 1
+        # 中断服务端任务并关闭标签页独有的客户端，在后台完成
+        if tab.llm_client is not None:
+            close_task = asyncio.create_task(
+                self._close_tab_client(tab.llm_client, owned=tab.owns_client, interrupt=tab.processing),
+            )
+            self._interrupt_tasks.add(close_task)
+            close_task.add_done_callback(self._interrupt_tasks.discard)
+        self.logger.info("已关闭会话标签页 %d", tab.tab_id)
+
+    @on(Tabs.TabActivated, "#session-tabs")
+    def handle_tab_activated(self, event: Tabs.TabActivated) -> None:
+        """点击标签时切换会话"""
+        for tab in self._tabs:
+            if tab.tab_widget_id == event.tab.id and tab is not self._active_tab:
+                self._activate_tab(tab)
+                break
+
     def action_toggle_focus(self) -> None:
         """在命令输入框和文本区域之间切换焦点"""
         # 获取当前聚焦的组件
@@ -329,39 +520,50 @@ class IntelligentTerminal(App):
 
         if is_input_focused:
             # 如果当前聚焦在输入组件，则聚焦到输出容器
-            output_container = self.query_one("#output-container", FocusableContainer)
-            output_container.focus()
+            self._active_tab.container.focus()
         else:
             # 否则聚焦到当前的输入组件
             self._focus_current_input_widget()
 
+    def action_bypass_cache(self) -> None:
+        """跳过响应缓存重新执行当前标签页的上一条命令，新的分析结果替换缓存"""
+        tab = self._active_tab
+        if self._response_cache is None:
+            self.notify(_("Response cache is not enabled"), severity="warning")
+            return
+        if tab.processing or not tab.last_input or not self._is_in_main_interface():
+            return
+        self.notify(_("Re-running without the response cache: {command}").format(command=tab.last_input))
+        self._submit_command(tab, tab.last_input, refresh_cache=True)
+
     def action_cancel(self) -> None:
-        """取消当前正在进行的操作（命令执行或AI问答）"""
-        if self.processing:
-            self.logger.info("用户请求取消当前操作")
+        """取消当前标签页正在进行的操作（命令执行或AI问答），其他标签页不受影响"""
+        tab = self._active_tab
+        if tab.processing:
+            self.logger.info("用户请求取消标签页 %d 的当前操作", tab.tab_id)
 
-            # 取消当前所有的后台任务
+            # 取消该标签页的处理任务
             interrupted_count = 0
-            for task in list(self.background_tasks):
+            for task in list(tab.tasks):
                 if not task.done():
                     task.cancel()
                     interrupted_count += 1
                     self.logger.debug("已取消后台任务")
 
-            # 取消 LLM 客户端请求
-            if self._llm_client is not None:
-                # 异步调用取消方法
-                cancel_task = asyncio.create_task(self._cancel_llm_request())
-                self.background_tasks.add(cancel_task)
-                cancel_task.add_done_callback(self._task_done_callback)
+            # 通知 LLM 客户端中断请求，服务端的停止请求在后台完成，不阻塞界面，
+            # 也不计入处理任务，避免其完成时重置之后新命令的处理状态
+            if tab.llm_client is not None:
+                cancel_task = asyncio.create_task(self._cancel_llm_request(tab.llm_client))
+                self._interrupt_tasks.add(cancel_task)
+                cancel_task.add_done_callback(self._interrupt_tasks.discard)
 
             if interrupted_count > 0:
                 # 显示中断消息
-                output_container = self.query_one("#output-container")
                 interrupt_line = OutputLine(_("[Cancelled]"))
-                output_container.mount(interrupt_line)
+                self._mount_output(tab, interrupt_line)
+                tab.transcript.begin(OUTPUT, interrupt_line.get_content())
                 # 异步滚动到底部
-                scroll_task = asyncio.create_task(self._scroll_to_end())
+                scroll_task = asyncio.create_task(self._scroll_to_end(tab))
                 self.background_tasks.add(scroll_task)
                 scroll_task.add_done_callback(self._task_done_callback)
             return
@@ -380,8 +582,8 @@ class IntelligentTerminal(App):
     def on_mount(self) -> None:
         """初始化完成时设置焦点和绑定"""
         # 确保初始状态是正常模式
-        self._mcp_mode = "normal"
-        self._current_mcp_task_id = ""
+        self._active_tab.mcp_mode = "normal"
+        self._active_tab.mcp_task_id = ""
 
         # 清理任何可能的重复组件
         try:
@@ -397,47 +599,48 @@ class IntelligentTerminal(App):
 
         self._focus_current_input_widget()
 
+        # 后台加载输入历史，不阻塞启动
+        task = asyncio.create_task(self._input_history.load())
+        self._history_tasks.add(task)
+        task.add_done_callback(self._history_tasks.discard)
+
+        if self._resume_session:
+            self._restore_transcript(self._active_tab)
+
         # 初始化默认智能体
         self._initialize_default_agent()
 
     def get_llm_client(self) -> LLMClientBase:
-        """获取大模型客户端，使用单例模式维持对话历史"""
-        if self._llm_client is None:
-            self._llm_client = BackendFactory.create_client(self.config_manager)
-
-            # 初始化时设置智能体状态
-            if (self.current_agent and self.current_agent[0] and
-                isinstance(self._llm_client, HermesChatClient)):
-                self._llm_client.set_current_agent(self.current_agent[0])
-
-        # 为 Hermes 客户端设置 MCP 事件处理器以支持 MCP 交互
-        if isinstance(self._llm_client, HermesChatClient):
-            mcp_handler = TUIMCPEventHandler(self, self._llm_client)
-            self._llm_client.set_mcp_handler(mcp_handler)
-
-            # 确保智能体状态同步
-            if self.current_agent and self.current_agent[0]:
-                current_client_agent = getattr(self._llm_client, "current_agent_id", "")
-                if current_client_agent != self.current_agent[0]:
-                    self._llm_client.set_current_agent(self.current_agent[0])
-
-        return self._llm_client
+        """获取当前标签页的大模型客户端"""
+        return self._get_tab_client(self._active_tab)
 
     def refresh_llm_client(self) -> None:
         """刷新 LLM 客户端实例，用于配置更改后重新创建客户端"""
         # 保存当前智能体状态
         current_agent_id = self.current_agent[0] if self.current_agent else ""
 
-        self._llm_client = BackendFactory.create_client(self.config_manager)
+        # 其他标签页的客户端在下次使用时按新配置重新创建，正在处理的标签页等处理结束后再替换
+        for tab in self._tabs:
+            if tab is not self._active_tab and tab.llm_client is not None:
+                if tab.processing:
+                    tab.client_stale = True
+                else:
+                    self._discard_tab_client(tab)
+
+        # 配置未变化或切换回之前的配置时复用池中已预热的客户端
+        tab = self._active_tab
+        if tab.owns_client:
+            self._discard_tab_client(tab)
+        tab.llm_client = self._acquire_llm_client(tab)
 
         # 恢复智能体状态到新的客户端
-        if current_agent_id and isinstance(self._llm_client, HermesChatClient):
-            self._llm_client.set_current_agent(current_agent_id)
+        if current_agent_id and isinstance(tab.llm_client, HermesChatClient):
+            tab.llm_client.set_current_agent(current_agent_id)
 
         # 为 Hermes 客户端设置 MCP 事件处理器
-        if isinstance(self._llm_client, HermesChatClient):
-            mcp_handler = TUIMCPEventHandler(self, self._llm_client)
-            self._llm_client.set_mcp_handler(mcp_handler)
+        if isinstance(tab.llm_client, HermesChatClient):
+            mcp_handler = TUIMCPEventHandler(self, tab.llm_client)
+            tab.llm_client.set_mcp_handler(mcp_handler)
 
         # 后端切换时重新初始化智能体状态
         self._reinitialize_agent_state()
@@ -445,16 +648,19 @@ class IntelligentTerminal(App):
     def exit(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
         """退出应用前取消所有后台任务"""
         # 取消所有正在运行的后台任务
-        for task in self.background_tasks:
+        for task in (*self.background_tasks, *self._history_tasks):
             if not task.done():
                 task.cancel()
+        for tab in self._tabs:
+            for task in tab.tasks:
+                if not task.done():
+                    task.cancel()
+            tab.transcript.close()
 
-        # 清理 LLM 客户端连接
-        if self._llm_client is not None:
-            # 创建清理任务并在当前事件循环中执行
-            cleanup_task = asyncio.create_task(self._cleanup_llm_client())
-            self.background_tasks.add(cleanup_task)
-            cleanup_task.add_done_callback(self._cleanup_task_done_callback)
+        # 清理 LLM 客户端及共享 HTTP 连接，在当前事件循环中执行
+        cleanup_task = asyncio.create_task(self._cleanup_llm_client())
+        self.background_tasks.add(cleanup_task)
+        cleanup_task.add_done_callback(self._cleanup_task_done_callback)
 
         # 调用父类的exit方法
         super().exit(*args, **kwargs)
@@ -465,70 +671,173 @@ class IntelligentTerminal(App):
         if not self._is_in_main_interface():
             return
 
+        # 每个标签页同时只处理一个请求，其他标签页不受影响
+        tab = self._active_tab
         user_input = event.value.strip()
-        if not user_input or self.processing:
+        if not user_input or tab.processing:
             return
 
-        # 清空输入框
+        # 记录输入历史并清空输入框
+        self._input_history.add(user_input)
         input_widget = self.query_one(CommandInput)
         input_widget.value = ""
+        self._submit_command(tab, user_input)
+
+    def _submit_command(self, tab: SessionTab, user_input: str, *, refresh_cache: bool = False) -> None:
+        """显示并开始处理一条输入"""
+        tab.last_input = user_input
 
         # 显示命令
-        output_container = self.query_one("#output-container")
-        output_container.mount(OutputLine(f"> {user_input}", command=True))
+        self._mount_output(tab, OutputLine(f"> {user_input}", command=True))
+        tab.transcript.begin(PROMPT, user_input)
+        tab.set_title(user_input)
+        self._refresh_tab_label(tab)
 
         # 滚动到输出容器的底部
-        output_container.scroll_end(animate=False)
+        tab.container.scroll_end(animate=False)
 
         # 异步处理命令
-        self.processing = True
-        # 创建任务并保存到类属性中的任务集合
-        task = asyncio.create_task(self._process_command(user_input))
-        self.background_tasks.add(task)
-        # 添加完成回调，自动从集合中移除
-        task.add_done_callback(self._task_done_callback)
+        tab.processing = True
+        # 创建任务并保存到标签页的任务集合，完成回调自动从集合中移除
+        self._start_tab_task(tab, self._process_command(tab, user_input, refresh_cache=refresh_cache))
 
     @on(SwitchToMCPConfirm)
     def handle_switch_to_mcp_confirm(self, message: SwitchToMCPConfirm) -> None:
         """处理切换到 MCP 确认界面的消息"""
-        self._mcp_mode = "confirm"
-        self._current_mcp_task_id = message.event.get_task_id()
-        self._replace_input_with_mcp_widget(MCPConfirmWidget(message.event, widget_id="mcp-confirm"))
+        self._set_mcp_state(message.client, "confirm", message.event)
 
     @on(SwitchToMCPParameter)
     def handle_switch_to_mcp_parameter(self, message: SwitchToMCPParameter) -> None:
         """处理切换到 MCP 参数输入界面的消息"""
-        self._mcp_mode = "parameter"
-        self._current_mcp_task_id = message.event.get_task_id()
-        self._replace_input_with_mcp_widget(MCPParameterWidget(message.event, widget_id="mcp-parameter"))
+        self._set_mcp_state(message.client, "parameter", message.event)
 
     @on(MCPConfirmResult)
     def handle_mcp_confirm_result(self, message: MCPConfirmResult) -> None:
         """处理 MCP 确认结果"""
         # 检查是否是当前任务且未在处理中
-        if message.task_id == self._current_mcp_task_id and not self.processing:
-            self.processing = True  # 设置处理标志，防止重复处理
+        tab = self._active_tab
+        if message.task_id == tab.mcp_task_id and not tab.processing:
+            tab.processing = True  # 设置处理标志，防止重复处理
             # 立即恢复正常输入界面
             self._restore_normal_input()
             # 发送 MCP 响应并处理结果
-            task = asyncio.create_task(self._send_mcp_response(message.task_id, params=message.confirmed))
-            self.background_tasks.add(task)
-            task.add_done_callback(self._task_done_callback)
+            self._start_tab_task(tab, self._send_mcp_response(tab, message.task_id, params=message.confirmed))
 
     @on(MCPParameterResult)
     def handle_mcp_parameter_result(self, message: MCPParameterResult) -> None:
         """处理 MCP 参数结果"""
         # 检查是否是当前任务且未在处理中
-        if message.task_id == self._current_mcp_task_id and not self.processing:
-            self.processing = True  # 设置处理标志，防止重复处理
+        tab = self._active_tab
+        if message.task_id == tab.mcp_task_id and not tab.processing:
+            tab.processing = True  # 设置处理标志，防止重复处理
             # 立即恢复正常输入界面
             self._restore_normal_input()
             # 发送 MCP 响应并处理结果
             params = message.params if message.params is not None else False
-            task = asyncio.create_task(self._send_mcp_response(message.task_id, params=params))
+            self._start_tab_task(tab, self._send_mcp_response(tab, message.task_id, params=params))
+
+    def _set_mcp_state(self, client: LLMClientBase | None, mode: str, event) -> None:  # noqa: ANN001
+        """记录标签页等待的 MCP 交互，后台标签页切换到前台时再显示交互组件"""
+        tab = next((tab for tab in self._tabs if client is not None and tab.llm_client is client), self._active_tab)
+        tab.mcp_mode = mode
+        tab.mcp_task_id = event.get_task_id()
+        tab.mcp_event = event
+        if tab is self._active_tab:
+            self._show_mcp_widget(tab)
+            return
+        tab.unread = True
+        self._refresh_tab_label(tab)
+        self.notify(_("Session {tab_id} is waiting for your input").format(tab_id=tab.tab_id))
+
+    def _show_mcp_widget(self, tab: SessionTab) -> None:
+        """显示标签页等待的 MCP 交互组件"""
+        if tab.mcp_mode == "confirm":
+            self._replace_input_with_mcp_widget(MCPConfirmWidget(tab.mcp_event, widget_id="mcp-confirm"))
+        elif tab.mcp_mode == "parameter":
+            self._replace_input_with_mcp_widget(MCPParameterWidget(tab.mcp_event, widget_id="mcp-parameter"))
+
+    def _sync_search_index(self) -> None:
+        """将当前标签页输出区域中的内容同步到检索索引，只重新索引内容发生变化的输出"""
+        tab = self._active_tab
+        entries = [child for child in tab.container.children if isinstance(child, (OutputLine, MarkdownOutput))]
+        for entry in entries:
+            tab.search_index.set(entry, entry.get_content())
+        tab.search_index.retain(entries)
+
+    def _jump_to_output(self, widget: Widget) -> None:
+        """滚动到搜索结果对应的输出并短暂高亮"""
+        if not widget.is_attached:
+            return
+        self._active_tab.container.scroll_to_widget(widget, animate=False, top=True)
+        widget.add_class("search-match")
+        self.set_timer(SEARCH_HIGHLIGHT_SECONDS, lambda: widget.remove_class("search-match"))
+
+    def _create_tab(self, session_id: str = "") -> SessionTab:
+        """创建会话标签页，session_id 不为空时继续追加到已有的会话记录"""
+        tab_id = self._next_tab_id
+        self._next_tab_id += 1
+        tab = SessionTab(
+            tab_id=tab_id,
+            container=FocusableContainer(id=f"output-{tab_id}", classes="output-container"),
+            transcript=TranscriptWriter(session_id, backend=self.config_manager.get_backend().value),
+        )
+        self._tabs.append(tab)
+        return tab
+
+    def _activate_tab(self, tab: SessionTab) -> None:
+        """切换到会话标签页：显示其输出区域与输入组件，并渲染在后台时暂存的内容"""
+        self._active_tab = tab
+        self.query_one("#output-switcher", ContentSwitcher).current = tab.pane_id
+        self.query_one("#session-tabs", Tabs).active = tab.tab_widget_id
+        tab.unread = False
+        self._refresh_tab_label(tab)
+
+        # 输入区域显示该标签页等待的 MCP 交互，或普通的命令输入
+        if tab.mcp_mode != "normal":
+            self._show_mcp_widget(tab)
+        elif not self.query(CommandInput):
+            self._mount_command_input()
+        else:
+            self._focus_current_input_widget()
+
+        if tab.pending:
+            task = asyncio.create_task(self._flush_pending(tab))
             self.background_tasks.add(task)
             task.add_done_callback(self._task_done_callback)
 
+    def _refresh_tab_label(self, tab: SessionTab) -> None:
+        """更新标签文本"""
+        try:
+            self.query_one(f"#{tab.tab_widget_id}", Tab).label = Content(tab.label)
+        except NoMatches:
+            return
+
+    def _mount_output(self, tab: SessionTab, widget: Widget) -> None:
+        """在标签页的输出区域显示组件，后台标签页先暂存，与暂存的流式内容保持顺序"""
+        if tab is self._active_tab and not tab.pending:
+            tab.container.mount(widget)
+            return
+        tab.pending.append(widget)
+        if tab is not self._active_tab and not tab.unread:
+            tab.unread = True
+            self._refresh_tab_label(tab)
+
+    async def _flush_pending(self, tab: SessionTab) -> None:
+        """按顺序渲染标签页在后台时暂存的内容，期间到达的新内容继续排在其后"""
+        if tab.flushing:
+            return
+        tab.flushing = True
+        try:
+            while tab.pending and tab is self._active_tab:
+                item = tab.pending.pop(0)
+                if isinstance(item, PendingBatch):
+                    await self._apply_stream_batch(tab, item.items(), item.stream_state)
+                else:
+                    tab.container.mount(item)
+            await self._scroll_to_end(tab)
+        finally:
+            tab.flushing = False
+
     def _is_in_main_interface(self) -> bool:
         """检查是否在主界面（没有其他屏幕弹出）"""
         # 检查是否有活动的屏幕栈，除了主屏幕外没有其他屏幕
@@ -555,28 +864,48 @@ class IntelligentTerminal(App):
             self.logger.exception("Task execution error occurred")
             # 尝试在前端显示错误信息
             self._display_error_in_ui(e)
-        finally:
-            # 确保处理标志被重置
-            self.processing = False
 
-    async def _cancel_llm_request(self) -> None:
+    def _start_tab_task(self, tab: SessionTab, coro: Coroutine[Any, Any, None]) -> None:
+        """启动标签页的处理任务"""
+        task = asyncio.create_task(coro)
+        tab.tasks.add(task)
+        task.add_done_callback(partial(self._tab_task_done_callback, tab))
+
+    def _tab_task_done_callback(self, tab: SessionTab, task: asyncio.Task) -> None:
+        """标签页处理任务完成回调，重置该标签页的处理状态"""
+        tab.tasks.discard(task)
+        try:
+            task.result()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.exception("Task execution error occurred")
+            self._display_error_in_ui(e, tab)
+        finally:
+            tab.processing = False
+            if tab.client_stale:
+                self._discard_tab_client(tab)
+            if tab is not self._active_tab:
+                tab.unread = True
+                self._refresh_tab_label(tab)
+
+    async def _cancel_llm_request(self, llm_client: LLMClientBase) -> None:
         """异步取消 LLM 请求"""
         try:
-            if self._llm_client is not None:
-                await self._llm_client.interrupt()
-                self.logger.info("LLM 请求已取消")
+            await llm_client.interrupt()
+            self.logger.info("LLM 请求已取消")
         except Exception:
             self.logger.exception("取消 LLM 请求时出错")
 
-    async def _process_command(self, user_input: str) -> None:
+    async def _process_command(self, tab: SessionTab, user_input: str, *, refresh_cache: bool = False) -> None:
         """异步处理命令"""
         try:
-            output_container = self.query_one("#output-container", Container)
-            received_any_content = await self._handle_command_stream(user_input, output_container)
+            received_any_content = await self._handle_command_stream(tab, user_input, refresh_cache=refresh_cache)
 
             # 如果没有收到任何内容且应用仍在运行，显示错误信息
             if not received_any_content and hasattr(self, "is_running") and self.is_running:
-                output_container.mount(
+                self._mount_output(
+                    tab,
                     OutputLine(
                         _("No response received, please check network connection or try again later"),
                         command=False,
@@ -591,42 +920,44 @@ class IntelligentTerminal(App):
             self.logger.exception("Command processing error occurred")
             # 添加异常处理，显示错误信息
             try:
-                output_container = self.query_one("#output-container", Container)
                 error_msg = self._format_error_message(e)
                 # 检查应用是否已经开始退出
                 if hasattr(self, "is_running") and self.is_running:
-                    output_container.mount(OutputLine(format_error_message(error_msg), command=False))
+                    error_line = OutputLine(format_error_message(error_msg), command=False)
+                    self._mount_output(tab, error_line)
+                    tab.transcript.begin(OUTPUT, error_line.get_content())
             except (AttributeError, ValueError, RuntimeError):
                 # 如果UI组件已不可用，只记录错误日志
                 self.logger.exception("Failed to display error message")
         finally:
-            # 重新聚焦到输入框（如果应用仍在运行）
+            # 重新聚焦到输入框（如果应用仍在运行且该标签页在前台）
             try:
-                if hasattr(self, "is_running") and self.is_running:
+                if hasattr(self, "is_running") and self.is_running and tab is self._active_tab:
                     self._focus_current_input_widget()
             except (AttributeError, ValueError, RuntimeError):
                 # 应用可能正在退出，忽略聚焦错误
                 self.logger.debug("[TUI] Failed to focus input widget, app may be exiting")
             # 注意：不在这里重置processing标志，由回调函数处理
 
-    async def _handle_command_stream(self, user_input: str, output_container: Container) -> bool:
+    async def _handle_command_stream(self, tab: SessionTab, user_input: str, *, refresh_cache: bool = False) -> bool:
         """处理命令流式响应"""
         # 在新的命令会话开始时重置MCP状态跟踪
-        if self._llm_client and isinstance(self._llm_client, HermesChatClient):
-            self._llm_client.stream_processor.reset_status_tracking()
+        if tab.llm_client and isinstance(tab.llm_client, HermesChatClient):
+            tab.llm_client.stream_processor.reset_status_tracking()
 
         stream_state = self._init_stream_state()
 
         try:
             received_any_content = await self._process_stream(
+                tab,
                 user_input,
-                output_container,
                 stream_state,
+                refresh_cache=refresh_cache,
             )
         except TimeoutError:
-            received_any_content = self._handle_timeout_error(output_container, stream_state)
+            received_any_content = self._handle_timeout_error(tab, stream_state)
         except asyncio.CancelledError:
-            received_any_content = self._handle_cancelled_error(output_container, stream_state)
+            received_any_content = self._handle_cancelled_error(stream_state)
 
         return received_any_content
 
@@ -642,17 +973,61 @@ class IntelligentTerminal(App):
             "timeout_seconds": None,  # 无总体超时限制，支持超长时间任务
             "last_content_time": start_time,
             "no_content_timeout": 1800.0,  # 30分钟无内容超时
+            # 会话记录的分块状态，与界面渲染分开维护，后台标签页的内容同样在收到时记录
+            "record_kind": None,
+            "record_content": "",
         }
 
     async def _process_stream(
         self,
+        tab: SessionTab,
         user_input: str,
-        output_container: Container,
         stream_state: dict,
+        *,
+        refresh_cache: bool = False,
     ) -> bool:
         """处理命令输出流"""
-        async for output_tuple in process_command(user_input, self.get_llm_client()):
-            content, is_llm_output = output_tuple
+        # 网络读取与界面渲染分离，渲染较慢时不阻塞响应流的读取
+        source = process_command(
+            user_input,
+            self._get_tab_client(tab),
+            self._response_cache,
+            refresh_cache=refresh_cache,
+        )
+        async with StreamPipeline(source, name="command") as pipeline:
+            async for batch in pipeline.batches():
+                if not await self._render_stream_batch(tab, batch, stream_state):
+                    break
+
+        return stream_state["received_any_content"]
+
+    async def _render_stream_batch(
+        self,
+        tab: SessionTab,
+        batch: list[tuple[str, bool]],
+        stream_state: dict,
+    ) -> bool:
+        """渲染一批流式内容，返回是否继续处理；后台标签页只暂存内容，切换到前台时再渲染"""
+        # 会话记录在收到内容时写入，不等待渲染，后台标签页未切换到前台就关闭或退出时也不会丢失
+        self._record_stream_batch(tab, batch, stream_state)
+        if tab is not self._active_tab or tab.pending:
+            stream_state["received_any_content"] = True
+            tab.buffer_batch(batch, stream_state)
+            if tab is not self._active_tab and not tab.unread:
+                tab.unread = True
+                self._refresh_tab_label(tab)
+            return True
+        return await self._apply_stream_batch(tab, batch, stream_state)
+
+    async def _apply_stream_batch(
+        self,
+        tab: SessionTab,
+        batch: list[tuple[str, bool]],
+        stream_state: dict,
+    ) -> bool:
+        """将一批流式内容渲染到标签页的输出区域，返回是否继续处理"""
+        output_container = tab.container
+        for content, is_llm_output in batch:
             stream_state["received_any_content"] = True
             current_time = asyncio.get_event_loop().time()
 
@@ -662,20 +1037,45 @@ class IntelligentTerminal(App):
 
             # 检查超时
             if self._check_timeouts(current_time, stream_state, output_container):
-                break
+                return False
 
             # 处理内容
             await self._process_stream_content(
+                tab,
                 content,
                 stream_state,
-                output_container,
                 is_llm_output=is_llm_output,
             )
 
-            # 滚动到底部
-            await self._scroll_to_end()
+        # 每批内容只滚动一次
+        await self._scroll_to_end(tab)
+        return True
 
-        return stream_state["received_any_content"]
+    def _record_stream_batch(self, tab: SessionTab, batch: list[tuple[str, bool]], stream_state: dict) -> None:
+        """
+        将一批流式内容写入会话记录，按批落盘
+
+        分块方式与界面渲染一致：MCP 进度消息记录为步骤，同类内容追加到当前块，
+        类型变化时新建块（切换回大模型输出时与界面一样包含之前累积的回复内容）。
+        """
+        for content, is_llm_output in batch:
+            tool_name, cleaned_content = extract_mcp_tag(content)
+            if tool_name is not None and is_mcp_message(content):
+                tab.transcript.step(tool_name, cleaned_content, final=is_final_mcp_message(cleaned_content))
+                continue
+
+            kind = REPLY if is_llm_output else OUTPUT
+            accumulated = stream_state["record_content"]
+            if stream_state["record_kind"] == kind:
+                tab.transcript.append(cleaned_content)
+            elif stream_state["record_kind"] is None:
+                tab.transcript.begin(kind, cleaned_content)
+            else:
+                tab.transcript.begin(kind, accumulated + cleaned_content if is_llm_output else cleaned_content)
+            stream_state["record_kind"] = kind
+            if is_llm_output:
+                stream_state["record_content"] = accumulated + cleaned_content
+        tab.transcript.flush()
 
     def _check_timeouts(
         self,
@@ -700,9 +1100,9 @@ class IntelligentTerminal(App):
 
     async def _process_stream_content(
         self,
+        tab: SessionTab,
         content: str,
         stream_state: dict,
-        output_container: Container,
         *,
         is_llm_output: bool,
     ) -> None:
@@ -714,11 +1114,7 @@ class IntelligentTerminal(App):
             is_first_content=stream_state["is_first_content"],
         )
 
-        processed_line = await self._process_content_chunk(
-            params,
-            stream_state["current_line"],
-            output_container,
-        )
+        processed_line = await self._process_content_chunk(tab, params, stream_state["current_line"])
 
         # 检查是否是 MCP 消息处理（返回值为 None 表示是 MCP 消息）
         tool_name, _cleaned_content = extract_mcp_tag(content)
@@ -742,25 +1138,26 @@ class IntelligentTerminal(App):
                 # 只有在LLM输出且有有效的 MarkdownOutput 时才累积
                 stream_state["current_content"] += content
 
-    def _handle_timeout_error(self, output_container: Container, stream_state: dict) -> bool:
+    def _handle_timeout_error(self, tab: SessionTab, stream_state: dict) -> bool:
         """处理超时错误"""
         self.logger.warning("Command stream timed out")
         if hasattr(self, "is_running") and self.is_running:
-            output_container.mount(OutputLine(_("Request timeout, please try again later"), command=False))
+            self._mount_output(tab, OutputLine(_("Request timeout, please try again later"), command=False))
         return stream_state["received_any_content"]
 
-    def _handle_cancelled_error(self, output_container: Container, stream_state: dict) -> bool:
+    def _handle_cancelled_error(self, stream_state: dict) -> bool:
         """处理取消错误"""
         self.logger.info("Command stream was cancelled")
         return stream_state["received_any_content"]
 
     async def _process_content_chunk(
         self,
+        tab: SessionTab,
         params: ContentChunkParams,
         current_line: OutputLine | MarkdownOutput | None,
-        output_container: Container,
     ) -> OutputLine | MarkdownOutput | None:
         """处理单个内容块"""
+        output_container = tab.container
         content = params.content
         is_llm_output = params.is_llm_output
         current_content = params.current_content
@@ -785,11 +1182,11 @@ class IntelligentTerminal(App):
         # 如果是进度消息，使用专门的处理方法，无论 is_llm_output 的值
         if is_progress_message and tool_name:
             return self._handle_mcp_progress_message(
+                tab,
                 cleaned_content,
                 tool_name,
                 replace_tool_name,
                 mcp_tool_name,
-                output_container,
             )
 
         # 使用清理后的内容进行后续处理
@@ -833,18 +1230,18 @@ class IntelligentTerminal(App):
 
     def _handle_mcp_progress_message(
         self,
+        tab: SessionTab,
         content: str,
         tool_name: str,
         replace_tool_name: str | None,
         mcp_tool_name: str | None,
-        output_container: Container,
     ) -> None:
         """处理 MCP 进度消息"""
         # 检查是否为最终状态消息
         is_final_message = is_final_mcp_message(content)
 
         # 检查是否有现有的进度消息
-        existing_progress = self._current_progress_lines.get(tool_name)
+        existing_progress = tab.progress_lines.get(tool_name)
 
         # 如果有替换标记，则尝试替换现有消息
         if replace_tool_name and existing_progress is not None:
@@ -854,7 +1251,7 @@ class IntelligentTerminal(App):
 
             # 如果是最终状态，清理进度跟踪
             if is_final_message:
-                self._current_progress_lines.pop(tool_name, None)
+                tab.progress_lines.pop(tool_name, None)
                 self.logger.debug("[TUI] 工具 %s 到达最终状态，清理进度跟踪", tool_name)
 
             return
@@ -867,7 +1264,7 @@ class IntelligentTerminal(App):
 
             # 如果是最终状态，清理进度跟踪
             if is_final_message:
-                self._current_progress_lines.pop(tool_name, None)
+                tab.progress_lines.pop(tool_name, None)
                 self.logger.debug("[TUI] 工具 %s 到达最终状态，清理进度跟踪", tool_name)
 
             return
@@ -877,9 +1274,9 @@ class IntelligentTerminal(App):
 
         # 如果不是最终状态，加入进度跟踪
         if not is_final_message:
-            self._current_progress_lines[tool_name] = new_progress_line
+            tab.progress_lines[tool_name] = new_progress_line
 
-        output_container.mount(new_progress_line)
+        tab.container.mount(new_progress_line)
         self.logger.debug("[TUI] 创建工具 %s 的新进度消息: %s", tool_name, content.strip()[:50])
 
     def _format_error_message(self, error: BaseException) -> str:
@@ -887,6 +1284,12 @@ class IntelligentTerminal(App):
         error_str = str(error).lower()
         error_type = type(error).__name__.lower()
 
+        # 流式响应长时间没有任何数据，连接已被看门狗释放
+        if isinstance(error, StreamIdleError):
+            return _("No data received for {seconds} seconds, the connection was closed").format(
+                seconds=f"{error.idle_timeout:.0f}",
+            )
+
         # 处理 HermesAPIError 特殊情况
         if hasattr(error, "status_code") and hasattr(error, "message"):
             if error.status_code == 500:  # type: ignore[attr-defined]  # noqa: PLR2004
@@ -955,24 +1358,23 @@ class IntelligentTerminal(App):
 
         return _("Error processing command: {error}").format(error=str(error))
 
-    def _display_error_in_ui(self, error: BaseException) -> None:
-        """在UI界面显示错误信息"""
+    def _display_error_in_ui(self, error: BaseException, tab: SessionTab | None = None) -> None:
+        """在UI界面显示错误信息，未指定标签页时显示在当前标签页"""
         try:
             # 检查应用是否仍在运行
             if not (hasattr(self, "is_running") and self.is_running):
                 return
 
-            # 获取输出容器
-            output_container = self.query_one("#output-container", Container)
+            tab = tab or self._active_tab
 
             # 格式化错误消息
             error_msg = self._format_error_message(error)
 
             # 显示错误信息
-            output_container.mount(OutputLine(f"❌ {error_msg}", command=False))
+            self._mount_output(tab, OutputLine(f"❌ {error_msg}", command=False))
 
             # 滚动到底部以确保用户看到错误信息
-            self.call_after_refresh(lambda: output_container.scroll_end(animate=False))
+            self.call_after_refresh(lambda: tab.container.scroll_end(animate=False))
 
         except Exception:
             # 如果UI显示失败，至少记录错误日志
@@ -980,54 +1382,167 @@ class IntelligentTerminal(App):
 
     def _focus_current_input_widget(self) -> None:
         """聚焦到当前的输入组件，考虑 MCP 模式状态"""
+        tab = self._active_tab
         try:
-            if self._mcp_mode == "normal":
+            if tab.mcp_mode == "normal":
                 # 正常模式，聚焦到 CommandInput
                 self.query_one(CommandInput).focus()
-            elif self._mcp_mode == "confirm":
+            elif tab.mcp_mode == "confirm":
                 # MCP 确认模式，聚焦到 MCP 确认组件
                 try:
                     mcp_widget = self.query_one("#mcp-confirm")
                     mcp_widget.focus()
                 except (AttributeError, ValueError, RuntimeError):
                     # 如果MCP组件不存在，回退到正常模式
-                    self._mcp_mode = "normal"
+                    tab.mcp_mode = "normal"
                     self.query_one(CommandInput).focus()
-            elif self._mcp_mode == "parameter":
+            elif tab.mcp_mode == "parameter":
                 # MCP 参数模式，聚焦到 MCP 参数组件
                 try:
                     mcp_widget = self.query_one("#mcp-parameter")
                     mcp_widget.focus()
                 except (AttributeError, ValueError, RuntimeError):
                     # 如果MCP组件不存在，回退到正常模式
-                    self._mcp_mode = "normal"
+                    tab.mcp_mode = "normal"
                     self.query_one(CommandInput).focus()
             else:
                 # 未知模式，重置为正常模式并聚焦到 CommandInput
-                self.logger.warning("未知的 MCP 模式: %s，重置为正常模式", self._mcp_mode)
-                self._mcp_mode = "normal"
+                self.logger.warning("未知的 MCP 模式: %s，重置为正常模式", tab.mcp_mode)
+                tab.mcp_mode = "normal"
                 self.query_one(CommandInput).focus()
         except (AttributeError, ValueError, RuntimeError) as e:
             # 聚焦失败时记录调试信息，但不抛出异常
             self.logger.debug("[TUI] Failed to focus input widget: %s", str(e))
 
-    async def _scroll_to_end(self) -> None:
+    async def _scroll_to_end(self, tab: SessionTab) -> None:
         """滚动到容器底部的辅助方法"""
-        # 获取输出容器
-        output_container = self.query_one("#output-container")
         # 使用同步方法滚动，确保UI更新
-        output_container.scroll_end(animate=False)
+        tab.container.scroll_end(animate=False)
         # 等待一个小的延迟，确保UI有时间更新
         await asyncio.sleep(0.01)
 
-    async def _cleanup_llm_client(self) -> None:
-        """异步清理 LLM 客户端"""
-        if self._llm_client is not None:
+    def _restore_transcript(self, tab: SessionTab) -> None:
+        """恢复会话：显示会话记录末尾的内容，并准备恢复对话历史"""
+        reader = TranscriptReader(tab.transcript.session_id)
+        tail = reader.load_tail()
+        widgets: list[Widget] = []
+        for block in tail.blocks:
+            if block.kind == PROMPT:
+                widgets.append(OutputLine(f"> {block.text}", command=True))
+            elif block.kind == REPLY:
+                widgets.append(MarkdownOutput(block.text))
+            elif block.kind == OUTPUT:
+                widgets.append(OutputLine(block.text))
+            else:
+                widgets.append(ProgressOutputLine(block.text, step_id=block.step))
+        widgets.append(
+            OutputLine(
+                _("Resumed session {session_id}, showing the last {shown} of {total} entries").format(
+                    session_id=tail.session_id,
+                    shown=len(tail.blocks),
+                    total=tail.total_blocks,
+                ),
+            ),
+        )
+        tab.container.mount_all(widgets)
+        self.call_after_refresh(lambda: tab.container.scroll_end(animate=False))
+
+        tab.resumed_history = reader.load_history()
+        self.logger.info(
+            "已恢复会话 %s：显示 %d/%d 个输出块，对话历史 %d 条",
+            tail.session_id,
+            len(tail.blocks),
+            tail.total_blocks,
+            len(tab.resumed_history),
+        )
+
+    def _apply_resumed_history(self, tab: SessionTab, llm_client: LLMClientBase) -> None:
+        """将恢复的对话历史写入支持的 LLM 客户端（OpenAI 后端），Hermes 后端的上下文由服务端维护"""
+        if tab.resumed_history and hasattr(llm_client, "restore_history"):
+            llm_client.restore_history(tab.resumed_history)
+        tab.resumed_history = []
+
+    def _get_tab_client(self, tab: SessionTab) -> LLMClientBase:
+        """获取标签页的大模型客户端，在标签页内保持同一实例以维持对话历史"""
+        if tab.llm_client is None:
+            tab.llm_client = self._acquire_llm_client(tab)
+            self._apply_resumed_history(tab, tab.llm_client)
+
+            # 初始化时设置智能体状态
+            if (self.current_agent and self.current_agent[0] and
+                isinstance(tab.llm_client, HermesChatClient)):
+                tab.llm_client.set_current_agent(self.current_agent[0])
+
+        # 为 Hermes 客户端设置 MCP 事件处理器以支持 MCP 交互
+        if isinstance(tab.llm_client, HermesChatClient):
+            mcp_handler = TUIMCPEventHandler(self, tab.llm_client)
+            tab.llm_client.set_mcp_handler(mcp_handler)
+
+            # 确保智能体状态同步
+            if self.current_agent and self.current_agent[0]:
+                current_client_agent = getattr(tab.llm_client, "current_agent_id", "")
+                if current_client_agent != self.current_agent[0]:
+                    tab.llm_client.set_current_agent(self.current_agent[0])
+
+        return tab.llm_client
+
+    def _acquire_llm_client(self, tab: SessionTab) -> LLMClientBase:
+        """
+        获取与当前配置对应的客户端
+
+        优先使用客户端池中的客户端并标记为活动客户端；池中的客户端已被其他标签页使用时，
+        单独创建一个客户端，使每个标签页拥有独立的对话。
+        """
+        client_pool = get_client_pool()
+        client = client_pool.acquire(
+            ClientPoolKey.from_config(self.config_manager),
+            lambda: BackendFactory.create_client(self.config_manager),
+        )
+        if any(other is not tab and other.llm_client is client for other in self._tabs):
+            tab.owns_client = True
+            return BackendFactory.create_client(self.config_manager)
+        tab.owns_client = False
+        client_pool.set_active(client)
+        return client
+
+    def _discard_tab_client(self, tab: SessionTab) -> None:
+        """丢弃标签页的客户端，下次使用时按当前配置重新获取"""
+        if tab.llm_client is not None and tab.owns_client:
+            close_task = asyncio.create_task(self._close_tab_client(tab.llm_client, owned=True))
+            self._interrupt_tasks.add(close_task)
+            close_task.add_done_callback(self._interrupt_tasks.discard)
+        tab.llm_client = None
+        tab.owns_client = False
+        tab.client_stale = False
+
+    async def _close_tab_client(self, llm_client: LLMClientBase, *, owned: bool, interrupt: bool = False) -> None:
+        """中断标签页正在进行的服务端任务，并关闭标签页独有的客户端"""
+        if interrupt:
+            await self._cancel_llm_request(llm_client)
+        if owned:
             try:
-                await self._llm_client.close()
-                self.logger.info("LLM 客户端已安全关闭")
+                await llm_client.close()
             except (OSError, RuntimeError, ValueError) as e:
-                log_exception(self.logger, "关闭 LLM 客户端时出错", e)
+                log_exception(self.logger, "关闭标签页客户端时出错", e)
+
+    async def _cleanup_llm_client(self) -> None:
+        """异步清理 LLM 客户端"""
+        client_pool = get_client_pool()
+        for tab in self._tabs:
+            if tab.llm_client is not None and tab.llm_client not in client_pool:
+                try:
+                    await tab.llm_client.close()
+                    self.logger.info("LLM 客户端已安全关闭")
+                except (OSError, RuntimeError, ValueError) as e:
+                    log_exception(self.logger, "关闭 LLM 客户端时出错", e)
+
+        await client_pool.close_all()
+
+        self.logger.debug("共享 HTTP 连接池统计: %s", get_http_pool_stats())
+        self.logger.debug("流式响应看门狗统计: %s", get_stream_watchdog_stats())
+        if self._response_cache is not None:
+            self.logger.info("命令失败分析响应缓存统计: %s", self._response_cache.stats)
+        await close_http_clients()
 
     def _cleanup_task_done_callback(self, task: asyncio.Task) -> None:
         """清理任务完成回调"""
@@ -1126,13 +1641,18 @@ class IntelligentTerminal(App):
 
     def _restore_normal_input(self) -> None:
         """恢复正常的命令输入组件"""
+        tab = self._active_tab
+        # 重置当前标签页的 MCP 状态
+        tab.mcp_mode = "normal"
+        tab.mcp_task_id = ""
+        tab.mcp_event = None
+        self._mount_command_input()
+
+    def _mount_command_input(self) -> None:
+        """在输入区域显示命令输入组件"""
         try:
             input_container = self.query_one("#input-container")
 
-            # 重置 MCP 状态
-            self._mcp_mode = "normal"
-            self._current_mcp_task_id = ""
-
             # 切换回正常模式样式
             input_container.remove_class("mcp-mode")
             input_container.add_class("normal-mode")
@@ -1141,7 +1661,7 @@ class IntelligentTerminal(App):
             input_container.remove_children()
 
             # 添加正常的命令输入组件
-            command_input = CommandInput()
+            command_input = CommandInput(self._input_history)
             input_container.mount(command_input)
 
             # 聚焦到输入框
@@ -1149,101 +1669,71 @@ class IntelligentTerminal(App):
 
         except Exception:
             self.logger.exception("恢复正常输入组件失败")
-            # 如果恢复失败，至少要重置状态
-            self._mcp_mode = "normal"
-            self._current_mcp_task_id = ""
 
-    async def _send_mcp_response(self, task_id: str, *, params: bool | dict[str, Any]) -> None:
+    async def _send_mcp_response(self, tab: SessionTab, task_id: str, *, params: bool | dict[str, Any]) -> None:
         """发送 MCP 响应并处理结果"""
-        output_container: Container | None = None
-
         try:
-            # 先获取输出容器，确保可以显示错误信息
-            output_container = self.query_one("#output-container", Container)
-
             # 发送 MCP 响应并处理流式回复
-            llm_client = self.get_llm_client()
+            llm_client = self._get_tab_client(tab)
             if hasattr(llm_client, "send_mcp_response"):
                 success = await self._handle_mcp_response_stream(
+                    tab,
                     task_id,
                     params=params,
-                    output_container=output_container,
                     llm_client=llm_client,
                 )
                 if not success:
                     # 如果没有收到任何响应内容，显示默认消息
-                    output_container.mount(OutputLine(_("💡 MCP response sent")))
+                    self._mount_output(tab, OutputLine(_("💡 MCP response sent")))
             else:
                 self.logger.error("当前客户端不支持 MCP 响应功能")
-                output_container.mount(OutputLine(_("❌ Current client does not support MCP response")))
+                self._mount_output(tab, OutputLine(_("❌ Current client does not support MCP response")))
 
         except Exception as e:
             self.logger.exception("发送 MCP 响应失败")
             # 显示错误信息
-            if output_container is not None:
-                try:
-                    error_message = self._format_error_message(e)
-                    output_container.mount(
-                        OutputLine(_("❌ Failed to send MCP response: {error}").format(error=error_message)),
-                    )
-                except Exception:
-                    # 如果连显示错误信息都失败了，至少记录日志
-                    self.logger.exception("无法显示错误信息")
+            try:
+                error_message = self._format_error_message(e)
+                self._mount_output(
+                    tab,
+                    OutputLine(_("❌ Failed to send MCP response: {error}").format(error=error_message)),
+                )
+            except Exception:
+                # 如果连显示错误信息都失败了，至少记录日志
+                self.logger.exception("无法显示错误信息")
         finally:
             # 重置处理标志，不再在这里恢复输入界面
-            self.processing = False
+            tab.processing = False
 
     async def _handle_mcp_response_stream(
         self,
+        tab: SessionTab,
         task_id: str,
         *,
         params: bool | dict[str, Any],
-        output_container: Container,
         llm_client: LLMClientBase,
     ) -> bool:
         """处理 MCP 响应的流式回复"""
         if not isinstance(llm_client, HermesChatClient):
             self.logger.error("当前客户端不支持 MCP 响应功能")
-            output_container.mount(OutputLine(_("❌ Current client does not support MCP response")))
+            self._mount_output(tab, OutputLine(_("❌ Current client does not support MCP response")))
             return False
 
         # 使用统一的流状态管理，与 _handle_command_stream 保持一致
         stream_state = self._init_stream_state()
 
         try:
-            async for content in llm_client.send_mcp_response(task_id, params=params):
-                if not content.strip():
-                    continue
-
-                stream_state["received_any_content"] = True
-                current_time = asyncio.get_event_loop().time()
-
-                # 更新最后收到内容的时间
-                if content.strip():
-                    stream_state["last_content_time"] = current_time
-
-                # 检查超时
-                if self._check_timeouts(current_time, stream_state, output_container):
-                    break
-
-                # 判断是否为 LLM 输出内容
-                tool_name, _cleaned_content = extract_mcp_tag(content)
-                is_llm_output = tool_name is None
-
-                # 处理内容
-                await self._process_stream_content(
-                    content,
-                    stream_state,
-                    output_container,
-                    is_llm_output=is_llm_output,
-                )
-
-                # 滚动到底部
-                await self._scroll_to_end()
+            source = llm_client.send_mcp_response(task_id, params=params)
+            async with StreamPipeline(source, name="mcp_response") as pipeline:
+                async for batch in pipeline.batches():
+                    # 判断是否为 LLM 输出内容
+                    outputs = [(content, extract_mcp_tag(content)[0] is None) for content in batch if content.strip()]
+                    if outputs and not await self._render_stream_batch(tab, outputs, stream_state):
+                        break
 
             return stream_state["received_any_content"]
         except asyncio.CancelledError:
-            output_container.mount(OutputLine(_("🚫 MCP response cancelled")))
+            self._mount_output(tab, OutputLine(_("🚫 MCP response cancelled")))
             raise
 
     def _get_initial_agent(self) -> tuple[str, str]:
@@ -1316,6 +1806,11 @@ class IntelligentTerminal(App):
                 valid, _ = await validate_oi_connection(base_url, api_key)
                 return valid
 
+            if backend == Backend.REPLAY:
+                # 录制回放只需要录制文件存在
+                replay_path = Path(self.config_manager.get_replay_path())
+                return await asyncio.to_thread(lambda: replay_path.expanduser().is_file())
+
         except Exception:
             self.logger.exception("验证后端配置时发生错误")
             return False
@@ -37,8 +37,8 @@ class TUIMCPEventHandler(MCPEventHandler):
 
         """
         try:
-            # 通知 TUI 切换到确认界面
-            self.tui_app.post_message(self.tui_app.SwitchToMCPConfirm(event))
+            # 通知 TUI 切换到确认界面，附带客户端以确定所属的会话标签页
+            self.tui_app.post_message(self.tui_app.SwitchToMCPConfirm(event, self.hermes_client))
         except Exception:
             self.logger.exception("处理用户确认请求时发生错误")
 
@@ -51,7 +51,7 @@ class TUIMCPEventHandler(MCPEventHandler):
 
         """
         try:
-            # 通知 TUI 切换到参数输入界面
-            self.tui_app.post_message(self.tui_app.SwitchToMCPParameter(event))
+            # 通知 TUI 切换到参数输入界面，附带客户端以确定所属的会话标签页
+            self.tui_app.post_message(self.tui_app.SwitchToMCPParameter(event, self.hermes_client))
         except Exception:
             self.logger.exception("处理用户参数输入请求时发生错误")
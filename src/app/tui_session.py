@@ -0,0 +1,118 @@
+"""
+TUI 会话标签页
+
+每个标签页是一个独立的会话：拥有自己的 LLM 客户端（对话 ID / 对话历史）、处理任务、
+输出区域和会话记录，多个标签页中的请求可以同时进行。
+
+后台标签页的流式响应照常读取，但不创建组件也不滚动：渲染操作暂存在 pending 中，
+切换到该标签页时按顺序执行。暂存时合并相邻的同类普通内容，切换时每段输出只需渲染一次，
+N 个后台任务不会让界面的渲染开销成倍增加。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from app.search_index import SearchIndex
+from backend.hermes.mcp_helpers import extract_mcp_tag
+from i18n.manager import _
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from textual.containers import Container
+    from textual.widget import Widget
+
+    from app.transcript import TranscriptWriter
+    from backend.base import LLMClientBase
+
+# 标签页标题的最大长度
+TAB_TITLE_WIDTH = 16
+
+
+@dataclass
+class PendingBatch:
+    """后台标签页暂存的一批流式内容"""
+
+    stream_state: dict
+    parts: list[tuple[list[str], bool]] = field(default_factory=list)
+    """每项为（内容分块, 是否为大模型输出），分块在渲染时才拼接，避免长响应反复复制字符串"""
+    last_mergeable: bool = False
+
+    def extend(self, batch: list[tuple[str, bool]]) -> None:
+        """追加内容，相邻的同类普通内容合并为一项（MCP 消息保持独立）"""
+        for content, is_llm_output in batch:
+            mergeable = extract_mcp_tag(content)[0] is None
+            if mergeable and self.last_mergeable and self.parts[-1][1] == is_llm_output:
+                self.parts[-1][0].append(content)
+                continue
+            self.parts.append(([content], is_llm_output))
+            self.last_mergeable = mergeable
+
+    def items(self) -> list[tuple[str, bool]]:
+        """拼接后的内容列表"""
+        return [("".join(chunks), is_llm_output) for chunks, is_llm_output in self.parts]
+
+
+@dataclass
+class SessionTab:
+    """会话标签页的状态"""
+
+    tab_id: int
+    container: Container
+    transcript: TranscriptWriter
+    title: str = ""
+    last_input: str = ""
+    """上一次提交的输入，跳过响应缓存重新分析时再次执行"""
+    llm_client: LLMClientBase | None = None
+    owns_client: bool = False
+    """客户端由本标签页单独创建（不在客户端池中），关闭标签页时需要关闭"""
+    client_stale: bool = False
+    """配置已变化，处理结束后丢弃当前客户端"""
+    processing: bool = False
+    tasks: set[asyncio.Task] = field(default_factory=set)
+    progress_lines: dict[str, Any] = field(default_factory=dict)
+    resumed_history: list[dict[str, str]] = field(default_factory=list)
+    search_index: SearchIndex[Widget] = field(default_factory=SearchIndex)
+    mcp_mode: str = "normal"
+    """MCP 交互状态："normal"、"confirm" 或 "parameter"，切换回该标签页时恢复对应的输入组件"""
+    mcp_task_id: str = ""
+    mcp_event: Any = None
+    pending: list[PendingBatch | Widget] = field(default_factory=list)
+    """在后台时暂存的渲染操作，切换到前台后按顺序执行"""
+    flushing: bool = False
+    unread: bool = False
+
+    @property
+    def pane_id(self) -> str:
+        """输出区域的组件 ID"""
+        return self.container.id or ""
+
+    @property
+    def tab_widget_id(self) -> str:
+        """标签的组件 ID"""
+        return f"tab-{self.tab_id}"
+
+    @property
+    def label(self) -> str:
+        """标签文本，后台有新内容时带有标记"""
+        title = self.title or _("New session")
+        marker = " ●" if self.unread else ""
+        return f"{self.tab_id}: {title}{marker}"
+
+    def set_title(self, text: str) -> None:
+        """以第一个问题作为标题"""
+        if not self.title:
+            flat = " ".join(text.split())
+            self.title = flat if len(flat) <= TAB_TITLE_WIDTH else flat[: TAB_TITLE_WIDTH - 1] + "…"
+
+    def buffer_batch(self, batch: list[tuple[str, bool]], stream_state: dict) -> None:
+        """暂存一批流式内容，与同一流的上一批合并"""
+        last = self.pending[-1] if self.pending else None
+        if isinstance(last, PendingBatch) and last.stream_state is stream_state:
+            last.extend(batch)
+            return
+        pending = PendingBatch(stream_state)
+        pending.extend(batch)
+        self.pending.append(pending)
@@ -53,6 +53,24 @@ class LLMClientBase(ABC):
         默认实现不执行任何操作，适用于无状态的客户端。
         """
 
+    def last_response_complete(self) -> bool:
+        """
+        上一次流式响应是否正常完成
+
+        以错误提示、内容屏蔽提示或无内容提示结束的响应虽然没有抛出异常，也不是有效的回答，
+        这类响应不应写入响应缓存。请求失败时抛出异常的客户端无需重写。
+        """
+        return True
+
+    def response_cache_scope(self) -> str | None:
+        """
+        响应缓存的作用范围
+
+        只有作用范围与提示都相同时才复用缓存的响应，通常由后端类型、服务地址和模型（或智能体）组成。
+        返回 None 表示不缓存该客户端的响应。
+        """
+        return None
+
     @abstractmethod
     async def close(self) -> None:
         """关闭客户端连接"""
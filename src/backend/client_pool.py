@@ -0,0 +1,164 @@
+"""
+LLM 客户端池
+
+按后端配置缓存 LLM 客户端，切换回之前的配置时复用已预热的客户端及其对话状态，
+超出容量的客户端按最近最少使用顺序淘汰并在后台异步关闭。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from config.model import Backend
+from log.manager import get_logger, log_exception
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from backend.base import LLMClientBase
+    from config.manager import ConfigManager
+
+# 默认最多保留的客户端数量
+DEFAULT_MAX_CLIENTS = 4
+
+
+@dataclass(frozen=True)
+class ClientPoolKey:
+    """客户端池的索引键，API Key 仅以哈希形式保存"""
+
+    backend: Backend
+    base_url: str
+    model: str
+    credential: str
+
+    @classmethod
+    def create(cls, backend: Backend, base_url: str, api_key: str, model: str = "") -> ClientPoolKey:
+        """根据后端配置构造索引键"""
+        return cls(
+            backend=backend,
+            base_url=base_url.strip().rstrip("/"),
+            # Hermes 后端与模型无关
+            model=model.strip() if backend == Backend.OPENAI else "",
+            credential=hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+        )
+
+    @classmethod
+    def from_config(cls, config_manager: ConfigManager) -> ClientPoolKey:
+        """根据已保存的配置构造索引键"""
+        backend = config_manager.get_backend()
+        if backend == Backend.OPENAI:
+            return cls.create(
+                backend,
+                config_manager.get_base_url(),
+                config_manager.get_api_key(),
+                config_manager.get_model(),
+            )
+        if backend == Backend.REPLAY:
+            # 回放速度不同时视为不同的客户端
+            return cls.create(backend, config_manager.get_replay_path(), str(config_manager.get_replay_speed()))
+        return cls.create(backend, config_manager.get_eulerintelli_url(), config_manager.get_eulerintelli_key())
+
+
+class LLMClientPool:
+    """有容量上限的 LLM 客户端池"""
+
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS) -> None:
+        """初始化客户端池"""
+        if max_clients < 1:
+            msg = "max_clients 必须大于 0"
+            raise ValueError(msg)
+        self.logger = get_logger(__name__)
+        self.max_clients = max_clients
+        self._clients: OrderedDict[ClientPoolKey, LLMClientBase] = OrderedDict()
+        self._active: LLMClientBase | None = None
+        self._closing_tasks: set[asyncio.Task] = set()
+
+    def __contains__(self, client: object) -> bool:
+        """判断客户端是否由池管理"""
+        return any(pooled is client for pooled in self._clients.values())
+
+    def __len__(self) -> int:
+        """当前保留的客户端数量"""
+        return len(self._clients)
+
+    def acquire(self, key: ClientPoolKey, factory: Callable[[], LLMClientBase]) -> LLMClientBase:
+        """
+        获取与配置对应的客户端，不存在时通过 factory 创建
+
+        Args:
+            key: 后端配置索引键
+            factory: 创建新客户端的工厂函数
+
+        Returns:
+            LLMClientBase: 复用的或新创建的客户端
+
+        """
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+            self.logger.debug("复用已缓存的 LLM 客户端: %s %s", key.backend.value, key.base_url)
+            return client
+
+        client = factory()
+        self._clients[key] = client
+        self.logger.debug("创建新的 LLM 客户端: %s %s", key.backend.value, key.base_url)
+        self._evict()
+        return client
+
+    def set_active(self, client: LLMClientBase | None) -> None:
+        """标记当前主界面正在使用的客户端，该客户端不会被淘汰"""
+        self._active = client
+
+    async def close_all(self) -> None:
+        """关闭池中所有客户端并等待后台关闭任务完成"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._active = None
+        for client in clients:
+            await self._close_client(client)
+        if self._closing_tasks:
+            await asyncio.gather(*self._closing_tasks, return_exceptions=True)
+
+    def _evict(self) -> None:
+        """淘汰超出容量的最久未使用客户端"""
+        for key in list(self._clients):
+            if len(self._clients) <= self.max_clients:
+                break
+            client = self._clients[key]
+            if client is self._active:
+                continue
+            del self._clients[key]
+            self.logger.debug("淘汰 LLM 客户端: %s %s", key.backend.value, key.base_url)
+            self._schedule_close(client)
+
+    def _schedule_close(self, client: LLMClientBase) -> None:
+        """在后台关闭被淘汰的客户端"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有运行中的事件循环时无法异步关闭，底层连接会在退出时统一释放
+            self.logger.debug("无运行中的事件循环，跳过关闭被淘汰的客户端")
+            return
+        task = loop.create_task(self._close_client(client))
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+
+    async def _close_client(self, client: LLMClientBase) -> None:
+        """关闭单个客户端，失败时仅记录日志"""
+        try:
+            await client.close()
+        except Exception as e:  # noqa: BLE001
+            log_exception(self.logger, "关闭被淘汰的 LLM 客户端失败", e)
+
+
+# 全局客户端池实例
+_client_pool = LLMClientPool()
+
+
+def get_client_pool() -> LLMClientPool:
+    """获取全局 LLM 客户端池"""
+    return _client_pool
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 
 from backend.hermes.client import HermesChatClient
 from backend.openai import OpenAIClient
+from backend.replay import ReplayClient
 from config.model import Backend
 
 if TYPE_CHECKING:
@@ -38,11 +39,19 @@ class BackendFactory:
                 base_url=config_manager.get_base_url(),
                 model=config_manager.get_model(),
                 api_key=config_manager.get_api_key(),
+                fallback_urls=config_manager.get_fallback_urls(),
+                hedge=config_manager.get_hedge_enabled(),
             )
         if backend == Backend.EULERINTELLI:
             return HermesChatClient(
                 base_url=config_manager.get_eulerintelli_url(),
                 auth_token=config_manager.get_eulerintelli_key(),
+                stream_idle_timeout=config_manager.get_stream_idle_timeout(),
+            )
+        if backend == Backend.REPLAY:
+            return ReplayClient(
+                path=config_manager.get_replay_path(),
+                speed=config_manager.get_replay_speed(),
             )
         msg = f"不支持的后端类型: {backend}"
         raise ValueError(msg)
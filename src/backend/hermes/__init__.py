@@ -1,13 +1,13 @@
 """Hermes Chat API 模块"""
 
 from .client import HermesChatClient
-from .exceptions import HermesAPIError
+from .exceptions import HermesAPIError, HermesCircuitOpenError
 from .models import HermesAgent, HermesApp, HermesChatRequest, HermesFeatures, HermesMessage
 from .services.agent import HermesAgentManager
 from .services.conversation import HermesConversationManager
-from .services.http import HermesHttpManager
+from .services.http import HermesHttpManager, RequestPolicy
 from .services.model import HermesModelManager
-from .stream import HermesStreamEvent, HermesStreamProcessor
+from .stream import HermesStreamCursor, HermesStreamEvent, HermesStreamProcessor
 
 __all__ = [
     "HermesAPIError",
@@ -16,11 +16,14 @@ __all__ = [
     "HermesApp",
     "HermesChatClient",
     "HermesChatRequest",
+    "HermesCircuitOpenError",
     "HermesConversationManager",
     "HermesFeatures",
     "HermesHttpManager",
     "HermesMessage",
     "HermesModelManager",
+    "HermesStreamCursor",
     "HermesStreamEvent",
     "HermesStreamProcessor",
+    "RequestPolicy",
 ]
@@ -2,18 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import time
-from typing import TYPE_CHECKING, Self
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any, Self
 from urllib.parse import urljoin
 
 import httpx
 
 from backend.base import LLMClientBase
+from backend.recording import STREAM_CHAT, STREAM_MCP_RESPONSE, begin_recording
+from backend.stream_watchdog import STREAM_IDLE_TIMEOUT, StreamIdleError, StreamWatchdog
+from config.model import Backend
 from i18n.manager import get_locale
 from log.manager import get_logger, log_exception
 
-from .constants import HTTP_OK
+from .constants import (
+    HTTP_OK,
+    PENDING_STOP_TIMEOUT,
+    STREAM_RESUME_ATTEMPTS,
+    STREAM_RESUME_DELAY,
+    STREAM_RESUME_MAX_DELAY,
+)
 from .exceptions import HermesAPIError
 from .models import HermesApp, HermesChatRequest, HermesFeatures
 from .services import (
@@ -23,13 +34,14 @@ from .services import (
     HermesModelManager,
     HermesUserManager,
 )
-from .stream import HermesStreamEvent, HermesStreamProcessor
+from .stream import HermesStreamCursor, HermesStreamEvent, HermesStreamProcessor
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator
+    from collections.abc import AsyncGenerator, AsyncIterator
     from types import TracebackType
 
     from backend.mcp_handler import MCPEventHandler
+    from backend.recording import StreamRecording
 
     from .models import HermesAgent
 
@@ -37,12 +49,27 @@ if TYPE_CHECKING:
 class HermesChatClient(LLMClientBase):
     """Hermes Chat API 客户端 - 重构版本"""
 
-    def __init__(self, base_url: str, auth_token: str = "") -> None:
-        """初始化 Hermes Chat API 客户端"""
+    def __init__(
+        self,
+        base_url: str,
+        auth_token: str = "",
+        *,
+        stream_idle_timeout: float | None = STREAM_IDLE_TIMEOUT,
+    ) -> None:
+        """
+        初始化 Hermes Chat API 客户端
+
+        Args:
+            base_url: Hermes 服务地址
+            auth_token: 认证令牌
+            stream_idle_timeout: 流式响应的空闲时限（秒），超过该时间没有收到任何数据（包括心跳）时断开连接
+
+        """
         self.logger = get_logger(__name__)
 
         self.current_agent_id: str = ""  # 当前选择的智能体 ID
         self.current_task_id: str = ""  # 当前正在运行的任务 ID
+        self.stream_idle_timeout = stream_idle_timeout
 
         # HTTP 管理器 - 立即初始化
         self.http_manager = HermesHttpManager(base_url, auth_token)
@@ -57,6 +84,11 @@ class HermesChatClient(LLMClientBase):
         # MCP 事件处理器（可选）
         self._mcp_handler: MCPEventHandler | None = None
 
+        # 中断后在后台发送的停止请求
+        self._pending_stops: set[asyncio.Task[bool]] = set()
+        # 上一次流式响应是否产生了内容且没有以错误或屏蔽提示结束
+        self._response_complete = False
+
         self.logger.info("Hermes 客户端初始化成功 - URL: %s", base_url)
 
     @property
@@ -130,8 +162,11 @@ class HermesChatClient(LLMClientBase):
             HermesAPIError: 当 API 调用失败时
 
         """
-        # 如果有未完成的会话，先停止它
-        await self._stop()
+        # 等待中断时发出的后台停止请求，避免其停止新的会话
+        await self._wait_pending_stops()
+        # 上一次流式响应没有正常结束时，先停止它
+        if self.current_task_id:
+            await self._stop()
 
         # 不在这里重置状态跟踪，让进度状态能够跨流保持
         # 只有在真正的新对话开始时才重置（由上层调用方决定）
@@ -217,28 +252,23 @@ class HermesChatClient(LLMClientBase):
 
         try:
             # 构建 MCP 响应请求
-            client = await self.http_manager.get_client()
-            chat_url = urljoin(self.http_manager.base_url, "/api/chat")
-            headers = self.http_manager.build_headers()
-
             request_data = {
                 "taskId": task_id,
                 "params": params,
             }
 
-            self.logger.info("准备发送 MCP 响应请求 - URL: %s, 任务ID: %s", chat_url, task_id)
-            self.logger.debug("请求头: %s", headers)
+            self.logger.info("准备发送 MCP 响应请求 - 任务ID: %s", task_id)
             self.logger.debug("请求内容: %s", request_data)
 
-            async with client.stream(
-                "POST",
-                chat_url,
-                json=request_data,
-                headers=headers,
-            ) as response:
-                self.logger.info("收到 MCP 响应 - 状态码: %d", response.status_code)
-                await self._validate_chat_response(response)
-                async for text in self._process_stream_events(response):
+            recording = begin_recording(
+                STREAM_MCP_RESPONSE,
+                Backend.EULERINTELLI.value,
+                task_id=task_id,
+                params=params,
+            )
+            cursor = HermesStreamCursor(task_id)
+            async with aclosing(self._resumable_lines(request_data, cursor, "mcp_response")) as lines:
+                async for text in self._process_stream_events(lines, recording, cursor):
                     yield text
 
             duration = time.time() - start_time
@@ -289,19 +319,36 @@ class HermesChatClient(LLMClientBase):
         """
         await self.user_manager.update_auto_execute(auto_execute=False)
 
+    def last_response_complete(self) -> bool:
+        """上一次流式响应是否正常完成，后端错误、敏感内容屏蔽与无内容提示都视为未完成"""
+        return self._response_complete
+
+    def response_cache_scope(self) -> str | None:
+        """响应缓存的作用范围：服务地址与当前智能体"""
+        return f"{Backend.EULERINTELLI.value} {self.http_manager.base_url} {self.current_agent_id}"
+
+    def get_endpoint_stats(self) -> list[dict[str, Any]]:
+        """获取各控制面端点的重试、对冲、熔断与延迟统计"""
+        return self.http_manager.get_endpoint_stats()
+
     async def interrupt(self) -> None:
         """
         中断当前正在进行的请求
 
-        调用后端的 stop 能力来中断当前会话。
+        本地的流式响应由调用方取消，这里立即返回，服务端的 stop 请求在后台发送并在失败时重试，
+        网络较慢时界面也不必等待服务端响应。
         """
         self.logger.info("中断 Hermes 客户端当前请求")
-        await self._stop()
+        self._stop_in_background()
 
     async def close(self) -> None:
         """关闭 HTTP 客户端"""
         # 如果有未完成的会话，先停止它
+        await self._wait_pending_stops()
         await self._stop()
+        for task in self._pending_stops:
+            task.cancel()
+        self.logger.debug("Hermes 控制面请求统计: %s", self.http_manager.get_endpoint_stats())
         try:
             await self.http_manager.close()
             self.logger.info("Hermes 客户端已关闭")
@@ -326,24 +373,14 @@ class HermesChatClient(LLMClientBase):
             HermesAPIError: 当 API 调用失败时
 
         """
-        client = await self.http_manager.get_client()
-        chat_url = urljoin(self.http_manager.base_url, "/api/chat")
-        headers = self.http_manager.build_headers()
-
-        self.logger.info("准备发送聊天请求 - URL: %s, 会话ID: %s", chat_url, request.conversation_id)
-        self.logger.debug("请求头: %s", headers)
+        self.logger.info("准备发送聊天请求 - 会话ID: %s", request.conversation_id)
         self.logger.debug("请求内容: %s", request.to_dict())
 
+        recording = begin_recording(STREAM_CHAT, Backend.EULERINTELLI.value, prompt=request.question)
+        cursor = HermesStreamCursor()
         try:
-            async with client.stream(
-                "POST",
-                chat_url,
-                json=request.to_dict(),
-                headers=headers,
-            ) as response:
-                self.logger.info("收到聊天响应 - 状态码: %d", response.status_code)
-                await self._validate_chat_response(response)
-                async for text in self._process_stream_events(response):
+            async with aclosing(self._resumable_lines(request.to_dict(), cursor, "chat")) as lines:
+                async for text in self._process_stream_events(lines, recording, cursor):
                     yield text
 
         except httpx.RequestError as e:
@@ -351,6 +388,73 @@ class HermesChatClient(LLMClientBase):
         except (json.JSONDecodeError, KeyError, ValueError) as e:
             raise HermesAPIError(500, f"Data parsing error: {e!s}") from e
 
+    async def _resumable_lines(
+        self,
+        request_data: dict[str, Any],
+        cursor: HermesStreamCursor,
+        name: str,
+    ) -> AsyncGenerator[str, None]:
+        """
+        读取 /api/chat 的 SSE 数据行，网络中断时自动重连
+
+        已知任务ID时，连接中断后按指数退避重新请求 /api/chat，只携带任务ID（不重复提交问题或 MCP 参数），
+        并通过 Last-Event-ID 请求头告知服务端最后收到的事件；服务端从头重新发送的事件由 cursor 去重。
+        连续重连 STREAM_RESUME_ATTEMPTS 次都没有收到新事件、或者中断前还没有收到任务ID时，抛出原始的网络异常。
+
+        Args:
+            request_data: 首次请求的内容
+            cursor: 流式响应的读取位置，由 _process_stream_events 更新
+            name: 日志与看门狗中使用的流名称
+
+        """
+        attempts = 0
+        while True:
+            accepted = cursor.accepted
+            try:
+                async with aclosing(self._open_chat_lines(request_data, name, cursor.last_event_id)) as lines:
+                    async for line in lines:
+                        yield line
+                        # 收到新的事件后重新计算重连次数，服务端只重复发送旧事件时不重新计数
+                        if cursor.accepted != accepted:
+                            attempts = 0
+            except httpx.TransportError as e:
+                if not cursor.task_id or attempts >= STREAM_RESUME_ATTEMPTS:
+                    raise
+                delay = min(STREAM_RESUME_DELAY * 2**attempts, STREAM_RESUME_MAX_DELAY)
+                attempts += 1
+                self.logger.warning(
+                    "流 %s 连接中断，%.1f 秒后第 %d 次重连 - 任务ID: %s, 最后事件ID: %s, 错误: %s",
+                    name,
+                    delay,
+                    attempts,
+                    cursor.task_id,
+                    cursor.last_event_id or "无",
+                    e,
+                )
+                await asyncio.sleep(delay)
+                request_data = {"taskId": cursor.task_id}
+            else:
+                return
+
+    async def _open_chat_lines(
+        self,
+        request_data: dict[str, Any],
+        name: str,
+        last_event_id: str = "",
+    ) -> AsyncGenerator[str, None]:
+        """发送一次 /api/chat 请求并逐行读取响应"""
+        client = await self.http_manager.get_client()
+        chat_url = urljoin(self.http_manager.base_url, "/api/chat")
+        headers = self.http_manager.build_headers({"Last-Event-ID": last_event_id} if last_event_id else None)
+        self.logger.debug("请求头: %s", headers)
+
+        async with client.stream("POST", chat_url, json=request_data, headers=headers) as response:
+            self.logger.info("收到流 %s 的响应 - 状态码: %d", name, response.status_code)
+            await self._validate_chat_response(response)
+            async with aclosing(self._watch_stream(response.aiter_lines(), name)) as lines:
+                async for line in lines:
+                    yield line
+
     async def _validate_chat_response(self, response: httpx.Response) -> None:
         """验证聊天响应状态"""
         if response.status_code != HTTP_OK:
@@ -360,17 +464,34 @@ class HermesChatClient(LLMClientBase):
                 error_text.decode("utf-8"),
             )
 
-    async def _process_stream_events(self, response: httpx.Response) -> AsyncGenerator[str, None]:
-        """处理流式响应事件"""
+    async def _process_stream_events(
+        self,
+        lines: AsyncIterator[str],
+        recording: StreamRecording | None = None,
+        cursor: HermesStreamCursor | None = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        处理流式响应事件
+
+        Args:
+            lines: SSE 数据行
+            recording: 开启录制时的录制句柄，原始数据行在解析前写入录制文件
+            cursor: 流式响应的读取位置，用于断线重连与事件去重
+
+        """
+        cursor = cursor or HermesStreamCursor()
+        self._response_complete = False
         has_content = False
         event_count = 0
         has_error_message = False
 
         self.logger.info("开始处理流式响应事件")
 
+        lines = _recorded(lines, recording)
+
         try:
-            async for line in response.aiter_lines():
-                event = self._parse_stream_line(line)
+            async for line in lines:
+                event = self._parse_stream_line(line, cursor)
                 if event is None:
                     continue
 
@@ -401,6 +522,10 @@ class HermesChatClient(LLMClientBase):
 
             self.logger.info("流式响应处理完成 - 事件数量: %d, 有内容: %s", event_count, has_content)
 
+        except StreamIdleError:
+            # 连接已由看门狗释放，服务端任务可能仍在运行，在后台通知其停止
+            self._stop_in_background()
+            raise
         except Exception:
             self.logger.exception("处理流式响应事件时出错")
             self._cleanup_task_id("发生异常")
@@ -409,9 +534,16 @@ class HermesChatClient(LLMClientBase):
         # 只有在没有内容且没有错误消息的情况下才显示无内容消息
         if not has_content and not has_error_message:
             yield self.stream_processor.get_no_content_message(event_count)
+            return
+        self._response_complete = not has_error_message
 
-    def _parse_stream_line(self, line: str) -> HermesStreamEvent | None:
-        """解析单行流式响应"""
+    def _watch_stream(self, lines: AsyncIterator[str], name: str) -> AsyncGenerator[str, None]:
+        """为流式响应启动空闲看门狗"""
+        watchdog = StreamWatchdog(self.stream_idle_timeout, name=name, is_heartbeat=_is_heartbeat_line)
+        return watchdog.watch(lines)
+
+    def _parse_stream_line(self, line: str, cursor: HermesStreamCursor) -> HermesStreamEvent | None:
+        """解析单行流式响应，重连后重复收到的事件返回 None"""
         stripped_line = line.strip()
         if not stripped_line:
             return None
@@ -420,6 +552,9 @@ class HermesChatClient(LLMClientBase):
         event = HermesStreamEvent.from_line(stripped_line)
         if event is None:
             self.logger.warning("无法解析 SSE 事件")
+        elif not cursor.accept(event):
+            self.logger.debug("跳过重复的事件: %s", event.get_event_id())
+            return None
         return event
 
     def _handle_task_id(self, event: HermesStreamEvent) -> None:
@@ -459,6 +594,23 @@ class HermesChatClient(LLMClientBase):
                 self.stream_processor.log_text_content(text_content)
                 yield text_content
 
+    def _stop_in_background(self) -> None:
+        """在后台停止当前会话，立即清理本地的任务ID"""
+        if self._conversation_manager is None:
+            return
+        task = asyncio.create_task(self._conversation_manager.stop_conversation_with_retry(self.current_task_id))
+        self._pending_stops.add(task)
+        task.add_done_callback(self._pending_stops.discard)
+        self._cleanup_task_id("中断请求")
+
+    async def _wait_pending_stops(self) -> None:
+        """等待后台停止请求完成，最多等待 PENDING_STOP_TIMEOUT 秒"""
+        if not self._pending_stops:
+            return
+        _done, pending = await asyncio.wait(set(self._pending_stops), timeout=PENDING_STOP_TIMEOUT)
+        if pending:
+            self.logger.warning("后台停止请求在 %.1f 秒内未完成，继续处理新的请求", PENDING_STOP_TIMEOUT)
+
     async def _stop(self) -> None:
         """停止当前会话"""
         if self._conversation_manager is not None:
@@ -478,3 +630,24 @@ class HermesChatClient(LLMClientBase):
     ) -> None:
         """异步上下文管理器出口"""
         await self.close()
+
+
+def _recorded(lines: AsyncIterator[str], recording: StreamRecording | None) -> AsyncIterator[str]:
+    """开启录制时在解析前将原始数据行写入录制文件"""
+    return lines if recording is None else _record_lines(lines, recording)
+
+
+async def _record_lines(lines: AsyncIterator[str], recording: StreamRecording) -> AsyncGenerator[str, None]:
+    """逐行录制原始数据"""
+    async for line in lines:
+        if line.strip():
+            recording.record(line)
+        yield line
+
+
+def _is_heartbeat_line(line: str) -> bool:
+    """判断 SSE 数据行是否为心跳，先做字符串检查以免重复解析每一行"""
+    if "heartbeat" not in line:
+        return False
+    event = HermesStreamEvent.from_line(line)
+    return event is not None and event.event_type == "heartbeat"
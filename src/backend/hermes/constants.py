@@ -6,3 +6,13 @@ HTTP_OK: int = 200
 # 分页常量
 ITEMS_PER_PAGE: int = 16  # 每页最多16项
 MAX_PAGES: int = 100  # 最多请求100页
+
+# 停止会话请求常量
+STOP_RETRY_ATTEMPTS: int = 3  # 后台停止请求的最大尝试次数
+STOP_RETRY_DELAY: float = 0.5  # 首次重试前的等待时间（秒），之后每次翻倍
+PENDING_STOP_TIMEOUT: float = 3.0  # 开始新请求前等待后台停止请求完成的最长时间（秒）
+
+# 流式响应断线续传常量
+STREAM_RESUME_ATTEMPTS: int = 5  # 连续重连的最大次数，重连后收到新事件即重新计数
+STREAM_RESUME_DELAY: float = 0.5  # 首次重连前的等待时间（秒），之后每次翻倍
+STREAM_RESUME_MAX_DELAY: float = 8.0  # 重连等待时间上限（秒）
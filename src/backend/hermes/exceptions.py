@@ -1,5 +1,7 @@
 """Hermes 异常定义"""
 
+import httpx
+
 
 class HermesAPIError(Exception):
     """Hermes API 错误异常"""
@@ -9,3 +11,18 @@ class HermesAPIError(Exception):
         self.status_code = status_code
         self.message = message
         super().__init__(f"HTTP {status_code}: {message}")
+
+
+class HermesCircuitOpenError(httpx.TransportError):
+    """
+    端点熔断中，请求未发出即失败
+
+    继承自 httpx.TransportError，调用方按网络错误处理即可，无需单独捕获。
+    """
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        """初始化熔断异常"""
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        """距离允许下一次探测请求的秒数"""
+        super().__init__(f"Circuit open for {endpoint}, retry after {retry_after:.1f}s")
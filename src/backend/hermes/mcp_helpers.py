@@ -6,10 +6,32 @@ MCP (Model Context Protocol) 相关常量定义
 
 from __future__ import annotations
 
+import functools
 import re
-from typing import ClassVar
+from typing import TYPE_CHECKING, ClassVar, TypeVar
 
-from i18n.manager import _
+from i18n.manager import _, memoize
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_T = TypeVar("_T")
+
+
+def _locale_cached(func: Callable[[], _T]) -> Callable[[], _T]:
+    """
+    缓存无参数的静态文本生成函数
+
+    结果按当前语言缓存，切换语言时由 i18n 模块清空，
+    避免每个 MCP 事件都重复查询翻译目录。
+    """
+    key = f"{__name__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper() -> _T:
+        return memoize(key, func)
+
+    return wrapper
 
 
 # MCP 状态标记
@@ -39,45 +61,65 @@ class MCPTextFragments:
     """MCP 状态文本片段常量"""
 
     @staticmethod
+    @_locale_cached
     def init_tool() -> str:
         """正在初始化工具"""
         return _("正在初始化工具")
 
     @staticmethod
+    @_locale_cached
     def tool_word() -> str:
         """工具"""
         return _("工具")
 
     @staticmethod
+    @_locale_cached
     def executing() -> str:
         """正在执行..."""
         return _("正在执行...")
 
     @staticmethod
+    @_locale_cached
     def completed() -> str:
         """执行完成"""
         return _("执行完成")
 
     @staticmethod
+    @_locale_cached
     def cancelled() -> str:
         """已取消"""
         return _("已取消")
 
     @staticmethod
+    @_locale_cached
     def failed() -> str:
         """执行失败"""
         return _("执行失败")
 
     @staticmethod
+    @_locale_cached
     def waiting_confirm() -> str:
         """等待用户确认执行工具"""
         return _("**等待用户确认执行工具**")
 
     @staticmethod
+    @_locale_cached
     def waiting_param() -> str:
         """等待用户输入参数"""
         return _("**等待用户输入参数**")
 
+    @staticmethod
+    @_locale_cached
+    def name_label() -> str:
+        """名称"""
+        return _("名称")
+
+    @staticmethod
+    @_locale_cached
+    def explanation_label() -> str:
+        """说明"""
+        return _("说明")
+
 
 # MCP 完整状态消息模板
 class MCPMessageTemplates:
@@ -85,56 +127,67 @@ class MCPMessageTemplates:
 
     # 基础状态指示符（用于识别）- 使用函数动态生成
     @staticmethod
+    @_locale_cached
     def init_indicator() -> str:
         """初始化指示符"""
         return f"{MCPEmojis.INIT} {MCPTextFragments.init_tool()}"
 
     @staticmethod
+    @_locale_cached
     def input_indicator() -> str:
         """输入指示符"""
         return f"{MCPEmojis.INPUT} {MCPTextFragments.tool_word()}"
 
     @staticmethod
+    @_locale_cached
     def executing_indicator() -> str:
         """执行中指示符"""
         return MCPTextFragments.executing()
 
     @staticmethod
+    @_locale_cached
     def output_indicator() -> str:
         """输出指示符"""
         return f"{MCPEmojis.OUTPUT} {MCPTextFragments.tool_word()}"
 
     @staticmethod
+    @_locale_cached
     def completed_indicator() -> str:
         """完成指示符"""
         return MCPTextFragments.completed()
 
     @staticmethod
+    @_locale_cached
     def cancel_indicator() -> str:
         """取消指示符"""
         return f"{MCPEmojis.CANCEL} {MCPTextFragments.tool_word()}"
 
     @staticmethod
+    @_locale_cached
     def cancelled_indicator() -> str:
         """已取消指示符"""
         return MCPTextFragments.cancelled()
 
     @staticmethod
+    @_locale_cached
     def error_indicator() -> str:
         """错误指示符"""
         return f"{MCPEmojis.ERROR} {MCPTextFragments.tool_word()}"
 
     @staticmethod
+    @_locale_cached
     def failed_indicator() -> str:
         """失败指示符"""
         return MCPTextFragments.failed()
 
     @staticmethod
+    @_locale_cached
     def waiting_start_indicator() -> str:
         """等待确认指示符"""
         return f"{MCPEmojis.WAITING_START} {MCPTextFragments.waiting_confirm()}"
 
     @staticmethod
+    @_locale_cached
     def waiting_param_indicator() -> str:
         """等待参数指示符"""
         return f"{MCPEmojis.WAITING_PARAM} {MCPTextFragments.waiting_param()}"
@@ -168,8 +221,8 @@ class MCPMessageTemplates:
     @staticmethod
     def waiting_start_message(tool_name: str, risk_info: str, reason: str) -> str:
         """生成等待用户确认消息"""
-        tool_name_label = _("名称")
-        explanation_label = _("说明")
+        tool_name_label = MCPTextFragments.name_label()
+        explanation_label = MCPTextFragments.explanation_label()
         return (
             f"\n{MCPEmojis.WAITING_START} {MCPTextFragments.waiting_confirm()}\n\n"
             f"{MCPEmojis.INIT} {MCPTextFragments.tool_word()}{tool_name_label}: "
@@ -179,8 +232,8 @@ class MCPMessageTemplates:
     @staticmethod
     def waiting_param_message(tool_name: str, message_content: str) -> str:
         """生成等待参数输入消息"""
-        tool_name_label = _("名称")
-        explanation_label = _("说明")
+        tool_name_label = MCPTextFragments.name_label()
+        explanation_label = MCPTextFragments.explanation_label()
         return (
             f"\n{MCPEmojis.WAITING_PARAM} {MCPTextFragments.waiting_param()}\n\n"
             f"{MCPEmojis.INIT} {MCPTextFragments.tool_word()}{tool_name_label}: "
@@ -194,9 +247,10 @@ class MCPIndicators:
 
     # 所有状态指示符（用于通用检测）- 使用函数动态生成
     @staticmethod
-    def all_indicators() -> list[str]:
+    @_locale_cached
+    def all_indicators() -> tuple[str, ...]:
         """获取所有状态指示符"""
-        return [
+        return (
             MCPMessageTemplates.init_indicator(),
             MCPMessageTemplates.input_indicator(),
             MCPMessageTemplates.executing_indicator(),
@@ -208,20 +262,21 @@ class MCPIndicators:
             MCPMessageTemplates.cancelled_indicator(),
             MCPMessageTemplates.error_indicator(),
             MCPMessageTemplates.failed_indicator(),
-        ]
+        )
 
     # 最终状态指示符（用于检测工具执行结束）
     @staticmethod
-    def final_indicators() -> list[str]:
+    @_locale_cached
+    def final_indicators() -> tuple[str, ...]:
         """获取最终状态指示符"""
-        return [
+        return (
             MCPMessageTemplates.output_indicator(),
             MCPMessageTemplates.completed_indicator(),
             MCPMessageTemplates.cancel_indicator(),
             MCPMessageTemplates.cancelled_indicator(),
             MCPMessageTemplates.error_indicator(),
             MCPMessageTemplates.failed_indicator(),
-        ]
+        )
 
     # 进度状态指示符（用于UI快速检测）
     PROGRESS_INDICATORS: ClassVar[list[str]] = [
@@ -282,15 +337,21 @@ class MCPRiskLevels:
     @classmethod
     def get_risk_display(cls, risk_level: str) -> str:
         """获取风险级别的显示文本"""
-        risk_display_map = {
-            cls.LOW: f"🟢 {_('低风险')}",
-            cls.MEDIUM: f"🟡 {_('中等风险')}",
-            cls.HIGH: f"🔴 {_('高风险')}",
-            cls.UNKNOWN: f"⚪ {_('未知风险')}",
-        }
+        risk_display_map = _risk_display_map()
         return risk_display_map.get(risk_level, risk_display_map[cls.UNKNOWN])
 
 
+@_locale_cached
+def _risk_display_map() -> dict[str, str]:
+    """生成当前语言下的风险级别显示映射"""
+    return {
+        MCPRiskLevels.LOW: f"🟢 {_('低风险')}",
+        MCPRiskLevels.MEDIUM: f"🟡 {_('中等风险')}",
+        MCPRiskLevels.HIGH: f"🔴 {_('高风险')}",
+        MCPRiskLevels.UNKNOWN: f"⚪ {_('未知风险')}",
+    }
+
+
 # 工具函数
 def is_mcp_message(content: str) -> bool:
     """检查内容是否为 MCP 状态消息"""
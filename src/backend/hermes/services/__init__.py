@@ -2,7 +2,7 @@
 
 from .agent import HermesAgentManager
 from .conversation import HermesConversationManager
-from .http import HermesHttpManager
+from .http import HermesHttpManager, RequestPolicy
 from .model import HermesModelManager
 from .user import HermesUserManager
 
@@ -12,4 +12,5 @@ __all__ = [
     "HermesHttpManager",
     "HermesModelManager",
     "HermesUserManager",
+    "RequestPolicy",
 ]
@@ -5,7 +5,6 @@ from __future__ import annotations
 import json
 import time
 from typing import TYPE_CHECKING
-from urllib.parse import urljoin
 
 import httpx
 
@@ -122,16 +121,12 @@ class HermesAgentManager:
             httpx.InvalidURL: URL错误
 
         """
-        client = await self.http_manager.get_client()
-        app_url = urljoin(self.http_manager.base_url, "/api/app")
-
         # 构建查询参数
         params = {
             "page": page,  # 当前页码
         }
 
-        headers = self.http_manager.build_headers()
-        response = await client.get(app_url, headers=headers, params=params)
+        response = await self.http_manager.request("GET", "/api/app", hedge=True, params=params)
 
         # 处理HTTP错误状态
         if response.status_code != HTTP_OK:
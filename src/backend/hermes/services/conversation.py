@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import time
 from typing import TYPE_CHECKING
@@ -9,7 +10,7 @@ from urllib.parse import urljoin
 
 import httpx
 
-from backend.hermes.constants import HTTP_OK
+from backend.hermes.constants import HTTP_OK, STOP_RETRY_ATTEMPTS, STOP_RETRY_DELAY
 from backend.hermes.exceptions import HermesAPIError
 from log.manager import get_logger, log_api_request, log_exception
 
@@ -84,15 +85,19 @@ class HermesConversationManager:
             return
 
         try:
-            stop_url = urljoin(self.http_manager.base_url, "/api/stop")
-            headers = self.http_manager.build_headers()
-
             # 构建请求参数
             params = {}
             if task_id:
                 params["taskId"] = task_id
 
-            response = await self.http_manager.client.post(stop_url, headers=headers, params=params)
+            # 停止请求是幂等的，重试由 stop_conversation_with_retry 按更长的间隔进行
+            response = await self.http_manager.request(
+                "POST",
+                "/api/stop",
+                idempotent=True,
+                max_attempts=1,
+                params=params,
+            )
 
             if response.status_code != HTTP_OK:
                 error_text = await response.aread()
@@ -102,6 +107,40 @@ class HermesConversationManager:
             log_exception(self.logger, "停止会话请求失败", e)
             raise HermesAPIError(500, f"Failed to stop conversation: {e!s}") from e
 
+    async def stop_conversation_with_retry(
+        self,
+        task_id: str = "",
+        *,
+        attempts: int = STOP_RETRY_ATTEMPTS,
+        delay: float = STOP_RETRY_DELAY,
+    ) -> bool:
+        """
+        停止会话，失败时按指数退避重试
+
+        用于中断后在后台通知服务端停止任务，失败不会抛出异常。
+
+        Args:
+            task_id: 可选的任务ID
+            attempts: 最大尝试次数
+            delay: 首次重试前的等待时间（秒），之后每次翻倍
+
+        Returns:
+            bool: 是否成功停止
+
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                await self.stop_conversation(task_id)
+            except HermesAPIError as e:
+                self.logger.warning("停止会话失败 (%d/%d) - 任务ID: %s, 错误: %s", attempt, attempts, task_id, e)
+            else:
+                self.logger.info("已停止会话 - 任务ID: %s, 尝试次数: %d", task_id, attempt)
+                return True
+            if attempt < attempts:
+                await asyncio.sleep(delay * 2 ** (attempt - 1))
+        self.logger.error("多次尝试后仍未能停止会话 - 任务ID: %s", task_id)
+        return False
+
     async def _create_conversation(self, llm_id: str = "") -> str:
         """
         创建新的会话并返回 conversationId
@@ -119,7 +158,6 @@ class HermesConversationManager:
         start_time = time.time()
         self.logger.info("开始创建 Hermes 会话 - LLM ID: %s", llm_id or "默认")
 
-        client = await self.http_manager.get_client()
         conversation_url = urljoin(self.http_manager.base_url, "/api/conversation")
 
         # 构建请求参数
@@ -127,14 +165,13 @@ class HermesConversationManager:
         if llm_id:
             params["llm_id"] = llm_id
 
-        headers = self.http_manager.build_headers()
-
         try:
-            response = await client.post(
-                conversation_url,
+            # 创建会话不是幂等的，只在请求确定未发出时重试
+            response = await self.http_manager.request(
+                "POST",
+                "/api/conversation",
                 params=params,
                 json={},  # 空的 JSON 体
-                headers=headers,
             )
 
             duration = time.time() - start_time
@@ -244,15 +281,15 @@ class HermesConversationManager:
         start_time = time.time()
         self.logger.info("开始请求 Hermes 会话列表 API")
 
-        client = await self.http_manager.get_client()
         conversation_url = urljoin(self.http_manager.base_url, "/api/conversation")
 
-        headers = self.http_manager.build_headers({
-            "Accept": "application/json, text/plain, */*",
-        })
-
         try:
-            response = await client.get(conversation_url, headers=headers)
+            response = await self.http_manager.request(
+                "GET",
+                "/api/conversation",
+                hedge=True,
+                headers={"Accept": "application/json, text/plain, */*"},
+            )
             duration = time.time() - start_time
 
             if response.status_code != HTTP_OK:
@@ -379,15 +416,16 @@ class HermesConversationManager:
         start_time = time.time()
         self.logger.info("检查对话是否为空 - ID: %s", conversation_id)
 
-        client = await self.http_manager.get_client()
         record_url = urljoin(self.http_manager.base_url, f"/api/record/{conversation_id}")
 
-        headers = self.http_manager.build_headers({
-            "Accept": "application/json, text/plain, */*",
-        })
-
         try:
-            response = await client.get(record_url, headers=headers)
+            response = await self.http_manager.request(
+                "GET",
+                f"/api/record/{conversation_id}",
+                endpoint="GET /api/record",
+                hedge=True,
+                headers={"Accept": "application/json, text/plain, */*"},
+            )
             duration = time.time() - start_time
 
             if response.status_code != HTTP_OK:
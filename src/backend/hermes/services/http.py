@@ -1,23 +1,162 @@
-"""Hermes HTTP 客户端基础管理器"""
+"""
+Hermes HTTP 客户端基础管理器
+
+控制面请求（会话、智能体、模型、用户接口）统一通过 request 发出，由请求策略负责：
+
+- 按幂等性重试：幂等请求在网络错误和 502/503/504 时重试；非幂等请求只在请求确定未发出
+  （连接失败）时重试，避免服务端重复执行
+- 指数退避加全抖动，避免后端重启后所有客户端同时重试
+- 按端点熔断：连续失败达到阈值后在冷却期内直接失败，冷却期结束后放行一个探测请求
+- 可选的对冲 GET：请求在历史延迟分位数内未返回时再发出一个相同请求，取先返回的结果
+- 按端点统计请求数、重试、对冲、熔断与延迟
+
+流式聊天请求不经过这里，其断线续传由 HermesChatClient 负责。
+"""
 
 from __future__ import annotations
 
-from urllib.parse import urlparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urljoin, urlparse
 
 import httpx
 
+from backend.hermes.exceptions import HermesCircuitOpenError
+from backend.http_pool import get_http_client
+from backend.routing import EndpointRouter
 from log.manager import get_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+# 默认视为幂等的请求方法
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# 幂等请求可重试的响应状态码（后端重启或网关暂不可用）
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+# 计入熔断失败的最小状态码
+SERVER_ERROR_STATUS = 500
+# 请求确定未发送到服务端的网络错误，非幂等请求也可以安全重试
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """控制面请求策略"""
+
+    max_attempts: int = 3
+    """单次调用的最大尝试次数（含首次请求）"""
+    backoff_base: float = 0.2
+    """首次重试的退避上限（秒），之后每次翻倍"""
+    backoff_max: float = 2.0
+    """退避上限（秒）"""
+    failure_threshold: int = 5
+    """连续失败多少次后熔断"""
+    reset_timeout: float = 10.0
+    """熔断冷却时间（秒），之后放行一个探测请求"""
+    hedge_delay: float = 1.0
+    """延迟样本不足时发出对冲请求前的等待时间（秒）"""
+    hedge_percentile: float = 0.9
+    """根据该延迟分位数计算对冲等待时间"""
+    timeout: httpx.Timeout = field(default_factory=lambda: httpx.Timeout(30.0))
+    """控制面请求的超时，共享客户端为流式请求配置了无限读取超时"""
+
+
+class CircuitBreaker:
+    """单个端点的熔断器：closed -> open -> half_open -> closed/open"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        """初始化熔断器"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        """距离允许探测请求的秒数"""
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """判断是否允许发出请求，冷却期结束后只放行一个探测请求"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self.retry_after() <= 0:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """记录成功，关闭熔断器"""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """记录失败，返回本次失败是否使熔断器打开"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+            return True
+        return False
+
+
+@dataclass
+class EndpointMetrics:
+    """单个端点的请求统计"""
+
+    calls: int = 0
+    """调用次数（一次调用可能包含多次尝试）"""
+    retries: int = 0
+    hedged: int = 0
+    """发出对冲请求的次数"""
+    hedge_wins: int = 0
+    """对冲请求先返回的次数"""
+    rejected: int = 0
+    """熔断期间直接失败的次数"""
+    circuit_opens: int = 0
+
+
+class _EndpointState:
+    """端点的熔断器、延迟统计与计数"""
+
+    def __init__(self, key: str, policy: RequestPolicy) -> None:
+        self.key = key
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        # 复用路由器的 EWMA 延迟、错误率与分位数计算
+        self.latency = EndpointRouter(
+            [key],
+            hedge_percentile=policy.hedge_percentile,
+            default_hedge_delay=policy.hedge_delay,
+        )
+        self.metrics = EndpointMetrics()
+
 
 class HermesHttpManager:
     """Hermes HTTP 客户端管理器"""
 
-    def __init__(self, base_url: str, auth_token: str = "") -> None:
+    def __init__(self, base_url: str, auth_token: str = "", *, policy: RequestPolicy | None = None) -> None:
         """初始化 HTTP 管理器"""
         self.logger = get_logger(__name__)
         self.base_url = base_url.rstrip("/")
         self.auth_token = auth_token
+        self.policy = policy or RequestPolicy()
         self.client: httpx.AsyncClient | None = None
+        self._endpoints: dict[str, _EndpointState] = {}
 
     def get_host_header(self) -> str:
         """
@@ -31,29 +170,19 @@ class HermesHttpManager:
         return parsed_url.netloc
 
     async def get_client(self) -> httpx.AsyncClient:
-        """获取或创建 HTTP 客户端"""
+        """获取共享的 HTTP 长连接客户端"""
         if self.client is None or self.client.is_closed:
-            headers = {
-                "Accept": "text/event-stream",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive",
-                "Content-Type": "application/json; charset=UTF-8",
-            }
-            if self.auth_token:
-                headers["Authorization"] = f"Bearer {self.auth_token}"
-
-            timeout = httpx.Timeout(
-                connect=30.0,  # 连接超时，允许30秒建立连接
-                read=None,  # 读取超时，无限制以支持超长时间SSE流
-                write=30.0,  # 写入超时
-                pool=30.0,  # 连接池超时
-            )
-            self.client = httpx.AsyncClient(headers=headers, timeout=timeout)
+            self.client = get_http_client(self.base_url, profile="stream")
         return self.client
 
     def build_headers(self, extra_headers: dict[str, str] | None = None) -> dict[str, str]:
         """构建请求的 HTTP 头部"""
+        # 共享客户端不携带默认头部，因此在每次请求时补齐
         headers = {
+            "Accept": "text/event-stream",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Connection": "keep-alive",
+            "Content-Type": "application/json; charset=UTF-8",
             "Host": self.get_host_header(),
         }
         if self.auth_token:
@@ -64,8 +193,197 @@ class HermesHttpManager:
 
         return headers
 
+    async def request(  # noqa: PLR0913
+        self,
+        method: str,
+        path: str,
+        *,
+        endpoint: str = "",
+        idempotent: bool | None = None,
+        hedge: bool = False,
+        max_attempts: int | None = None,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        按请求策略发出控制面请求
+
+        Args:
+            method: 请求方法
+            path: 请求路径，相对于 base_url
+            endpoint: 统计与熔断使用的端点名，路径包含 ID 时应指定，默认为 "方法 路径"
+            idempotent: 请求是否幂等，默认按请求方法判断
+            hedge: 是否对 GET 请求启用对冲
+            max_attempts: 最大尝试次数，默认使用策略配置
+            headers: 额外的请求头
+            **kwargs: 传递给 httpx 的其他参数（params、json 等）
+
+        Returns:
+            httpx.Response: 最后一次请求的响应，状态码由调用方判断
+
+        Raises:
+            HermesCircuitOpenError: 端点熔断中
+            httpx.HTTPError: 重试耗尽后的网络错误
+
+        """
+        method = method.upper()
+        state = self._endpoint_state(endpoint or f"{method} {path}")
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = max_attempts or self.policy.max_attempts
+        url = urljoin(self.base_url, path)
+        kwargs.setdefault("timeout", self.policy.timeout)
+
+        async def send() -> httpx.Response:
+            client = await self.get_client()
+            return await client.request(method, url, headers=self.build_headers(headers), **kwargs)
+
+        state.metrics.calls += 1
+        attempt = 1
+        while True:
+            self._check_circuit(state)
+            try:
+                response = await self._send_once(state, send, hedge=hedge and method == "GET")
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, NOT_SENT_ERRORS)
+                if not retryable or attempt >= attempts or state.breaker.state != CircuitBreaker.CLOSED:
+                    raise
+                self.logger.warning("%s 请求失败 (%d/%d)，准备重试: %s", state.key, attempt, attempts, e)
+            else:
+                if not (
+                    idempotent
+                    and response.status_code in RETRYABLE_STATUS_CODES
+                    and attempt < attempts
+                    and state.breaker.state == CircuitBreaker.CLOSED
+                ):
+                    return response
+                self.logger.warning(
+                    "%s 返回 %d (%d/%d)，准备重试",
+                    state.key,
+                    response.status_code,
+                    attempt,
+                    attempts,
+                )
+                await response.aclose()
+
+            state.metrics.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def get_endpoint_stats(self) -> list[dict[str, Any]]:
+        """获取各控制面端点的请求统计"""
+        stats = []
+        for state in self._endpoints.values():
+            latency = state.latency.get_stats()[0]
+            stats.append({
+                "endpoint": state.key,
+                "state": state.breaker.state,
+                "requests": latency["requests"],
+                "errors": latency["errors"],
+                "error_rate": latency["error_rate"],
+                "ewma_latency": latency["ewma_ttft"],
+                "hedge_delay": state.latency.hedge_delay(state.key),
+                "calls": state.metrics.calls,
+                "retries": state.metrics.retries,
+                "hedged": state.metrics.hedged,
+                "hedge_wins": state.metrics.hedge_wins,
+                "rejected": state.metrics.rejected,
+                "circuit_opens": state.metrics.circuit_opens,
+            })
+        return stats
+
     async def close(self) -> None:
-        """关闭 HTTP 客户端"""
-        if self.client and not self.client.is_closed:
-            await self.client.aclose()
-            self.logger.info("HTTP 客户端已关闭")
+        """释放 HTTP 客户端引用，底层连接由共享注册表在退出时统一关闭"""
+        if self.client is not None:
+            self.client = None
+            self.logger.info("HTTP 客户端已释放")
+
+    def _endpoint_state(self, key: str) -> _EndpointState:
+        """获取端点状态，不存在时创建"""
+        state = self._endpoints.get(key)
+        if state is None:
+            state = self._endpoints[key] = _EndpointState(key, self.policy)
+        return state
+
+    def _check_circuit(self, state: _EndpointState) -> None:
+        """端点熔断中时直接失败"""
+        if state.breaker.allow():
+            return
+        state.metrics.rejected += 1
+        retry_after = state.breaker.retry_after()
+        self.logger.debug("%s 熔断中，%.1f 秒后允许探测", state.key, retry_after)
+        raise HermesCircuitOpenError(state.key, retry_after)
+
+    async def _send_once(
+        self,
+        state: _EndpointState,
+        send: Callable[[], Awaitable[httpx.Response]],
+        *,
+        hedge: bool,
+    ) -> httpx.Response:
+        """发出一次（可能对冲的）请求，并记录延迟与熔断状态"""
+        started = time.monotonic()
+        try:
+            response = await (self._send_hedged(state, send) if hedge else send())
+        except httpx.TransportError:
+            self._record_failure(state)
+            raise
+        except BaseException:
+            # 取消等非网络原因不计入熔断，但需要释放探测名额
+            if state.breaker.state == CircuitBreaker.HALF_OPEN:
+                state.breaker.state = CircuitBreaker.OPEN
+            raise
+
+        if response.status_code >= SERVER_ERROR_STATUS:
+            self._record_failure(state)
+        else:
+            state.breaker.record_success()
+            state.latency.record_success(state.key, time.monotonic() - started)
+        return response
+
+    async def _send_hedged(
+        self,
+        state: _EndpointState,
+        send: Callable[[], Awaitable[httpx.Response]],
+    ) -> httpx.Response:
+        """首个请求在对冲等待时间内未返回时再发出一个请求，返回先成功的结果"""
+        primary = asyncio.create_task(send())
+        done, _ = await asyncio.wait({primary}, timeout=state.latency.hedge_delay(state.key))
+        if done:
+            return primary.result()
+
+        state.metrics.hedged += 1
+        self.logger.debug("%s 超过对冲等待时间仍未返回，发出对冲请求", state.key)
+        hedged = asyncio.create_task(send())
+        pending = {primary, hedged}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedged:
+                            state.metrics.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error  # type: ignore[misc]
+
+    def _record_failure(self, state: _EndpointState) -> None:
+        """记录失败，熔断器打开时记录日志"""
+        state.latency.record_error(state.key)
+        if state.breaker.record_failure():
+            state.metrics.circuit_opens += 1
+            self.logger.warning(
+                "%s 连续失败 %d 次，熔断 %.0f 秒",
+                state.key,
+                state.breaker.consecutive_failures,
+                state.breaker.reset_timeout,
+            )
+
+    def _backoff(self, attempt: int) -> float:
+        """计算第 attempt 次失败后的退避时间（全抖动）"""
+        ceiling = min(self.policy.backoff_max, self.policy.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)  # noqa: S311
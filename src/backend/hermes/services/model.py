@@ -35,11 +35,8 @@ class HermesModelManager:
         self.logger.info("开始请求 Hermes 模型列表 API")
 
         try:
-            client = await self.http_manager.get_client()
             llm_url = urljoin(self.http_manager.base_url, "/api/llm")
-
-            headers = self.http_manager.build_headers()
-            response = await client.get(llm_url, headers=headers)
+            response = await self.http_manager.request("GET", "/api/llm", hedge=True)
 
             duration = time.time() - start_time
 
@@ -48,11 +48,8 @@ class HermesUserManager:
         self.logger.info("开始请求 Hermes 用户信息 API")
 
         try:
-            client = await self.http_manager.get_client()
             user_url = urljoin(self.http_manager.base_url, "/api/auth/user")
-            headers = self.http_manager.build_headers()
-
-            response = await client.get(user_url, headers=headers)
+            response = await self.http_manager.request("GET", "/api/auth/user", hedge=True)
 
             duration = time.time() - start_time
             log_api_request(
@@ -123,20 +120,21 @@ class HermesUserManager:
         self.logger.info("开始请求 Hermes 用户设置更新 API - auto_execute: %s", auto_execute)
 
         try:
-            client = await self.http_manager.get_client()
             user_url = urljoin(self.http_manager.base_url, "/api/user")
-            headers = self.http_manager.build_headers(
-                {
-                    "Content-Type": "application/json",
-                },
-            )
 
             # 构建请求体
             request_data = {
                 "autoExecute": auto_execute,
             }
 
-            response = await client.post(user_url, headers=headers, json=request_data)
+            # 设置为固定值，重复提交结果相同，可以安全重试
+            response = await self.http_manager.request(
+                "POST",
+                "/api/user",
+                idempotent=True,
+                headers={"Content-Type": "application/json"},
+                json=request_data,
+            )
 
             duration = time.time() - start_time
             log_api_request(
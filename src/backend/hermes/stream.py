@@ -18,8 +18,18 @@ from backend.hermes.mcp_helpers import (
 from log.manager import get_logger
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from typing import Any
 
+# 事件类型到状态消息生成函数的映射
+_STATUS_MESSAGE_BUILDERS: dict[str, Callable[[str], str]] = {
+    MCPEventTypes.STEP_INIT: MCPMessageTemplates.init_message,
+    MCPEventTypes.STEP_INPUT: MCPMessageTemplates.input_message,
+    MCPEventTypes.STEP_OUTPUT: MCPMessageTemplates.output_message,
+    MCPEventTypes.STEP_CANCEL: MCPMessageTemplates.cancel_message,
+    MCPEventTypes.STEP_ERROR: MCPMessageTemplates.error_message,
+}
+
 
 class HermesStreamEvent:
     """Hermes 流事件类"""
@@ -85,6 +95,10 @@ class HermesStreamEvent:
         """获取任务ID"""
         return self.data.get("taskId", "")
 
+    def get_event_id(self) -> str:
+        """获取事件ID，用于断线续传时定位已收到的事件"""
+        return str(self.data.get("id") or "")
+
     def get_content(self) -> dict[str, Any]:
         """获取内容部分"""
         return self.data.get("content", {})
@@ -105,6 +119,36 @@ class HermesStreamEvent:
         return self.event_type in flow_events
 
 
+class HermesStreamCursor:
+    """
+    流式响应的读取位置
+
+    记录任务ID与最后收到的事件ID，供断线重连时从中断处继续；服务端重新发送已收到的事件时，
+    按事件ID去重，避免重复渲染。
+    """
+
+    def __init__(self, task_id: str = "") -> None:
+        """初始化读取位置"""
+        self.task_id = task_id
+        self.last_event_id = ""
+        self.accepted = 0
+        """接受的事件数量，重连后该数量增长说明服务端发送了新的事件"""
+        self._seen_event_ids: set[str] = set()
+
+    def accept(self, event: HermesStreamEvent) -> bool:
+        """记录事件，已收到过的事件返回 False"""
+        event_id = event.get_event_id()
+        if event_id:
+            if event_id in self._seen_event_ids:
+                return False
+            self._seen_event_ids.add(event_id)
+            self.last_event_id = event_id
+        if not self.task_id:
+            self.task_id = event.get_task_id()
+        self.accepted += 1
+        return True
+
+
 class HermesStreamProcessor:
     """Hermes 流响应处理器"""
 
@@ -220,18 +264,11 @@ class HermesStreamProcessor:
         should_replace: bool,
     ) -> str | None:
         """格式化标准状态消息"""
-        # 定义事件类型到状态消息的映射
-        status_messages = {
-            MCPEventTypes.STEP_INIT: MCPMessageTemplates.init_message(step_name),
-            MCPEventTypes.STEP_INPUT: MCPMessageTemplates.input_message(step_name),
-            MCPEventTypes.STEP_OUTPUT: MCPMessageTemplates.output_message(step_name),
-            MCPEventTypes.STEP_CANCEL: MCPMessageTemplates.cancel_message(step_name),
-            MCPEventTypes.STEP_ERROR: MCPMessageTemplates.error_message(step_name),
-        }
-
-        base_message = status_messages.get(event_type)
-        if not base_message:
+        # 只生成当前事件类型对应的状态消息
+        message_builder = _STATUS_MESSAGE_BUILDERS.get(event_type)
+        if message_builder is None:
             return None
+        base_message = message_builder(step_name)
 
         # 定义进度消息类型
         progress_message_types = MCPEventTypes.PROGRESS_MESSAGE_EVENTS
@@ -0,0 +1,218 @@
+"""
+进程级共享 HTTP 客户端注册表
+
+按 (基础 URL, SSL 校验, 超时配置) 复用 httpx.AsyncClient，
+避免验证、部署和聊天流程中为每次请求重复建立 TCP/TLS 连接。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
+
+# 超时配置，请求级别的 timeout 参数仍可覆盖
+TIMEOUT_PROFILES: dict[str, httpx.Timeout] = {
+    "default": httpx.Timeout(10.0),
+    "health": httpx.Timeout(5.0),
+    "validation": httpx.Timeout(30.0),
+    # 读取超时无限制以支持超长时间 SSE 流
+    "stream": httpx.Timeout(connect=30.0, read=None, write=30.0, pool=30.0),
+}
+
+# 连接池限制
+POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+
+@dataclass(frozen=True)
+class ClientKey:
+    """共享客户端的索引键"""
+
+    origin: str
+    verify: bool
+    profile: str
+
+
+@dataclass
+class ClientStats:
+    """单个共享客户端的统计信息"""
+
+    created_at: float = field(default_factory=time.time)
+    leases: int = 0
+    """被获取的次数（含首次创建）"""
+    requests: int = 0
+    """通过该客户端发出的请求数"""
+
+
+class HttpClientRegistry:
+    """
+    共享 HTTP 客户端注册表
+
+    httpx.AsyncClient 的连接绑定在创建它的事件循环上，
+    因此注册表按事件循环分别保存客户端，事件循环销毁后对应客户端自动失效。
+    """
+
+    def __init__(self) -> None:
+        """初始化注册表"""
+        self.logger = get_logger(__name__)
+        self._clients: weakref.WeakKeyDictionary[AbstractEventLoop, dict[ClientKey, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._unbound_clients: dict[ClientKey, httpx.AsyncClient] = {}
+        self._stats: dict[tuple[int, ClientKey], ClientStats] = {}
+        self._created = 0
+        self._reused = 0
+        self._closed = 0
+
+    def get_client(
+        self,
+        base_url: str,
+        *,
+        verify: bool = True,
+        profile: str = "default",
+    ) -> httpx.AsyncClient:
+        """
+        获取共享的 HTTP 客户端
+
+        调用方不应关闭返回的客户端，连接由注册表统一管理。
+
+        Args:
+            base_url: 请求的目标地址，仅使用其 scheme://host:port 部分
+            verify: 是否校验 SSL 证书
+            profile: 超时配置名称，见 TIMEOUT_PROFILES
+
+        Returns:
+            httpx.AsyncClient: 启用长连接的共享客户端
+
+        """
+        if profile not in TIMEOUT_PROFILES:
+            msg = f"未知的超时配置: {profile}"
+            raise ValueError(msg)
+
+        key = ClientKey(origin=_origin_of(base_url), verify=verify, profile=profile)
+        clients = self._clients_for_current_loop()
+
+        client = clients.get(key)
+        stats_key = (id(clients), key)
+        if client is not None and not client.is_closed:
+            self._reused += 1
+            self._stats[stats_key].leases += 1
+            return client
+
+        stats = ClientStats(leases=1)
+        client = httpx.AsyncClient(
+            verify=verify,
+            timeout=TIMEOUT_PROFILES[profile],
+            limits=POOL_LIMITS,
+            event_hooks={"request": [self._make_request_hook(stats)]},
+        )
+        clients[key] = client
+        self._stats[stats_key] = stats
+        self._created += 1
+        self.logger.debug("创建共享 HTTP 客户端: %s (verify=%s, profile=%s)", key.origin, verify, profile)
+        return client
+
+    async def close_all(self) -> None:
+        """关闭当前事件循环中的所有共享客户端（应用退出时调用）"""
+        for clients in (self._clients_for_current_loop(), self._unbound_clients):
+            for key, client in list(clients.items()):
+                try:
+                    if not client.is_closed:
+                        await client.aclose()
+                        self._closed += 1
+                except (httpx.HTTPError, OSError, RuntimeError) as e:
+                    self.logger.warning("关闭共享 HTTP 客户端失败 %s: %s", key.origin, e)
+                finally:
+                    self._stats.pop((id(clients), key), None)
+            clients.clear()
+        self.logger.debug("已关闭所有共享 HTTP 客户端")
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        获取连接池统计信息
+
+        Returns:
+            dict[str, Any]: 包含创建/复用/关闭次数以及各客户端的请求统计
+
+        """
+        clients = [
+            {
+                "origin": key.origin,
+                "verify": key.verify,
+                "profile": key.profile,
+                "leases": stats.leases,
+                "requests": stats.requests,
+                "age": round(time.time() - stats.created_at, 3),
+            }
+            for (_loop_id, key), stats in self._stats.items()
+        ]
+        return {
+            "created": self._created,
+            "reused": self._reused,
+            "closed": self._closed,
+            "active": len(clients),
+            "clients": clients,
+        }
+
+    def _clients_for_current_loop(self) -> dict[ClientKey, httpx.AsyncClient]:
+        """获取当前事件循环对应的客户端表"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 在事件循环外创建的客户端会在首次请求时绑定到当时的事件循环
+            return self._unbound_clients
+        clients = self._clients.get(loop)
+        if clients is None:
+            clients = {}
+            self._clients[loop] = clients
+        return clients
+
+    @staticmethod
+    def _make_request_hook(stats: ClientStats) -> Any:
+        """创建统计请求数的事件钩子"""
+
+        async def on_request(_request: httpx.Request) -> None:
+            stats.requests += 1
+
+        return on_request
+
+
+def _origin_of(base_url: str) -> str:
+    """提取 URL 的 scheme://host:port 部分"""
+    parts = urlsplit(base_url)
+    if not parts.scheme or not parts.netloc:
+        return base_url.rstrip("/")
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+# 全局注册表实例
+_registry = HttpClientRegistry()
+
+
+def get_http_client(base_url: str, *, verify: bool = True, profile: str = "default") -> httpx.AsyncClient:
+    """获取共享的 HTTP 客户端，调用方不应关闭该客户端"""
+    return _registry.get_client(base_url, verify=verify, profile=profile)
+
+
+async def close_http_clients() -> None:
+    """关闭当前事件循环中的所有共享 HTTP 客户端"""
+    await _registry.close_all()
+
+
+def get_http_pool_stats() -> dict[str, Any]:
+    """获取共享 HTTP 客户端的统计信息"""
+    return _registry.get_stats()
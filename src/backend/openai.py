@@ -1,19 +1,30 @@
 """OpenAI 大模型客户端"""
 
+from __future__ import annotations
+
 import asyncio
+import json
 import time
-from collections.abc import AsyncGenerator
+from collections import deque
+from dataclasses import dataclass
 from importlib import import_module
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-import httpx
-from openai import AsyncOpenAI, OpenAIError
+from openai import DEFAULT_MAX_RETRIES, AsyncOpenAI, AsyncStream, OpenAIError
 
 from backend.base import LLMClientBase
+from backend.http_pool import get_http_client
+from backend.recording import STREAM_CHAT, begin_recording
+from backend.routing import EndpointRouter
+from config.model import Backend
 from log.manager import get_logger, log_api_request, log_exception
 
 if TYPE_CHECKING:
-    from openai.types.chat import ChatCompletionMessageParam
+    from collections.abc import AsyncGenerator, AsyncIterator
+
+    from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
+
+    from backend.recording import StreamRecording
 
 
 def _should_verify_ssl(*, verify_ssl: bool | None = None) -> bool:
@@ -25,25 +36,49 @@ def _should_verify_ssl(*, verify_ssl: bool | None = None) -> bool:
 class OpenAIClient(LLMClientBase):
     """OpenAI 大模型客户端"""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         base_url: str,
         model: str,
         api_key: str = "",
         *,
         verify_ssl: bool | None = None,
+        fallback_urls: list[str] | None = None,
+        hedge: bool = False,
+        router: EndpointRouter | None = None,
     ) -> None:
-        """初始化 OpenAI 大模型客户端"""
+        """
+        初始化 OpenAI 大模型客户端
+
+        Args:
+            base_url: 主端点地址
+            model: 模型名称
+            api_key: API 密钥，所有端点共用
+            verify_ssl: 是否校验 SSL 证书，None 表示按环境变量决定
+            fallback_urls: 备用端点地址，按延迟与错误率参与路由和故障转移
+            hedge: 首选端点未在分位数时限内返回首个 token 时，是否向下一个端点发出对冲请求
+            router: 自定义端点路由器，默认根据 base_url 与 fallback_urls 创建
+
+        """
         self.logger = get_logger(__name__)
 
         self.model = model
         self.base_url = base_url
         self.verify_ssl = _should_verify_ssl(verify_ssl=verify_ssl)
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,
-            http_client=httpx.AsyncClient(verify=self.verify_ssl),
-        )
+        self.hedge = hedge
+        self.router = router or EndpointRouter([base_url, *(fallback_urls or [])])
+        # 多端点时由路由层负责故障转移，不再在单个端点上重试
+        max_retries = DEFAULT_MAX_RETRIES if len(self.router.endpoints) == 1 else 0
+        self._clients = {
+            url: AsyncOpenAI(
+                api_key=api_key,
+                base_url=url,
+                max_retries=max_retries,
+                http_client=get_http_client(url, verify=self.verify_ssl, profile="stream"),
+            )
+            for url in self.router.endpoints
+        }
+        self.client = self._clients.get(base_url) or next(iter(self._clients.values()))
         self.logger.debug("OpenAIClient SSL 验证状态: %s", self.verify_ssl)
 
         # 添加历史记录管理
@@ -68,20 +103,19 @@ class OpenAIClient(LLMClientBase):
         user_message: ChatCompletionMessageParam = {"role": "user", "content": prompt}
         self._conversation_history.append(user_message)
 
+        endpoint = self.base_url
+        recording = begin_recording(STREAM_CHAT, Backend.OPENAI.value, prompt=prompt, model=self.model)
         try:
-            # 使用完整的对话历史记录
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=self._conversation_history,
-                stream=True,
-            )
+            # 使用完整的对话历史记录，按路由选择端点并等待首个 token
+            attempt = await self._open_stream()
+            endpoint = attempt.endpoint
 
             # 记录成功的API请求
             duration = time.time() - start_time
             log_api_request(
                 self.logger,
                 "POST",
-                f"{self.base_url}/chat/completions",
+                f"{endpoint}/chat/completions",
                 200,
                 duration,
                 model=self.model,
@@ -90,22 +124,26 @@ class OpenAIClient(LLMClientBase):
             )
 
             # 收集助手的完整回复
-            assistant_response = ""
+            assistant_response = attempt.first_content
             try:
-                async for chunk in response:
-                    content = chunk.choices[0].delta.content
+                if assistant_response:
+                    _record_content(recording, assistant_response)
+                    yield assistant_response
+                async for chunk in attempt.chunks:
+                    _record_chunk(recording, chunk)
+                    content = _chunk_content(chunk)
                     if content:
                         assistant_response += content
                         yield content
+                _record_done(recording)
             except asyncio.CancelledError:
                 self.logger.info("OpenAI 流式响应被中断")
                 # 如果被中断，移除刚添加的用户消息
-                if (
-                    self._conversation_history
-                    and len(self._conversation_history) > 0
-                    and self._conversation_history[-1].get("content") == prompt
-                ):
-                    self._conversation_history.pop()
+                self._discard_pending_prompt(prompt)
+                raise
+            except OpenAIError:
+                # 首个 token 之后的失败无法再切换端点，仅计入错误率
+                self.router.record_error(endpoint)
                 raise
 
             # 将助手回复添加到历史记录
@@ -122,12 +160,7 @@ class OpenAIClient(LLMClientBase):
             raise
         except OpenAIError as e:
             # 如果请求失败，移除刚添加的用户消息
-            if (
-                self._conversation_history
-                and len(self._conversation_history) > 0
-                and self._conversation_history[-1].get("content") == prompt
-            ):
-                self._conversation_history.pop()
+            self._discard_pending_prompt(prompt)
 
             duration = time.time() - start_time
             log_exception(self.logger, "OpenAI 流式聊天 API 请求失败", e)
@@ -135,7 +168,7 @@ class OpenAIClient(LLMClientBase):
             log_api_request(
                 self.logger,
                 "POST",
-                f"{self.base_url}/chat/completions",
+                f"{endpoint}/chat/completions",
                 500,
                 duration,
                 model=self.model,
@@ -176,6 +209,15 @@ class OpenAIClient(LLMClientBase):
         self._conversation_history.clear()
         self.logger.info("OpenAI 客户端对话历史记录已重置")
 
+    def restore_history(self, messages: list[ChatCompletionMessageParam]) -> None:
+        """
+        恢复对话上下文
+
+        用已保存会话中的消息替换当前历史记录，恢复会话后继续多轮对话。
+        """
+        self._conversation_history = list(messages)
+        self.logger.info("OpenAI 客户端已恢复 %d 条对话历史记录", len(messages))
+
     async def get_available_models(self) -> list[str]:
         """
         获取当前 LLM 服务中可用的模型，返回名称列表
@@ -215,11 +257,183 @@ class OpenAIClient(LLMClientBase):
             self.logger.info("获取到 %d 个可用模型", len(models))
             return models
 
+    def response_cache_scope(self) -> str | None:
+        """响应缓存的作用范围：服务地址与模型"""
+        return f"{Backend.OPENAI.value} {self.base_url} {self.model}"
+
+    def get_endpoint_stats(self) -> list[dict[str, Any]]:
+        """获取各端点的延迟与错误率统计"""
+        return self.router.get_stats()
+
     async def close(self) -> None:
-        """关闭 OpenAI 客户端"""
+        """
+        关闭 OpenAI 客户端
+
+        底层 HTTP 连接来自共享注册表，可能仍被其他客户端复用，
+        因此这里不关闭 AsyncOpenAI，连接在应用退出时统一关闭。
+        """
+        await self.interrupt()
+        self.logger.info("OpenAI 客户端已关闭")
+
+    def _discard_pending_prompt(self, prompt: str) -> None:
+        """移除未得到完整回复的用户消息"""
+        if self._conversation_history and self._conversation_history[-1].get("content") == prompt:
+            self._conversation_history.pop()
+
+    async def _open_stream(self) -> _StreamAttempt:
+        """
+        按路由顺序打开流式请求，直到拿到首个 token
+
+        未启用对冲时依次尝试各端点实现故障转移；启用对冲时见 _open_hedged_stream。
+        """
+        ranked = self.router.rank()
+        if self.hedge and len(ranked) > 1:
+            return await self._open_hedged_stream(ranked)
+
+        last_error: OpenAIError | None = None
+        for endpoint in ranked:
+            try:
+                return await self._start_attempt(endpoint)
+            except OpenAIError as e:
+                last_error = e
+                if endpoint != ranked[-1]:
+                    self.logger.warning("端点 %s 请求失败，切换到下一个端点: %s", endpoint, e)
+        raise last_error  # type: ignore[misc]
+
+    async def _open_hedged_stream(self, ranked: list[str]) -> _StreamAttempt:
+        """
+        带对冲的流式请求
+
+        首选端点在其 TTFT 分位数时限内仍未返回首个 token 时，向下一个端点发出对冲请求，
+        先返回首个 token 的请求胜出，其余请求被取消并关闭。
+        """
+        remaining = deque(ranked)
+        inflight: dict[asyncio.Task[_StreamAttempt], str] = {}
+        last_launched = ranked[0]
+        last_error: OpenAIError | None = None
+
+        def launch() -> None:
+            nonlocal last_launched
+            last_launched = remaining.popleft()
+            inflight[asyncio.create_task(self._start_attempt(last_launched))] = last_launched
+
+        launch()
         try:
-            await self.client.close()
-            self.logger.info("OpenAI 客户端已关闭")
-        except OpenAIError as e:
-            log_exception(self.logger, "关闭 OpenAI 客户端失败", e)
+            while inflight:
+                timeout = self.router.hedge_delay(last_launched) if remaining else None
+                done, _pending = await asyncio.wait(inflight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.logger.info(
+                        "端点 %s 在 %.2f 秒内未返回首个 token，发出对冲请求",
+                        last_launched,
+                        timeout,
+                    )
+                    launch()
+                    continue
+
+                winner: _StreamAttempt | None = None
+                for task in done:
+                    endpoint = inflight.pop(task)
+                    try:
+                        attempt = task.result()
+                    except OpenAIError as e:
+                        last_error = e
+                        self.logger.warning("端点 %s 请求失败: %s", endpoint, e)
+                        continue
+                    if winner is None:
+                        winner = attempt
+                    else:
+                        await attempt.stream.close()
+                if winner is not None:
+                    if len(ranked) > 1 and winner.endpoint != ranked[0]:
+                        self.logger.info("对冲请求胜出，使用端点: %s", winner.endpoint)
+                    return winner
+
+                # 没有进行中的请求时立即故障转移到下一个端点
+                if not inflight and remaining:
+                    launch()
+            raise last_error  # type: ignore[misc]
+        finally:
+            await self._cancel_attempts(list(inflight))
+
+    async def _start_attempt(self, endpoint: str) -> _StreamAttempt:
+        """向指定端点发起流式请求并读取到首个 token，同时更新路由统计"""
+        start_time = time.monotonic()
+        try:
+            stream = await self._clients[endpoint].chat.completions.create(
+                model=self.model,
+                messages=self._conversation_history,
+                stream=True,
+            )
+        except OpenAIError:
+            self.router.record_error(endpoint)
+            raise
+
+        chunks = aiter(stream)
+        first_content = ""
+        try:
+            async for chunk in chunks:
+                first_content = _chunk_content(chunk)
+                if first_content:
+                    break
+        except OpenAIError:
+            self.router.record_error(endpoint)
+            await stream.close()
             raise
+        except asyncio.CancelledError:
+            # 被对冲请求击败，已等待的时间作为延迟下限计入统计
+            self.router.record_latency(endpoint, time.monotonic() - start_time)
+            await stream.close()
+            raise
+
+        self.router.record_success(endpoint, time.monotonic() - start_time)
+        return _StreamAttempt(endpoint=endpoint, stream=stream, chunks=chunks, first_content=first_content)
+
+    async def _cancel_attempts(self, tasks: list[asyncio.Task[_StreamAttempt]]) -> None:
+        """取消落败的请求，并关闭在取消前已完成的请求的流"""
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, _StreamAttempt):
+                await result.stream.close()
+
+
+@dataclass
+class _StreamAttempt:
+    """已返回首个 token 的流式请求"""
+
+    endpoint: str
+    stream: AsyncStream[ChatCompletionChunk]
+    chunks: AsyncIterator[ChatCompletionChunk]
+    first_content: str
+
+
+def _record_content(recording: StreamRecording | None, content: str) -> None:
+    """
+    录制首个 token
+
+    首个 token 所在的响应块在路由阶段已被读取，这里以 OpenAI 流式响应的格式记录其文本内容。
+    """
+    if recording is not None:
+        chunk = {"choices": [{"index": 0, "delta": {"content": content}}]}
+        recording.record(f"data: {json.dumps(chunk, ensure_ascii=False)}")
+
+
+def _record_chunk(recording: StreamRecording | None, chunk: ChatCompletionChunk) -> None:
+    """录制原始响应块"""
+    if recording is not None:
+        recording.record(f"data: {chunk.model_dump_json(exclude_none=True)}")
+
+
+def _record_done(recording: StreamRecording | None) -> None:
+    """录制流式响应结束标记"""
+    if recording is not None:
+        recording.record("data: [DONE]")
+
+
+def _chunk_content(chunk: ChatCompletionChunk) -> str:
+    """提取流式响应块中的文本内容"""
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
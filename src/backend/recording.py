@@ -0,0 +1,179 @@
+"""
+流式响应录制
+
+将后端返回的原始 SSE 数据行连同相对请求开始的时间写入录制文件，用于在本地回放
+（见 backend.replay.ReplayClient）以复现线上的慢响应或交互问题、在没有真实后端时测试 TUI。
+
+设置环境变量 WITTY_RECORD_STREAMS 为录制文件路径即可开启录制。录制文件为 JSON Lines 格式，
+文件名以 .gz 结尾时使用 gzip 压缩，每次流式请求的记录以流编号 s 关联:
+
+- 请求记录: {"s": 1, "stream": "chat", "backend": "eulerintelli", "request": {"prompt": "..."}}
+- 数据行记录: {"s": 1, "t": 0.512, "line": "data: {...}"}，t 为相对请求开始的秒数
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# 开启录制的环境变量，值为录制文件路径
+RECORD_ENV = "WITTY_RECORD_STREAMS"
+
+# 流式请求类型
+STREAM_CHAT = "chat"
+STREAM_MCP_RESPONSE = "mcp_response"
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RecordedStream:
+    """录制文件中的一次流式请求"""
+
+    kind: str
+    backend: str
+    request: dict[str, Any] = field(default_factory=dict)
+    lines: list[tuple[float, str]] = field(default_factory=list)
+    """(相对请求开始的秒数, 原始数据行)"""
+
+
+class StreamRecording:
+    """一次流式请求的录制句柄"""
+
+    def __init__(self, recorder: StreamRecorder, stream_id: int) -> None:
+        """初始化录制句柄，从此刻开始计时"""
+        self._recorder = recorder
+        self._stream_id = stream_id
+        self._started = time.monotonic()
+
+    def record(self, line: str) -> None:
+        """记录一行原始数据"""
+        self._recorder.write({"s": self._stream_id, "t": round(time.monotonic() - self._started, 3), "line": line})
+
+
+class StreamRecorder:
+    """流式响应录制器，多个并发的流式请求写入同一个文件"""
+
+    def __init__(self, path: Path) -> None:
+        """初始化录制器，文件在第一次写入时打开"""
+        self.path = path
+        self._file: IO[str] | None = None
+        self._stream_ids = itertools.count(1)
+        self._failed = False
+
+    def begin(self, kind: str, backend: str, **request: Any) -> StreamRecording:
+        """开始录制一次流式请求"""
+        stream_id = next(self._stream_ids)
+        self.write({"s": stream_id, "stream": kind, "backend": backend, "request": request})
+        return StreamRecording(self, stream_id)
+
+    def write(self, record: dict[str, Any]) -> None:
+        """写入一条记录，写入失败后停止录制"""
+        if self._failed:
+            return
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = _open_recording(self.path, "a")
+                logger.info("开始录制流式响应: %s", self.path)
+            self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError:
+            logger.exception("写入流式响应录制文件失败，停止录制: %s", self.path)
+            self._failed = True
+            self.close()
+
+    def close(self) -> None:
+        """关闭录制文件"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                logger.exception("关闭流式响应录制文件失败: %s", self.path)
+            self._file = None
+
+
+_recorder: StreamRecorder | None = None
+
+
+def get_stream_recorder() -> StreamRecorder | None:
+    """获取全局录制器，未设置环境变量 WITTY_RECORD_STREAMS 时返回 None"""
+    global _recorder  # noqa: PLW0603
+    path = os.environ.get(RECORD_ENV, "").strip()
+    if not path:
+        return None
+    if _recorder is None or _recorder.path != Path(path).expanduser():
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = StreamRecorder(Path(path).expanduser())
+        atexit.register(_recorder.close)
+    return _recorder
+
+
+def begin_recording(kind: str, backend: str, **request: Any) -> StreamRecording | None:
+    """开启录制时开始录制一次流式请求，否则返回 None"""
+    recorder = get_stream_recorder()
+    return recorder.begin(kind, backend, **request) if recorder is not None else None
+
+
+def load_recording(path: Path) -> list[RecordedStream]:
+    """
+    读取录制文件
+
+    Args:
+        path: 录制文件路径
+
+    Returns:
+        list[RecordedStream]: 按请求开始顺序排列的流式请求
+
+    Raises:
+        OSError: 文件无法读取
+
+    """
+    streams: dict[int, RecordedStream] = {}
+    for number, record in _iter_records(path):
+        stream_id = record.get("s")
+        if "stream" in record:
+            streams[stream_id] = RecordedStream(
+                kind=record["stream"],
+                backend=record.get("backend", ""),
+                request=record.get("request", {}),
+            )
+        elif stream_id in streams and "line" in record:
+            streams[stream_id].lines.append((float(record.get("t", 0.0)), record["line"]))
+        else:
+            logger.warning("录制文件 %s 第 %d 行不属于任何流式请求，已忽略", path, number)
+    return list(streams.values())
+
+
+def _iter_records(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    """逐行读取录制文件，跳过无法解析的行"""
+    with _open_recording(path, "r") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("录制文件 %s 第 %d 行格式错误，已忽略", path, number)
+                continue
+            if isinstance(record, dict):
+                yield number, record
+
+
+def _open_recording(path: Path, mode: str) -> IO[str]:
+    """按文件后缀打开录制文件，.gz 文件使用 gzip 压缩"""
+    if path.suffix == ".gz":
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8", buffering=1 if mode == "a" else -1)
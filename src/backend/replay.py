@@ -0,0 +1,167 @@
+"""
+录制回放客户端
+
+回放由 WITTY_RECORD_STREAMS 录制的流式响应，无需真实的 Hermes 或 OpenAI 服务即可对 TUI
+进行性能分析和回归测试，也可用于在本地复现线上的慢响应。
+
+Hermes 录制内容经过与 HermesChatClient 完全相同的事件处理流程，MCP 步骤状态、
+waiting_for_start/waiting_for_param 交互以及 [DONE] 等特殊事件均按录制时的顺序重现；
+用户确认或补全参数后，send_mcp_response 回放录制文件中的下一次 MCP 响应流。
+OpenAI 录制内容按响应块中的文本增量回放。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from backend.hermes.client import HermesChatClient
+from backend.recording import STREAM_CHAT, STREAM_MCP_RESPONSE, RecordedStream, load_recording
+from config.model import Backend
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+    from backend.hermes.models import HermesAgent
+
+# 录制内容已全部回放时返回的消息
+REPLAY_EXHAUSTED_MESSAGE = "录制文件中没有更多可回放的响应。"
+
+
+class ReplayClient(HermesChatClient):
+    """
+    录制回放客户端
+
+    继承 HermesChatClient 以复用其流事件处理与 MCP 交互逻辑，TUI 对 Hermes 客户端的
+    MCP 支持因此同样适用于回放；所有网络操作均被替换为读取录制文件。
+    """
+
+    def __init__(self, path: str | Path, speed: float = 1.0) -> None:
+        """
+        初始化录制回放客户端
+
+        Args:
+            path: 录制文件路径
+            speed: 回放速度倍数，1 为原始速度，大于 1 时加速，0 或负数表示不等待、尽快回放
+
+        """
+        super().__init__(base_url="http://replay.invalid")
+        self.path = Path(path).expanduser()
+        self.speed = speed
+        self._streams: dict[str, deque[RecordedStream]] = defaultdict(deque)
+        try:
+            for stream in load_recording(self.path):
+                self._streams[stream.kind].append(stream)
+        except OSError:
+            self.logger.exception("读取录制文件失败: %s", self.path)
+        self.logger.info(
+            "录制回放客户端初始化成功 - 文件: %s, 对话: %d, MCP 响应: %d, 速度: %s",
+            self.path,
+            len(self._streams[STREAM_CHAT]),
+            len(self._streams[STREAM_MCP_RESPONSE]),
+            speed if speed > 0 else "尽快",
+        )
+
+    async def get_llm_response(self, prompt: str) -> AsyncGenerator[str, None]:
+        """按录制顺序回放下一次对话请求的响应"""
+        stream = self._next_stream(STREAM_CHAT)
+        if stream is None:
+            yield REPLAY_EXHAUSTED_MESSAGE
+            return
+
+        recorded_prompt = stream.request.get("prompt")
+        if recorded_prompt is not None and recorded_prompt != prompt:
+            self.logger.warning("输入与录制时的提问不同，仍回放录制的响应: %s", recorded_prompt)
+
+        async for text in self._replay(stream):
+            yield text
+
+    async def send_mcp_response(self, task_id: str, *, params: bool | dict) -> AsyncGenerator[str, None]:
+        """按录制顺序回放下一次 MCP 响应流"""
+        self.logger.info("回放 MCP 响应 - 任务ID: %s, 参数: %s", task_id, params)
+        stream = self._next_stream(STREAM_MCP_RESPONSE)
+        if stream is None:
+            yield REPLAY_EXHAUSTED_MESSAGE
+            return
+
+        async for text in self._replay(stream):
+            yield text
+
+    async def get_available_models(self) -> list[str]:
+        """回放时没有可用的模型列表"""
+        return []
+
+    async def get_available_agents(self) -> list[HermesAgent]:
+        """回放时没有可用的智能体列表"""
+        return []
+
+    async def get_auto_execute_status(self) -> bool:
+        """回放时始终等待用户确认，以便重现交互过程"""
+        return False
+
+    async def enable_auto_execute(self) -> None:
+        """回放时不修改自动执行状态"""
+
+    async def disable_auto_execute(self) -> None:
+        """回放时不修改自动执行状态"""
+
+    def response_cache_scope(self) -> str | None:
+        """回放按录制顺序返回响应，不使用响应缓存"""
+        return None
+
+    async def close(self) -> None:
+        """回放客户端没有需要释放的连接"""
+        self._cleanup_task_id("关闭回放客户端")
+
+    def _next_stream(self, kind: str) -> RecordedStream | None:
+        """取出下一次指定类型的录制请求"""
+        streams = self._streams[kind]
+        if not streams:
+            self.logger.warning("录制文件中没有更多的 %s 请求", kind)
+            return None
+        return streams.popleft()
+
+    async def _replay(self, stream: RecordedStream) -> AsyncGenerator[str, None]:
+        """回放一次录制的流式请求"""
+        start_time = time.monotonic()
+        if stream.backend == Backend.OPENAI.value:
+            async for line in self._replay_lines(stream):
+                text = _openai_line_content(line)
+                if text:
+                    yield text
+        else:
+            async for text in self._process_stream_events(self._replay_lines(stream)):
+                yield text
+        self.logger.info("回放完成 - 数据行: %d, 耗时: %.3fs", len(stream.lines), time.monotonic() - start_time)
+
+    async def _replay_lines(self, stream: RecordedStream) -> AsyncGenerator[str, None]:
+        """按回放速度输出录制的数据行"""
+        started = time.monotonic()
+        for offset, line in stream.lines:
+            if self.speed > 0:
+                delay = started + offset / self.speed - time.monotonic()
+                await asyncio.sleep(max(0.0, delay))
+            else:
+                # 尽快回放时仍让出控制权，避免阻塞界面刷新
+                await asyncio.sleep(0)
+            yield line
+
+    async def _stop(self) -> None:
+        """回放没有后端会话需要停止"""
+        self._cleanup_task_id("手动停止")
+
+
+def _openai_line_content(line: str) -> str:
+    """提取 OpenAI 流式响应数据行中的文本增量"""
+    data = line.strip().removeprefix("data:").strip()
+    if not data or data == "[DONE]":
+        return ""
+    try:
+        chunk = json.loads(data)
+        return chunk["choices"][0]["delta"].get("content") or ""
+    except (json.JSONDecodeError, KeyError, IndexError, TypeError, AttributeError):
+        return ""
@@ -0,0 +1,230 @@
+"""
+LLM 响应的本地缓存
+
+同一命令在多台主机上以相同方式失败、或用户重复执行失败的命令时，发给 LLM 的分析请求完全相同。
+开启 response_cache 配置后，命令失败分析的响应保存在本地磁盘，再次遇到相同请求时直接回放，
+不再请求后端。
+
+- 缓存键为（作用范围, 规范化的提示）的 SHA-256，作用范围由客户端给出（后端类型、服务地址与
+  模型或智能体，见 LLMClientBase.response_cache_scope）；提示规范化时合并每行内的连续空白、
+  去掉空行。条目中保存作用范围与规范化的提示，读取时再次比较，只有完全相同时才命中。
+- 每个条目是缓存目录下的一个 JSON 文件，保存响应的原始分块，回放时按原分块不加等待地输出。
+- 文件修改时间记录最近一次使用的时间：命中时更新，多个 witty 实例共享同一目录；
+  目录大小超过上限时按最近使用时间淘汰，超过有效期的条目在读取或扫描时删除。
+- 只缓存完整结束的响应：请求失败、被中断或包含 MCP 交互消息时不写入缓存。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from config.manager import ConfigManager
+
+RESPONSE_CACHE_DIR = Path.home() / ".cache" / "openEuler Intelligence" / "responses"
+RESPONSE_CACHE_VERSION = 1
+
+logger = get_logger(__name__)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """规范化提示：合并每行内的连续空白，去掉空行"""
+    lines = (" ".join(line.split()) for line in prompt.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(scope: str, prompt: str) -> str:
+    """计算缓存键"""
+    data = json.dumps([RESPONSE_CACHE_VERSION, scope, normalize_prompt(prompt)], ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """本次运行的缓存统计"""
+
+    hits: int = 0
+    misses: int = 0
+    bypasses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+class ResponseCache:
+    """按大小与有效期淘汰的磁盘响应缓存"""
+
+    def __init__(self, directory: Path = RESPONSE_CACHE_DIR, *, max_bytes: int, ttl: float) -> None:
+        """
+        初始化缓存，目录内容在第一次使用时扫描
+
+        Args:
+            directory: 缓存目录
+            max_bytes: 缓存目录的大小上限（字节）
+            ttl: 条目的有效期（秒）
+
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        # 键 -> 文件大小，按最近使用时间从旧到新排列
+        self._entries: OrderedDict[str, int] | None = None
+        self._total = 0
+        self._disabled = False
+
+    @classmethod
+    def from_config(cls, config_manager: ConfigManager) -> ResponseCache | None:
+        """按配置创建缓存，未开启时返回 None"""
+        if not config_manager.get_response_cache_enabled():
+            return None
+        return cls(
+            max_bytes=config_manager.get_response_cache_max_size(),
+            ttl=config_manager.get_response_cache_ttl(),
+        )
+
+    def get(self, scope: str, prompt: str) -> list[str] | None:
+        """查找缓存的响应分块，未命中返回 None"""
+        key = cache_key(scope, prompt)
+        chunks = self._read(key, scope, normalize_prompt(prompt))
+        if chunks is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        entries = self._load_entries()
+        if key in entries:
+            entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            logger.debug("更新缓存条目的使用时间失败: %s", key)
+        return chunks
+
+    def bypass(self) -> None:
+        """记录一次跳过缓存的请求，其响应仍会写入缓存"""
+        self.stats.bypasses += 1
+
+    def put(self, scope: str, prompt: str, chunks: list[str]) -> None:
+        """写入响应分块，必要时淘汰最久未使用的条目"""
+        if self._disabled or not chunks:
+            return
+        key = cache_key(scope, prompt)
+        record = {
+            "version": RESPONSE_CACHE_VERSION,
+            "scope": scope,
+            "prompt": normalize_prompt(prompt),
+            "created": time.time(),
+            "chunks": chunks,
+        }
+        data = json.dumps(record, ensure_ascii=False).encode()
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            entries = self._load_entries()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            temp_path.replace(path)
+        except OSError as e:
+            logger.warning("写入响应缓存失败，本次运行不再写入: %s", e)
+            self._disabled = True
+            return
+        self._total += len(data) - entries.pop(key, 0)
+        entries[key] = len(data)
+        self.stats.stores += 1
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        """条目文件路径"""
+        return self.directory / f"{key}.json"
+
+    def _read(self, key: str, scope: str, prompt: str) -> list[str] | None:
+        """读取条目，过期、损坏或内容不一致的条目视为未命中"""
+        path = self._path(key)
+        try:
+            record = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("响应缓存条目损坏，已删除: %s", path)
+            self._remove(key)
+            return None
+        if not isinstance(record, dict) or record.get("version") != RESPONSE_CACHE_VERSION:
+            return None
+        if time.time() - float(record.get("created", 0)) > self.ttl:
+            self._remove(key)
+            return None
+        chunks = record.get("chunks")
+        if record.get("scope") != scope or record.get("prompt") != prompt or not isinstance(chunks, list):
+            return None
+        return [str(chunk) for chunk in chunks]
+
+    def _load_entries(self) -> OrderedDict[str, int]:
+        """第一次使用时扫描缓存目录，删除已过期的条目"""
+        if self._entries is None:
+            self._entries = self._scan()
+        return self._entries
+
+    def _scan(self) -> OrderedDict[str, int]:
+        """扫描缓存目录，按最近使用时间排列条目"""
+        found: list[tuple[float, str, int]] = []
+        self._total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, entry.name.removesuffix(".json"), stat.st_size))
+        except FileNotFoundError:
+            return OrderedDict()
+        except OSError as e:
+            logger.warning("扫描响应缓存目录失败: %s", e)
+            return OrderedDict()
+
+        # 使用时间不晚于创建时间，最近一次使用已超过有效期的条目必然过期
+        expired_before = time.time() - self.ttl
+        entries: OrderedDict[str, int] = OrderedDict()
+        for mtime, key, size in sorted(found):
+            if mtime < expired_before:
+                self._unlink(key)
+                continue
+            entries[key] = size
+            self._total += size
+        return entries
+
+    def _evict(self) -> None:
+        """淘汰最久未使用的条目直至低于大小上限，先重新扫描以计入其他实例写入的条目"""
+        self._entries = self._scan()
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            self._unlink(key)
+            self.stats.evictions += 1
+        logger.debug("响应缓存已淘汰至 %d 字节，共 %d 条", self._total, len(self._entries))
+
+    def _remove(self, key: str) -> None:
+        """删除条目"""
+        if self._entries is not None and key in self._entries:
+            self._total -= self._entries.pop(key)
+        self._unlink(key)
+
+    def _unlink(self, key: str) -> None:
+        """删除条目文件"""
+        try:
+            self._path(key).unlink(missing_ok=True)
+        except OSError as e:
+            logger.debug("删除响应缓存条目失败: %s", e)
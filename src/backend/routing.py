@@ -0,0 +1,138 @@
+"""
+多端点延迟感知路由
+
+为每个端点维护首 token 延迟 (TTFT) 与错误率的指数加权移动平均 (EWMA)，
+据此为每次请求选择最优端点，并根据历史 TTFT 分位数计算对冲请求的等待时限。
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+# EWMA 平滑系数，越大越偏重最近的样本
+DEFAULT_EWMA_ALPHA = 0.3
+# 错误率对评分的惩罚（秒），使频繁出错的端点排在后面
+ERROR_PENALTY_SECONDS = 10.0
+# 计算分位数时保留的最近 TTFT 样本数量
+TTFT_SAMPLE_SIZE = 50
+# 样本不足时使用的默认对冲等待时间（秒）
+DEFAULT_HEDGE_DELAY = 2.0
+# 启用分位数计算所需的最少样本数量
+MIN_HEDGE_SAMPLES = 5
+
+
+@dataclass
+class EndpointStats:
+    """单个端点的统计信息"""
+
+    url: str
+    ewma_ttft: float | None = None
+    """首 token 延迟的 EWMA（秒），None 表示尚无成功样本"""
+    error_rate: float = 0.0
+    """错误率的 EWMA，取值 0~1"""
+    requests: int = 0
+    errors: int = 0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=TTFT_SAMPLE_SIZE))
+
+    def score(self) -> float:
+        """
+        计算端点评分，越小越优
+
+        未产生过成功样本的端点按 0 计算延迟，以便获得一次被探测的机会。
+        """
+        ttft = self.ewma_ttft if self.ewma_ttft is not None else 0.0
+        return ttft * (1.0 + self.error_rate) + self.error_rate * ERROR_PENALTY_SECONDS
+
+
+class EndpointRouter:
+    """根据 EWMA 延迟与错误率对端点排序，并给出对冲等待时限"""
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        *,
+        alpha: float = DEFAULT_EWMA_ALPHA,
+        hedge_percentile: float = 0.9,
+        default_hedge_delay: float = DEFAULT_HEDGE_DELAY,
+    ) -> None:
+        """
+        初始化路由器
+
+        Args:
+            endpoints: 端点列表，评分相同时按列表顺序优先
+            alpha: EWMA 平滑系数
+            hedge_percentile: 计算对冲等待时限使用的 TTFT 分位数
+            default_hedge_delay: 样本不足时的对冲等待时限（秒）
+
+        """
+        if not endpoints:
+            msg = "至少需要一个端点"
+            raise ValueError(msg)
+        self.alpha = alpha
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        # 去重并保持顺序
+        self._stats = {url: EndpointStats(url=url) for url in dict.fromkeys(endpoints)}
+
+    @property
+    def endpoints(self) -> list[str]:
+        """按配置顺序返回所有端点"""
+        return list(self._stats)
+
+    def rank(self) -> list[str]:
+        """按评分从优到劣返回端点列表"""
+        order = {url: index for index, url in enumerate(self._stats)}
+        return sorted(self._stats, key=lambda url: (self._stats[url].score(), order[url]))
+
+    def record_success(self, url: str, ttft: float) -> None:
+        """记录一次成功请求及其首 token 延迟"""
+        stats = self._stats[url]
+        stats.requests += 1
+        stats.error_rate = self._ewma(stats.error_rate, 0.0)
+        self.record_latency(url, ttft)
+
+    def record_latency(self, url: str, ttft: float) -> None:
+        """记录一次首 token 延迟样本（也用于被取消请求的延迟下限）"""
+        stats = self._stats[url]
+        stats.samples.append(ttft)
+        stats.ewma_ttft = ttft if stats.ewma_ttft is None else self._ewma(stats.ewma_ttft, ttft)
+
+    def record_error(self, url: str) -> None:
+        """记录一次失败请求"""
+        stats = self._stats[url]
+        stats.requests += 1
+        stats.errors += 1
+        stats.error_rate = self._ewma(stats.error_rate, 1.0)
+
+    def hedge_delay(self, url: str) -> float:
+        """
+        计算对冲请求的等待时限
+
+        首选端点在该时限内仍未产生首个 token 时，应向下一个端点发出对冲请求。
+        """
+        samples = sorted(self._stats[url].samples)
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return self.default_hedge_delay
+        # 最近秩法计算分位数
+        index = max(0, math.ceil(len(samples) * self.hedge_percentile) - 1)
+        return samples[min(index, len(samples) - 1)]
+
+    def get_stats(self) -> list[dict[str, Any]]:
+        """获取各端点的统计信息"""
+        return [
+            {
+                "url": stats.url,
+                "ewma_ttft": stats.ewma_ttft,
+                "error_rate": round(stats.error_rate, 4),
+                "requests": stats.requests,
+                "errors": stats.errors,
+            }
+            for stats in self._stats.values()
+        ]
+
+    def _ewma(self, current: float, sample: float) -> float:
+        """计算新的 EWMA 值"""
+        return self.alpha * sample + (1.0 - self.alpha) * current
@@ -0,0 +1,174 @@
+"""
+流式响应空闲看门狗
+
+流式请求的 HTTP 读取超时为无限制以支持超长时间任务，连接静默卡住（既无内容也无心跳）时
+读取会永远挂起并占用连接。看门狗为每个活动的流启动一个监视任务，记录最后一次收到数据的时间
+（心跳也算作数据，与最后一次收到内容的时间分开记录），等待数据超过空闲时限时中断读取，
+由调用方退出流式请求的上下文以释放连接。
+
+只统计等待网络数据的时间，调用方处理已收到的数据或因背压暂停读取时不计入空闲时间。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from log.manager import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, AsyncIterator, Callable
+
+# 默认空闲时限（秒）
+STREAM_IDLE_TIMEOUT = 300.0
+
+logger = get_logger(__name__)
+
+
+class StreamIdleError(Exception):
+    """流式响应超过空闲时限没有收到任何数据"""
+
+    def __init__(self, name: str, idle_timeout: float, since_content: float) -> None:
+        """初始化异常"""
+        self.name = name
+        self.idle_timeout = idle_timeout
+        self.since_content = since_content
+        """距最后一次收到内容的秒数"""
+        super().__init__(f"Stream {name} idle for {idle_timeout:.0f}s, connection closed")
+
+
+@dataclass
+class WatchdogStats:
+    """看门狗统计信息"""
+
+    watched: int = 0
+    """被监视的流数量"""
+    fired: int = 0
+    """因空闲超时被中断的流数量"""
+    heartbeats: int = 0
+    """收到的心跳数量"""
+
+
+_stats = WatchdogStats()
+
+
+def get_stream_watchdog_stats() -> dict[str, Any]:
+    """获取看门狗的统计信息"""
+    return asdict(_stats)
+
+
+class StreamWatchdog:
+    """单个流式响应的空闲看门狗"""
+
+    def __init__(
+        self,
+        idle_timeout: float | None,
+        *,
+        name: str = "stream",
+        is_heartbeat: Callable[[str], bool] | None = None,
+    ) -> None:
+        """
+        初始化看门狗
+
+        Args:
+            idle_timeout: 空闲时限（秒），None 或非正数表示不监视
+            name: 日志中使用的流名称
+            is_heartbeat: 判断数据行是否为心跳，心跳只更新最后收到数据的时间
+
+        """
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self.is_heartbeat = is_heartbeat
+        self.last_byte_time = 0.0
+        self.last_content_time = 0.0
+        self.fired = False
+        self._reading_since: float | None = None
+        self._reading = asyncio.Event()
+
+    async def watch(self, lines: AsyncIterator[str]) -> AsyncGenerator[str, None]:
+        """
+        监视数据行的读取
+
+        Raises:
+            StreamIdleError: 等待数据超过空闲时限
+
+        """
+        if not self.idle_timeout or self.idle_timeout <= 0:
+            async for line in lines:
+                yield line
+            return
+
+        owner = asyncio.current_task()
+        if owner is None:
+            msg = "看门狗必须在任务中使用"
+            raise RuntimeError(msg)
+
+        _stats.watched += 1
+        self.last_byte_time = self.last_content_time = time.monotonic()
+        watcher = asyncio.create_task(self._watch(owner), name=f"{self.name}-watchdog")
+        iterator = aiter(lines)
+        try:
+            while True:
+                line = await self._read(iterator, owner)
+                if line is None:
+                    return
+                self._observe(line)
+                yield line
+        finally:
+            watcher.cancel()
+
+    async def _read(self, iterator: AsyncIterator[str], owner: asyncio.Task) -> str | None:
+        """读取下一行，流结束时返回 None，看门狗中断读取时抛出 StreamIdleError"""
+        self._reading_since = time.monotonic()
+        self._reading.set()
+        try:
+            return await anext(iterator)
+        except StopAsyncIteration:
+            return None
+        except asyncio.CancelledError:
+            # 只有看门狗发出的取消才转换为空闲超时，其他取消继续传递
+            if self.fired and owner.uncancel() == 0:
+                since_content = time.monotonic() - self.last_content_time
+                raise StreamIdleError(self.name, self.idle_timeout or 0.0, since_content) from None
+            raise
+        finally:
+            self._reading_since = None
+
+    def _observe(self, line: str) -> None:
+        """记录收到数据的时间，心跳和空行不计为内容"""
+        now = time.monotonic()
+        self.last_byte_time = now
+        if not line.strip():
+            return
+        if self.is_heartbeat is not None and self.is_heartbeat(line):
+            _stats.heartbeats += 1
+            return
+        self.last_content_time = now
+
+    async def _watch(self, owner: asyncio.Task) -> None:
+        """监视任务：读取等待时间超过空闲时限时取消读取"""
+        idle_timeout = self.idle_timeout or 0.0
+        while True:
+            reading_since = self._reading_since
+            if reading_since is None:
+                self._reading.clear()
+                await self._reading.wait()
+                continue
+
+            remaining = reading_since + idle_timeout - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+
+            self.fired = True
+            _stats.fired += 1
+            logger.warning(
+                "流 %s 超过 %.0f 秒没有收到任何数据（距最后一次内容 %.0f 秒），中断读取并释放连接",
+                self.name,
+                idle_timeout,
+                time.monotonic() - self.last_content_time,
+            )
+            owner.cancel()
+            return
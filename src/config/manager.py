@@ -159,6 +159,14 @@ class ConfigManager:
         """获取当前 api_key"""
         return self.data.openai.api_key
 
+    def get_fallback_urls(self) -> list[str]:
+        """获取 OpenAI 备用端点列表"""
+        return self.data.openai.fallback_urls
+
+    def get_hedge_enabled(self) -> bool:
+        """获取是否启用对冲请求"""
+        return self.data.openai.hedge
+
     def get_backend(self) -> Backend:
         """获取当前后端"""
         return self.data.backend
@@ -186,6 +194,30 @@ class ConfigManager:
         self.data.eulerintelli.api_key = key
         self._save_settings()
 
+    def get_stream_idle_timeout(self) -> float:
+        """获取 Hermes 流式响应的空闲时限（秒）"""
+        return self.data.eulerintelli.stream_idle_timeout
+
+    def get_replay_path(self) -> str:
+        """获取回放使用的录制文件路径"""
+        return self.data.replay.path
+
+    def get_replay_speed(self) -> float:
+        """获取回放速度倍数"""
+        return self.data.replay.speed
+
+    def get_response_cache_enabled(self) -> bool:
+        """获取是否启用命令失败分析的响应缓存"""
+        return self.data.response_cache.enabled
+
+    def get_response_cache_max_size(self) -> int:
+        """获取响应缓存的大小上限（字节）"""
+        return int(self.data.response_cache.max_size_mb * 1024 * 1024)
+
+    def get_response_cache_ttl(self) -> float:
+        """获取响应缓存条目的有效期（秒）"""
+        return self.data.response_cache.ttl
+
     def get_log_level(self) -> LogLevel:
         """获取当前日志级别"""
         return self.data.log_level
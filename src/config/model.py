@@ -9,12 +9,14 @@ class Backend(str, Enum):
 
     OPENAI = "openai"
     EULERINTELLI = "eulerintelli"
+    REPLAY = "replay"
 
     def get_display_name(self) -> str:
         """获取后端的可读显示名称"""
         display_names = {
             Backend.OPENAI: "OpenAI 大模型接口",
             Backend.EULERINTELLI: "Witty Assistant",
+            Backend.REPLAY: "录制回放",
         }
         return display_names.get(self, self.value)
 
@@ -35,6 +37,8 @@ class OpenAIConfig:
     base_url: str = field(default="")
     model: str = field(default="")
     api_key: str = field(default="")
+    fallback_urls: list[str] = field(default_factory=list)  # 备用端点，与主端点共用模型和 API Key
+    hedge: bool = field(default=False)  # 首选端点响应过慢时是否向备用端点发出对冲请求
 
     @classmethod
     def from_dict(cls, d: dict) -> "OpenAIConfig":
@@ -43,11 +47,19 @@ class OpenAIConfig:
             base_url=d.get("base_url", cls.base_url),
             model=d.get("model", cls.model),
             api_key=d.get("api_key", cls.api_key),
+            fallback_urls=list(d.get("fallback_urls", [])),
+            hedge=bool(d.get("hedge", False)),
         )
 
     def to_dict(self) -> dict:
         """转换为字典"""
-        return {"base_url": self.base_url, "model": self.model, "api_key": self.api_key}
+        return {
+            "base_url": self.base_url,
+            "model": self.model,
+            "api_key": self.api_key,
+            "fallback_urls": self.fallback_urls,
+            "hedge": self.hedge,
+        }
 
 
 @dataclass
@@ -57,6 +69,7 @@ class HermesConfig:
     base_url: str = field(default="http://127.0.0.1:8002")
     api_key: str = field(default="")
     default_app: str = field(default="")
+    stream_idle_timeout: float = field(default=300.0)  # 流式响应超过该秒数没有收到任何数据时断开连接，0 表示不限制
 
     @classmethod
     def from_dict(cls, d: dict) -> "HermesConfig":
@@ -65,6 +78,7 @@ class HermesConfig:
             base_url=d.get("base_url", cls.base_url),
             api_key=d.get("api_key", cls.api_key),
             default_app=d.get("default_app", cls.default_app),
+            stream_idle_timeout=float(d.get("stream_idle_timeout", cls.stream_idle_timeout)),
         )
 
     def to_dict(self) -> dict:
@@ -73,6 +87,56 @@ class HermesConfig:
             "base_url": self.base_url,
             "api_key": self.api_key,
             "default_app": self.default_app,
+            "stream_idle_timeout": self.stream_idle_timeout,
+        }
+
+
+@dataclass
+class ReplayConfig:
+    """录制回放后端配置"""
+
+    path: str = field(default="")  # 录制文件路径，由 WITTY_RECORD_STREAMS 录制
+    speed: float = field(default=1.0)  # 回放速度倍数，1 为原始速度，0 表示不等待、尽快回放
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ReplayConfig":
+        """从字典初始化配置"""
+        return cls(
+            path=d.get("path", cls.path),
+            speed=float(d.get("speed", cls.speed)),
+        )
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "path": self.path,
+            "speed": self.speed,
+        }
+
+
+@dataclass
+class ResponseCacheConfig:
+    """命令失败分析的本地响应缓存配置"""
+
+    enabled: bool = field(default=False)  # 是否缓存命令失败时的 LLM 分析结果
+    max_size_mb: float = field(default=64.0)  # 缓存目录的大小上限，超出时淘汰最久未使用的条目
+    ttl: float = field(default=7 * 24 * 3600.0)  # 缓存条目的有效期（秒）
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ResponseCacheConfig":
+        """从字典初始化配置"""
+        return cls(
+            enabled=bool(d.get("enabled", cls.enabled)),
+            max_size_mb=float(d.get("max_size_mb", cls.max_size_mb)),
+            ttl=float(d.get("ttl", cls.ttl)),
+        )
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "enabled": self.enabled,
+            "max_size_mb": self.max_size_mb,
+            "ttl": self.ttl,
         }
 
 
@@ -83,6 +147,8 @@ class ConfigModel:
     backend: Backend = field(default=Backend.EULERINTELLI)
     openai: OpenAIConfig = field(default_factory=OpenAIConfig)
     eulerintelli: HermesConfig = field(default_factory=HermesConfig)
+    replay: ReplayConfig = field(default_factory=ReplayConfig)
+    response_cache: ResponseCacheConfig = field(default_factory=ResponseCacheConfig)
     log_level: LogLevel = field(default=LogLevel.DEBUG)
     locale: str = field(default="")  # 空字符串表示自动检测系统语言
 
@@ -114,6 +180,8 @@ class ConfigModel:
             backend=backend,
             openai=OpenAIConfig.from_dict(d.get("openai", {})),
             eulerintelli=HermesConfig.from_dict(d.get("eulerintelli", {})),
+            replay=ReplayConfig.from_dict(d.get("replay", {})),
+            response_cache=ResponseCacheConfig.from_dict(d.get("response_cache", {})),
             log_level=log_level,
             locale=d.get("locale", ""),  # 空字符串表示自动检测
         )
@@ -124,6 +192,8 @@ class ConfigModel:
             "backend": self.backend.value,  # 保存枚举的值
             "openai": self.openai.to_dict(),
             "eulerintelli": self.eulerintelli.to_dict(),
+            "replay": self.replay.to_dict(),
+            "response_cache": self.response_cache.to_dict(),
             "log_level": self.log_level.value,
             "locale": self.locale,
         }
@@ -2,8 +2,11 @@
 
 import gettext
 import locale
+from collections.abc import Callable
 from pathlib import Path
-from typing import ClassVar
+from typing import ClassVar, TypeVar
+
+_T = TypeVar("_T")
 
 # 支持的语言列表
 SUPPORTED_LOCALES = {
@@ -53,6 +56,8 @@ class I18nManager:
     _instance: ClassVar["I18nManager | None"] = None
     _current_locale: str = DEFAULT_LOCALE
     _translations: ClassVar[dict[str, gettext.GNUTranslations | gettext.NullTranslations]] = {}
+    # 当前语言下的静态文本缓存，切换语言时清空
+    _memo: ClassVar[dict[str, object]] = {}
 
     def __new__(cls) -> "I18nManager":
         """单例模式"""
@@ -65,24 +70,8 @@ class I18nManager:
         if not hasattr(self, "_initialized"):
             self._locale_dir = Path(__file__).parent / "locales"
             self._domain = "messages"
-            self._load_all_translations()
             self._initialized = True
 
-    def _load_all_translations(self) -> None:
-        """预加载所有支持的翻译"""
-        for locale_code in SUPPORTED_LOCALES:
-            try:
-                translation = gettext.translation(
-                    self._domain,
-                    localedir=str(self._locale_dir),
-                    languages=[locale_code],
-                    fallback=False,
-                )
-                self._translations[locale_code] = translation
-            except FileNotFoundError:
-                # 如果翻译文件不存在，使用空翻译(返回原始文本)
-                self._translations[locale_code] = gettext.NullTranslations()
-
     def set_locale(self, locale_code: str) -> bool:
         """
         设置当前语言环境
@@ -98,10 +87,10 @@ class I18nManager:
             return False
 
         self._current_locale = locale_code
+        self._memo.clear()
 
         # 安装全局翻译函数
-        if locale_code in self._translations:
-            self._translations[locale_code].install()
+        self._get_translation(locale_code).install()
 
         return True
 
@@ -123,6 +112,31 @@ class I18nManager:
         """
         return _detect_default_locale()
 
+    def get_loaded_locales(self) -> list[str]:
+        """获取已加载翻译的语言列表（用于调试和测试）"""
+        return list(self._translations)
+
+    def memoize(self, key: str, factory: Callable[[], _T]) -> _T:
+        """
+        获取当前语言下缓存的文本，不存在时调用 factory 生成
+
+        适用于不含运行时参数的静态文本片段，缓存在切换语言时自动失效。
+
+        Args:
+            key: 缓存键，调用方需保证唯一
+            factory: 生成文本的函数
+
+        Returns:
+            缓存或新生成的值
+
+        """
+        try:
+            return self._memo[key]  # type: ignore[return-value]
+        except KeyError:
+            value = factory()
+            self._memo[key] = value
+            return value
+
     def translate(self, message: str, **kwargs: str | float) -> str:
         """
         翻译消息
@@ -135,11 +149,7 @@ class I18nManager:
             翻译后的消息
 
         """
-        translation = self._translations.get(
-            self._current_locale,
-            gettext.NullTranslations(),
-        )
-        translated = translation.gettext(message)
+        translated = self._get_translation(self._current_locale).gettext(message)
 
         # 支持格式化参数
         if kwargs:
@@ -167,17 +177,30 @@ class I18nManager:
             翻译后的消息
 
         """
-        translation = self._translations.get(
-            self._current_locale,
-            gettext.NullTranslations(),
-        )
-        translated = translation.ngettext(singular, plural, n)
+        translated = self._get_translation(self._current_locale).ngettext(singular, plural, n)
 
         if kwargs:
             translated = translated.format(n=n, **kwargs)
 
         return translated
 
+    def _get_translation(self, locale_code: str) -> gettext.GNUTranslations | gettext.NullTranslations:
+        """获取指定语言的翻译，首次使用时才加载对应的 .mo 文件"""
+        translation = self._translations.get(locale_code)
+        if translation is None:
+            try:
+                translation = gettext.translation(
+                    self._domain,
+                    localedir=str(self._locale_dir),
+                    languages=[locale_code],
+                    fallback=False,
+                )
+            except FileNotFoundError:
+                # 如果翻译文件不存在，使用空翻译(返回原始文本)
+                translation = gettext.NullTranslations()
+            self._translations[locale_code] = translation
+        return translation
+
 
 # 全局实例
 _i18n_manager = I18nManager()
@@ -212,6 +235,11 @@ def get_supported_locales() -> dict[str, str]:
     return _i18n_manager.get_supported_locales()
 
 
+def memoize(key: str, factory: Callable[[], _T]) -> _T:
+    """获取当前语言下缓存的静态文本，切换语言后自动重新生成"""
+    return _i18n_manager.memoize(key, factory)
+
+
 # 便捷的翻译函数
 def _(message: str, **kwargs: str | float) -> str:
     """翻译消息的快捷函数"""
@@ -84,6 +84,13 @@ For more information and documentation, please visit:
         action="store_true",
         help=_("Select default agent"),
     )
+    app_group.add_argument(
+        "--resume",
+        nargs="?",
+        const="",
+        metavar="SESSION_ID",
+        help=_("Resume a saved session (the most recent one if no ID is given)"),
+    )
 
     # 认证管理选项组
     auth_group = parser.add_argument_group(
@@ -173,6 +180,23 @@ def set_log_level(config_manager: ConfigManager, level: str) -> None:
     sys.stdout.write(_("✓ Logging system initialized\n"))
 
 
+def resolve_resume_session(session_id: str | None) -> str:
+    """解析要恢复的会话，未指定 --resume 时返回空字符串，找不到会话时退出"""
+    if session_id is None:
+        return ""
+
+    from app.transcript import resolve_session  # noqa: PLC0415
+
+    resolved = resolve_session(session_id)
+    if resolved is None:
+        if session_id:
+            sys.stderr.write(_("✗ Session not found: {session_id}\n").format(session_id=session_id))
+        else:
+            sys.stderr.write(_("✗ No saved session to resume\n"))
+        sys.exit(1)
+    return resolved
+
+
 def main() -> None:  # noqa: C901, PLR0911
     """主函数"""
     # 首先初始化配置管理器
@@ -230,6 +254,8 @@ def main() -> None:  # noqa: C901, PLR0911
         browser_login()
         return
 
+    resume_session = resolve_resume_session(args.resume)
+
     setup_logging(config_manager)
     # 在 TUI 模式下禁用控制台日志输出，避免干扰界面
     disable_console_output()
@@ -240,7 +266,7 @@ def main() -> None:  # noqa: C901, PLR0911
         # 延迟导入 IntelligentTerminal，确保在 i18n 初始化之后
         from app.tui import IntelligentTerminal  # noqa: PLC0415
 
-        app = IntelligentTerminal()
+        app = IntelligentTerminal(resume_session=resume_session)
         app.run()
     except Exception:
         logger.exception(_("Fatal error in Intelligent Shell application"))
@@ -4,13 +4,14 @@
 功能说明:
 1. 异步流式执行系统命令: 逐行输出 STDOUT。
 2. 结束后输出总结状态(退出码，成功/失败)。
-3. 失败时自动向 LLM 请求分析建议并继续流式输出建议。
+3. 失败时自动向 LLM 请求分析建议并继续流式输出建议；开启响应缓存时相同的分析请求直接回放缓存的建议。
 """
 
 from __future__ import annotations
 
 import asyncio
 import shutil
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
 from backend.hermes.mcp_helpers import is_mcp_message
@@ -22,6 +23,7 @@ if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
     from backend.base import LLMClientBase
+    from backend.response_cache import ResponseCache
 
 # 定义危险命令黑名单
 BLACKLIST = ["rm", "sudo", "shutdown", "reboot", "mkfs"]
@@ -36,7 +38,66 @@ def is_command_safe(command: str) -> bool:
     return all(dangerous not in command for dangerous in BLACKLIST)
 
 
-async def process_command(command: str, llm_client: LLMClientBase) -> AsyncGenerator[tuple[str, bool], None]:
+@dataclass
+class _SuggestionSource:
+    """命令失败分析建议的来源：LLM 客户端及可选的响应缓存"""
+
+    llm_client: LLMClientBase
+    response_cache: ResponseCache | None = None
+    refresh_cache: bool = False
+    """跳过缓存重新请求，新的响应替换缓存"""
+
+    async def suggest(self, query: str) -> AsyncGenerator[tuple[str, bool], None]:
+        """
+        获取分析建议
+
+        开启缓存时优先回放缓存的响应，按原分块不加等待地输出，与实时响应经过相同的渲染流程；
+        未命中时请求 LLM，只缓存正常完成的响应。
+        """
+        cache = self.response_cache
+        scope = self.llm_client.response_cache_scope() if cache is not None else None
+        if cache is None or scope is None:
+            async for suggestion in self.llm_client.get_llm_response(query):
+                is_mcp_message_flag = is_mcp_message(suggestion)
+                yield (suggestion, not is_mcp_message_flag)
+            return
+
+        if self.refresh_cache:
+            cache.bypass()
+        elif (cached := cache.get(scope, query)) is not None:
+            yield (
+                _("[缓存的分析] 命中 {hits} 次 / 未命中 {misses} 次，按 Ctrl+B 跳过缓存重新分析").format(
+                    hits=cache.stats.hits,
+                    misses=cache.stats.misses,
+                ),
+                False,
+            )
+            for chunk in cached:
+                yield (chunk, True)
+            return
+
+        chunks = []
+        cacheable = True
+        async for suggestion in self.llm_client.get_llm_response(query):
+            is_mcp_message_flag = is_mcp_message(suggestion)
+            if is_mcp_message_flag:
+                # 包含工具调用交互的响应依赖当时的执行结果，不缓存
+                cacheable = False
+            else:
+                chunks.append(suggestion)
+            yield (suggestion, not is_mcp_message_flag)
+        # 后端错误等以提示文本结束的响应不缓存，否则后端恢复后仍会回放错误提示
+        if cacheable and self.llm_client.last_response_complete():
+            cache.put(scope, query, chunks)
+
+
+async def process_command(
+    command: str,
+    llm_client: LLMClientBase,
+    response_cache: ResponseCache | None = None,
+    *,
+    refresh_cache: bool = False,
+) -> AsyncGenerator[tuple[str, bool], None]:
     """
     处理用户输入的命令
 
@@ -44,6 +105,9 @@ async def process_command(command: str, llm_client: LLMClientBase) -> AsyncGener
     2. 若存在，则检查命令安全性，安全时执行命令；若执行失败则将错误信息附带命令发送给大模型；
     3. 若不存在，则直接将命令内容发送给大模型生成建议。
 
+    传入 response_cache 时，命令失败的分析请求优先使用缓存的响应；refresh_cache 为 True 时
+    跳过缓存重新请求，并以新的响应替换缓存。
+
     返回一个元组 (content, is_llm_output)，其中：
     - content: 输出内容
     - is_llm_output: 是否是LLM输出（True表示LLM输出，应使用富文本；False表示命令输出，应使用纯文本）
@@ -77,7 +141,8 @@ async def process_command(command: str, llm_client: LLMClientBase) -> AsyncGener
 
     # 流式执行
     try:
-        async for item in _stream_system_command(command, llm_client, logger):
+        source = _SuggestionSource(llm_client, response_cache, refresh_cache=refresh_cache)
+        async for item in _stream_system_command(command, source, logger):
             yield item
     except asyncio.CancelledError:
         logger.info("命令执行被用户中断")
@@ -86,7 +151,7 @@ async def process_command(command: str, llm_client: LLMClientBase) -> AsyncGener
 
 async def _stream_system_command(
     command: str,
-    llm_client: LLMClientBase,
+    source: _SuggestionSource,
     logger: logging.Logger,
 ) -> AsyncGenerator[tuple[str, bool], None]:
     """
@@ -101,13 +166,13 @@ async def _stream_system_command(
     # 创建子进程
     proc = await _create_subprocess(command, logger)
     if proc is None:
-        async for item in _handle_subprocess_creation_error(command, llm_client):
+        async for item in _handle_subprocess_creation_error(command, source):
             yield item
         return
 
     # 执行命令并处理输出
     try:
-        async for item in _execute_and_stream_output(proc, command, llm_client, logger):
+        async for item in _execute_and_stream_output(proc, command, source, logger):
             yield item
     except asyncio.CancelledError:
         await _handle_process_interruption(proc, logger)
@@ -129,20 +194,19 @@ async def _create_subprocess(command: str, logger: logging.Logger) -> asyncio.su
 
 async def _handle_subprocess_creation_error(
     command: str,
-    llm_client: LLMClientBase,
+    source: _SuggestionSource,
 ) -> AsyncGenerator[tuple[str, bool], None]:
     """处理子进程创建失败的情况"""
     yield (_("[命令启动失败] 无法创建子进程"), False)
     query = _("无法启动命令 '{command}'，请分析可能原因并给出解决建议。").format(command=command)
-    async for suggestion in llm_client.get_llm_response(query):
-        is_mcp_message_flag = is_mcp_message(suggestion)
-        yield (suggestion, not is_mcp_message_flag)
+    async for item in source.suggest(query):
+        yield item
 
 
 async def _execute_and_stream_output(
     proc: asyncio.subprocess.Process,
     command: str,
-    llm_client: LLMClientBase,
+    source: _SuggestionSource,
     logger: logging.Logger,
 ) -> AsyncGenerator[tuple[str, bool], None]:
     """执行命令并流式输出结果"""
@@ -166,7 +230,7 @@ async def _execute_and_stream_output(
         return
 
     # 处理命令失败的情况
-    async for item in _handle_command_failure(proc, command, returncode, llm_client, logger):
+    async for item in _handle_command_failure(proc, command, returncode, source, logger):
         yield item
 
 
@@ -174,7 +238,7 @@ async def _handle_command_failure(
     proc: asyncio.subprocess.Process,
     command: str,
     returncode: int,
-    llm_client: LLMClientBase,
+    source: _SuggestionSource,
     logger: logging.Logger,
 ) -> AsyncGenerator[tuple[str, bool], None]:
     """处理命令执行失败的情况"""
@@ -189,9 +253,8 @@ async def _handle_command_failure(
         "标准错误输出如下：\n{stderr_text}\n"
         "请分析原因并提供解决建议。",
     ).format(command=command, returncode=returncode, stderr_text=stderr_text)
-    async for suggestion in llm_client.get_llm_response(query):
-        is_mcp_message_flag = is_mcp_message(suggestion)
-        yield (suggestion, not is_mcp_message_flag)
+    async for item in source.suggest(query):
+        yield item
 
 
 async def _read_stderr(proc: asyncio.subprocess.Process) -> str:
@@ -7,17 +7,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
+import time
 import webbrowser
-from typing import Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import httpx
 from openai import APIError, AsyncOpenAI, AuthenticationError, OpenAIError
 
+from backend.http_pool import get_http_client
 from i18n.manager import _
 from log.manager import get_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
 # 常量定义
 MAX_MODEL_DISPLAY = 5
 HTTP_OK = 200
@@ -36,6 +44,10 @@ TOKEN_LONG_TERM_PREFIX = "sk-"  # noqa: S105
 TOKEN_LONG_TERM_LENGTH = 35  # sk- (3) + 32 hex chars
 TOKEN_PREVIEW_LENGTH = 5  # 日志中显示的令牌预览长度
 
+# LLM 能力检测结果缓存
+CAPABILITY_CACHE_PATH = Path.home() / ".cache" / "openEuler Intelligence" / "llm-capability-cache.json"
+CAPABILITY_CACHE_TTL = 3600  # 缓存有效期（秒）
+
 
 def _parse_env_flag(value: str | None) -> bool | None:
     """解析环境变量中的布尔标志值"""
@@ -103,13 +115,90 @@ def is_browser_available() -> bool:
         return browser is not None
 
 
+class CapabilityCache:
+    """
+    LLM 能力检测结果缓存
+
+    以端点、模型和 API 密钥哈希作为指纹持久化保存验证成功的结果，
+    在有效期内重复验证同一配置时直接返回缓存结果；重新验证失败时删除该配置的缓存。
+    """
+
+    def __init__(self, path: Path = CAPABILITY_CACHE_PATH, ttl: float = CAPABILITY_CACHE_TTL) -> None:
+        """初始化能力缓存"""
+        self.logger = get_logger(__name__)
+        self.path = path
+        self.ttl = ttl
+
+    @staticmethod
+    def fingerprint(endpoint: str, model: str, api_key: str) -> str:
+        """根据端点、模型和 API 密钥哈希计算配置指纹"""
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        raw = f"{endpoint.rstrip('/')}\n{model}\n{key_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, fingerprint: str) -> dict[str, Any] | None:
+        """获取未过期的缓存结果，不存在或已过期时返回 None"""
+        entry = self._load().get(fingerprint)
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - entry.get("timestamp", 0) > self.ttl:
+            return None
+        return entry
+
+    def put(self, fingerprint: str, result: dict[str, Any]) -> None:
+        """写入检测结果，同时清理已过期的条目"""
+        now = time.time()
+        entries = {
+            key: value
+            for key, value in self._load().items()
+            if isinstance(value, dict) and now - value.get("timestamp", 0) <= self.ttl
+        }
+        entries[fingerprint] = {**result, "timestamp": now}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self.path)
+        except OSError as e:
+            self.logger.warning("写入 LLM 能力缓存失败: %s", e)
+
+    def invalidate(self, fingerprint: str) -> None:
+        """删除指定指纹的缓存"""
+        entries = self._load()
+        if entries.pop(fingerprint, None) is None:
+            return
+        try:
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self.path)
+        except OSError as e:
+            self.logger.warning("更新 LLM 能力缓存失败: %s", e)
+
+    def _load(self) -> dict[str, Any]:
+        """读取缓存文件"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.debug("读取 LLM 能力缓存失败: %s", e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
 class APIValidator:
     """API 配置验证器"""
 
-    def __init__(self, *, verify_ssl: bool | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        verify_ssl: bool | None = None,
+        capability_cache: CapabilityCache | None = None,
+    ) -> None:
         """初始化验证器"""
         self.logger = get_logger(__name__)
         self.verify_ssl = should_verify_ssl(verify_ssl=verify_ssl)
+        self.capability_cache = capability_cache or CapabilityCache()
         self.logger.debug("SSL 验证状态: %s", self.verify_ssl)
 
     async def validate_llm_config(  # noqa: PLR0913
@@ -120,10 +209,15 @@ class APIValidator:
         timeout: int = 30,  # noqa: ASYNC109
         max_tokens: int | None = None,
         temperature: float | None = None,
+        *,
+        use_cache: bool = True,
     ) -> tuple[bool, str, dict[str, Any]]:
         """
         验证 LLM 配置
 
+        验证成功的结果会按配置指纹缓存，有效期内再次验证相同配置时直接返回缓存结果；
+        跳过缓存重新验证失败时删除该配置的缓存，之后不再使用过时的成功结果。
+
         Args:
             endpoint: API 端点
             api_key: API 密钥
@@ -131,6 +225,7 @@ class APIValidator:
             timeout: 超时时间（秒）
             max_tokens: 最大令牌数，如果为 None 则使用默认值
             temperature: 温度参数，如果为 None 则使用默认值
+            use_cache: 是否使用能力检测缓存
 
         Returns:
             tuple[bool, str, dict]: (是否验证成功, 错误/成功消息, 额外信息)
@@ -138,6 +233,24 @@ class APIValidator:
         """
         self.logger.info("开始验证 LLM 配置 - 端点: %s, 模型: %s", endpoint, model)
 
+        fingerprint = CapabilityCache.fingerprint(endpoint, model, api_key)
+        if use_cache:
+            cached = self.capability_cache.get(fingerprint)
+            if cached is not None:
+                self.logger.info("使用缓存的 LLM 能力检测结果 - 端点: %s, 模型: %s", endpoint, model)
+                return (
+                    True,
+                    self._build_llm_success_message(
+                        func_valid=cached.get("supports_function_call", False),
+                        func_type=cached.get("detected_function_call_type", "none"),
+                    ),
+                    {
+                        "supports_function_call": cached.get("supports_function_call", False),
+                        "detected_function_call_type": cached.get("detected_function_call_type", "none"),
+                        "cached": True,
+                    },
+                )
+
         try:
             client = self._create_openai_client(
                 endpoint=endpoint,
@@ -148,7 +261,7 @@ class APIValidator:
             # 测试基本对话功能
             chat_valid, chat_msg = await self._test_basic_chat(client, model, max_tokens, temperature)
             if not chat_valid:
-                await client.close()
+                self.capability_cache.invalidate(fingerprint)
                 return False, chat_msg, {}
 
             # 测试 function_call 支持并检测类型
@@ -159,9 +272,8 @@ class APIValidator:
                 temperature,
             )
 
-            await client.close()
-
         except TimeoutError:
+            self.capability_cache.invalidate(fingerprint)
             return False, _("连接超时 - 无法在 {timeout} 秒内连接到 {endpoint}").format(
                 timeout=timeout,
                 endpoint=endpoint,
@@ -169,21 +281,18 @@ class APIValidator:
         except (AuthenticationError, APIError, OpenAIError) as e:
             error_msg = _("LLM 配置验证失败: {error}").format(error=str(e))
             self.logger.exception(error_msg)
+            self.capability_cache.invalidate(fingerprint)
             return False, error_msg, {}
         else:
-            success_msg = _("LLM 配置验证成功")
-            if func_valid:
-                success_msg += _(" - 支持工具调用，类型: {func_type}").format(func_type=func_type)
-            else:
-                success_msg += _(" - 不支持工具调用")
-
+            result = {
+                "supports_function_call": func_valid,
+                "detected_function_call_type": func_type,
+            }
+            self.capability_cache.put(fingerprint, result)
             return (
                 True,
-                success_msg,
-                {
-                    "supports_function_call": func_valid,
-                    "detected_function_call_type": func_type,
-                },
+                self._build_llm_success_message(func_valid=func_valid, func_type=func_type),
+                result,
             )
 
     async def validate_embedding_config(
@@ -230,6 +339,15 @@ class APIValidator:
         # 两种格式都失败
         return False, _("无法连接到 Embedding 模型服务。"), {}
 
+    def _build_llm_success_message(self, *, func_valid: bool, func_type: str) -> str:
+        """构造 LLM 验证成功消息"""
+        success_msg = _("LLM 配置验证成功")
+        if func_valid:
+            success_msg += _(" - 支持工具调用，类型: {func_type}").format(func_type=func_type)
+        else:
+            success_msg += _(" - 不支持工具调用")
+        return success_msg
+
     def _create_openai_client(
         self,
         *,
@@ -237,8 +355,12 @@ class APIValidator:
         api_key: str,
         timeout: int,
     ) -> AsyncOpenAI:
-        """构造 AsyncOpenAI 客户端，应用统一的 SSL 校验设置"""
-        http_client = httpx.AsyncClient(timeout=timeout, verify=self.verify_ssl)
+        """
+        构造 AsyncOpenAI 客户端，应用统一的 SSL 校验设置
+
+        底层复用共享 HTTP 客户端，因此调用方不应关闭返回的 AsyncOpenAI 实例。
+        """
+        http_client = get_http_client(endpoint, verify=self.verify_ssl, profile="validation")
         return AsyncOpenAI(
             api_key=api_key,
             base_url=endpoint,
@@ -285,65 +407,42 @@ class APIValidator:
         """
         检测并测试不同类型的 function_call 支持
 
-        按照以下顺序尝试：
-        1. OpenAI 标准 function_call 格式
-        2. OpenAI tools 格式
-        3. vLLM 特有格式
-        4. Ollama 特有格式
+        所有格式的探测请求并发发出，按以下优先顺序选取结果：
+        1. OpenAI tools 格式
+        2. structured_output 格式
+        3. json_mode 格式
+        4. vLLM 特有格式
+        5. Ollama 特有格式
+
+        一旦优先级更高的探测确认成功，其余仍在进行的探测会被取消。
 
         Returns:
             tuple[bool, str, str]: (是否支持, 详细消息, 格式类型)
 
         """
-        # 尝试 OpenAI tools 格式
-        tools_valid, tools_msg = await self._test_tools_format(
-            client,
-            model,
-            max_tokens,
-            temperature,
-        )
-        if tools_valid:
-            return True, tools_msg, "function_call"
-
-        # 尝试 structured_output 格式
-        structured_valid, structured_msg = await self._test_structured_output(
-            client,
-            model,
-            max_tokens,
-            temperature,
-        )
-        if structured_valid:
-            return True, structured_msg, "structured_output"
-
-        # 尝试 json_mode 格式
-        json_mode_valid, json_mode_msg = await self._test_json_mode(
-            client,
-            model,
-            max_tokens,
-            temperature,
-        )
-        if json_mode_valid:
-            return True, json_mode_msg, "json_mode"
-
-        # 尝试 vLLM 格式
-        vllm_valid, vllm_msg = await self._test_vllm_function_call(
-            client,
-            model,
-            max_tokens,
-            temperature,
-        )
-        if vllm_valid:
-            return True, vllm_msg, "vllm"
+        probes: list[tuple[str, Callable[..., Awaitable[tuple[bool, str]]]]] = [
+            ("function_call", self._test_tools_format),
+            ("structured_output", self._test_structured_output),
+            ("json_mode", self._test_json_mode),
+            ("vllm", self._test_vllm_function_call),
+            ("ollama", self._test_ollama_function_call),
+        ]
+        tasks = [
+            asyncio.create_task(probe(client, model, max_tokens, temperature), name=f"probe-{func_type}")
+            for func_type, probe in probes
+        ]
 
-        # 尝试 Ollama 格式
-        ollama_valid, ollama_msg = await self._test_ollama_function_call(
-            client,
-            model,
-            max_tokens,
-            temperature,
-        )
-        if ollama_valid:
-            return True, ollama_msg, "ollama"
+        try:
+            # 按优先顺序等待结果，低优先级探测即使先完成也需等待高优先级结果
+            for (func_type, _probe), task in zip(probes, tasks, strict=True):
+                valid, message = await task
+                if valid:
+                    self.logger.debug("function_call 探测命中: %s", func_type)
+                    return True, message, func_type
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         return False, _("不支持任何 function_call 格式"), "none"
 
@@ -608,8 +707,6 @@ FUNCTION_CALL: get_current_time()
             # 测试 embedding 功能
             test_text = "这是一个测试文本"
             response = await client.embeddings.create(input=test_text, model=model)
-
-            await client.close()
         except TimeoutError:
             return False, _("连接超时 - 无法在 {timeout} 秒内连接到 {endpoint}").format(
                 timeout=timeout,
@@ -650,28 +747,28 @@ FUNCTION_CALL: get_current_time()
 
             data = {"inputs": "这是一个测试文本", "normalize": True}
 
-            async with httpx.AsyncClient(timeout=timeout, verify=self.verify_ssl) as client:
-                response = await client.post(embed_endpoint, json=data, headers=headers)
-
-                if response.status_code == HTTP_OK:
-                    json_response = response.json()
-                    if isinstance(json_response, list) and len(json_response) > 0:
-                        embedding = json_response[0]
-                        if isinstance(embedding, list) and len(embedding) > 0:
-                            dimension = len(embedding)
-                            return (
-                                True,
-                                _("MindIE Embedding 配置验证成功 - 维度: {dimension}").format(
-                                    dimension=dimension,
-                                ),
-                                {
-                                    "type": "mindie",
-                                    "dimension": dimension,
-                                    "sample_embedding_length": len(embedding),
-                                },
-                            )
-
-                return False, _("MindIE Embedding 响应格式不正确"), {}
+            client = get_http_client(endpoint, verify=self.verify_ssl, profile="validation")
+            response = await client.post(embed_endpoint, json=data, headers=headers, timeout=timeout)
+
+            if response.status_code == HTTP_OK:
+                json_response = response.json()
+                if isinstance(json_response, list) and len(json_response) > 0:
+                    embedding = json_response[0]
+                    if isinstance(embedding, list) and len(embedding) > 0:
+                        dimension = len(embedding)
+                        return (
+                            True,
+                            _("MindIE Embedding 配置验证成功 - 维度: {dimension}").format(
+                                dimension=dimension,
+                            ),
+                            {
+                                "type": "mindie",
+                                "dimension": dimension,
+                                "sample_embedding_length": len(embedding),
+                            },
+                        )
+
+            return False, _("MindIE Embedding 响应格式不正确"), {}
 
         except httpx.TimeoutException:
             return False, _("连接超时 - 无法在 {timeout} 秒内连接到 {endpoint}").format(
@@ -725,27 +822,27 @@ async def validate_oi_connection(base_url: str, access_token: str) -> tuple[bool
         if access_token and access_token.strip():
             headers["Authorization"] = f"Bearer {access_token}"
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            # 发送请求
-            response = await client.get(api_url, headers=headers)
+        # 发送请求
+        client = get_http_client(base_url)
+        response = await client.get(api_url, headers=headers)
 
-            # 检查 HTTP 状态码
-            if response.status_code != HTTP_OK:
-                return _handle_http_error(response.status_code)
+        # 检查 HTTP 状态码
+        if response.status_code != HTTP_OK:
+            return _handle_http_error(response.status_code)
 
-            # 检查响应内容
-            try:
-                response_data = response.json()
-            except (ValueError, TypeError, KeyError):
-                return False, _("服务返回的数据格式不正确")
+        # 检查响应内容
+        try:
+            response_data = response.json()
+        except (ValueError, TypeError, KeyError):
+            return False, _("服务返回的数据格式不正确")
 
-            # 检查 code 字段
-            code = response_data.get("code")
-            if code == HTTP_OK:
-                logger.info("Witty Assistant 服务连接成功")
-                return True, _("连接成功")
+        # 检查 code 字段
+        code = response_data.get("code")
+        if code == HTTP_OK:
+            logger.info("Witty Assistant 服务连接成功")
+            return True, _("连接成功")
 
-            return False, _("服务返回错误代码: {code}").format(code=code)
+        return False, _("服务返回错误代码: {code}").format(code=code)
 
     except httpx.ConnectError:
         return False, _("无法连接到服务，请检查 URL 和网络连接")
@@ -0,0 +1,124 @@
+"""测试 MCP 服务注册与智能体创建的并发执行"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment import agent as agent_module
+from app.deployment.agent import AgentManager, AppConfig, McpConfig
+from app.deployment.models import DeploymentState
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import pytest
+
+SERVICE_COUNT = 6
+INSTALL_DELAY = 0.2
+
+
+class _FakeConfigManager:
+    def __init__(self) -> None:
+        self.default_app = ""
+
+    def set_default_app(self, app_id: str) -> None:
+        self.default_app = app_id
+
+
+class _FakeApiClient:
+    """模拟后端 API，记录并发度与调用时间"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.ready_at: dict[str, float] = {}
+        self.agent_started_at: list[float] = []
+
+    async def register_mcp_service(self, config: McpConfig) -> str:
+        return f"id-{config.name}"
+
+    async def install_mcp_service(self, service_id: str) -> None:
+        return
+
+    async def wait_for_installation(self, service_id: str) -> bool:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        # 倒序完成，验证日志仍按配置顺序输出
+        await asyncio.sleep(INSTALL_DELAY * (1 + (SERVICE_COUNT - int(service_id[-1])) / SERVICE_COUNT))
+        self.active -= 1
+        self.ready_at[service_id] = time.monotonic()
+        return True
+
+    async def activate_mcp_service(self, service_id: str) -> None:
+        return
+
+    async def create_agent(self, name: str, description: str, mcp_service_ids: list[str]) -> str:
+        self.agent_started_at.append(time.monotonic())
+        await asyncio.sleep(0.05)
+        return f"app-{name}"
+
+    async def publish_agent(self, app_id: str) -> None:
+        return
+
+
+def _make_manager(monkeypatch: pytest.MonkeyPatch, api_client: _FakeApiClient) -> AgentManager:
+    monkeypatch.setattr(agent_module, "ConfigManager", _FakeConfigManager)
+    manager = AgentManager(max_concurrency=3)
+    manager.api_client = api_client  # type: ignore[assignment]
+
+    configs = [
+        (Path(f"/mcp/svc{i}/config.json"), McpConfig(f"svc{i}", "", "", {}, "stdio"))
+        for i in range(SERVICE_COUNT)
+    ]
+    apps = [
+        AppConfig("agent", f"agent{i}", "", [f"svc{i}", f"svc{(i + 1) % SERVICE_COUNT}"])
+        for i in range(SERVICE_COUNT)
+    ]
+
+    async def load_mcp_configs(*_args: object) -> list[tuple[Path, McpConfig]]:
+        return configs
+
+    async def load_app_configs(*_args: object) -> list[AppConfig]:
+        return apps
+
+    monkeypatch.setattr(manager, "_load_mcp_configs", load_mcp_configs)
+    monkeypatch.setattr(manager, "_load_app_configs", load_app_configs)
+    return manager
+
+
+def _positions(log: list[str], needle: Callable[[int], str]) -> list[int]:
+    return [next(i for i, line in enumerate(log) if needle(n) in line) for n in range(SERVICE_COUNT)]
+
+
+def test_mcp_services_and_agents_run_concurrently_in_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """服务并发安装且受并发数限制，智能体在服务就绪后创建，日志顺序与串行执行一致"""
+    api_client = _FakeApiClient()
+    manager = _make_manager(monkeypatch, api_client)
+    state = DeploymentState()
+
+    async def run() -> str | None:
+        mapping = await manager._register_all_mcp_services(state, None)  # noqa: SLF001
+        assert len(mapping) == SERVICE_COUNT
+        return await manager._create_agents_from_config(mapping, state, None)  # noqa: SLF001
+
+    start = time.monotonic()
+    default_app_id = asyncio.run(run())
+    elapsed = time.monotonic() - start
+
+    # 串行至少需要 SERVICE_COUNT * INSTALL_DELAY 秒
+    assert elapsed < SERVICE_COUNT * INSTALL_DELAY
+    assert api_client.peak == manager.max_concurrency
+    assert min(api_client.agent_started_at) >= max(api_client.ready_at.values())
+
+    assert default_app_id == "app-agent0"
+    assert manager.config_manager.default_app == "app-agent0"  # type: ignore[attr-defined]
+
+    registered = _positions(state.output_log, lambda n: f"svc{n} 注册成功")
+    created = _positions(state.output_log, lambda n: f"智能体 agent{n} 创建成功")
+    assert registered == sorted(registered)
+    assert created == sorted(created)
+    assert registered[-1] < created[0]
@@ -0,0 +1,123 @@
+"""测试部署断点续跑"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment import agent as agent_module
+from app.deployment.agent import AgentManager
+from app.deployment.checkpoint import DeploymentCheckpoint
+from app.deployment.models import AgentInitStatus, DeploymentConfig, DeploymentState
+from app.deployment.scheduler import DeploymentStep, StepScheduler
+from app.deployment.service import DeploymentService
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from pathlib import Path
+
+    import pytest
+
+
+def _run_simulated(config: DeploymentConfig, checkpoint: DeploymentCheckpoint, failing: set[str]) -> list[str]:
+    """按真实的步骤依赖图和指纹执行一次模拟部署，返回实际执行的步骤"""
+    executed: list[str] = []
+    steps = DeploymentService()._build_deployment_steps(config, None)  # noqa: SLF001
+
+    def simulate(name: str) -> Callable[[], Awaitable[bool]]:
+        async def run() -> bool:
+            executed.append(name)
+            return name not in failing
+
+        return run
+
+    scheduler = StepScheduler(
+        [DeploymentStep(s.name, s.title, simulate(s.name), s.depends_on, s.fingerprint) for s in steps],
+        checkpoint=checkpoint,
+    )
+    asyncio.run(scheduler.run(DeploymentState()))
+    return executed
+
+
+def test_retry_resumes_at_failed_step(tmp_path: Path) -> None:
+    """重试时跳过已完成的步骤，只重新执行失败的步骤和每次都要执行的停止旧服务、环境检查"""
+    path = tmp_path / "checkpoint.json"
+    config = DeploymentConfig()
+
+    first = _run_simulated(config, DeploymentCheckpoint(path), {"agent_init"})
+    assert "install_dependency_script" in first
+    assert first[-1] == "agent_init"
+
+    # 重新读取断点文件，模拟重新启动后的重试
+    second = _run_simulated(config, DeploymentCheckpoint(path), set())
+    assert sorted(second) == ["agent_init", "check_environment", "stop_old_service"]
+
+
+def test_stale_checkpoint_is_discarded(tmp_path: Path) -> None:
+    """超过有效期或主机重启后的断点记录被丢弃，重试时执行所有步骤"""
+    path = tmp_path / "checkpoint.json"
+    config = DeploymentConfig()
+    all_steps = sorted(_run_simulated(config, DeploymentCheckpoint(path), {"agent_init"}))
+
+    assert sorted(_run_simulated(config, DeploymentCheckpoint(path, ttl=0), {"agent_init"})) == all_steps
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["boot_id"] = "another-boot"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert sorted(_run_simulated(config, DeploymentCheckpoint(path), set())) == all_steps
+
+
+def test_changed_config_reruns_affected_steps_and_dependents(tmp_path: Path) -> None:
+    """配置变化只让使用该配置的步骤及其下游重新执行"""
+    path = tmp_path / "checkpoint.json"
+    config = DeploymentConfig()
+    _run_simulated(config, DeploymentCheckpoint(path), {"agent_init"})
+
+    config.llm.model = "another-model"
+    rerun = _run_simulated(config, DeploymentCheckpoint(path), set())
+    assert sorted(rerun) == [
+        "agent_init",
+        "check_environment",
+        "generate_config_files",
+        "init_config_script",
+        "stop_old_service",
+    ]
+
+
+def test_agent_init_reuses_registered_mcp_services(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """智能体创建失败后重试时复用断点记录中的 MCP 服务 ID，不再重复注册"""
+    monkeypatch.setattr(agent_module, "ConfigManager", lambda: None)
+    checkpoint = DeploymentCheckpoint(tmp_path / "checkpoint.json")
+    checkpoint.begin("agent_init", "fp")
+    registrations: list[int] = []
+    received: list[dict[str, str]] = []
+
+    async def ok(*_args: object) -> bool:
+        return True
+
+    async def register(*_args: object) -> dict[str, str]:
+        registrations.append(1)
+        return {"svc": "id-svc"}
+
+    async def create(mapping: dict[str, str], *_args: object) -> str:
+        received.append(mapping)
+        if len(received) == 1:
+            msg = "后端暂不可用"
+            raise RuntimeError(msg)
+        return "app-1"
+
+    def make_manager() -> AgentManager:
+        manager = AgentManager(checkpoint=DeploymentCheckpoint(checkpoint.path).step("agent_init"))
+        for name in ("_install_service_files", "_start_mcp_servers", "_verify_mcp_services"):
+            monkeypatch.setattr(manager, name, ok)
+        monkeypatch.setattr(manager, "_register_all_mcp_services", register)
+        monkeypatch.setattr(manager, "_create_agents_from_config", create)
+        return manager
+
+    state = DeploymentState()
+    assert asyncio.run(make_manager().initialize_agents(state)) == AgentInitStatus.FAILED
+    assert asyncio.run(make_manager().initialize_agents(state)) == AgentInitStatus.SUCCESS
+    assert len(registrations) == 1
+    assert received == [{"svc": "id-svc"}, {"svc": "id-svc"}]
@@ -0,0 +1,82 @@
+"""测试部署日志的 ANSI 转换与环形缓冲区"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from rich.text import Text
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment.ansi import ansi_to_rich, strip_ansi
+from app.deployment.models import LOG_BUFFER_SIZE, DeploymentState
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        # 安装脚本中使用的颜色变量
+        ("\033[34m[INFO]\033[0m 开始安装", "[blue][INFO][/] 开始安装"),
+        ("\033[0;32m完成\033[0m", "[green]完成[/]"),
+        # 跨行颜色在行尾闭合，孤立的重置码被忽略
+        ("\033[31m错误未闭合", "[red]错误未闭合[/]"),
+        ("\033[0m孤立重置", "孤立重置"),
+        # 组合样式与部分关闭
+        ("\033[1;33m警告\033[22m 正文\033[0m", "[bold yellow]警告[/][yellow] 正文[/]"),
+        # 亮色、256 色与真彩色
+        ("\033[92mok\033[39m", "[bright_green]ok[/]"),
+        ("\033[38;5;208m橙\033[0m", "[color(208)]橙[/]"),
+        ("\033[48;2;10;20;30m底\033[0m", "[on rgb(10,20,30)]底[/]"),
+        # 未知 SGR 参数与非 SGR 控制序列被丢弃
+        ("\033[53;4:3m上划线\033[0m", "上划线"),
+        ("\033[2K\033[1G进度 50%", "进度 50%"),
+        # 已有的 Rich 标记保持不变
+        ("[bold]标题[/bold] \033[33m注意", "[bold]标题[/bold] [yellow]注意[/]"),
+    ],
+)
+def test_ansi_to_rich(raw: str, expected: str) -> None:
+    """ANSI 转义序列一次扫描转换为平衡的 Rich 标记"""
+    converted = ansi_to_rich(raw)
+    assert converted == expected
+    Text.from_markup(converted)
+
+
+def test_strip_ansi() -> None:
+    """落盘日志去除所有转义序列"""
+    assert strip_ansi("\033[1;31m错误\033[0m \033[2K完成") == "错误 完成"
+
+
+def test_log_buffer_is_bounded_and_spilled_to_file(tmp_path: Path) -> None:
+    """缓冲区只保留最近的日志，完整日志写入文件，增量读取能报告被淘汰的行数"""
+    state = DeploymentState()
+    log_file = tmp_path / "deployment.log"
+    state.open_log_file(log_file)
+
+    total = LOG_BUFFER_SIZE + 500
+    for i in range(total):
+        state.add_log(f"\033[32mline {i}\033[0m")
+    state.add_log(f"\033[32mline {total - 1}\033[0m")  # 重复的消息不会再次添加
+    state.close_log_file()
+
+    assert len(state.output_log) == LOG_BUFFER_SIZE
+    assert state.log_count == total
+    assert state.output_log[-1] == f"[green]line {total - 1}[/]"
+
+    lines, dropped = state.logs_since(0)
+    assert dropped == total - LOG_BUFFER_SIZE
+    assert lines[0] == f"[green]line {dropped}[/]"
+
+    lines, dropped = state.logs_since(total - 3)
+    assert dropped == 0
+    assert len(lines) == 3  # noqa: PLR2004
+
+    spilled = log_file.read_text(encoding="utf-8").splitlines()
+    assert len(spilled) == total
+    assert spilled[0] == "line 0"
+
+    state.reset()
+    assert state.log_count == 0
+    assert state.logs_since(0) == ([], 0)
@@ -0,0 +1,81 @@
+"""测试部署耗时记录"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment import profiling
+from app.deployment.scheduler import DeploymentStep, StepScheduler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+async def _script_step() -> bool:
+    process = await profiling.create_subprocess_exec("sleep", "0.1")
+    await process.wait()
+    failing = await profiling.create_subprocess_shell("exit 3")
+    await failing.wait()
+    return True
+
+
+async def _api_step() -> bool:
+    with profiling.measure("http", "POST /api/app"):
+        await asyncio.sleep(0.05)
+    return True
+
+
+def test_profile_attributes_subprocesses_and_requests_to_steps(tmp_path: Path) -> None:
+    """子进程与请求的耗时归属到所在步骤，汇总后保存为 JSON"""
+    profile = profiling.DeploymentProfile("light")
+
+    async def run() -> None:
+        with profile.activate():
+            scheduler = StepScheduler(
+                [
+                    DeploymentStep("script", "脚本", _script_step),
+                    DeploymentStep("api", "接口", _api_step, depends_on=("script",)),
+                ],
+            )
+            assert await scheduler.run()
+        await profile.finish(success=True)
+
+    asyncio.run(run())
+
+    summary = {step.name: step for step in profile.summary()}
+    assert list(summary) == ["script", "api"]
+    assert summary["script"].label == "脚本"
+    assert summary["script"].subprocess_count == 2  # noqa: PLR2004
+    assert summary["script"].subprocess_time >= 0.1  # noqa: PLR2004
+    assert summary["script"].http_count == 0
+    assert summary["api"].http_count == 1
+    assert summary["api"].http_time >= 0.05  # noqa: PLR2004
+
+    failed = [record for record in profile.records if record.category == "subprocess" and not record.success]
+    assert [record.name for record in failed] == ["exit 3"]
+
+    path = profile.save(tmp_path)
+    assert path is not None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["deployment_mode"] == "light"
+    assert data["success"] is True
+    assert data["host"]["hostname"]
+    assert [step["name"] for step in data["steps"]] == ["script", "api"]
+    assert len(data["records"]) == 5  # noqa: PLR2004
+
+
+def test_nothing_is_recorded_without_active_profile() -> None:
+    """没有激活的耗时记录时步骤正常执行，激活结束后不再记录"""
+    profile = profiling.DeploymentProfile()
+
+    async def run() -> None:
+        with profile.activate():
+            pass
+        assert profiling.current_profile() is None
+        assert await StepScheduler([DeploymentStep("script", "脚本", _script_step)]).run()
+
+    asyncio.run(run())
+    assert profile.records == []
@@ -0,0 +1,85 @@
+"""测试部署脚本输出的批量读取与限频刷新"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment.models import DeploymentState
+from app.deployment.service import DeploymentService
+from app.deployment.streaming import PROGRESS_INTERVAL, ThrottledProgress, read_line_batches
+
+SYNTHETIC_LINES = 100_000
+
+
+def test_read_line_batches_splits_across_chunks() -> None:
+    """跨块的行与多字节字符被正确拼接，空行被丢弃，结尾不带换行的内容也会产出"""
+
+    async def run() -> list[list[str]]:
+        stream = asyncio.StreamReader()
+        data = "第一行\r\n\n  第二行  \n最后".encode()
+        for i in range(0, len(data), 4):
+            stream.feed_data(data[i : i + 4])
+        stream.feed_eof()
+        return [lines async for lines in read_line_batches(stream, chunk_size=4)]
+
+    batches = asyncio.run(run())
+    assert [line for lines in batches for line in lines] == ["第一行", "第二行", "最后"]
+
+
+def test_throttled_progress_coalesces_updates() -> None:
+    """间隔内的多次更新合并为一次，最后一次更新在间隔结束时送达"""
+    received: list[int] = []
+
+    async def run() -> None:
+        progress = ThrottledProgress(lambda state: received.append(state.log_count))
+        state = DeploymentState()
+        for i in range(100):
+            state.add_log(f"line {i}")
+            progress(state)
+        await asyncio.sleep(PROGRESS_INTERVAL * 2)
+
+    asyncio.run(run())
+    assert received == [1, 100]
+
+
+def test_synthetic_script_output_keeps_event_loop_responsive() -> None:
+    """脚本快速输出 10 万行时日志完整，界面回调次数受限，事件循环不被阻塞"""
+    received: list[int] = []
+    script = f"import sys\nfor i in range({SYNTHETIC_LINES}): sys.stdout.write(f'\\x1b[32m安装包 {{i}}\\x1b[0m\\n')"
+
+    async def run() -> tuple[bool, list[str], DeploymentState, float, float]:
+        stop = asyncio.Event()
+        max_lag = 0.0
+
+        async def ticker() -> None:
+            nonlocal max_lag
+            while not stop.is_set():
+                started = time.monotonic()
+                await asyncio.sleep(0.01)
+                max_lag = max(max_lag, time.monotonic() - started - 0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        state = DeploymentState()
+        started = time.monotonic()
+        success, output = await DeploymentService()._execute_install_command(  # noqa: SLF001
+            [sys.executable, "-c", script],
+            lambda s: received.append(s.log_count),
+            state,
+        )
+        elapsed = time.monotonic() - started
+        stop.set()
+        await ticker_task
+        return success, output, state, elapsed, max_lag
+
+    success, output, state, elapsed, max_lag = asyncio.run(run())
+    assert success
+    assert len(output) == SYNTHETIC_LINES
+    assert state.log_count == SYNTHETIC_LINES
+    assert state.output_log[-1] == f"安装: [green]安装包 {SYNTHETIC_LINES - 1}[/]"
+    # 每个刷新间隔最多回调一次，最后一次回调包含全部日志
+    assert len(received) <= elapsed / PROGRESS_INTERVAL + 2
+    assert received[-1] == SYNTHETIC_LINES
+    assert max_lag < 0.25  # noqa: PLR2004
@@ -0,0 +1,86 @@
+"""测试部署前环境检查的并发执行"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment.precheck import Precheck, PrecheckResult, run_prechecks
+from app.deployment.service import DeploymentResourceManager, DeploymentService
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    import pytest
+
+CHECK_DELAY = 0.3
+
+
+def _delayed(*, result: bool, delay: float = CHECK_DELAY) -> Callable[[], Awaitable[bool]]:
+    async def run() -> bool:
+        await asyncio.sleep(delay)
+        return result
+
+    return run
+
+
+async def _raise() -> bool:
+    msg = "rpm 数据库被锁定"
+    raise RuntimeError(msg)
+
+
+def test_prechecks_run_concurrently_with_own_timeouts() -> None:
+    """所有检查同时执行，结果按完成顺序回调，超时与异常均视为未通过"""
+    completed: list[PrecheckResult] = []
+    checks = [
+        Precheck("slow", "慢", _delayed(result=True)),
+        Precheck("fast", "快", _delayed(result=False, delay=0.1)),
+        Precheck("hang", "卡住", _delayed(result=True, delay=60), timeout=0.2),
+        Precheck("broken", "异常", _raise),
+    ]
+
+    started = time.monotonic()
+    results = asyncio.run(run_prechecks(checks, completed.append))
+    elapsed = time.monotonic() - started
+
+    assert elapsed < CHECK_DELAY * 2
+    assert list(results) == ["slow", "fast", "hang", "broken"]
+    assert [result.name for result in completed] == ["broken", "fast", "hang", "slow"]
+    assert results["slow"].passed
+    assert not results["fast"].passed
+    assert results["hang"].timed_out
+    assert not results["hang"].passed
+    assert results["broken"].error == "rpm 数据库被锁定"
+
+
+def test_dependency_check_takes_time_of_slowest_check(monkeypatch: pytest.MonkeyPatch) -> None:
+    """部署依赖检查的耗时取决于最慢的一项检查，且同时报告所有未通过的前提条件"""
+    service = DeploymentService()
+
+    def detect() -> bool:
+        time.sleep(CHECK_DELAY)
+        return True
+
+    monkeypatch.setattr(service, "detect_openeuler", detect)
+    monkeypatch.setattr(service, "check_sudo_privileges", _delayed(result=True))
+    monkeypatch.setattr(DeploymentResourceManager, "check_installer_available", classmethod(lambda _cls: True))
+
+    logs: list[str] = []
+    started = time.monotonic()
+    success, errors = asyncio.run(
+        service.check_and_install_dependencies(lambda state: logs.append(state.output_log[-1])),
+    )
+    elapsed = time.monotonic() - started
+
+    assert success
+    assert errors == []
+    assert elapsed < CHECK_DELAY * 2
+    assert sum("检查通过" in line for line in logs) == 3  # noqa: PLR2004
+
+    monkeypatch.setattr(service, "detect_openeuler", lambda: False)
+    monkeypatch.setattr(service, "check_sudo_privileges", _delayed(result=False))
+    success, errors = asyncio.run(service.check_and_install_dependencies())
+    assert not success
+    assert len(errors) == 2  # noqa: PLR2004
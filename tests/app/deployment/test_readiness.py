@@ -0,0 +1,83 @@
+"""测试就绪等待原语"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment.readiness import BackoffPolicy, tcp_connect_event_source, wait_until_ready
+
+
+def test_fast_initial_polling_detects_early_readiness() -> None:
+    """服务很快就绪时，快速轮询能在几百毫秒内返回"""
+
+    async def run() -> None:
+        ready_at = time.monotonic() + 0.3
+
+        async def check() -> bool:
+            return time.monotonic() >= ready_at
+
+        result = await wait_until_ready("fast", check, timeout=10.0)
+        assert result.ready
+        assert result.elapsed < 0.9  # noqa: PLR2004
+        assert result.attempts > 1
+
+    asyncio.run(run())
+
+
+def test_deadline_stops_waiting() -> None:
+    """到达截止时间后返回未就绪"""
+
+    async def run() -> None:
+        async def check() -> bool:
+            return False
+
+        result = await wait_until_ready("never", check, timeout=0.3)
+        assert not result.ready
+        assert 0.3 <= result.elapsed < 0.6  # noqa: PLR2004
+
+    asyncio.run(run())
+
+
+def test_backoff_grows_to_max_interval() -> None:
+    """等待间隔按倍数增长且不超过上限"""
+    intervals = BackoffPolicy(initial=0.1, factor=2.0, max_interval=0.5, jitter=0.0).intervals()
+    assert [next(intervals) for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+def test_event_source_wakes_check_before_next_poll() -> None:
+    """端口开始监听时立即触发检查，无需等待较长的轮询间隔"""
+
+    async def run() -> None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        server: asyncio.Server | None = None
+
+        async def start_later() -> None:
+            nonlocal server
+            await asyncio.sleep(0.3)
+            server = await asyncio.start_server(lambda _r, w: w.close(), "127.0.0.1", port)
+
+        async def check() -> bool:
+            return server is not None
+
+        starter = asyncio.create_task(start_later())
+        result = await wait_until_ready(
+            "tcp",
+            check,
+            timeout=10.0,
+            policy=BackoffPolicy(initial=5.0),
+            event_sources=[tcp_connect_event_source("127.0.0.1", port, interval=0.05)],
+        )
+        await starter
+        assert result.ready
+        assert result.elapsed < 1.0
+        assert result.woken_by_event == 1
+        if server is not None:
+            server.close()
+
+    asyncio.run(run())
@@ -0,0 +1,116 @@
+"""测试部署步骤 DAG 调度"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment.models import DeploymentConfig, DeploymentState
+from app.deployment.scheduler import DeploymentStep, StepScheduler
+from app.deployment.service import DeploymentService
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+# 模拟部署中各步骤的耗时（秒）
+SIMULATED_DURATIONS = {
+    "stop_old_service": 0.2,
+    "setup_deploy_mode": 0.05,
+    "check_environment": 0.1,
+    "env_check_script": 0.3,
+    "generate_config_files": 0.3,
+    "install_dependency_script": 0.3,
+    "init_config_script": 0.2,
+    "agent_init": 0.1,
+}
+
+
+def _simulated_steps(events: list[tuple[str, str]]) -> list[DeploymentStep]:
+    """使用真实的部署步骤依赖图，并把每个步骤替换为定长等待"""
+    service = DeploymentService()
+    steps = service._build_deployment_steps(DeploymentConfig(), None)  # noqa: SLF001
+
+    def simulate(name: str) -> Callable[[], Awaitable[bool]]:
+        async def run() -> bool:
+            events.append(("start", name))
+            await asyncio.sleep(SIMULATED_DURATIONS[name])
+            events.append(("finish", name))
+            return True
+
+        return run
+
+    return [DeploymentStep(step.name, step.title, simulate(step.name), step.depends_on) for step in steps]
+
+
+def test_simulated_deployment_runs_independent_steps_concurrently() -> None:
+    """并发调度的耗时接近关键路径，明显短于串行执行，且每个步骤都在其依赖完成后才开始"""
+    serial = StepScheduler(_simulated_steps([]), max_concurrency=1)
+    assert asyncio.run(serial.run())
+
+    events: list[tuple[str, str]] = []
+    steps = _simulated_steps(events)
+    concurrent = StepScheduler(steps)
+    states: list[tuple[int, str]] = []
+    state = DeploymentState()
+    assert asyncio.run(concurrent.run(state, lambda s: states.append((s.current_step, s.current_step_name))))
+
+    # 关键路径: 环境检查 -> 检查脚本 -> 依赖安装 -> 初始化配置 -> Agent 初始化，共 1.0 秒
+    assert serial.elapsed >= sum(SIMULATED_DURATIONS.values())
+    assert concurrent.elapsed < serial.elapsed - 0.3
+    assert concurrent.serial_time >= sum(SIMULATED_DURATIONS.values())
+
+    for step in steps:
+        started = events.index(("start", step.name))
+        for dep in step.depends_on:
+            assert events.index(("finish", dep)) < started
+
+    # 进度只前进不后退，并发时显示所有正在执行的步骤
+    assert state.total_steps == len(steps)
+    progress = [current for current, _name in states]
+    assert progress == sorted(progress)
+    assert progress[-1] == len(steps)
+    assert any(" / " in name for _current, name in states)
+
+
+def test_failed_step_stops_dependents_but_waits_for_running_steps() -> None:
+    """步骤失败后不再启动依赖它的步骤，已在执行的独立步骤正常结束"""
+    finished: list[str] = []
+
+    def make(name: str, delay: float, *, ok: bool = True) -> Callable[[], Awaitable[bool]]:
+        async def run() -> bool:
+            await asyncio.sleep(delay)
+            finished.append(name)
+            return ok
+
+        return run
+
+    scheduler = StepScheduler(
+        [
+            DeploymentStep("broken", "broken", make("broken", 0.05, ok=False)),
+            DeploymentStep("independent", "independent", make("independent", 0.2)),
+            DeploymentStep("dependent", "dependent", make("dependent", 0.0), depends_on=("broken",)),
+        ],
+    )
+    assert not asyncio.run(scheduler.run())
+    assert finished == ["broken", "independent"]
+    assert not scheduler.results["broken"].success
+
+
+def test_invalid_graph_is_rejected() -> None:
+    """依赖未知步骤或存在循环依赖时拒绝构建调度器"""
+
+    async def noop() -> bool:
+        return True
+
+    with pytest.raises(ValueError, match="未知"):
+        StepScheduler([DeploymentStep("a", "a", noop, depends_on=("missing",))])
+    with pytest.raises(ValueError, match="循环"):
+        StepScheduler(
+            [
+                DeploymentStep("a", "a", noop, depends_on=("b",)),
+                DeploymentStep("b", "b", noop, depends_on=("a",)),
+            ],
+        )
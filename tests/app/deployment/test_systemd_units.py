@@ -0,0 +1,129 @@
+"""测试 systemd 服务状态批量查询与 MCP 服务验证"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+import tool  # noqa: F401  # 与程序入口保持一致的导入顺序，避免循环导入
+from app.deployment import agent as agent_module
+from app.deployment import systemd
+from app.deployment.agent import AgentManager
+from app.deployment.models import DeploymentState
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+# 模拟 systemctl：每个单元按顺序返回 <单元>.states 中的状态，最后一个状态保持不变，每次调用的参数记录到 calls
+STUB_SYSTEMCTL = """\
+import json, os, pathlib, sys
+root = pathlib.Path(os.environ["STUB_SYSTEMD_DIR"])
+with (root / "calls").open("a") as calls:
+    calls.write(json.dumps(sys.argv[1:]) + "\\n")
+args = sys.argv[1:]
+if args[0] != "show":
+    sys.exit(0)
+blocks = []
+for unit in args[args.index("--") + 1 :]:
+    path = root / f"{unit}.states"
+    states = path.read_text().split() if path.exists() else ["inactive/dead"]
+    if len(states) > 1:
+        path.write_text(" ".join(states[1:]))
+    active, sub = states[0].split("/")
+    load = "loaded" if path.exists() else "not-found"
+    blocks.append(f"LoadState={load}\\nActiveState={active}\\nSubState={sub}\\nResult=success")
+print("\\n\\n".join(blocks))
+"""
+
+
+@pytest.fixture
+def stub_systemd(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Callable[..., list[list[str]]]:
+    """在 PATH 中放置模拟的 systemctl 和 sudo，返回设置单元状态并读取调用记录的函数"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    systemctl = bin_dir / "systemctl"
+    systemctl.write_text(f"#!{sys.executable}\n{STUB_SYSTEMCTL}")
+    sudo = bin_dir / "sudo"
+    sudo.write_text('#!/bin/sh\nexec "$@"\n')
+    for script in (systemctl, sudo):
+        script.chmod(0o755)
+
+    monkeypatch.setenv("PATH", f"{bin_dir}:/usr/bin:/bin")
+    monkeypatch.setenv("STUB_SYSTEMD_DIR", str(tmp_path))
+
+    def configure(**units: str) -> list[list[str]]:
+        for unit, states in units.items():
+            (tmp_path / f"{unit}.states").write_text(states)
+        calls = tmp_path / "calls"
+        return [json.loads(line) for line in calls.read_text().splitlines()] if calls.exists() else []
+
+    return configure
+
+
+def _make_manager(monkeypatch: pytest.MonkeyPatch, service_dir: Path, names: list[str]) -> AgentManager:
+    monkeypatch.setattr(agent_module, "ConfigManager", lambda: None)
+    service_dir.mkdir()
+    for name in names:
+        (service_dir / f"{name}.service").write_text("")
+    manager = AgentManager()
+    manager.service_dir = service_dir
+    return manager
+
+
+def test_query_units_uses_single_spawn(stub_systemd: Callable[..., list[list[str]]]) -> None:
+    """一次 systemctl show 调用返回所有单元的状态"""
+    stub_systemd(**{"svc-a": "active/running", "svc-b": "failed/failed"})
+
+    statuses = asyncio.run(systemd.query_units(["svc-a", "svc-b", "svc-missing"]))
+
+    assert statuses["svc-a"].is_running
+    assert statuses["svc-b"].active_state == "failed"
+    assert statuses["svc-missing"].load_state == "not-found"
+    calls = stub_systemd()
+    assert len(calls) == 1
+    assert calls[0][-3:] == ["svc-a", "svc-b", "svc-missing"]
+
+
+def test_verify_polls_pending_units_together(
+    stub_systemd: Callable[..., list[list[str]]],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """只重新查询仍在启动中的服务，直到每个服务都有确定的状态"""
+    stub_systemd(
+        **{
+            "svc-a": "active/running",
+            "svc-b": "activating/start activating/start active/running",
+            "svc-c": "activating/start activating/auto-restart",
+        },
+    )
+    manager = _make_manager(monkeypatch, tmp_path / "service", ["svc-a", "svc-b", "svc-c"])
+    state = DeploymentState()
+
+    assert not asyncio.run(manager._verify_mcp_services(state, None))  # noqa: SLF001
+
+    queried = [sorted(call[call.index("--") + 1 :]) for call in stub_systemd()]
+    assert queried == [["svc-a", "svc-b", "svc-c"], ["svc-b", "svc-c"], ["svc-b"]]
+    assert any("svc-c" in line and "停止初始化" in line for line in state.output_log)
+    assert not any("svc-b" in line and "停止初始化" in line for line in state.output_log)
+
+
+def test_cleanup_stops_active_units_in_one_call(
+    stub_systemd: Callable[..., list[list[str]]],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """清理旧进程时一次查询所有服务，并一次停止所有正在运行的服务"""
+    stub_systemd(**{"svc-a": "active/running", "svc-b": "inactive/dead", "svc-c": "active/running"})
+    manager = _make_manager(monkeypatch, tmp_path / "service", ["svc-a", "svc-b", "svc-c"])
+
+    assert asyncio.run(manager._cleanup_old_mcp_processes(DeploymentState(), None))  # noqa: SLF001
+
+    calls = stub_systemd()
+    assert [call[0] for call in calls] == ["show", "stop"]
+    assert sorted(calls[1][calls[1].index("--") + 1 :]) == ["svc-a", "svc-c"]
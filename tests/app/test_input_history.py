@@ -0,0 +1,128 @@
+"""测试命令输入历史的去重浏览、反向搜索与多实例写入"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import TYPE_CHECKING
+
+from app.input_history import HistoryIndex, InputHistory
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _browse(index: HistoryIndex, prefix: str) -> list[str]:
+    found = []
+    position = index.end
+    while (result := index.previous(prefix, position)) is not None:
+        position, text = result
+        found.append(text)
+    return found
+
+
+def test_browse_deduplicated_with_prefix() -> None:
+    """重复输入移动到最新位置，按前缀浏览只经过匹配的条目，可以向新的方向返回"""
+    index = HistoryIndex()
+    for text in ("ls -l", "df -h", "systemctl status nginx", "ls -a", "df -h", "系统负载高吗"):
+        index.add(text)
+
+    assert index.entries() == ["ls -l", "systemctl status nginx", "ls -a", "df -h", "系统负载高吗"]
+    assert _browse(index, "") == ["系统负载高吗", "df -h", "ls -a", "systemctl status nginx", "ls -l"]
+    assert _browse(index, "ls") == ["ls -a", "ls -l"]
+
+    newer, _text = index.previous("ls", index.end) or (0, "")
+    older, _text = index.previous("ls", newer) or (0, "")
+    assert index.next("ls", older) == (newer, "ls -a")
+    assert index.next("ls", newer) is None
+
+    assert index.search("nginx status") == ["systemctl status nginx"]
+    assert index.search("负载") == ["系统负载高吗"]
+    assert index.search("")[:2] == ["系统负载高吗", "df -h"]
+
+
+def test_large_history_navigation_is_fast() -> None:
+    """十万条历史中按前缀浏览（包括第一次）不需要排序匹配条目，常见词的反向搜索只查找最新的条目"""
+    index = HistoryIndex(max_entries=100_000)
+    for i in range(100_010):
+        index.add(f"systemctl restart service{i} --now")
+
+    assert len(index) == 100_000  # noqa: PLR2004
+    assert "systemctl restart service9 --now" not in index
+
+    started = time.perf_counter()
+    position = index.end
+    for _ in range(1000):
+        position, _text = index.previous("", position) or (0, "")
+    browse_elapsed = (time.perf_counter() - started) / 1000
+
+    started = time.perf_counter()
+    for prefix in ("systemctl restart service5000", "systemctl"):
+        position = index.end
+        for _ in range(50):
+            position, _text = index.previous(prefix, position) or (0, "")
+    prefix_elapsed = (time.perf_counter() - started) / 100
+
+    started = time.perf_counter()
+    results = index.search("service100009")
+    common = index.search("systemctl now")
+    search_elapsed = (time.perf_counter() - started) / 2
+
+    assert results == ["systemctl restart service100009 --now"]
+    assert common[:2] == ["systemctl restart service100009 --now", "systemctl restart service100008 --now"]
+    assert browse_elapsed < 0.001  # noqa: PLR2004
+    assert prefix_elapsed < 0.001  # noqa: PLR2004
+    assert search_elapsed < 0.01  # noqa: PLR2004
+
+    loaded = HistoryIndex.from_entries([f"uptime {i % 3}" for i in range(10)] + ["uptime 1"], max_entries=2)
+    assert loaded.entries() == ["uptime 0", "uptime 1"]
+    assert loaded.previous("up", loaded.end) == (1, "uptime 1")
+
+
+def test_history_file_shared_by_instances(tmp_path: Path) -> None:
+    """多个实例交替追加不互相覆盖，启动前的输入合并在加载结果之后，重复过多时压缩文件"""
+    path = tmp_path / "cache" / "history"
+    first = InputHistory(path)
+    second = InputHistory(path)
+    for i in range(600):
+        first.add(f"uptime {i % 3}")
+        second.add(f"free -m {i % 2}")
+    with path.open("ab") as file:
+        file.write(b'"truncated')
+
+    third = InputHistory(path)
+    third.add("hostname")
+    asyncio.run(third.load())
+
+    assert third.index.entries() == ["uptime 0", "uptime 1", "free -m 0", "uptime 2", "free -m 1", "hostname"]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 6  # noqa: PLR2004
+    # 历史文件（包括压缩后替换的文件）只允许当前用户访问
+    assert path.stat().st_mode & 0o777 == 0o600  # noqa: PLR2004
+    assert path.parent.stat().st_mode & 0o777 == 0o700  # noqa: PLR2004
+
+    # 压缩后其他实例的追加写入新文件
+    first.add("whoami")
+    reloaded = InputHistory(path)
+    asyncio.run(reloaded.load())
+    assert reloaded.index.entries()[-2:] == ["hostname", "whoami"]
+
+
+def test_cancelled_load_keeps_session_entries(tmp_path: Path) -> None:
+    """加载被取消后继续使用本次运行的输入，不再暂存等待合并"""
+    history = InputHistory(tmp_path / "history")
+    history.add("hostname")
+
+    async def cancel_load() -> None:
+        task = asyncio.create_task(history.load())
+        await asyncio.sleep(0)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_load())
+    history.add("uptime")
+
+    assert history.loaded
+    assert history._pending == []  # noqa: SLF001
+    assert history.index.entries() == ["hostname", "uptime"]
@@ -0,0 +1,108 @@
+"""测试输出内容检索索引与已保存会话的磁盘索引"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from app.search_index import SEARCH_INDEX_FILE, SearchIndex, SessionSearchIndex
+from app.transcript import OUTPUT, PROMPT, REPLY, TranscriptWriter
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_incremental_updates_and_prefix_search() -> None:
+    """条目更新只替换增减的词项，英文按前缀匹配，中文按子串匹配，结果从新到旧"""
+    index: SearchIndex[int] = SearchIndex()
+    index.set(1, "Filesystem usage on /dev/sda1")
+    index.set(2, "磁盘空间不足，请清理日志")
+    index.set(3, "filesystem check passed")
+
+    assert index.search("files") == [3, 1]
+    assert index.search("FILESYSTEM sda") == [1]
+    assert index.search("空间不足") == [2]
+    # 二元组都存在但不连续时由原文校验排除
+    assert index.search("空间日志") == []
+    assert index.search("日") == [2]
+
+    # 流式输出不断变长，旧词项保留，新词项可检索
+    index.set(2, "磁盘空间不足，请清理日志 journalctl --vacuum-size")
+    assert index.search("journal") == [2]
+    index.set(1, "Memory usage")
+    assert index.search("sda") == []
+    assert index.search("usage") == [1]
+
+    index.retain([1, 2])
+    assert 3 not in index  # noqa: PLR2004
+    assert index.search("passed") == []
+    assert index.search("file") == []
+
+
+def test_search_large_index_is_fast() -> None:
+    """数万条输出中按输入逐字搜索仍在毫秒级完成"""
+    index: SearchIndex[int] = SearchIndex()
+    for i in range(30000):
+        index.set(i, f"entry {i} service{i % 500} 状态正常 pid{i}")
+
+    started = time.perf_counter()
+    for query in ("s", "se", "ser", "serv", "service4", "service42", "service42 pid2", "状态", "pid29999"):
+        index.search(query)
+    elapsed = time.perf_counter() - started
+
+    assert index.search("pid29999") == [29999]
+    assert index.search("service499 entry")[:2] == [29999, 29499]
+    assert elapsed < 0.5  # noqa: PLR2004
+
+
+def test_session_index_reuses_unchanged_sessions(tmp_path: Path) -> None:
+    """磁盘索引跨实例复用，只重建大小变化的会话，已删除的会话被移除"""
+    first = TranscriptWriter("20250101-000000-aaaa", tmp_path)
+    first.begin(PROMPT, "查看 nginx 状态")
+    first.begin(OUTPUT, "nginx.service active (running)")
+    first.close()
+    second = TranscriptWriter("20250102-000000-bbbb", tmp_path)
+    second.begin(PROMPT, "重启 nginx")
+    second.begin(REPLY, "已重启")
+    second.close()
+
+    index = SessionSearchIndex(tmp_path)
+    index.refresh()
+    assert [(match.session_id, match.block) for match in index.search("nginx")] == [
+        ("20250102-000000-bbbb", 0),
+        ("20250101-000000-aaaa", 1),
+        ("20250101-000000-aaaa", 0),
+    ]
+    assert (tmp_path / SEARCH_INDEX_FILE).stat().st_mode & 0o777 == 0o600  # noqa: PLR2004
+
+    resumed = TranscriptWriter("20250101-000000-aaaa", tmp_path)
+    resumed.begin(OUTPUT, "postgresql.service failed")
+    resumed.close()
+    (tmp_path / "20250102-000000-bbbb.jsonl").unlink()
+    (tmp_path / "20250102-000000-bbbb.idx").unlink()
+
+    reloaded = SessionSearchIndex(tmp_path)
+    reloaded.refresh(exclude="")
+    assert [match.text for match in reloaded.search("postgres")] == ["postgresql.service failed"]
+    assert {match.session_id for match in reloaded.search("nginx")} == {"20250101-000000-aaaa"}
+
+    reloaded.refresh(exclude="20250101-000000-aaaa")
+    assert reloaded.search("nginx") == []
+
+
+def test_session_search_verifies_merged_blocks(tmp_path: Path) -> None:
+    """在后续块开始后才写入的追加与替换内容同样可以检索，单个汉字通过索引查找"""
+    writer = TranscriptWriter("20250103-000000-cccc", tmp_path)
+    writer.begin(REPLY, "正在检查")
+    writer.step("disk_check", "正在执行 disk_check", final=False)
+    writer.append(" inode 使用率正常")
+    writer.step("disk_check", "disk_check finished", final=True)
+    writer.begin(PROMPT, "谢谢")
+    writer.close()
+
+    index = SessionSearchIndex(tmp_path)
+    index.refresh()
+    assert [(match.block, match.text) for match in index.search("inode")] == [(0, "正在检查 inode 使用率正常")]
+    assert [match.block for match in index.search("finished")] == [1]
+    assert [match.block for match in index.search("谢")] == [2]
+    assert index.search("率") == index.search("使用率")
@@ -0,0 +1,106 @@
+"""测试流式响应读取与渲染流水线"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.stream_pipeline import StreamPipeline
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+class _Source:
+    """模拟响应流，记录读取进度与关闭状态"""
+
+    def __init__(self, count: int, *, fail_after: int | None = None, interval: float = 0.0) -> None:
+        self.count = count
+        self.fail_after = fail_after
+        self.interval = interval
+        self.produced = 0
+        self.closed = False
+
+    async def stream(self) -> AsyncGenerator[int, None]:
+        try:
+            for i in range(self.count):
+                if i == self.fail_after:
+                    msg = "连接被重置"
+                    raise ConnectionError(msg)
+                await asyncio.sleep(self.interval)
+                self.produced += 1
+                yield i
+        finally:
+            self.closed = True
+
+
+def test_slow_renderer_does_not_stall_reader() -> None:
+    """渲染较慢时读取任务继续读取，队列深度受高水位线限制，内容保持读取顺序"""
+    source = _Source(200)
+    received: list[int] = []
+
+    async def run() -> StreamPipeline[int]:
+        async with StreamPipeline(source.stream(), high_water=32, low_water=8, max_batch=16) as pipeline:
+            async for batch in pipeline.batches():
+                received.extend(batch)
+                await asyncio.sleep(0.005)
+        return pipeline
+
+    metrics = asyncio.run(run()).metrics
+
+    assert received == list(range(200))
+    assert metrics.items == 200  # noqa: PLR2004
+    assert metrics.max_depth <= 32  # noqa: PLR2004
+    assert metrics.pauses > 0
+    assert metrics.batches < 200  # noqa: PLR2004
+    assert metrics.max_lag >= metrics.mean_lag > 0
+
+
+def test_reader_error_raised_after_received_items() -> None:
+    """读取失败时先交付已读取的内容，再向渲染方抛出异常"""
+    source = _Source(10, fail_after=3)
+    received: list[int] = []
+
+    async def run() -> None:
+        async with StreamPipeline(source.stream()) as pipeline:
+            async for batch in pipeline.batches():
+                received.extend(batch)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+    assert received == [0, 1, 2]
+    assert source.closed
+
+
+def test_renderer_exit_and_cancel_close_source() -> None:
+    """渲染方提前退出或被取消时，读取任务被取消并关闭响应流"""
+    stopped = _Source(1000, interval=0.01)
+
+    async def stop_early() -> None:
+        async with StreamPipeline(stopped.stream()) as pipeline:
+            async for _batch in pipeline.batches():
+                break
+
+    asyncio.run(stop_early())
+    assert stopped.closed
+    assert stopped.produced < 1000  # noqa: PLR2004
+
+    cancelled = _Source(1000, interval=0.01)
+
+    async def consume() -> None:
+        async with StreamPipeline(cancelled.stream()) as pipeline:
+            async for _batch in pipeline.batches():
+                pass
+
+    async def cancel() -> None:
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    assert cancelled.closed
+    assert cancelled.produced < 1000  # noqa: PLR2004
@@ -0,0 +1,118 @@
+"""测试会话记录的写入、末尾加载与对话历史恢复"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from app.transcript import (
+    MCP_STEP,
+    OUTPUT,
+    PROMPT,
+    REPLY,
+    TranscriptReader,
+    TranscriptWriter,
+    estimate_tokens,
+    resolve_session,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write_turns(writer: TranscriptWriter, count: int) -> None:
+    for i in range(count):
+        writer.begin(PROMPT, f"问题{i}")
+        writer.begin(REPLY, f"回答{i}-")
+        writer.append("续写")
+    writer.flush()
+
+
+def test_stream_records_are_merged_into_blocks(tmp_path: Path) -> None:
+    """流式追加的内容合并到所属块，MCP 步骤状态更新替换原内容且不影响追加目标"""
+    writer = TranscriptWriter("s1", tmp_path / "sessions")
+    writer.begin(PROMPT, "查看磁盘")
+    writer.begin(OUTPUT, "Filesystem\n")
+    writer.step("df", "运行中", final=False)
+    writer.append("/dev/sda1\n")
+    writer.step("df", "已完成", final=True)
+    writer.begin(REPLY, "磁盘")
+    writer.append("空间充足")
+    writer.close()
+
+    tail = TranscriptReader("s1", tmp_path / "sessions").load_tail()
+
+    assert [(block.kind, block.text, block.step) for block in tail.blocks] == [
+        (PROMPT, "查看磁盘", ""),
+        (OUTPUT, "Filesystem\n/dev/sda1\n", ""),
+        (MCP_STEP, "已完成", "df"),
+        (REPLY, "磁盘空间充足", ""),
+    ]
+    assert tail.total_blocks == 4  # noqa: PLR2004
+    # 会话记录只允许当前用户访问
+    assert (tmp_path / "sessions").stat().st_mode & 0o777 == 0o700  # noqa: PLR2004
+    for suffix in ("jsonl", "idx"):
+        assert (tmp_path / "sessions" / f"s1.{suffix}").stat().st_mode & 0o777 == 0o600  # noqa: PLR2004
+
+
+def test_tail_reads_only_last_blocks_and_survives_truncation(tmp_path: Path) -> None:
+    """只加载末尾的块，继续写入已有会话时块编号连续，不完整的最后一行被忽略"""
+    writer = TranscriptWriter("s2", tmp_path)
+    _write_turns(writer, 50)
+    writer.close()
+
+    resumed = TranscriptWriter("s2", tmp_path)
+    resumed.begin(PROMPT, "恢复后的问题")
+    resumed.close()
+    with (tmp_path / "s2.jsonl").open("ab") as file:
+        file.write('{"b": 101, "x": "半'.encode())
+
+    tail = TranscriptReader("s2", tmp_path).load_tail(blocks=3)
+
+    assert tail.total_blocks == 101  # noqa: PLR2004
+    assert [block.text for block in tail.blocks] == ["问题49", "回答49-续写", "恢复后的问题"]
+    assert resolve_session("", tmp_path) == "s2"
+    assert resolve_session("missing", tmp_path) is None
+    # 会话目录之外的文件不能被恢复
+    (tmp_path / "sessions").mkdir()
+    assert resolve_session("../s2", tmp_path / "sessions") is None
+    assert resolve_session("s2/", tmp_path) is None
+
+
+def test_history_restored_within_token_budget(tmp_path: Path) -> None:
+    """对话历史从末尾向前恢复完整的轮次，跨越读取窗口的轮次不会丢失，总量不超过预算"""
+    writer = TranscriptWriter("s3", tmp_path)
+    _write_turns(writer, 100)
+    # 最后一个问题没有回答（例如被取消），不计入历史
+    writer.begin(PROMPT, "未回答的问题")
+    writer.close()
+    turn_tokens = estimate_tokens("问题99") + estimate_tokens("回答99-续写")
+
+    messages = TranscriptReader("s3", tmp_path).load_history(token_budget=turn_tokens * 40)
+
+    assert len(messages) == 80  # noqa: PLR2004
+    assert messages[0] == {"role": "user", "content": "问题60"}
+    assert messages[-2:] == [
+        {"role": "user", "content": "问题99"},
+        {"role": "assistant", "content": "回答99-续写"},
+    ]
+    assert all(message["role"] == ("user" if i % 2 == 0 else "assistant") for i, message in enumerate(messages))
+
+
+def test_history_keeps_appends_written_after_later_blocks(tmp_path: Path) -> None:
+    """回复在之后的块开始后追加的内容，跨越读取窗口时同样恢复到对话历史中"""
+    writer = TranscriptWriter("s4", tmp_path)
+    writer.begin(PROMPT, "问题")
+    writer.begin(REPLY, "part1")
+    writer.step("df", "运行中", final=True)
+    writer.append(" part2")
+    for i in range(63):
+        writer.begin(OUTPUT, f"输出{i}")
+    writer.close()
+
+    reader = TranscriptReader("s4", tmp_path)
+
+    assert reader.load_blocks(0)[1].text == "part1 part2"
+    assert reader.load_history() == [
+        {"role": "user", "content": "问题"},
+        {"role": "assistant", "content": "part1 part2"},
+    ]
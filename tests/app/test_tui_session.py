@@ -0,0 +1,45 @@
+"""测试会话标签页的后台内容暂存与标签文本"""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from app.tui_session import TAB_TITLE_WIDTH, SessionTab
+
+MCP_MESSAGE = "[MCP:waiting]等待确认"
+
+
+def _tab() -> SessionTab:
+    container = MagicMock()
+    container.id = "output-2"
+    return SessionTab(tab_id=2, container=container, transcript=MagicMock())
+
+
+def test_background_batches_are_coalesced() -> None:
+    """同一流的后台内容合并为一项，MCP 消息与其他流保持独立"""
+    tab = _tab()
+    stream: dict = {}
+    tab.buffer_batch([("a", True), ("b", True)], stream)
+    tab.buffer_batch([("c", True), ("$ ls", False)], stream)
+    tab.buffer_batch([(MCP_MESSAGE, True), ("d", True)], stream)
+    other: dict = {}
+    tab.buffer_batch([("e", True)], other)
+
+    assert len(tab.pending) == 2  # noqa: PLR2004
+    first, second = tab.pending
+    assert first.items() == [("abc", True), ("$ ls", False), (MCP_MESSAGE, True), ("d", True)]
+    assert first.parts[0] == (["a", "b", "c"], True)
+    assert second.items() == [("e", True)]
+    assert second.stream_state is other
+
+
+def test_label_uses_first_question() -> None:
+    """标题取第一个问题并截断，后台有新内容时带有标记"""
+    tab = _tab()
+    assert tab.pane_id == "output-2"
+    tab.set_title("查看   系统负载\n并给出优化建议，包括 CPU 与内存")
+    tab.set_title("第二个问题")
+    assert len(tab.title) == TAB_TITLE_WIDTH
+    assert tab.title.startswith("查看 系统负载")
+    tab.unread = True
+    assert tab.label == f"2: {tab.title} ●"
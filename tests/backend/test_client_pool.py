@@ -0,0 +1,84 @@
+"""测试 LLM 客户端池"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from backend.base import LLMClientBase
+from backend.client_pool import ClientPoolKey, LLMClientPool
+from config.model import Backend
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
+
+class _FakeClient(LLMClientBase):
+    """记录关闭次数的假客户端"""
+
+    def __init__(self) -> None:
+        self.closed = 0
+
+    async def get_llm_response(self, prompt: str) -> AsyncGenerator[str, None]:
+        yield prompt
+
+    async def interrupt(self) -> None:
+        return
+
+    async def get_available_models(self) -> list[str]:
+        return []
+
+    def reset_conversation(self) -> None:
+        return
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+def _key(index: int) -> ClientPoolKey:
+    return ClientPoolKey.create(Backend.OPENAI, f"http://127.0.0.1:{8000 + index}/v1/", "sk-test", "qwen")
+
+
+def test_key_normalizes_config_and_hides_api_key() -> None:
+    """索引键忽略末尾斜杠，Hermes 后端忽略模型，API Key 不以明文保存"""
+    assert _key(1) == ClientPoolKey.create(Backend.OPENAI, "http://127.0.0.1:8001/v1", "sk-test", "qwen")
+    assert _key(1) != ClientPoolKey.create(Backend.OPENAI, "http://127.0.0.1:8001/v1", "sk-other", "qwen")
+    hermes = ClientPoolKey.create(Backend.EULERINTELLI, "http://127.0.0.1:8002", "token", "ignored")
+    assert hermes.model == ""
+    assert "sk-test" not in repr(_key(1))
+
+
+def test_switching_back_reuses_warm_client() -> None:
+    """切换回之前的配置时复用同一客户端"""
+    pool = LLMClientPool(max_clients=2)
+    first = pool.acquire(_key(1), _FakeClient)
+    pool.acquire(_key(2), _FakeClient)
+
+    assert pool.acquire(_key(1), _FakeClient) is first
+    assert len(pool) == 2  # noqa: PLR2004
+
+
+def test_eviction_closes_least_recently_used_in_background() -> None:
+    """超出容量时淘汰最久未使用的客户端并异步关闭，活动客户端不会被淘汰"""
+
+    async def run() -> None:
+        pool = LLMClientPool(max_clients=2)
+        active = pool.acquire(_key(1), _FakeClient)
+        pool.set_active(active)
+        second = pool.acquire(_key(2), _FakeClient)
+        third = pool.acquire(_key(3), _FakeClient)
+
+        assert active in pool
+        assert second not in pool
+        assert third in pool
+
+        await asyncio.sleep(0)
+        assert isinstance(second, _FakeClient)
+        assert second.closed == 1
+
+        await pool.close_all()
+        assert isinstance(active, _FakeClient)
+        assert active.closed == 1
+        assert len(pool) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,107 @@
+"""测试 Hermes 客户端的本地即时取消与后台停止请求"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Self
+
+from backend.hermes.client import HermesChatClient
+from backend.http_pool import close_http_clients
+
+# 取消到可以输入新命令的时间上限（秒）
+CANCEL_BOUND = 0.2
+# 服务端处理 stop 请求的延迟（秒）
+STOP_DELAY = 1.5
+
+
+class _SlowStopServer:
+    """模拟 Hermes 服务：聊天流持续发送心跳，/api/stop 第一次失败、第二次延迟后成功"""
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.stop_requests: list[str] = []
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> Self:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *_args: object) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        target = head.split(" ", 2)[1]
+        length = 0
+        for line in head.split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        await reader.readexactly(length)
+
+        try:
+            if target.startswith("/api/stop"):
+                await self._stop(target, writer)
+            else:
+                await self._chat(writer)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stop(self, target: str, writer: asyncio.StreamWriter) -> None:
+        self.stop_requests.append(target)
+        if len(self.stop_requests) == 1:
+            status = "500 Internal Server Error"
+        else:
+            await asyncio.sleep(STOP_DELAY)
+            status = "200 OK"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+
+    async def _chat(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nConnection: close\r\n\r\n")
+        event = {"event": "text.add", "taskId": "task-1", "content": {"text": "正在分析"}}
+        writer.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+        await writer.drain()
+        while True:
+            await asyncio.sleep(0.05)
+            writer.write(b'data: {"event": "heartbeat"}\n\n')
+            await writer.drain()
+
+
+def test_cancel_returns_before_server_stop_completes() -> None:
+    """取消立即返回，stop 请求在后台带任务ID发送并在失败后重试"""
+
+    async def run() -> None:
+        async with _SlowStopServer() as server:
+            client = HermesChatClient(server.url)
+            client.conversation_manager._conversation_id = "conv-1"  # noqa: SLF001
+            first_text = asyncio.Event()
+
+            async def consume() -> None:
+                async for _text in client.get_llm_response("分析日志"):
+                    first_text.set()
+
+            task = asyncio.create_task(consume())
+            await asyncio.wait_for(first_text.wait(), timeout=5)
+            assert client.current_task_id == "task-1"
+
+            started = time.monotonic()
+            task.cancel()
+            await client.interrupt()
+            await asyncio.gather(task, return_exceptions=True)
+            assert time.monotonic() - started < CANCEL_BOUND
+            assert client.current_task_id == ""
+
+            # 新请求开始前等待后台停止请求完成，避免其停止新的会话
+            await client._wait_pending_stops()  # noqa: SLF001
+            assert len(server.stop_requests) == 2  # noqa: PLR2004
+            assert all("taskId=task-1" in target for target in server.stop_requests)
+            await close_http_clients()
+
+    asyncio.run(run())
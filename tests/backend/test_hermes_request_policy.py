@@ -0,0 +1,142 @@
+"""测试 Hermes 控制面请求的重试、熔断与对冲策略"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Self
+
+import pytest
+
+from backend.hermes.exceptions import HermesAPIError
+from backend.hermes.services.conversation import HermesConversationManager
+from backend.hermes.services.http import HermesHttpManager, RequestPolicy
+from backend.hermes.services.model import HermesModelManager
+from backend.http_pool import close_http_clients
+
+RESET = "reset"
+
+
+def _models(name: str) -> tuple[int, dict, float]:
+    return 200, {"code": 200, "result": [{"modelName": name}]}, 0.0
+
+
+class _FlakyServer:
+    """模拟 Hermes 服务：按顺序为每个请求执行预设动作，动作用完后重复最后一个"""
+
+    def __init__(self, *actions: str | tuple[int, dict, float]) -> None:
+        self.url = ""
+        self.requests: list[str] = []
+        self.actions = list(actions)
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> Self:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *_args: object) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        self.requests.append(" ".join(head.split(" ", 2)[:2]))
+        action = self.actions.pop(0) if len(self.actions) > 1 else self.actions[0]
+        try:
+            # 模拟后端重启：不返回任何响应直接断开
+            if action == RESET:
+                return
+            status, body, delay = action
+            await asyncio.sleep(delay)
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload,
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def test_idempotent_read_survives_restart_flap() -> None:
+    """后端重启期间连接被断开、返回 503，幂等读取重试后成功"""
+
+    async def run() -> tuple[list[str], int, list[dict]]:
+        async with _FlakyServer(RESET, (503, {}, 0.0), _models("qwen")) as server:
+            http = HermesHttpManager(server.url, policy=RequestPolicy(backoff_base=0.01))
+            models = await HermesModelManager(http).get_available_models()
+            await close_http_clients()
+            return models, len(server.requests), http.get_endpoint_stats()
+
+    models, request_count, stats = asyncio.run(run())
+
+    assert models == ["qwen"]
+    assert request_count == 3  # noqa: PLR2004
+    assert stats[0]["endpoint"] == "GET /api/llm"
+    assert stats[0]["retries"] == 2  # noqa: PLR2004
+    assert stats[0]["state"] == "closed"
+
+
+def test_non_idempotent_post_is_not_retried_after_sending() -> None:
+    """创建会话请求已发出后失败时不重试，避免服务端重复创建"""
+
+    async def run(action: str | tuple[int, dict, float]) -> int:
+        async with _FlakyServer(action, _models("unused")) as server:
+            http = HermesHttpManager(server.url, policy=RequestPolicy(backoff_base=0.01))
+            with pytest.raises(HermesAPIError):
+                await HermesConversationManager(http)._create_conversation()  # noqa: SLF001
+            await close_http_clients()
+            return len(server.requests)
+
+    assert asyncio.run(run((503, {}, 0.0))) == 1
+    assert asyncio.run(run(RESET)) == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers() -> None:
+    """连续失败后熔断，冷却期内不发出请求，探测成功后恢复"""
+    policy = RequestPolicy(max_attempts=1, failure_threshold=2, reset_timeout=0.2)
+
+    async def run() -> None:
+        async with _FlakyServer(RESET, RESET, _models("qwen")) as server:
+            http = HermesHttpManager(server.url, policy=policy)
+            manager = HermesModelManager(http)
+            for _ in range(4):
+                assert await manager.get_available_models() == []
+            # 熔断后的请求直接失败，没有到达服务端
+            assert len(server.requests) == 2  # noqa: PLR2004
+            assert http.get_endpoint_stats()[0]["rejected"] == 2  # noqa: PLR2004
+
+            await asyncio.sleep(policy.reset_timeout)
+            assert await manager.get_available_models() == ["qwen"]
+            stats = http.get_endpoint_stats()[0]
+            assert stats["state"] == "closed"
+            assert stats["circuit_opens"] == 1
+            await close_http_clients()
+
+    asyncio.run(run())
+
+
+def test_hedged_read_returns_faster_response() -> None:
+    """首个请求超过对冲等待时间未返回时发出对冲请求，使用先返回的结果"""
+
+    async def run() -> tuple[list[str], float, dict]:
+        slow = (200, {"code": 200, "result": [{"modelName": "slow"}]}, 2.0)
+        async with _FlakyServer(slow, _models("fast")) as server:
+            http = HermesHttpManager(server.url, policy=RequestPolicy(hedge_delay=0.1))
+            started = time.monotonic()
+            models = await HermesModelManager(http).get_available_models()
+            elapsed = time.monotonic() - started
+            await close_http_clients()
+            return models, elapsed, http.get_endpoint_stats()[0]
+
+    models, elapsed, stats = asyncio.run(run())
+
+    assert models == ["fast"]
+    assert elapsed < 1.0
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
@@ -0,0 +1,133 @@
+"""测试 Hermes 流式响应的断线续传"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING, Self
+
+import pytest
+
+from backend.hermes import client as client_module
+from backend.hermes.client import HermesChatClient
+from backend.hermes.exceptions import HermesAPIError
+from backend.http_pool import close_http_clients
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def _event(event_id: int, text: str) -> bytes:
+    event = {"id": str(event_id), "event": "text.add", "taskId": "task-1", "content": {"text": text}}
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode()
+
+
+def _chunk(data: bytes) -> bytes:
+    return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+
+class _DroppingServer:
+    """模拟 Hermes 服务：按顺序执行每次 /api/chat 请求的处理函数，记录请求内容与 Last-Event-ID"""
+
+    def __init__(self, *handlers: Callable[[asyncio.StreamWriter], object]) -> None:
+        self.url = ""
+        self.requests: list[tuple[dict, str]] = []
+        self._handlers = list(handlers)
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> Self:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *_args: object) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        headers = dict(line.lower().split(": ", 1) for line in head.split("\r\n")[1:] if ": " in line)
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+        self.requests.append((json.loads(body), headers.get("last-event-id", "")))
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        try:
+            await self._handlers.pop(0)(writer)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _drop_after(writer: asyncio.StreamWriter, *events: bytes) -> None:
+    """发送事件后在分块中途断开连接"""
+    for event in events:
+        writer.write(_chunk(event))
+    await writer.drain()
+    await asyncio.sleep(0.05)
+    writer.write(b"ff\r\ndata: {")
+    await writer.drain()
+
+
+async def _replay_all_and_finish(writer: asyncio.StreamWriter) -> None:
+    """忽略 Last-Event-ID，从头重新发送所有事件后结束"""
+    for event in (_event(1, "第一段"), _event(2, "第二段"), _event(3, "第三段"), b"data: [DONE]\n\n"):
+        writer.write(_chunk(event))
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _collect(client: HermesChatClient) -> list[str]:
+    client.conversation_manager._conversation_id = "conv-1"  # noqa: SLF001
+    try:
+        return [text async for text in client.get_llm_response("分析日志")]
+    finally:
+        await close_http_clients()
+
+
+def test_stream_resumes_with_task_id_and_deduplicates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """连接中断后带任务ID和最后事件ID重连，服务端重发的事件不会重复输出"""
+    monkeypatch.setattr(client_module, "STREAM_RESUME_DELAY", 0.01)
+
+    async def run() -> tuple[list[str], list[tuple[dict, str]]]:
+        async with _DroppingServer(
+            lambda writer: _drop_after(writer, _event(1, "第一段"), _event(2, "第二段")),
+            _replay_all_and_finish,
+        ) as server:
+            texts = await _collect(HermesChatClient(server.url))
+            return texts, server.requests
+
+    texts, requests = asyncio.run(run())
+
+    assert texts == ["第一段", "第二段", "第三段"]
+    assert len(requests) == 2  # noqa: PLR2004
+    assert requests[0][0]["question"] == "分析日志"
+    assert requests[1] == ({"taskId": "task-1"}, "2")
+
+
+def test_stream_without_task_id_is_not_resumed(monkeypatch: pytest.MonkeyPatch) -> None:
+    """收到任务ID前连接就中断时无法续传，按网络错误处理"""
+    monkeypatch.setattr(client_module, "STREAM_RESUME_DELAY", 0.01)
+
+    async def run() -> int:
+        async with _DroppingServer(_drop_after) as server:
+            with pytest.raises(HermesAPIError, match="Network error"):
+                await _collect(HermesChatClient(server.url))
+            return len(server.requests)
+
+    assert asyncio.run(run()) == 1
+
+
+def test_resume_gives_up_without_new_events(monkeypatch: pytest.MonkeyPatch) -> None:
+    """重连后服务端只重复发送旧事件就断开时，达到重连上限后放弃"""
+    monkeypatch.setattr(client_module, "STREAM_RESUME_DELAY", 0.01)
+    monkeypatch.setattr(client_module, "STREAM_RESUME_ATTEMPTS", 2)
+
+    async def run() -> int:
+        handlers = [lambda writer: _drop_after(writer, _event(1, "第一段"))] * 3
+        async with _DroppingServer(*handlers) as server:
+            with pytest.raises(HermesAPIError, match="Network error"):
+                await _collect(HermesChatClient(server.url))
+            return len(server.requests)
+
+    assert asyncio.run(run()) == 3  # noqa: PLR2004
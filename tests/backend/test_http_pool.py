@@ -0,0 +1,66 @@
+"""测试共享 HTTP 客户端注册表"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.http_pool import HttpClientRegistry
+
+
+def test_clients_are_shared_by_origin_verify_and_profile() -> None:
+    """同一来源、SSL 设置和超时配置复用同一个客户端"""
+
+    async def run() -> None:
+        registry = HttpClientRegistry()
+        first = registry.get_client("http://127.0.0.1:8002/api/mcp")
+        second = registry.get_client("http://127.0.0.1:8002/api/app/1")
+        insecure = registry.get_client("http://127.0.0.1:8002", verify=False)
+        health = registry.get_client("http://127.0.0.1:8002", profile="health")
+        other = registry.get_client("http://127.0.0.1:8080")
+
+        assert first is second
+        assert len({id(first), id(insecure), id(health), id(other)}) == 4  # noqa: PLR2004
+        assert health.timeout == httpx.Timeout(5.0)
+
+        stats = registry.get_stats()
+        assert stats["created"] == 4  # noqa: PLR2004
+        assert stats["reused"] == 1
+        await registry.close_all()
+
+    asyncio.run(run())
+
+
+def test_close_all_and_recreate() -> None:
+    """关闭后再次获取会创建新的客户端，并统计请求数"""
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"code": 200})
+
+    async def run() -> None:
+        registry = HttpClientRegistry()
+        client = registry.get_client("http://testserver")
+        client._transport = httpx.MockTransport(handler)  # noqa: SLF001
+        await client.get("http://testserver/api/user")
+        await client.get("http://testserver/api/user")
+        assert registry.get_stats()["clients"][0]["requests"] == 2  # noqa: PLR2004
+
+        await registry.close_all()
+        assert client.is_closed
+        assert registry.get_stats()["closed"] == 1
+        assert registry.get_stats()["active"] == 0
+
+        new_client = registry.get_client("http://testserver")
+        assert new_client is not client
+        await registry.close_all()
+
+    asyncio.run(run())
+
+
+def test_unknown_profile_rejected() -> None:
+    """未知的超时配置直接报错"""
+    registry = HttpClientRegistry()
+    with pytest.raises(ValueError, match="missing"):
+        registry.get_client("http://127.0.0.1", profile="missing")
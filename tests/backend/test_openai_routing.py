@@ -0,0 +1,147 @@
+"""测试 OpenAI 客户端的多端点路由、故障转移与对冲请求"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Self
+
+from backend.http_pool import close_http_clients
+from backend.openai import OpenAIClient
+from backend.routing import EndpointRouter
+
+
+class _StandInServer:
+    """模拟 OpenAI 兼容接口的本地流式服务"""
+
+    def __init__(self, reply: str, *, delay: float = 0.0, status: int = 200) -> None:
+        self.reply = reply
+        self.delay = delay
+        self.status = status
+        self.requests = 0
+        self.url = ""
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> Self:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def __aexit__(self, *_args: object) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.decode().split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        await reader.readexactly(length)
+        self.requests += 1
+
+        try:
+            if self.status != 200:  # noqa: PLR2004
+                body = json.dumps({"error": {"message": "overloaded"}}).encode()
+                writer.write(
+                    f"HTTP/1.1 {self.status} Error\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body,
+                )
+            else:
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                await asyncio.sleep(self.delay)
+                for word in self.reply.split(" "):
+                    chunk = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion.chunk",
+                        "created": 0,
+                        "model": "test",
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                    }
+                    writer.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                writer.write(b"data: [DONE]\n\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _collect(client: OpenAIClient, prompt: str) -> str:
+    return "".join([part async for part in client.get_llm_response(prompt)])
+
+
+def test_failover_to_next_endpoint_on_error() -> None:
+    """首选端点出错时切换到备用端点，并在后续请求中优先使用备用端点"""
+
+    async def run() -> None:
+        async with (
+            _StandInServer("", status=503) as broken,
+            _StandInServer("hello from backup") as backup,
+        ):
+            client = OpenAIClient(broken.url, "test", "sk-test", verify_ssl=True, fallback_urls=[backup.url])
+
+            assert await _collect(client, "hi") == "hellofrombackup"
+            assert client.router.rank()[0] == backup.url
+            stats = {item["url"]: item for item in client.get_endpoint_stats()}
+            assert stats[broken.url]["errors"] == 1
+            # 多端点时不在单个端点上重试
+            assert broken.requests == 1
+
+            await _collect(client, "again")
+            assert broken.requests == 1
+            assert backup.requests == 2  # noqa: PLR2004
+            await close_http_clients()
+
+    asyncio.run(run())
+
+
+def test_hedged_request_wins_and_loser_is_cancelled() -> None:
+    """首选端点超过对冲时限未返回首个 token 时，备用端点的结果胜出"""
+
+    async def run() -> None:
+        async with (
+            _StandInServer("slow", delay=2.0) as slow,
+            _StandInServer("fast answer") as fast,
+        ):
+            router = EndpointRouter([slow.url, fast.url], default_hedge_delay=0.1)
+            client = OpenAIClient(slow.url, "test", "sk-test", verify_ssl=True, router=router, hedge=True)
+
+            start = time.monotonic()
+            assert await _collect(client, "hi") == "fastanswer"
+            assert time.monotonic() - start < 1.0
+            assert slow.requests == 1
+            assert fast.requests == 1
+
+            stats = {item["url"]: item for item in client.get_endpoint_stats()}
+            # 落败请求已等待的时间作为延迟下限计入统计，不计为错误
+            assert stats[slow.url]["errors"] == 0
+            assert stats[slow.url]["ewma_ttft"] >= 0.1  # noqa: PLR2004
+            assert router.rank()[0] == fast.url
+            # 历史记录只保留一轮对话
+            assert len(client._conversation_history) == 2  # noqa: SLF001, PLR2004
+            await close_http_clients()
+
+    asyncio.run(run())
+
+
+def test_router_ranks_by_ewma_and_hedges_on_percentile() -> None:
+    """路由按 EWMA 延迟与错误率排序，对冲时限取 TTFT 分位数"""
+    router = EndpointRouter(["a", "b"], default_hedge_delay=3.0)
+    assert router.rank() == ["a", "b"]
+
+    router.record_success("a", 1.0)
+    router.record_success("b", 0.2)
+    assert router.rank() == ["b", "a"]
+
+    router.record_error("b")
+    router.record_error("b")
+    assert router.rank() == ["a", "b"]
+
+    assert router.hedge_delay("a") == 3.0  # noqa: PLR2004
+    for ttft in (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9):
+        router.record_success("a", ttft)
+    assert router.hedge_delay("a") == 0.9  # noqa: PLR2004
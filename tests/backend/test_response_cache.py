@@ -0,0 +1,156 @@
+"""测试命令失败分析的本地响应缓存"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+from backend.base import LLMClientBase
+from backend.hermes.client import HermesChatClient
+from backend.response_cache import ResponseCache, cache_key
+from tool.command_processor import process_command
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, AsyncIterator
+    from pathlib import Path
+
+FAILING_COMMAND = "ls /nonexistent-response-cache-test"
+
+
+class _FakeClient(LLMClientBase):
+    """按预设分块返回响应并记录请求次数的客户端"""
+
+    def __init__(self, chunks: list[str], scope: str | None = "openai http://llm qwen") -> None:
+        self.chunks = chunks
+        self.scope = scope
+        self.requests = 0
+
+    async def get_llm_response(self, prompt: str) -> AsyncGenerator[str, None]:
+        self.requests += 1
+        for chunk in self.chunks:
+            yield chunk
+
+    async def interrupt(self) -> None:
+        pass
+
+    async def get_available_models(self) -> list[str]:
+        return []
+
+    def reset_conversation(self) -> None:
+        pass
+
+    def response_cache_scope(self) -> str | None:
+        return self.scope
+
+    async def close(self) -> None:
+        pass
+
+
+class _HermesStreamClient(HermesChatClient):
+    """按预设的 SSE 事件经过 Hermes 事件处理流程返回响应的客户端"""
+
+    def __init__(self, *events: dict) -> None:
+        super().__init__(base_url="http://hermes.invalid")
+        self.events = events
+        self.requests = 0
+
+    async def get_llm_response(self, prompt: str) -> AsyncGenerator[str, None]:
+        self.requests += 1
+        async for text in self._process_stream_events(self._lines()):
+            yield text
+
+    async def _lines(self) -> AsyncIterator[str]:
+        for event in self.events:
+            yield f"data: {json.dumps(event, ensure_ascii=False)}"
+
+
+def _run(client: LLMClientBase, cache: ResponseCache, *, refresh_cache: bool = False) -> list[tuple[str, bool]]:
+    async def collect() -> list[tuple[str, bool]]:
+        return [item async for item in process_command(FAILING_COMMAND, client, cache, refresh_cache=refresh_cache)]
+
+    return asyncio.run(collect())
+
+
+def test_failure_analysis_replayed_from_cache(tmp_path: Path) -> None:
+    """相同的失败分析第二次直接回放原分块，跳过缓存时重新请求，其他模型不共享缓存"""
+    cache = ResponseCache(tmp_path, max_bytes=1024 * 1024, ttl=3600)
+    client = _FakeClient(["目录", "不存在，", "请检查路径。"])
+
+    first = _run(client, cache)
+    second = _run(client, cache)
+
+    assert client.requests == 1
+    assert [item for item in first if item[1]] == [("目录", True), ("不存在，", True), ("请检查路径。", True)]
+    assert [item for item in second if item[1]] == [item for item in first if item[1]]
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    _run(client, cache, refresh_cache=True)
+    assert client.requests == 2  # noqa: PLR2004
+    assert cache.stats.bypasses == 1
+
+    other = _FakeClient(["另一个模型"], scope="openai http://llm deepseek")
+    _run(other, cache)
+    assert other.requests == 1
+
+    # 包含 MCP 交互的响应与不支持缓存的客户端都不写入缓存
+    mcp = _FakeClient(["[MCP:waiting]等待确认"], scope="eulerintelli http://hermes agent")
+    _run(mcp, cache)
+    _run(mcp, cache)
+    assert mcp.requests == 2  # noqa: PLR2004
+    replay = _FakeClient(["回放"], scope=None)
+    _run(replay, cache)
+    _run(replay, cache)
+    assert replay.requests == 2  # noqa: PLR2004
+
+
+def test_normalized_key_ttl_and_lru_eviction(tmp_path: Path) -> None:
+    """提示中的空白差异命中同一条目，过期条目失效，超过大小上限时淘汰最久未使用的条目"""
+    assert cache_key("s", "line one\n\n  line   two  ") == cache_key("s", "line one\nline two")
+    assert cache_key("s", "line one") != cache_key("t", "line one")
+
+    cache = ResponseCache(tmp_path, max_bytes=1024 * 1024, ttl=3600)
+    cache.put("s", "prompt a", ["a" * 300])
+    assert cache.get("s", "prompt   a\n") == ["a" * 300]
+
+    expired = ResponseCache(tmp_path, max_bytes=1024 * 1024, ttl=0.01)
+    time.sleep(0.02)
+    assert expired.get("s", "prompt a") is None
+    assert not list(tmp_path.glob("*.json"))
+
+    small = ResponseCache(tmp_path, max_bytes=1000, ttl=3600)
+    small.put("s", "prompt 1", ["1" * 300])
+    small.put("s", "prompt 2", ["2" * 300])
+    # 使用时间由文件修改时间记录，其他实例据此淘汰
+    old = time.time() - 100
+    for name in (cache_key("s", "prompt 1"), cache_key("s", "prompt 2")):
+        os.utime(tmp_path / f"{name}.json", (old, old))
+    assert small.get("s", "prompt 1") is not None
+
+    other = ResponseCache(tmp_path, max_bytes=1000, ttl=3600)
+    other.put("s", "prompt 3", ["3" * 300])
+    assert other.stats.evictions == 1
+    assert other.get("s", "prompt 2") is None
+    assert other.get("s", "prompt 1") is not None
+    assert other.get("s", "prompt 3") is not None
+
+
+def test_backend_error_text_is_not_cached(tmp_path: Path) -> None:
+    """以后端错误提示或无内容提示结束的 Hermes 响应不写入缓存，正常完成的响应照常缓存"""
+    cache = ResponseCache(tmp_path, max_bytes=1024 * 1024, ttl=3600)
+    text = {"event": "text.add", "content": {"text": "请检查路径"}}
+
+    for events in ([text, {"event": "error", "content": {}}], [{"event": "done", "content": {}}]):
+        client = _HermesStreamClient(*events)
+        _run(client, cache)
+        _run(client, cache)
+        assert client.requests == 2  # noqa: PLR2004
+        assert not list(tmp_path.glob("*.json"))
+
+    client = _HermesStreamClient(text, {"event": "done", "content": {}})
+    _run(client, cache)
+    replayed = _run(client, cache)
+    assert client.requests == 1
+    assert [item for item in replayed if item[1]] == [("请检查路径", True)]
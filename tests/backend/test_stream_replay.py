@@ -0,0 +1,134 @@
+"""测试流式响应的录制与回放"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from backend import recording
+from backend.hermes.client import HermesChatClient
+from backend.mcp_handler import MCPEventHandler
+from backend.recording import RECORD_ENV, STREAM_CHAT, STREAM_MCP_RESPONSE, begin_recording, load_recording
+from backend.replay import REPLAY_EXHAUSTED_MESSAGE, ReplayClient
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+    from pathlib import Path
+
+    from backend.hermes.stream import HermesStreamEvent
+
+CHAT_LINES = [
+    'data: {"event": "text.add", "content": {"text": "你好"}}',
+    'data: {"event": "step.waiting_for_start", "taskId": "task-1", "flow": {"stepName": "查询磁盘"}}',
+    "data: [DONE]",
+]
+MCP_LINES = [
+    'data: {"event": "text.add", "content": {"text": "磁盘空间充足"}}',
+    "data: [DONE]",
+]
+
+
+class _RecordingHandler(MCPEventHandler):
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    async def handle_waiting_for_start(self, event: HermesStreamEvent) -> None:
+        self.events.append(event.event_type)
+
+    async def handle_waiting_for_param(self, event: HermesStreamEvent) -> None:
+        self.events.append(event.event_type)
+
+
+async def _lines(lines: list[str], interval: float = 0.0) -> AsyncIterator[str]:
+    for line in lines:
+        await asyncio.sleep(interval)
+        yield line
+
+
+async def _collect(stream: AsyncIterator[str]) -> list[str]:
+    return [text async for text in stream]
+
+
+@pytest.fixture
+def recorded_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """通过 WITTY_RECORD_STREAMS 录制一次对话和一次 MCP 响应"""
+    path = tmp_path / "streams.jsonl.gz"
+    monkeypatch.setattr(recording, "_recorder", None)
+    monkeypatch.setenv(RECORD_ENV, str(path))
+
+    async def record() -> None:
+        client = HermesChatClient(base_url="http://127.0.0.1:1")
+        chat = begin_recording(STREAM_CHAT, "eulerintelli", prompt="检查磁盘")
+        await _collect(client._process_stream_events(_lines(CHAT_LINES, 0.05), chat))  # noqa: SLF001
+        mcp = begin_recording(STREAM_MCP_RESPONSE, "eulerintelli", task_id="task-1", params=True)
+        await _collect(client._process_stream_events(_lines(MCP_LINES), mcp))  # noqa: SLF001
+
+    asyncio.run(record())
+    recorder = recording.get_stream_recorder()
+    assert recorder is not None
+    recorder.close()
+    return path
+
+
+def test_recording_keeps_raw_lines_and_timing(recorded_file: Path) -> None:
+    """录制文件保留每次请求的原始数据行及其相对时间"""
+    chat, mcp = load_recording(recorded_file)
+
+    assert chat.kind == STREAM_CHAT
+    assert chat.request == {"prompt": "检查磁盘"}
+    assert [line for _, line in chat.lines] == CHAT_LINES
+    assert chat.lines[-1][0] >= 0.1  # noqa: PLR2004
+    assert mcp.kind == STREAM_MCP_RESPONSE
+    assert mcp.request == {"task_id": "task-1", "params": True}
+
+
+def test_replay_reproduces_text_and_mcp_interaction(recorded_file: Path) -> None:
+    """回放按录制顺序输出文本，重现 MCP 交互，并在用户确认后回放 MCP 响应流"""
+    client = ReplayClient(recorded_file, speed=0)
+    handler = _RecordingHandler()
+    client.set_mcp_handler(handler)
+
+    async def replay() -> tuple[list[str], list[str], list[str]]:
+        chat = await _collect(client.get_llm_response("检查磁盘"))
+        task_id = client.current_task_id
+        mcp = await _collect(client.send_mcp_response(task_id, params=True))
+        exhausted = await _collect(client.get_llm_response("再来一次"))
+        return chat, mcp, exhausted
+
+    chat, mcp, exhausted = asyncio.run(replay())
+
+    assert chat[0] == "你好"
+    assert handler.events == ["step.waiting_for_start"]
+    assert mcp == ["磁盘空间充足"]
+    assert exhausted == [REPLAY_EXHAUSTED_MESSAGE]
+
+
+def test_replay_speed(recorded_file: Path) -> None:
+    """回放速度倍数按比例缩短录制时的等待时间，0 表示尽快回放"""
+    recorded = load_recording(recorded_file)[0].lines[-1][0]
+
+    for speed, low, high in ((0, 0.0, recorded / 4), (2, recorded / 2 * 0.9, recorded)):
+        client = ReplayClient(recorded_file, speed=speed)
+        started = time.monotonic()
+        asyncio.run(_collect(client.get_llm_response("检查磁盘")))
+        assert low <= time.monotonic() - started < high
+
+
+def test_replay_openai_recording(tmp_path: Path) -> None:
+    """OpenAI 录制内容按响应块中的文本增量回放"""
+    path = tmp_path / "openai.jsonl"
+    chunks = [{"choices": [{"delta": {"content": text}}]} for text in ("ls", " -la")]
+    records = [
+        {"s": 1, "stream": STREAM_CHAT, "backend": "openai", "request": {"prompt": "列出文件"}},
+        *({"s": 1, "t": 0.0, "line": f"data: {json.dumps(chunk)}"} for chunk in chunks),
+        {"s": 1, "t": 0.0, "line": "data: [DONE]"},
+    ]
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+    client = ReplayClient(path, speed=0)
+
+    assert asyncio.run(_collect(client.get_llm_response("列出文件"))) == ["ls", " -la"]
@@ -0,0 +1,157 @@
+"""测试流式响应空闲看门狗"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import TYPE_CHECKING, Self
+
+import pytest
+
+from backend.hermes.client import HermesChatClient
+from backend.http_pool import close_http_clients
+from backend.stream_watchdog import StreamIdleError, StreamWatchdog, get_stream_watchdog_stats
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+IDLE = 0.15
+HEARTBEAT = 'data: {"event": "heartbeat"}'
+
+
+async def _lines(lines: list[str], interval: float, *, stall: bool) -> AsyncIterator[str]:
+    for line in lines:
+        await asyncio.sleep(interval)
+        yield line
+    if stall:
+        await asyncio.Event().wait()
+
+
+def _is_heartbeat(line: str) -> bool:
+    return line == HEARTBEAT
+
+
+def test_silent_stall_raises_after_idle_window() -> None:
+    """心跳维持连接，之后静默卡住的流在空闲时限后被中断"""
+    before = get_stream_watchdog_stats()
+    watchdog = StreamWatchdog(IDLE, name="test", is_heartbeat=_is_heartbeat)
+    received: list[str] = []
+
+    async def run() -> None:
+        source = _lines(["data: first", *[HEARTBEAT] * 6], 0.05, stall=True)
+        async for line in watchdog.watch(source):
+            received.append(line)  # noqa: PERF401  # 需要保留异常前收到的数据
+
+    started = time.monotonic()
+    with pytest.raises(StreamIdleError) as exc_info:
+        asyncio.run(run())
+    elapsed = time.monotonic() - started
+
+    assert len(received) == 7  # noqa: PLR2004
+    assert 0.3 + IDLE <= elapsed < 0.3 + IDLE * 3
+    # 心跳计为数据而不是内容
+    assert exc_info.value.since_content >= 0.3 + IDLE
+    after = get_stream_watchdog_stats()
+    assert after["fired"] == before["fired"] + 1
+    assert after["heartbeats"] == before["heartbeats"] + 6
+
+
+def test_slow_consumer_and_external_cancel() -> None:
+    """调用方处理数据的时间不计入空闲时间，外部取消仍按取消处理"""
+    watchdog = StreamWatchdog(IDLE, name="slow-consumer")
+
+    async def consume_slowly() -> list[str]:
+        received = []
+        async for line in watchdog.watch(_lines(["a", "b", "c"], 0.0, stall=False)):
+            received.append(line)
+            await asyncio.sleep(IDLE * 2)
+        return received
+
+    assert asyncio.run(consume_slowly()) == ["a", "b", "c"]
+    assert not watchdog.fired
+
+    async def cancel_while_reading() -> None:
+        task = asyncio.create_task(_drain(StreamWatchdog(10.0).watch(_lines([], 0.0, stall=True))))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_reading())
+
+
+async def _drain(lines: AsyncIterator[str]) -> None:
+    async for _line in lines:
+        pass
+
+
+class _StallingServer:
+    """模拟 Hermes 服务：聊天流发送一条内容后不再发送任何数据"""
+
+    def __init__(self) -> None:
+        self.url = ""
+        self.disconnected = asyncio.Event()
+        self.stop_requests: list[str] = []
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> Self:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *_args: object) -> None:
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        target = head.split(" ", 2)[1]
+        length = next(
+            (int(line.split(":", 1)[1]) for line in head.split("\r\n") if line.lower().startswith("content-length:")),
+            0,
+        )
+        await reader.readexactly(length)
+        try:
+            if target.startswith("/api/stop"):
+                self.stop_requests.append(target)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nConnection: close\r\n\r\n")
+            event = {"event": "text.add", "taskId": "task-1", "content": {"text": "正在分析"}}
+            writer.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode())
+            await writer.drain()
+            # 客户端断开连接时 read 返回空字节
+            await reader.read()
+            self.disconnected.set()
+        except (ConnectionError, asyncio.CancelledError):
+            self.disconnected.set()
+        finally:
+            writer.close()
+
+
+def test_hermes_client_releases_stalled_connection() -> None:
+    """Hermes 客户端在流静默卡住时断开连接，并在后台通知服务端停止任务"""
+
+    async def run() -> None:
+        async with _StallingServer() as server:
+            client = HermesChatClient(server.url, stream_idle_timeout=IDLE)
+            client.conversation_manager._conversation_id = "conv-1"  # noqa: SLF001
+            received: list[str] = []
+
+            async def consume() -> None:
+                async for text in client.get_llm_response("分析日志"):
+                    received.append(text)  # noqa: PERF401  # 需要保留异常前收到的数据
+
+            with pytest.raises(StreamIdleError):
+                await consume()
+
+            assert received == ["正在分析"]
+            await asyncio.wait_for(server.disconnected.wait(), timeout=2)
+            await client._wait_pending_stops()  # noqa: SLF001
+            assert server.stop_requests == ["/api/stop?taskId=task-1"]
+            await close_http_clients()
+
+    asyncio.run(run())
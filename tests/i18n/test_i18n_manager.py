@@ -0,0 +1,49 @@
+"""Tests for lazy translation loading and the per-locale memo table."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from backend.hermes.mcp_helpers import MCPIndicators, MCPTextFragments
+from i18n.manager import I18nManager, memoize, set_locale
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_only_requested_locale_is_loaded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Setting a locale should load that catalog and nothing else."""
+    manager = I18nManager()
+    monkeypatch.setattr(I18nManager, "_translations", {})
+
+    assert manager.get_loaded_locales() == []
+    assert set_locale("zh_CN")
+    assert manager.get_loaded_locales() == ["zh_CN"]
+
+    manager.translate("工具")
+    assert manager.get_loaded_locales() == ["zh_CN"]
+
+
+def test_memo_is_cleared_on_locale_change() -> None:
+    """Memoized fragments are computed once per locale."""
+    calls: list[int] = []
+
+    def factory() -> str:
+        calls.append(1)
+        return "value"
+
+    set_locale("en_US")
+    assert memoize("test.factory", factory) == "value"
+    assert memoize("test.factory", factory) == "value"
+    assert calls == [1]
+
+    set_locale("zh_CN")
+    memoize("test.factory", factory)
+    assert calls == [1, 1]
+
+
+def test_mcp_fragments_are_cached() -> None:
+    """Repeated MCP fragment lookups return the cached object."""
+    set_locale("zh_CN")
+    assert MCPTextFragments.tool_word() is MCPTextFragments.tool_word()
+    assert MCPIndicators.all_indicators() is MCPIndicators.all_indicators()
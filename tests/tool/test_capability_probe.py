@@ -0,0 +1,113 @@
+"""测试 function_call 能力并发探测与指纹缓存"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from tool.validators import APIValidator, CapabilityCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+PROBE_DELAY = 0.2
+
+
+class _FakeCompletions:
+    """模拟 chat.completions，仅 json_mode 探测返回有效结果"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        self.calls += 1
+        response_format = kwargs.get("response_format", {})
+        is_basic_chat = kwargs["max_tokens"] == 10  # noqa: PLR2004
+        try:
+            await asyncio.sleep(0 if is_basic_chat else PROBE_DELAY)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        content = '{"status": "ok"}' if response_format.get("type") == "json_object" else "plain text"
+        message = SimpleNamespace(content=content, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class _FakeClient:
+    """模拟 AsyncOpenAI 客户端"""
+
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=_FakeCompletions())
+
+    async def close(self) -> None:
+        return None
+
+
+def _make_validator(tmp_path: Path, client: _FakeClient) -> APIValidator:
+    validator = APIValidator(capability_cache=CapabilityCache(tmp_path / "cache.json"))
+    validator._create_openai_client = lambda **_kwargs: client  # type: ignore[method-assign]  # noqa: SLF001
+    return validator
+
+
+def test_probes_run_concurrently(tmp_path: Path) -> None:
+    """所有探测并发执行，耗时接近单次探测而非总和"""
+    client = _FakeClient()
+    validator = _make_validator(tmp_path, client)
+
+    start = time.perf_counter()
+    valid, _msg, info = asyncio.run(validator.validate_llm_config("http://llm/v1", "key", "model"))
+    elapsed = time.perf_counter() - start
+
+    assert valid
+    assert info["detected_function_call_type"] == "json_mode"
+    assert elapsed < PROBE_DELAY * 2
+    # 1 次基础对话 + 5 次探测
+    assert client.chat.completions.calls == 6  # noqa: PLR2004
+
+
+def test_cached_result_skips_probing(tmp_path: Path) -> None:
+    """相同指纹的配置第二次验证直接命中缓存"""
+    client = _FakeClient()
+    validator = _make_validator(tmp_path, client)
+    asyncio.run(validator.validate_llm_config("http://llm/v1", "key", "model"))
+    calls_after_first = client.chat.completions.calls
+
+    valid, _msg, info = asyncio.run(validator.validate_llm_config("http://llm/v1/", "key", "model"))
+    assert valid
+    assert info["cached"] is True
+    assert client.chat.completions.calls == calls_after_first
+
+    # 更换 API 密钥后指纹不同，需要重新探测
+    asyncio.run(validator.validate_llm_config("http://llm/v1", "other-key", "model"))
+    assert client.chat.completions.calls > calls_after_first
+
+
+def test_expired_entries_are_ignored(tmp_path: Path) -> None:
+    """超过有效期的缓存条目不会被使用"""
+    cache = CapabilityCache(tmp_path / "cache.json", ttl=0)
+    fingerprint = CapabilityCache.fingerprint("http://llm/v1", "model", "key")
+    cache.put(fingerprint, {"supports_function_call": True, "detected_function_call_type": "function_call"})
+    time.sleep(0.01)
+    assert cache.get(fingerprint) is None
+
+
+def test_failed_revalidation_invalidates_cache(tmp_path: Path) -> None:
+    """跳过缓存重新验证失败时删除缓存，之后的验证不再返回过时的成功结果"""
+    client = _FakeClient()
+    validator = _make_validator(tmp_path, client)
+    asyncio.run(validator.validate_llm_config("http://llm/v1", "key", "model"))
+
+    async def fail(*_args: object) -> tuple[bool, str]:
+        return False, "model not found"
+
+    validator._test_basic_chat = fail  # type: ignore[method-assign]  # noqa: SLF001
+    valid, _msg, _info = asyncio.run(validator.validate_llm_config("http://llm/v1", "key", "model", use_cache=False))
+    assert not valid
+
+    fingerprint = CapabilityCache.fingerprint("http://llm/v1", "model", "key")
+    assert validator.capability_cache.get(fingerprint) is None
+    valid, _msg, _info = asyncio.run(validator.validate_llm_config("http://llm/v1", "key", "model"))
+    assert not valid
@@ -23,10 +23,10 @@ async def test_invalid_token_no_request() -> None:
         "Bearer a1b2c3d4e5f6789012345678abcdef90",  # 带 Bearer 前缀
     ]
 
-    # Mock httpx.AsyncClient 来验证是否发送了请求
-    with patch("tool.validators.httpx.AsyncClient") as mock_client:
+    # Mock 共享 HTTP 客户端来验证是否发送了请求
+    with patch("tool.validators.get_http_client") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
 
         for token in invalid_tokens:
             print(f"测试无效令牌: {token}")
@@ -57,15 +57,15 @@ async def test_valid_token_sends_request() -> None:
         token_display = token if token else "(空令牌)"
         print(f"测试有效令牌: {token_display}")
 
-        # Mock httpx.AsyncClient
-        with patch("tool.validators.httpx.AsyncClient") as mock_client:
+        # Mock 共享 HTTP 客户端
+        with patch("tool.validators.get_http_client") as mock_client:
             mock_response = AsyncMock()
             mock_response.status_code = 200
             mock_response.json.return_value = {"code": 200, "data": {}}
 
             mock_client_instance = AsyncMock()
             mock_client_instance.get.return_value = mock_response
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_client.return_value = mock_client_instance
 
             # 执行验证
             _valid, _message = await validate_oi_connection(base_url, token)
@@ -88,9 +88,9 @@ async def test_url_validation() -> None:
     # 使用有效令牌
     valid_token = "a1b2c3d4e5f6789012345678abcdef90"  # noqa: S105
 
-    with patch("tool.validators.httpx.AsyncClient") as mock_client:
+    with patch("tool.validators.get_http_client") as mock_client:
         mock_client_instance = AsyncMock()
-        mock_client.return_value.__aenter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
 
         for url in invalid_urls:
             print(f"测试无效 URL: {url}")